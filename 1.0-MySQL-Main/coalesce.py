@@ -0,0 +1,158 @@
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+T = TypeVar("T")
+
+# Leader outcome telling async waiters to run the query themselves (the leader was cancelled)
+_RETRY = object()
+
+# One in-flight sync call and its outcome
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+# Coalesces identical concurrent reads: the first caller per key runs the query, the others share its result
+class SingleFlight:
+    def __init__(self, timeout: float, enabled: bool = True):
+        self.timeout = timeout
+        self.enabled = enabled
+        self.invalidations = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._futures: Dict[Hashable, asyncio.Future] = {}
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(("leaders", "shared", "timeouts", "errors"), 0)
+        )
+        self._lock = threading.Lock()
+
+    # Run fn() once for concurrent callers of `key` (its first item names the route in stats)
+    def do(self, key: Tuple[Hashable, ...], fn: Callable[[], T]) -> T:
+        if not self.enabled:
+            return fn()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            self._counts[key[0]]["leaders" if leader else "shared"] += 1
+        if leader:
+            try:
+                call.result = fn()
+                return call.result
+            except BaseException as e:
+                call.error = e
+                self._count(key, "errors")
+                raise
+            finally:
+                self._finish(self._calls, key, call)
+                call.done.set()
+        if not call.done.wait(self.timeout):
+            # A stuck leader must not hold every waiter: stop waiting and query directly
+            self._count(key, "timeouts")
+            return fn()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    # Async do(): await fn() once for concurrent callers of `key` on this event loop
+    async def do_async(self, key: Tuple[Hashable, ...], fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await fn()
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = asyncio.get_running_loop().create_future()
+            self._counts[key[0]]["leaders" if leader else "shared"] += 1
+        if not leader:
+            try:
+                # shield: a waiter that times out or disconnects must not cancel the shared outcome
+                result, error = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            except asyncio.TimeoutError:
+                self._count(key, "timeouts")
+                return await fn()
+            if result is _RETRY:
+                return await fn()
+            if error is not None:
+                raise error
+            return result
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_result((_RETRY, None))
+            raise
+        except BaseException as e:
+            self._count(key, "errors")
+            future.set_result((None, e))
+            raise
+        else:
+            future.set_result((result, None))
+            return result
+        finally:
+            self._finish(self._futures, key, future)
+
+    # Stop new callers from joining calls already in flight (they may predate a committed write)
+    def forget(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._futures.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "timeout_seconds": self.timeout,
+                "in_flight": len(self._calls) + len(self._futures),
+                "invalidations": self.invalidations,
+                "routes": {route: dict(counts) for route, counts in self._counts.items()},
+            }
+
+    def _count(self, key: Tuple[Hashable, ...], name: str) -> None:
+        with self._lock:
+            self._counts[key[0]][name] += 1
+
+    # Drop `key` unless forget() already replaced it with a newer call
+    def _finish(self, calls: Dict[Hashable, Any], key: Hashable, call: Any) -> None:
+        with self._lock:
+            if calls.get(key) is call:
+                del calls[key]
+
+# Single-flight key for /books/search (whitespace differences do not change results)
+def search_key(search_term: str, limit: int) -> Tuple[Hashable, ...]:
+    return ("search", " ".join(search_term.split()), limit)
+
+# Call `callback` after every commit that wrote (ORM flushes and DML statements, sync or async)
+def on_write_commit(callback: Callable[[], None]) -> None:
+    # Session.info flag of this registration, so several can watch the same sessions
+    wrote = object()
+
+    def flushed(session: Session, flush_context) -> None:
+        session.info[wrote] = True
+
+    def executed(state: ORMExecuteState) -> None:
+        if state.is_insert or state.is_update or state.is_delete:
+            state.session.info[wrote] = True
+
+    def committed(session: Session) -> None:
+        # Releasing a savepoint fires after_commit too; only the outer commit makes the writes visible
+        if session.in_nested_transaction():
+            return
+        # Kept across rollbacks on purpose: a rolled-back savepoint must not hide the batch's other writes
+        if session.info.pop(wrote, False):
+            callback()
+
+    event.listen(Session, "after_flush", flushed)
+    event.listen(Session, "do_orm_execute", executed)
+    event.listen(Session, "after_commit", committed)
+
+# Forget in-flight reads after every commit that wrote
+def track_writes(flights: SingleFlight) -> None:
+    on_write_commit(flights.forget)
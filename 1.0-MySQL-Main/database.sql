@@ -12,14 +12,112 @@ CREATE TABLE IF NOT EXISTS books (
   published_year INT,
   genre VARCHAR(100),
   created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+  updated_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 );
 
 -- Create indexes for better search performance
 CREATE INDEX idx_title ON books(title);
 CREATE INDEX idx_author ON books(author);
 CREATE INDEX idx_published_year ON books(published_year);
-CREATE INDEX idx_genre ON books(genre); 
+CREATE INDEX idx_genre ON books(genre);
+CREATE INDEX idx_updated_at ON books(updated_at);
+-- Filter on one column, order by the next (GET /books?genre=...&sort=published_year)
+CREATE INDEX idx_genre_published_year ON books(genre, published_year);
+CREATE INDEX idx_author_published_year ON books(author, published_year);
+
+-- Full-text index used by /books/search (ranked, prefix matching)
+CREATE FULLTEXT INDEX ft_books_search ON books(title, author, genre);
+
+-- Grouped counts behind /books/facets and /books/stats (genre, author, publication decade).
+-- The triggers below keep them current on every write, so those endpoints read one row per
+-- value instead of scanning books. NULL values are not counted; `total` counts every book.
+CREATE TABLE IF NOT EXISTS book_facet_counts (
+  facet VARCHAR(16) NOT NULL,
+  value VARCHAR(255) NOT NULL,
+  book_count INT NOT NULL,
+  PRIMARY KEY (facet, value)
+);
+
+-- Backfill from existing rows (a no-op on a fresh database)
+INSERT INTO book_facet_counts (facet, value, book_count)
+SELECT 'total', '', COUNT(*) FROM books;
+INSERT INTO book_facet_counts (facet, value, book_count)
+SELECT 'genre', genre, COUNT(*) FROM books WHERE genre IS NOT NULL GROUP BY genre;
+INSERT INTO book_facet_counts (facet, value, book_count)
+SELECT 'author', author, COUNT(*) FROM books GROUP BY author;
+INSERT INTO book_facet_counts (facet, value, book_count)
+SELECT 'decade', FLOOR(published_year / 10) * 10, COUNT(*) FROM books
+WHERE published_year IS NOT NULL GROUP BY FLOOR(published_year / 10) * 10;
+
+-- Append-only change log behind /books/changes: the triggers below add one row per inserted,
+-- updated or deleted book in the writing transaction. seq is assigned at insert time, so rows
+-- can commit out of seq order; readers stop before gaps that a running transaction may still fill.
+CREATE TABLE IF NOT EXISTS book_changes (
+  seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+  book_id INT NOT NULL,
+  op ENUM('upsert', 'delete') NOT NULL,
+  changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+-- Existing books start the log as upserts, so since=0 replays the catalog (a no-op on a fresh database)
+INSERT INTO book_changes (book_id, op) SELECT id, 'upsert' FROM books ORDER BY id;
+
+DELIMITER //
+
+CREATE PROCEDURE bump_book_facet(IN p_facet VARCHAR(16), IN p_value VARCHAR(255), IN p_delta INT)
+BEGIN
+  IF p_value IS NOT NULL THEN
+    INSERT INTO book_facet_counts (facet, value, book_count) VALUES (p_facet, p_value, p_delta)
+    ON DUPLICATE KEY UPDATE book_count = book_count + p_delta;
+    -- Drop values no book has any more
+    IF p_delta < 0 AND p_facet <> 'total' THEN
+      DELETE FROM book_facet_counts WHERE facet = p_facet AND value = p_value AND book_count <= 0;
+    END IF;
+  END IF;
+END//
+
+CREATE TRIGGER books_facets_ai AFTER INSERT ON books FOR EACH ROW
+BEGIN
+  CALL bump_book_facet('total', '', 1);
+  CALL bump_book_facet('genre', NEW.genre, 1);
+  CALL bump_book_facet('author', NEW.author, 1);
+  CALL bump_book_facet('decade', FLOOR(NEW.published_year / 10) * 10, 1);
+END//
+
+CREATE TRIGGER books_facets_ad AFTER DELETE ON books FOR EACH ROW
+BEGIN
+  CALL bump_book_facet('total', '', -1);
+  CALL bump_book_facet('genre', OLD.genre, -1);
+  CALL bump_book_facet('author', OLD.author, -1);
+  CALL bump_book_facet('decade', FLOOR(OLD.published_year / 10) * 10, -1);
+END//
+
+CREATE TRIGGER books_facets_au AFTER UPDATE ON books FOR EACH ROW
+BEGIN
+  IF NOT (OLD.genre <=> NEW.genre) THEN
+    CALL bump_book_facet('genre', OLD.genre, -1);
+    CALL bump_book_facet('genre', NEW.genre, 1);
+  END IF;
+  IF NOT (OLD.author <=> NEW.author) THEN
+    CALL bump_book_facet('author', OLD.author, -1);
+    CALL bump_book_facet('author', NEW.author, 1);
+  END IF;
+  IF NOT (OLD.published_year <=> NEW.published_year) THEN
+    CALL bump_book_facet('decade', FLOOR(OLD.published_year / 10) * 10, -1);
+    CALL bump_book_facet('decade', FLOOR(NEW.published_year / 10) * 10, 1);
+  END IF;
+END//
+
+CREATE TRIGGER books_changes_ai AFTER INSERT ON books FOR EACH ROW
+  INSERT INTO book_changes (book_id, op) VALUES (NEW.id, 'upsert')//
+
+CREATE TRIGGER books_changes_au AFTER UPDATE ON books FOR EACH ROW
+  INSERT INTO book_changes (book_id, op) VALUES (NEW.id, 'upsert')//
+
+CREATE TRIGGER books_changes_ad AFTER DELETE ON books FOR EACH ROW
+  INSERT INTO book_changes (book_id, op) VALUES (OLD.id, 'delete')//
+
+DELIMITER ;
 
 INSERT INTO books (title, author, published_year, genre) VALUES
 ('The Great Gatsby', 'F. Scott Fitzgerald', 1925, 'Fiction'),
@@ -0,0 +1,52 @@
+from typing import List, NamedTuple, Optional, Tuple
+from fastapi import Query
+from models import BOOK_FIELDS, Book
+
+# Comma-separated BookResponse fields for sparse GET /books responses
+_FIELD = f"({'|'.join(BOOK_FIELDS)})"
+FIELDS_PATTERN = f"^{_FIELD}(,{_FIELD})*$"
+
+# Typed GET /books filters, each mapped to an index-friendly predicate
+class BookFilters(NamedTuple):
+    author: Optional[str] = None
+    genre: Optional[str] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    title_prefix: Optional[str] = None
+
+    # Equality and ranges on indexed columns, never a leading wildcard
+    def conditions(self) -> List:
+        conditions = []
+        if self.author is not None:
+            conditions.append(Book.author == self.author)
+        if self.genre is not None:
+            conditions.append(Book.genre == self.genre)
+        if self.year_from is not None:
+            conditions.append(Book.published_year >= self.year_from)
+        if self.year_to is not None:
+            conditions.append(Book.published_year <= self.year_to)
+        if self.title_prefix:
+            conditions.append(prefix_match(Book.title, self.title_prefix))
+        return conditions
+
+# Dependency collecting the typed GET /books filters (shared by the sync and async routes)
+def get_book_filters(
+    author: Optional[str] = Query(None, description="Exact author"),
+    genre: Optional[str] = Query(None, description="Exact genre"),
+    year_from: Optional[int] = Query(None, description="Published in or after this year"),
+    year_to: Optional[int] = Query(None, description="Published in or before this year"),
+    title_prefix: Optional[str] = Query(None, min_length=1, description="Title starts with")
+) -> BookFilters:
+    return BookFilters(author, genre, year_from, year_to, title_prefix)
+
+# LIKE 'prefix%' with a constant pattern is an index range scan on idx_title
+def prefix_match(column, prefix: str):
+    escaped = prefix.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return column.like(escaped + "%", escape="!")
+
+# Requested fields in response order, always including id; None selects every field
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    if not fields:
+        return BOOK_FIELDS
+    requested = set(fields.split(",")) | {"id"}
+    return tuple(name for name in BOOK_FIELDS if name in requested)
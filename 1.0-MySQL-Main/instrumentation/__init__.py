@@ -0,0 +1,47 @@
+# Request timing and SQL instrumentation (Server-Timing, structured logs, /metrics).
+# Self-contained: plug it into any FastAPI app and SQLAlchemy engine with instrument_app().
+import logging
+from typing import Iterable, Optional
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from .metrics import RequestMetrics
+from .middleware import InstrumentationMiddleware, server_timing
+from .sql import instrument_engine, instrument_sessions
+from .stats import RequestStats, current_stats, serialization_timer
+
+__all__ = [
+    "InstrumentationMiddleware", "RequestMetrics", "RequestStats", "current_stats",
+    "instrument_app", "instrument_engine", "instrument_sessions", "serialization_timer", "server_timing",
+]
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Add the timing middleware and a Prometheus endpoint to `app`, and hook `engines`
+def instrument_app(
+    app: FastAPI,
+    engines: Iterable[Optional[object]],
+    slow_query_ms: float = 200,
+    n_plus_one_threshold: int = 10,
+    metrics_path: str = "/metrics",
+) -> RequestMetrics:
+    for engine in engines:
+        if engine is not None:
+            instrument_engine(engine, slow_query_ms)
+    instrument_sessions()
+
+    metrics = RequestMetrics()
+    app.add_middleware(InstrumentationMiddleware, metrics=metrics, n_plus_one_threshold=n_plus_one_threshold)
+
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_api_route(metrics_path, prometheus_metrics, methods=["GET"], include_in_schema=False)
+
+    # Emit the JSON log lines even when the server did not configure logging
+    logger = logging.getLogger("bookstore")
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return metrics
@@ -0,0 +1,88 @@
+import json
+import logging
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .metrics import RequestMetrics
+from .stats import RequestStats, current_stats
+
+logger = logging.getLogger("bookstore.requests")
+
+# Time each request, add a Server-Timing header, log it and feed the metrics
+class InstrumentationMiddleware:
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics, n_plus_one_threshold: int = 10):
+        self.app = app
+        self.metrics = metrics
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streamed bodies keep running queries after this point; those only reach logs/metrics
+                MutableHeaders(scope=message).append("Server-Timing", server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_stats.reset(token)
+            self.record(scope, status, stats)
+
+    def record(self, scope: Scope, status: int, stats: RequestStats) -> None:
+        elapsed = stats.elapsed()
+        # Label by route template so /books/1 and /books/2 share a series
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        labels = (scope["method"], route)
+        repeated = stats.repeated_statements(self.n_plus_one_threshold)
+
+        self.metrics.requests.inc(labels + (str(status),))
+        self.metrics.duration.observe(labels, elapsed)
+        self.metrics.db_duration.observe(labels, stats.db_time)
+        self.metrics.serialization.observe(labels, stats.serialization_time)
+        self.metrics.statements.observe(labels, stats.statements)
+        self.metrics.rows.observe(labels, stats.rows)
+        if stats.slow_queries:
+            self.metrics.slow_queries.inc(labels, stats.slow_queries)
+        if repeated:
+            self.metrics.n_plus_one.inc(labels)
+
+        record = {
+            "event": "request",
+            "method": scope["method"],
+            "route": route,
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": _ms(elapsed),
+            "db_ms": _ms(stats.db_time),
+            "statements": stats.statements,
+            "rows": stats.rows,
+            "serialization_ms": _ms(stats.serialization_time),
+            "slow_queries": stats.slow_queries,
+        }
+        if repeated:
+            record["n_plus_one"] = [" ".join(statement.split())[:200] for statement in repeated]
+        logger.log(logging.WARNING if repeated else logging.INFO, json.dumps(record))
+
+# Server-Timing value splitting the request into db, serialization and the rest
+def server_timing(stats: RequestStats) -> str:
+    total = stats.elapsed()
+    app = max(0.0, total - stats.db_time - stats.serialization_time)
+    return ", ".join([
+        f'db;dur={_ms(stats.db_time)};desc="{stats.statements} queries, {stats.rows} rows"',
+        f"ser;dur={_ms(stats.serialization_time)}",
+        f"app;dur={_ms(app)}",
+        f"total;dur={_ms(total)}",
+    ])
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
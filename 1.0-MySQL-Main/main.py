@@ -1,12 +1,41 @@
-from typing import Union , Annotated, Optional
-from fastapi import FastAPI , Request , Depends , HTTPException , Query
-from pydantic import BaseModel, ConfigDict
+from typing import Union , Annotated, Optional, Literal, Any, Callable
+from fastapi import FastAPI , APIRouter , Request , Depends , HTTPException , Query
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from contextlib import asynccontextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
+import time
+import re
+import json
+import queue
 from dotenv import load_dotenv
 
-from sqlmodel import SQLModel, Field, create_engine, Session, select, or_
+from sqlmodel import Field, create_engine, Session, select, or_, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import column, insert, table, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.dialects.mysql import match
+
+from instrumentation import instrument_app, serialization_timer
+from probe import HealthProbe, pool_stats
+from coalesce import SingleFlight, on_write_commit, search_key, track_writes
+from changes import DELETE, UPSERT, ChangeWatcher, book_changes
+from trigram import TrigramIndex
+from suggest import MAX_SUGGESTIONS, SuggestIndex
+from compression import CompressionMiddleware, create_codecs
+from writer import BatchWriter
+from replicas import ReadYourWritesMiddleware, ReplicaRouter, RoutingSession, reads_from_primary
+from models import BOOK_COLUMNS, BOOK_FIELDS, Book
+from pagination import SORT_PATTERN, decode_cursor, encode_cursor, page_query, select_columns, sort_order
+from filters import FIELDS_PATTERN, BookFilters, get_book_filters, parse_fields
+from conditional import book_validators, collection_validators, is_conditional, is_not_modified, not_modified
+
+try:
+    import orjson  # optional, faster list encoding
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +46,62 @@ DB_PORT = int(os.getenv("DB_PORT" , "3306"))
 DB_USER = os.getenv("DB_USER" , "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD" , "")
 DB_NAME = os.getenv("DB_NAME" , "bookstore")
+# Per-engine pool size (serve.py derives both from --db-connections)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE" , "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW" , "20"))
+# Use the async engine (aiomysql) and async handlers for the core book routes
+ASYNC_DB = os.getenv("ASYNC_DB" , "false").lower() in ("1", "true", "yes")
+# Server-Timing headers, JSON request logs and Prometheus /metrics
+INSTRUMENTATION = os.getenv("INSTRUMENTATION" , "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS" , "200"))
+# Flag a request as N+1 when one statement repeats this many times
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD" , "10"))
+# Readiness probe: seconds between background SELECT 1 probes, and the probe timeout
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL" , "5"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT" , "2"))
+# Read replicas: comma-separated host[:port] list sharing the primary's user, password and database
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS" , "").split(",") if host.strip()]
+# round_robin or least_loaded (fewest checked-out connections)
+REPLICA_STRATEGY = os.getenv("REPLICA_STRATEGY" , "round_robin")
+# Seconds a client's reads stay on the primary after it writes (read-your-writes)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS" , "5"))
+# Seconds a replica that failed its pre-ping is skipped before being tried again
+REPLICA_COOLDOWN_SECONDS = float(os.getenv("REPLICA_COOLDOWN_SECONDS" , "5"))
+# Batch get-by-ids: ids per request and ids per IN query
+BATCH_GET_MAX_IDS = int(os.getenv("BATCH_GET_MAX_IDS" , "5000"))
+BATCH_GET_CHUNK_SIZE = int(os.getenv("BATCH_GET_CHUNK_SIZE" , "1000"))
+# Single-flight: identical concurrent reads share one query; waiters give up after the timeout
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT" , "true").lower() in ("1", "true", "yes")
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS" , "5"))
+# /books/search backend: fulltext (MySQL FULLTEXT) or trigram (in-memory, typo-tolerant)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND" , "fulltext")
+# Share of the query's trigrams a book must contain, and how far back each sync re-reads updated_at
+# (keep it above replica lag when searches read from replicas)
+TRIGRAM_THRESHOLD = float(os.getenv("TRIGRAM_THRESHOLD" , "0.3"))
+TRIGRAM_SYNC_LAG_SECONDS = float(os.getenv("TRIGRAM_SYNC_LAG_SECONDS" , "5"))
+# /books/suggest: distinct values kept per field (least recently written dropped first) and sync re-read window
+SUGGEST_MAX_VALUES = int(os.getenv("SUGGEST_MAX_VALUES" , "1000000"))
+SUGGEST_SYNC_LAG_SECONDS = float(os.getenv("SUGGEST_SYNC_LAG_SECONDS" , "5"))
+# /books/changes: longest long-poll wait, how often waiting consumers re-read the log for other workers'
+# writes, and how long a seq gap holds the feed back at least. A change whose transaction takes longer
+# than that to commit (after statements that began before it) can be skipped, so the default matches
+# InnoDB's default innodb_lock_wait_timeout
+CHANGES_MAX_WAIT_SECONDS = float(os.getenv("CHANGES_MAX_WAIT_SECONDS" , "30"))
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS" , "1"))
+CHANGES_GAP_SECONDS = float(os.getenv("CHANGES_GAP_SECONDS" , "50"))
+# Response compression: codings in order of preference (br and zstd need the brotli and zstandard packages),
+# smallest body worth compressing, and the level profile for routes without their own (fast, default or best)
+COMPRESSION = os.getenv("COMPRESSION" , "true").lower() in ("1", "true", "yes")
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS" , "zstd,br,gzip")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE" , "1024"))
+COMPRESSION_PROFILE = os.getenv("COMPRESSION_PROFILE" , "default")
+# Write-behind creates: POST /books queued and inserted in groups of up to WRITE_BEHIND_MAX_ROWS rows, or every
+# WRITE_BEHIND_MAX_DELAY_MS; a full queue makes a create wait WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS, then answer 503
+WRITE_BEHIND = os.getenv("WRITE_BEHIND" , "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("WRITE_BEHIND_MAX_ROWS" , "500"))
+WRITE_BEHIND_MAX_DELAY_MS = float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS" , "5"))
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE" , "10000"))
+WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS = float(os.getenv("WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS" , "1"))
 
 # MySQL Database URL
 mysql_url = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
@@ -25,15 +110,65 @@ engine = create_engine(
     mysql_url,
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=10,
-    max_overflow=20
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+)
+
+# Only created when enabled, so sync-only deployments hold no second pool
+async_engine = create_async_engine(
+    f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}",
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+) if ASYNC_DB else None
+
+# Read replicas share the primary's credentials, database and pool settings
+def replica_url(driver: str, host: str) -> str:
+    name, _, port = host.partition(":")
+    return f"mysql+{driver}://{DB_USER}:{DB_PASSWORD}@{name}:{port or DB_PORT}/{DB_NAME}"
+
+replica_engines = [
+    create_engine(replica_url("pymysql", host), pool_pre_ping=True, pool_recycle=300, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    for host in DB_REPLICA_HOSTS
+]
+async_replica_engines = [
+    create_async_engine(replica_url("aiomysql", host), pool_pre_ping=True, pool_recycle=300, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    for host in DB_REPLICA_HOSTS
+] if ASYNC_DB else []
+
+# Without replicas every session goes straight to the primary engine
+replica_router = ReplicaRouter(engine, replica_engines, REPLICA_STRATEGY, REPLICA_COOLDOWN_SECONDS) if replica_engines else None
+async_replica_router = (
+    ReplicaRouter(async_engine, async_replica_engines, REPLICA_STRATEGY, REPLICA_COOLDOWN_SECONDS)
+    if async_replica_engines else None
 )
 
+# Background SELECT 1 whose cached result answers the health endpoints
+db_probe = HealthProbe(engine, interval=HEALTH_PROBE_INTERVAL, timeout=HEALTH_PROBE_TIMEOUT)
+
+# Identical concurrent reads share one query; every committed write stops new requests joining older ones
+read_flights = SingleFlight(SINGLE_FLIGHT_TIMEOUT_SECONDS, enabled=SINGLE_FLIGHT)
+track_writes(read_flights)
+# Wakes change-feed waiters when this process commits a write
+change_watcher = ChangeWatcher()
+on_write_commit(change_watcher.notify)
+
+# In-memory trigram index answering /books/search when SEARCH_BACKEND=trigram
+search_index = TrigramIndex(TRIGRAM_THRESHOLD, TRIGRAM_SYNC_LAG_SECONDS)
+# Sorted prefix index of titles and authors answering /books/suggest
+suggest_index = SuggestIndex(SUGGEST_MAX_VALUES, SUGGEST_SYNC_LAG_SECONDS)
+
 # def create_db_and_tables():
 #     SQLModel.metadata.create_all(engine)
     
-def get_session():
-    with Session(engine) as session:
+def new_session(primary_only: bool = False) -> Session:
+    if replica_router is None:
+        return Session(engine)
+    return RoutingSession(replica_router, primary_only=primary_only)
+
+def get_session(request: Request):
+    with new_session(primary_only=reads_from_primary(request)) as session:
         yield session
 
 SessionDep = Annotated[Session, Depends(get_session)]
@@ -41,10 +176,45 @@ SessionDep = Annotated[Session, Depends(get_session)]
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # create_db_and_tables()
+    with new_session() as session:
+        # Build the in-memory indexes before serving, so no request pays for them
+        if SEARCH_BACKEND == "trigram":
+            sync_search_index(session)
+        sync_suggest_index(session)
+    await db_probe.start()
     yield
+    await db_probe.stop()
+    # Queued creates are written before the pools close
+    if create_batcher is not None:
+        create_batcher.stop()
+    # Close pooled connections on graceful shutdown
+    engine.dispose()
+    for replica in replica_engines:
+        replica.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
 
 app = FastAPI(lifespan=lifespan)
 
+# Negotiated zstd/br/gzip above COMPRESSION_MIN_SIZE; added first so the timing middleware wraps it
+if COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware, codecs=create_codecs(COMPRESSION_ENCODINGS),
+        minimum_size=COMPRESSION_MIN_SIZE, profile=COMPRESSION_PROFILE
+    )
+
+if INSTRUMENTATION:
+    instrument_app(
+        app, [engine, async_engine, *replica_engines, *async_replica_engines],
+        slow_query_ms=SLOW_QUERY_MS, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD
+    )
+
+# Clients that just wrote read from the primary for READ_YOUR_WRITES_SECONDS
+if replica_router is not None:
+    app.add_middleware(ReadYourWritesMiddleware, window=READ_YOUR_WRITES_SECONDS)
+
 # 1 - Request model
 class BookCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -54,17 +224,7 @@ class BookCreate(BaseModel):
     published_year: int | None = None
     genre: str | None = None
 
-# 2 - Database model
-class Book(SQLModel, table=True):
-    __tablename__ = "books"
-    
-    id: int = Field(default=None, primary_key=True)
-    title: str = Field(index=True, max_length=255, nullable=False)
-    author: str = Field(index=True, max_length=255, nullable=False)
-    published_year: int = Field(index=True, nullable=True)
-    genre: str = Field(index=True, max_length=100, nullable=True)
-    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
-    updated_at: datetime = Field(default_factory=datetime.now, nullable=False)
+# 2 - Database model (models.py)
 
 # 3 - Response model
 class BookResponse(BaseModel):
@@ -78,14 +238,41 @@ class BookResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+# Built once; dump_json infers types at serialization time without validating
+any_adapter = TypeAdapter(Any)
+
+def encode_json(value) -> bytes:
+    with serialization_timer():
+        return orjson.dumps(value) if orjson is not None else any_adapter.dump_json(value)
+
+# Column tuples (`fields` first, in BOOK_COLUMNS order) to BookResponse-shaped dicts
+def encode_rows(rows, fields: tuple[str, ...] = BOOK_FIELDS) -> list[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+def json_response(value, headers: dict[str, str] | None = None) -> Response:
+    return Response(content=encode_json(value), media_type="application/json", headers=headers)
+
 #Dependency
-def get_db():
-    db = Session(engine)
+def get_db(request: Request):
+    db = new_session(primary_only=reads_from_primary(request))
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db(request: Request):
+    if async_replica_router is None:
+        db = AsyncSession(async_engine, expire_on_commit=False)
+    else:
+        db = AsyncSession(
+            sync_session_class=RoutingSession,
+            router=async_replica_router,
+            primary_only=reads_from_primary(request),
+            expire_on_commit=False
+        )
+    async with db:
+        yield db
+
 @app.post("/books", response_model=BookResponse)
 def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
     book = Book(
@@ -99,27 +286,589 @@ def create_book(book_data: BookCreate, db: Session = Depends(get_db)):
     db.refresh(book)
     return book
 
-@app.get("/books", response_model=list[BookResponse])
-def get_books(db: Session = Depends(get_db)):
-    books = db.exec(select(Book)).all()
-    return books
+# Columns compared when new rows are read back by id
+INSERTED_COLUMNS = (Book.title, Book.author, Book.published_year, Book.genre, Book.updated_at)
+
+# One multi-row INSERT without committing; rows in input order. A multi-row "simple insert" gets
+# LAST_INSERT_ID() onwards in steps of @@auto_increment_increment (more than 1 on Galera or multi-primary
+# setups) when InnoDB hands it a consecutive block, which innodb_autoinc_lock_mode 2 does not promise
+# while other inserts run. So the ids are read back: if any is not one of these rows, the INSERT is
+# undone and the rows go in one at a time instead.
+def insert_books(db: Session, books: list[BookCreate]) -> list[dict[str, Any]]:
+    now = datetime.now()
+    # created_at is a DATETIME (whole seconds): rounded here so the rows returned match the stored ones
+    rows = [{**book.model_dump(), "created_at": now.replace(microsecond=0), "updated_at": now} for book in books]
+    table = Book.__table__
+    step = db.connection().execute(text("SELECT @@auto_increment_increment")).scalar_one()
+    savepoint = db.begin_nested()
+    result = db.connection().execute(insert(table).values(rows))
+    ids = [result.lastrowid + offset * step for offset in range(len(rows))]
+    if rows_inserted(db, ids, rows):
+        savepoint.commit()
+    else:
+        savepoint.rollback()
+        ids = [db.connection().execute(insert(table).values(row)).lastrowid for row in rows]
+    return [{"id": book_id, **row} for book_id, row in zip(ids, rows)]
+
+# Whether `ids` hold exactly `rows`, in order (this transaction sees its own uncommitted rows)
+def rows_inserted(db: Session, ids: list[int], rows: list[dict[str, Any]]) -> bool:
+    found = {
+        row[0]: tuple(row[1:])
+        for row in db.connection().execute(select(Book.id, *INSERTED_COLUMNS).where(Book.id.in_(ids)))
+    }
+    return all(
+        found.get(book_id) == tuple(row[column.key] for column in INSERTED_COLUMNS)
+        for book_id, row in zip(ids, rows)
+    )
+
+# Insert and commit one write-behind batch on the primary
+def write_created_books(books: list[BookCreate]) -> list[dict[str, Any]]:
+    with Session(engine) as session:
+        rows = insert_books(session, books)
+        session.commit()
+    return rows
+
+# Write-behind batcher for POST /books (its thread starts with the first create, in the worker)
+create_batcher = BatchWriter(
+    write_created_books,
+    max_rows=WRITE_BEHIND_MAX_ROWS,
+    max_delay=WRITE_BEHIND_MAX_DELAY_MS / 1000,
+    max_pending=WRITE_BEHIND_QUEUE_SIZE,
+    queue_timeout=WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS
+) if WRITE_BEHIND else None
+
+# 4 - Keyset page model
+class BookPage(BaseModel):
+    items: list[BookResponse]
+    next_cursor: str | None = None
+
+def page_result(rows, limit: int, sort: str, fields: tuple[str, ...] = BOOK_FIELDS) -> dict:
+    # BookPage-shaped dict of selected rows, ready for encode_json
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, rows[-1])
+    return {"items": encode_rows(rows, fields), "next_cursor": next_cursor}
+
+# The collection version is the row count plus max(updated_at)
+collection_version_query = select(func.count(Book.id), func.max(Book.updated_at))
+
+# GET /books past its version check, for the sync and async routes: the query for the requested
+# offset or keyset page, and the function building the response body from its rows
+def books_query(
+    filters: BookFilters, skip: int, limit: int, cursor: str | None, sort: str, fields: str | None
+) -> tuple[Any, Callable[[list], Any]]:
+    selected = parse_fields(fields)
+    columns = select_columns(selected, sort)
+    if cursor is None:
+        query = select(*columns).where(*filters.conditions()).order_by(*sort_order(sort)).offset(skip).limit(limit)
+        return query, lambda rows: encode_rows(rows, selected)
+    try:
+        position = decode_cursor(cursor, sort)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return page_query(position, sort, limit, columns, filters), lambda rows: page_result(rows, limit, sort, selected)
+
+# Conditional GET /books/{book_id} against updated_at alone (404 for no such book): a 304, or None to send the body
+def revalidate_book(request: Request, book_id: int, updated_at: datetime | None) -> Response | None:
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    validators = book_validators(book_id, updated_at)
+    return not_modified(validators) if is_not_modified(request, validators) else None
+
+# What concurrent GET /books/{book_id} requests share: updated_at and the encoded body (None: not found)
+def encode_book(book: Book | None) -> tuple[datetime, bytes] | None:
+    if book is None:
+        return None
+    with serialization_timer():
+        return book.updated_at, BookResponse.model_validate(book).model_dump_json().encode()
+
+# A loaded (updated_at, encoded body) pair, or 404 when the book was not found
+def book_response(book_id: int, loaded: tuple[datetime, bytes] | None) -> Response:
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    updated_at, body = loaded
+    return Response(content=body, media_type="application/json", headers=book_validators(book_id, updated_at).headers())
+
+# 5 - Batch models
+class BookBatchGet(BaseModel):
+    ids: list[int] = Field(..., min_length=1)
+
+# Items in request order; ids with no book are listed under missing
+class BookBatch(BaseModel):
+    items: list[BookResponse]
+    missing: list[int]
+
+# Comma-separated ids for GET /books?ids=
+IDS_PATTERN = r"^\d+(,\d+)*$"
+
+def unique_ids(ids: list[int]) -> list[int]:
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_GET_MAX_IDS} ids per request")
+    return ids
+
+# One IN query per chunk, so a few thousand ids never become one huge statement
+def ids_queries(ids: list[int]) -> list:
+    return [
+        select(*BOOK_COLUMNS).where(Book.id.in_(ids[start:start + BATCH_GET_CHUNK_SIZE]))
+        for start in range(0, len(ids), BATCH_GET_CHUNK_SIZE)
+    ]
+
+def batch_result(ids: list[int], rows) -> dict:
+    # BookBatch-shaped dict in request order, ready for encode_json
+    by_id = {row.id: row for row in rows}
+    return {
+        "items": encode_rows([by_id[book_id] for book_id in ids if book_id in by_id]),
+        "missing": [book_id for book_id in ids if book_id not in by_id],
+    }
+
+def batch_get(db: Session, ids: list[int]) -> Response:
+    ids = unique_ids(ids)
+    rows = [row for query in ids_queries(ids) for row in db.exec(query).all()]
+    return json_response(batch_result(ids, rows))
+
+@app.get("/books", response_model=list[BookResponse] | BookPage | BookBatch)
+def get_books(
+    request: Request,
+    db: Session = Depends(get_db),
+    filters: BookFilters = Depends(get_book_filters),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: str | None = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: str | None = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
+):
+    if ids is not None:
+        return batch_get(db, [int(book_id) for book_id in ids.split(",")])
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*db.exec(collection_version_query).one())
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    query, body = books_query(filters, skip, limit, cursor, sort, fields)
+    return json_response(body(db.exec(query).all()), validators.headers())
+
+# InnoDB ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+def build_boolean_query(search_term: str) -> str | None:
+    tokens = [t for t in re.findall(r"\w+", search_term) if len(t) >= FULLTEXT_MIN_TOKEN_SIZE]
+    if not tokens:
+        return None
+    # Every token is required and matched as a prefix
+    return " ".join(f"+{token}*" for token in tokens)
+
+def scan_condition(q: str):
+    return or_(
+        Book.title.ilike(f"%{q}%"),
+        Book.author.ilike(f"%{q}%"),
+        Book.genre.ilike(f"%{q}%"),
+        Book.published_year.ilike(f"%{q}%")
+    )
+
+def fulltext_score(boolean_query: str):
+    # Backed by the ft_books_search FULLTEXT index (see database.sql)
+    return match(Book.title, Book.author, Book.genre, against=boolean_query).in_boolean_mode()
+
+def search_query(q: str, limit: int, columns=(Book,)):
+    boolean_query = build_boolean_query(q)
+    if boolean_query is None:
+        # Nothing the FULLTEXT index can answer, fall back to a substring scan
+        return select(*columns).where(scan_condition(q)).limit(limit)
+    score = fulltext_score(boolean_query)
+    return select(*columns).where(score).order_by(score.desc()).limit(limit)
+
+# The rows /books/search would return (without its limit), as a WHERE clause
+def search_condition(q: str):
+    boolean_query = build_boolean_query(q)
+    if boolean_query is None:
+        return scan_condition(q)
+    if q.strip().isdigit():
+        return or_(fulltext_score(boolean_query), Book.published_year == int(q))
+    return fulltext_score(boolean_query)
+
+def year_query(q: str, limit: int, columns=(Book,)):
+    # Years are not part of the FULLTEXT index; use idx_published_year instead
+    if build_boolean_query(q) is None or not q.strip().isdigit():
+        return None
+    return select(*columns).where(Book.published_year == int(q)).limit(limit)
+
+def merge_results(books, extra, limit: int) -> list:
+    seen = {book.id for book in books}
+    return (list(books) + [book for book in extra if book.id not in seen])[:limit]
+
+# Searchable columns of books written at or after `since` (all books when None)
+def changed_query(since: datetime | None):
+    query = select(Book.id, Book.title, Book.author, Book.genre, Book.updated_at)
+    return query if since is None else query.where(Book.updated_at >= since)
+
+# Feed books written since the last sync (by any process) into the trigram index
+def sync_search_index(db: Session) -> int:
+    return search_index.apply(db.exec(changed_query(search_index.since()).execution_options(yield_per=5000)))
+
+# Rows in ranked id order; ids without a row were deleted and are removed from the index
+def ranked_rows(ids: list[int], rows) -> list:
+    by_id = {row.id: row for row in rows}
+    search_index.remove(book_id for book_id in ids if book_id not in by_id)
+    return [by_id[book_id] for book_id in ids if book_id in by_id]
+
+# Typo-tolerant search through the trigram index, best matches first
+def fuzzy_search_rows(db: Session, q: str, limit: int) -> list:
+    sync_search_index(db)
+    rows = []
+    ids = search_index.search(q, limit)
+    while ids:
+        found = ranked_rows(ids, [row for query in ids_queries(ids) for row in db.exec(query).all()])
+        rows.extend(found)
+        if len(found) == len(ids):
+            break
+        # Deleted books just left the index, so the next ranks move up
+        ids = search_index.search(q, limit)[len(rows):]
+    return rows
+
+async def fuzzy_search_rows_async(db: AsyncSession, q: str, limit: int) -> list:
+    search_index.apply((await db.exec(changed_query(search_index.since()))).all())
+    rows = []
+    ids = search_index.search(q, limit)
+    while ids:
+        found = ranked_rows(ids, [row for query in ids_queries(ids) for row in (await db.exec(query)).all()])
+        rows.extend(found)
+        if len(found) == len(ids):
+            break
+        ids = search_index.search(q, limit)[len(rows):]
+    return rows
 
 @app.get("/books/search", response_model=list[BookResponse])
 def search_books(
     q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(get_db)
 ):
-    query = select(Book).where(
-        or_(
-            Book.title.ilike(f"%{q}%"),
-            Book.author.ilike(f"%{q}%"),
-            Book.genre.ilike(f"%{q}%"),
-            Book.published_year.ilike(f"%{q}%")
-        )
+    # Identical concurrent searches share one query and one encoded body
+    def search() -> bytes:
+        if SEARCH_BACKEND == "trigram":
+            return encode_json(encode_rows(fuzzy_search_rows(db, q, limit)))
+        rows = db.exec(search_query(q, limit, BOOK_COLUMNS)).all()
+        years = year_query(q, limit, BOOK_COLUMNS)
+        if years is not None and len(rows) < limit:
+            rows = merge_results(rows, db.exec(years).all(), limit)
+        return encode_json(encode_rows(rows))
+    return Response(content=read_flights.do(search_key(q, limit), search), media_type="application/json")
+
+# 6 - Facet models
+class FacetValue(BaseModel):
+    value: int | str
+    count: int
+
+class BookFacets(BaseModel):
+    total: int
+    facets: dict[str, list[FacetValue]]
+
+class BookStats(BaseModel):
+    total: int
+    # Per facet: how many values exist, and how many books have none
+    distinct: dict[str, int]
+    missing: dict[str, int]
+    earliest_year: int | None = None
+    latest_year: int | None = None
+
+# Grouped counts per facet value, kept current by triggers on books (see database.sql), so
+# unfiltered facet and stats requests read O(#values) rows. NULLs are not counted; the
+# "total" facet holds the row count under the empty value.
+facet_counts = table("book_facet_counts", column("facet"), column("value"), column("book_count"))
+FACET_TOTAL = "total"
+# Expressions grouped by the search-scoped queries (the triggers compute the same)
+FACET_COLUMNS = {
+    "genre": Book.genre,
+    "author": Book.author,
+    "decade": (Book.published_year // 10 * 10).label("decade"),
+}
+FACETS = tuple(FACET_COLUMNS)
+
+# Counter values are stored as text; decades come back as integers
+def facet_value(facet: str, value):
+    return int(value) if facet == "decade" and value is not None else value
+
+def group_query(expression, condition):
+    count = func.count()
+    return (
+        select(expression, count)
+        .where(condition, expression.is_not(None))
+        .group_by(expression)
+        .order_by(count.desc(), expression)
+    )
+
+@app.get("/books/facets", response_model=BookFacets)
+def get_facets(
+    facet: list[Literal["genre", "author", "decade"]] = Query(
+        ["genre", "author", "decade"], description="Facets to count (repeat the parameter for several)"
+    ),
+    q: str | None = Query(None, description="Only count books matching this search term"),
+    limit: int = Query(20, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    if q is None:
+        # Read the counters: O(#values), independent of the number of books
+        total = db.exec(select(facet_counts.c.book_count).where(facet_counts.c.facet == FACET_TOTAL)).first() or 0
+        queries = {
+            name: select(facet_counts.c.value, facet_counts.c.book_count)
+            .where(facet_counts.c.facet == name)
+            .order_by(facet_counts.c.book_count.desc(), facet_counts.c.value)
+            .limit(limit)
+            for name in facet
+        }
+    else:
+        # Search results have no counters; group the matching rows instead
+        condition = search_condition(q)
+        total = db.exec(select(func.count()).select_from(Book).where(condition)).one()
+        queries = {name: group_query(FACET_COLUMNS[name], condition).limit(limit) for name in facet}
+    return {
+        "total": total,
+        "facets": {
+            name: [{"value": facet_value(name, value), "count": count} for value, count in db.exec(query)]
+            for name, query in queries.items()
+        },
+    }
+
+@app.get("/books/stats", response_model=BookStats)
+def get_stats(
+    q: str | None = Query(None, description="Only include books matching this search term"),
+    db: Session = Depends(get_db)
+):
+    if q is None:
+        # Counters give the per-facet figures; MIN/MAX are read from the ends of idx_published_year
+        counters = db.exec(
+            select(facet_counts.c.facet, func.count(), func.sum(facet_counts.c.book_count))
+            .group_by(facet_counts.c.facet)
+        ).all()
+        sums = {name: (values, books) for name, values, books in counters}
+        total = int(sums.get(FACET_TOTAL, (0, 0))[1])
+        distinct = {name: sums.get(name, (0, 0))[0] for name in FACETS}
+        counted = {name: int(sums.get(name, (0, 0))[1]) for name in FACETS}
+        earliest, latest = db.exec(select(func.min(Book.published_year), func.max(Book.published_year))).one()
+    else:
+        row = db.exec(
+            select(
+                func.count(),
+                *(func.count(func.distinct(FACET_COLUMNS[name])) for name in FACETS),
+                *(func.count(FACET_COLUMNS[name]) for name in FACETS),
+                func.min(Book.published_year),
+                func.max(Book.published_year),
+            ).where(search_condition(q))
+        ).one()
+        total, earliest, latest = row[0], row[-2], row[-1]
+        distinct = dict(zip(FACETS, row[1:1 + len(FACETS)]))
+        counted = dict(zip(FACETS, row[1 + len(FACETS):1 + 2 * len(FACETS)]))
+    return {
+        "total": total,
+        "distinct": distinct,
+        "missing": {name: total - counted[name] for name in FACETS},
+        "earliest_year": earliest,
+        "latest_year": latest,
+    }
+
+# 7 - Suggestion model
+class BookSuggestions(BaseModel):
+    field: str
+    prefix: str
+    suggestions: list[str]
+
+# Columns /books/suggest completes
+SUGGEST_COLUMNS = {"title": Book.title, "author": Book.author}
+
+# (title, author, updated_at) of books written at or after `since` (all books when None)
+def suggest_query(since: datetime | None):
+    query = select(Book.title, Book.author, Book.updated_at)
+    return query if since is None else query.where(Book.updated_at >= since)
+
+# Feed titles and authors written since the last sync (by any process) into the prefix index
+def sync_suggest_index(db: Session) -> int:
+    return suggest_index.apply(db.exec(suggest_query(suggest_index.since()).execution_options(yield_per=5000)))
+
+# One indexed IN lookup confirms some book still has each value
+def present_query(field: str, values: list[str]):
+    column = SUGGEST_COLUMNS[field]
+    return select(column).where(column.in_(values)).distinct()
+
+# Typeahead completions for a prefix (case and accent insensitive, most recently written first)
+@app.get("/books/suggest", response_model=BookSuggestions)
+def suggest_books(
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions"),
+    db: Session = Depends(get_db)
+):
+    sync_suggest_index(db)
+    values = suggest_index.top(field, prefix, limit)
+    while values:
+        present = set(db.exec(present_query(field, values)).all())
+        if len(present) == len(values):
+            break
+        # Values no book has any more leave the index, so the next ones move up
+        suggest_index.remove(field, (value for value in values if value not in present))
+        values = suggest_index.top(field, prefix, limit)
+    return {"field": field, "prefix": prefix, "suggestions": values}
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+def encode_export_row(row) -> str:
+    book = dict(zip(BOOK_FIELDS, row))
+    book["created_at"] = book["created_at"].isoformat()
+    book["updated_at"] = book["updated_at"].isoformat()
+    return json.dumps(book, separators=(",", ":"))
+
+def stream_books(fmt: str, batch_size: int):
+    # The generator owns its session so it stays open while the response streams (served by a replica if any)
+    with new_session() as db:
+        # yield_per switches PyMySQL to an unbuffered server-side cursor
+        query = select(*BOOK_COLUMNS).order_by(Book.id).execution_options(yield_per=batch_size)
+        if fmt == "json":
+            yield b"["
+        first = True
+        for rows in db.exec(query).partitions():
+            encoded = [encode_export_row(row) for row in rows]
+            if fmt == "json":
+                chunk = ",".join(encoded)
+                yield (chunk if first else "," + chunk).encode()
+            else:
+                yield ("\n".join(encoded) + "\n").encode()
+            first = False
+        if fmt == "json":
+            yield b"]"
+
+@app.get("/books/export", response_class=StreamingResponse)
+def export_books(
+    format: Literal["ndjson", "json"] = "ndjson",
+    batch_size: int = Query(1000, ge=1, le=10000)
+):
+    return StreamingResponse(stream_books(format, batch_size), media_type=EXPORT_MEDIA_TYPES[format])
+
+# 8 - Change feed models
+class BookChange(BaseModel):
+    seq: int
+    op: Literal["upsert", "delete"]
+    id: int
+    # Current row for upserts, null for deletes
+    book: BookResponse | None = None
+
+class BookChanges(BaseModel):
+    changes: list[BookChange]
+    # Resume with since=next_since
+    next_since: int
+    has_more: bool
+
+# Log rows up to the first seq gap that may still fill: the transaction that took the missing seq
+# may not have committed yet. A gap is taken for a rollback only once no transaction that started
+# before the row after it is still writing, and it is older than CHANGES_GAP_SECONDS (by the database
+# clock; this also covers a writer whose statement began before the transaction that took the gap)
+def committed_prefix(log, since: int, oldest_writer: Optional[datetime] = None) -> list:
+    gap = timedelta(seconds=CHANGES_GAP_SECONDS)
+    expected = since + 1
+    for index, (seq, _, _, changed_at, now) in enumerate(log):
+        if seq != expected and (
+            now - changed_at < gap or (oldest_writer is not None and oldest_writer <= changed_at)
+        ):
+            return log[:index]
+        expected = seq + 1
+    return log
+
+# Start of the oldest other transaction that has written rows (None if there is none); needs PROCESS
+def oldest_writer_start(db: Session) -> Optional[datetime]:
+    return db.connection().execute(text(
+        "SELECT MIN(trx_started) FROM information_schema.INNODB_TRX"
+        " WHERE trx_mysql_thread_id <> CONNECTION_ID() AND trx_rows_modified > 0"
+    )).scalar_one()
+
+# Up to `limit` change log rows after `since`, each book once at its latest seq (upserts with the current row)
+def change_batch(db: Session, since: int, limit: int) -> dict:
+    # Read before the log: a writer that commits in between is then in the log instead
+    oldest_writer = oldest_writer_start(db)
+    log = db.exec(
+        select(book_changes.c.seq, book_changes.c.book_id, book_changes.c.op, book_changes.c.changed_at, func.now(6))
+        .where(book_changes.c.seq > since)
+        .order_by(book_changes.c.seq)
+        .limit(limit)
+    ).all()
+    visible = committed_prefix(log, since, oldest_writer)
+    latest = {book_id: (seq, op) for seq, book_id, op, _, _ in visible}
+    upserts = [book_id for book_id, (_, op) in latest.items() if op == UPSERT]
+    rows = {row.id: row for query in ids_queries(upserts) for row in db.exec(query).all()}
+    changes = []
+    for book_id, (seq, op) in sorted(latest.items(), key=lambda item: item[1][0]):
+        if op == DELETE:
+            changes.append({"seq": seq, "op": op, "id": book_id, "book": None})
+        elif book_id in rows:
+            changes.append({"seq": seq, "op": op, "id": book_id, "book": dict(zip(BOOK_FIELDS, rows[book_id]))})
+        # else: deleted after this batch was read; a later change reports it
+    return {"changes": changes, "next_since": visible[-1].seq if visible else since, "has_more": len(visible) == limit}
+
+# One batch on its own session (the SSE stream outlives the request). Always from the primary:
+# only its INNODB_TRX shows the transactions that may still fill a seq gap
+def read_changes(since: int, limit: int) -> dict:
+    with new_session(primary_only=True) as db:
+        return change_batch(db, since, limit)
+
+# The next batch after `since`, waiting up to `wait` seconds for one (long-poll)
+async def wait_for_changes(since: int, limit: int, wait: float) -> dict:
+    deadline = time.monotonic() + wait
+    while True:
+        version = change_watcher.mark()
+        batch = await run_in_threadpool(read_changes, since, limit)
+        remaining = deadline - time.monotonic()
+        # next_since also moves when every change read was superseded, which is progress too
+        if batch["next_since"] != since or remaining <= 0:
+            return batch
+        # Local commits wake the wait at once; other workers' are picked up by the re-read
+        await change_watcher.wait(version, min(remaining, CHANGES_POLL_SECONDS))
+
+# Seconds between SSE comment lines on an idle stream (keeps proxies from closing it)
+KEEPALIVE_SECONDS = 15
+
+# Server-sent events: one upsert or delete event per change, its seq as the event id
+async def stream_changes(since: int, limit: int):
+    yield b"retry: 1000\n\n"
+    while True:
+        batch = await wait_for_changes(since, limit, KEEPALIVE_SECONDS)
+        if batch["next_since"] == since:
+            yield b": keepalive\n\n"
+            continue
+        events = [
+            b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["op"].encode(), encode_json(change))
+            for change in batch["changes"]
+        ]
+        if events:
+            yield b"".join(events)
+        since = batch["next_since"]
+
+# Books created, updated or deleted after `since` in seq order, each at its latest change (long-poll with wait)
+@app.get("/books/changes", response_model=BookChanges)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Last seq already applied (0 replays the whole catalog)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch"),
+    wait: float = Query(0, ge=0, le=CHANGES_MAX_WAIT_SECONDS, description="Seconds to wait for a change when there is none yet")
+):
+    return json_response(await wait_for_changes(since, limit, wait))
+
+@app.get("/books/changes/stream", response_class=StreamingResponse)
+def stream_book_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last seq already applied (Last-Event-ID takes precedence)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch")
+):
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        stream_changes(since, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    
-    books = db.exec(query).all()
-    return books
+
+# Many books by id in one round trip instead of one GET /books/{book_id} each
+@app.post("/books/batch-get", response_model=BookBatch)
+def batch_get_books(request_data: BookBatchGet, db: Session = Depends(get_db)):
+    return batch_get(db, request_data.ids)
 
 @app.put("/books/{book_id}", response_model=BookResponse)
 def update_book(book_id: int, book_data: BookCreate, db: Session = Depends(get_db)):
@@ -144,22 +893,27 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
     return book
 
 @app.get("/books/{book_id}", response_model=BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    book = db.get(Book, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return book
+def get_book(book_id: int, request: Request, db: Session = Depends(get_db)):
+    if is_conditional(request):
+        # Revalidate against updated_at alone before loading the full row
+        response = revalidate_book(request, book_id, db.exec(select(Book.updated_at).where(Book.id == book_id)).first())
+        if response is not None:
+            return response
+    # Concurrent requests for the same book share one load and encoding
+    def load() -> tuple[datetime, bytes] | None:
+        return encode_book(db.get(Book, book_id))
+    return book_response(book_id, read_flights.do(("book", book_id), load))
 
 @app.get("/")
 def health_check():
-    try:
-        with Session(engine) as session:
-            result = session.exec(select(Book).limit(1))
-            db_status = "Connected"
-            db_message = "Database connection successful"
-    except Exception as e:
+    # Database status comes from the cached readiness probe, not a query per call
+    probe = db_probe.latest()
+    if probe.ok:
+        db_status = "Connected"
+        db_message = "Database connection successful"
+    else:
         db_status = "Error"
-        db_message = f"Database connection failed: {str(e)}"
+        db_message = f"Database connection failed: {probe.error}"
     
     return {
         "status": "healthy" if db_status == "Connected" else "unhealthy",
@@ -193,6 +947,174 @@ def health_check():
         }
     }
 
+# Liveness: the process is serving requests; never touches the database
+@app.get("/livez")
+async def liveness():
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+# Readiness from the last background probe plus live pool counters; 503 when not ready
+@app.get("/readyz")
+def readiness(response: Response):
+    probe = db_probe.latest()
+    ready = db_probe.is_ready(probe)
+    if not ready:
+        response.status_code = 503
+    pools = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_stats(async_engine)
+    body = {
+        "status": "ready" if ready else "unready",
+        "timestamp": datetime.now().isoformat(),
+        "database": db_probe.describe(probe),
+        "pool": pools,
+    }
+    if replica_router is not None:
+        body["replicas"] = replica_router.stats()
+    if create_batcher is not None:
+        body["write_behind"] = create_batcher.stats()
+    return body
+
+# Single-flight counters per route (queries run, requests that shared one, waiter timeouts)
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    return read_flights.stats()
+
+# Trigram search index size (books, trigrams, postings and their bytes; empty unless SEARCH_BACKEND=trigram)
+# and the typeahead prefix index (values per field)
+@app.get("/search-index/stats")
+def search_index_stats():
+    return {"backend": SEARCH_BACKEND, **search_index.stats(), "suggest": suggest_index.stats()}
 
+# Async versions of the core book routes (ASYNC_DB=true), same paths and parameters
+async_router = APIRouter()
+
+@async_router.post("/books", response_model=BookResponse)
+async def create_book_async(book_data: BookCreate, db: AsyncSession = Depends(get_async_db)):
+    book = Book(**book_data.model_dump())
+    db.add(book)
+    await db.commit()
+    await db.refresh(book)
+    return book
+
+@async_router.get("/books", response_model=list[BookResponse] | BookPage | BookBatch)
+async def get_books_async(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    filters: BookFilters = Depends(get_book_filters),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: str | None = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: str | None = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
+):
+    if ids is not None:
+        return await batch_get_async(db, [int(book_id) for book_id in ids.split(",")])
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*(await db.exec(collection_version_query)).one())
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    query, body = books_query(filters, skip, limit, cursor, sort, fields)
+    return json_response(body((await db.exec(query)).all()), validators.headers())
+
+@async_router.get("/books/search", response_model=list[BookResponse])
+async def search_books_async(
+    q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Identical concurrent searches share one query and one encoded body
+    async def search() -> bytes:
+        if SEARCH_BACKEND == "trigram":
+            return encode_json(encode_rows(await fuzzy_search_rows_async(db, q, limit)))
+        rows = (await db.exec(search_query(q, limit, BOOK_COLUMNS))).all()
+        years = year_query(q, limit, BOOK_COLUMNS)
+        if years is not None and len(rows) < limit:
+            rows = merge_results(rows, (await db.exec(years)).all(), limit)
+        return encode_json(encode_rows(rows))
+    return Response(content=await read_flights.do_async(search_key(q, limit), search), media_type="application/json")
+
+@async_router.get("/books/suggest", response_model=BookSuggestions)
+async def suggest_books_async(
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    suggest_index.apply((await db.exec(suggest_query(suggest_index.since()))).all())
+    values = suggest_index.top(field, prefix, limit)
+    while values:
+        present = set((await db.exec(present_query(field, values))).all())
+        if len(present) == len(values):
+            break
+        suggest_index.remove(field, (value for value in values if value not in present))
+        values = suggest_index.top(field, prefix, limit)
+    return {"field": field, "prefix": prefix, "suggestions": values}
 
+@async_router.put("/books/{book_id}", response_model=BookResponse)
+async def update_book_async(book_id: int, book_data: BookCreate, db: AsyncSession = Depends(get_async_db)):
+    book = await db.get(Book, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    book.title = book_data.title
+    book.author = book_data.author
+    book.published_year = book_data.published_year
+    book.genre = book_data.genre
+    await db.commit()
+    await db.refresh(book)
+    return book
+
+@async_router.delete("/books/{book_id}", response_model=BookResponse)
+async def delete_book_async(book_id: int, db: AsyncSession = Depends(get_async_db)):
+    book = await db.get(Book, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    await db.delete(book)
+    await db.commit()
+    return book
+
+async def batch_get_async(db: AsyncSession, ids: list[int]) -> Response:
+    ids = unique_ids(ids)
+    rows = [row for query in ids_queries(ids) for row in (await db.exec(query)).all()]
+    return json_response(batch_result(ids, rows))
+
+@async_router.post("/books/batch-get", response_model=BookBatch)
+async def batch_get_books_async(request_data: BookBatchGet, db: AsyncSession = Depends(get_async_db)):
+    return await batch_get_async(db, request_data.ids)
+
+@async_router.get("/books/{book_id}", response_model=BookResponse)
+async def get_book_async(book_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    if is_conditional(request):
+        response = revalidate_book(request, book_id, (await db.exec(select(Book.updated_at).where(Book.id == book_id))).first())
+        if response is not None:
+            return response
+    # Concurrent requests for the same book share one load and encoding
+    async def load() -> tuple[datetime, bytes] | None:
+        return encode_book(await db.get(Book, book_id))
+    return book_response(book_id, await read_flights.do_async(("book", book_id), load))
+
+# Swap same-path, same-method routes in place so route order is unchanged
+def replace_routes(router: APIRouter):
+    replacements = {(route.path, frozenset(route.methods)): route for route in router.routes}
+    app.router.routes = [
+        replacements.get((route.path, frozenset(getattr(route, "methods", None) or ())), route)
+        for route in app.router.routes
+    ]
+
+if ASYNC_DB:
+    replace_routes(async_router)
+
+# POST /books through the write-behind batcher (WRITE_BEHIND=true). Creates are inserted in groups
+# (one multi-row INSERT, one commit) and each request is answered with its own row only after that
+# commit, so a 200 still means the book is durable
+write_behind_router = APIRouter()
+
+@write_behind_router.post("/books", response_model=BookResponse)
+async def create_book_write_behind(book_data: BookCreate):
+    try:
+        return await create_batcher.run(book_data)
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Too many pending writes, retry later", headers={"Retry-After": "1"})
 
+if WRITE_BEHIND:
+    replace_routes(write_behind_router)
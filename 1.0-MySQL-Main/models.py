@@ -0,0 +1,29 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+
+# Database model
+class Book(SQLModel, table=True):
+    __tablename__ = "books"
+    # Filter on one column, order by the next (InnoDB appends the primary key); see database.sql
+    __table_args__ = (
+        Index("idx_genre_published_year", "genre", "published_year"),
+        Index("idx_author_published_year", "author", "published_year"),
+    )
+    
+    id: int = Field(default=None, primary_key=True)
+    title: str = Field(index=True, max_length=255, nullable=False)
+    author: str = Field(index=True, max_length=255, nullable=False)
+    published_year: int = Field(index=True, nullable=True)
+    genre: str = Field(index=True, max_length=100, nullable=True)
+    created_at: datetime = Field(default_factory=datetime.now, nullable=False)
+    updated_at: datetime = Field(
+        default_factory=datetime.now, nullable=False, index=True,
+        sa_column_kwargs={"onupdate": datetime.now}
+    )
+
+# Columns in BookResponse order, selected as plain tuples (no ORM identity map).
+# List endpoints encode these straight to JSON bytes without building BookResponse
+# models; their response_model only documents the shape.
+BOOK_COLUMNS = (Book.id, Book.title, Book.author, Book.published_year, Book.genre, Book.created_at, Book.updated_at)
+BOOK_FIELDS = tuple(column.key for column in BOOK_COLUMNS)
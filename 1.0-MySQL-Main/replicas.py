@@ -0,0 +1,127 @@
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("bookstore.replicas")
+
+STRATEGIES = ("round_robin", "least_loaded")
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+# Set after a successful write; until it expires the client's reads go to the primary
+STICKY_COOKIE = "read_primary_until"
+
+# Chooses a replica per session; a replica that fails its pre-ping sits out for `cooldown` seconds.
+# Works for async engines too: routing happens on their sync_engine inside the greenlet.
+class ReplicaRouter:
+    def __init__(self, primary, replicas: Sequence, strategy: str = "round_robin", cooldown: float = 5.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy!r} (expected one of {', '.join(STRATEGIES)})")
+        self.primary: Engine = getattr(primary, "sync_engine", primary)
+        self.replicas: List[Engine] = [getattr(replica, "sync_engine", replica) for replica in replicas]
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self._down_until: Dict[Engine, float] = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    # Healthy replicas in the order they should be tried
+    def candidates(self) -> List[Engine]:
+        now = time.monotonic()
+        with self._lock:
+            healthy = [replica for replica in self.replicas if self._down_until.get(replica, 0) <= now]
+        if not healthy:
+            return []
+        if self.strategy == "least_loaded":
+            return sorted(healthy, key=lambda replica: replica.pool.checkedout())
+        start = next(self._turn) % len(healthy)
+        return healthy[start:] + healthy[:start]
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.cooldown
+
+    # Check out a connection from the first replica that answers; pool_pre_ping validates it here,
+    # so a dead replica is skipped before any query runs on it. None means use the primary.
+    def connect_replica(self) -> Optional[Connection]:
+        for replica in self.candidates():
+            try:
+                return replica.connect()
+            except DBAPIError as e:
+                self.mark_down(replica)
+                logger.warning("replica %s failed its pre-ping, skipping it for %ss: %s",
+                               replica.url.render_as_string(hide_password=True), self.cooldown, e.orig or e)
+        return None
+
+    def stats(self) -> List[Dict[str, object]]:
+        now = time.monotonic()
+        return [
+            {
+                "replica": replica.url.render_as_string(hide_password=True),
+                "available": self._down_until.get(replica, 0) <= now,
+                "checkedout": replica.pool.checkedout() if hasattr(replica.pool, "checkedout") else None,
+            }
+            for replica in self.replicas
+        ]
+
+# Sends writes (and everything after the first write) to the primary and reads to a replica.
+# Pass it as sync_session_class to AsyncSession for the async engines.
+class RoutingSession(Session):
+    def __init__(self, router: ReplicaRouter, primary_only: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self.router = router
+        self.primary_only = primary_only
+        self._replica = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.primary_only or self._flushing or getattr(clause, "is_dml", False):
+            # Read-your-writes within the session: once it writes, stay on the primary
+            self.primary_only = True
+            return self.router.primary
+        if self._replica is None:
+            self._replica = self.router.connect_replica() or self.router.primary
+        return self._replica
+
+    def close(self) -> None:
+        super().close()
+        if isinstance(self._replica, Connection):
+            self._replica.close()
+        self._replica = None
+
+# Whether this request's reads must go to the primary (writes, or a write within the sticky window)
+def reads_from_primary(connection: HTTPConnection) -> bool:
+    if connection.scope.get("method") not in READ_METHODS:
+        return True
+    try:
+        return float(connection.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+# Marks clients that just wrote, so their next reads (on any worker) see the write
+class ReadYourWritesMiddleware:
+    def __init__(self, app: ASGIApp, window: float = 5.0):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or self.window <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.window
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{STICKY_COOKIE}={until:.3f}; Max-Age={math.ceil(self.window)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
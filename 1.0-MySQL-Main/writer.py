@@ -0,0 +1,110 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+
+# Writes a batch of items in one transaction and returns one result per item, after the commit
+BatchFlush = Callable[[List[Any]], List[Any]]
+
+_STOP = object()
+
+# Write-behind group commit: queued items are written together every `max_rows` items or `max_delay` seconds
+class BatchWriter:
+    def __init__(self, flush: BatchFlush, max_rows: int = 500, max_delay: float = 0.005,
+                 max_pending: int = 10000, queue_timeout: float = 1.0):
+        self.flush = flush
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.queue_timeout = queue_timeout
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+        self.waited = 0
+        self.rejected = 0
+        # Bounded: once max_pending items wait, submitters wait for room (backpressure)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # Queue `item`, waiting up to `timeout` seconds for room (queue.Full when there is none)
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        if timeout is None:
+            self._queue.put_nowait((item, future))
+        else:
+            self._queue.put((item, future), timeout=timeout)
+        return future
+
+    # Await an item's result, which only arrives once the batch holding it has committed
+    async def run(self, item: Any) -> Any:
+        try:
+            future = self.submit(item)
+        except queue.Full:
+            # Backpressure: wait for room in a threadpool thread rather than on the event loop
+            self.waited += 1
+            try:
+                future = await run_in_threadpool(self.submit, item, self.queue_timeout)
+            except queue.Full:
+                self.rejected += 1
+                raise
+        return await asyncio.wrap_future(future)
+
+    # Committed batches and items (items / batches is the average batch), failures and queue pressure
+    def stats(self) -> dict:
+        return {"batches": self.batches, "items": self.items, "failed": self.failed,
+                "waited": self.waited, "rejected": self.rejected, "pending": self._queue.qsize()}
+
+    # Write what is already queued, then stop the batcher thread
+    def stop(self, timeout: float = 30) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            # The first item starts the clock: the batch is written when full or max_delay later
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Any, Future]]) -> None:
+        # Requests cancelled while queued (client gone) are dropped rather than written unanswered
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = self.flush([item for item, _ in batch])
+        except Exception as e:
+            self.failed += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
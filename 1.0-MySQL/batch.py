@@ -0,0 +1,44 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+from cache import book_cache, book_key, encode_book, pack_entry, unpack_entry
+from config import BATCH_GET_MAX_IDS
+from instrumentation import serialization_timer
+
+# Comma-separated ids for GET /books?ids=
+IDS_PATTERN = r"^\d+(,\d+)*$"
+
+def parse_ids(ids: str) -> List[int]:
+    return [int(book_id) for book_id in ids.split(",")]
+
+# Requested ids in order without repeats; ValueError above BATCH_GET_MAX_IDS
+def unique_ids(ids: Iterable[int]) -> List[int]:
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BATCH_GET_MAX_IDS:
+        raise ValueError(f"At most {BATCH_GET_MAX_IDS} ids per request")
+    return ids
+
+# Cached GET /books/{book_id} bodies by id, and the ids that still have to be loaded
+def cached_books(ids: Sequence[int]) -> Tuple[Dict[int, bytes], List[int]]:
+    bodies, misses = {}, []
+    for book_id, entry in zip(ids, book_cache.get_many([book_key(book_id) for book_id in ids])):
+        if entry is None:
+            misses.append(book_id)
+        else:
+            bodies[book_id] = unpack_entry(entry)[1]
+    return bodies, misses
+
+# Encode BOOK_COLUMNS rows exactly like GET /books/{book_id} and fill the cache with them
+def cache_books(rows: Iterable[tuple], token: int) -> Dict[int, bytes]:
+    bodies, entries = {}, {}
+    for row in rows:
+        body = encode_book(row)
+        bodies[row.id] = body
+        entries[book_key(row.id)] = pack_entry(row.updated_at, body)
+    book_cache.set_many(entries, token=token)
+    return bodies
+
+# BookBatch JSON spliced from per-book bodies, in request order
+def encode_batch(ids: Sequence[int], bodies: Dict[int, bytes]) -> bytes:
+    with serialization_timer():
+        items = b",".join(bodies[book_id] for book_id in ids if book_id in bodies)
+        missing = ",".join(str(book_id) for book_id in ids if book_id not in bodies)
+        return b'{"items":[' + items + b'],"missing":[' + missing.encode() + b"]}"
@@ -0,0 +1,87 @@
+import json
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from schemas import BulkItemResult, BulkResult
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+BatchHandler = Callable[[List[Any]], List[Tuple[str, Optional[int]]]]
+
+def bulk_request_body(item_schema: dict) -> dict:
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": item_schema}},
+                NDJSON_MEDIA_TYPE: {"schema": item_schema},
+            },
+        }
+    }
+
+async def read_bulk_items(request: Request) -> AsyncIterator[Any]:
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON")
+    for item in items:
+        yield item
+
+async def run_bulk(
+    request: Request, adapter: TypeAdapter, handler: BatchHandler, batch_size: int
+) -> BulkResult:
+    results: List[BulkItemResult] = []
+    batch: List[Tuple[int, Any]] = []
+    index = 0
+    async for raw in read_bulk_items(request):
+        try:
+            if isinstance(raw, bytes):
+                batch.append((index, adapter.validate_json(raw)))
+            else:
+                batch.append((index, adapter.validate_python(raw)))
+        except ValidationError as e:
+            results.append(BulkItemResult(index=index, status="invalid", error=_format_errors(e)))
+        index += 1
+        if len(batch) >= batch_size:
+            results.extend(await _apply_batch(handler, batch))
+            batch = []
+    if batch:
+        results.extend(await _apply_batch(handler, batch))
+
+    results.sort(key=lambda result: result.index)
+    failed = sum(1 for result in results if result.status in ("invalid", "error", "not_found"))
+    return BulkResult(total=index, succeeded=index - failed, failed=failed, results=results)
+
+async def _apply_batch(handler: BatchHandler, batch: Sequence[Tuple[int, Any]]) -> List[BulkItemResult]:
+    items = [item for _, item in batch]
+    try:
+        outcomes = await run_in_threadpool(handler, items)
+    except SQLAlchemyError as e:
+        error = str(getattr(e, "orig", None) or e)
+        return [BulkItemResult(index=index, status="error", error=error) for index, _ in batch]
+    return [
+        BulkItemResult(index=index, status=status, id=book_id)
+        for (index, _), (status, book_id) in zip(batch, outcomes)
+    ]
+
+def _format_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}"
+        for err in error.errors()
+    )
@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from bus import invalidation_bus
+from compression import precompress
+from config import CACHE_BACKEND, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS, REDIS_URL
+from models import Book
+from schemas import BookResponse
+from instrumentation import serialization_timer
+
+class ResponseCache:
+    backend = "none"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped on every invalidation; fills that started before it are dropped
+        self._epoch = 0
+        # key -> (version stamp, expiry): fills of an older version than the latest
+        # invalidation are dropped too, whichever worker or replica they were read from
+        self._floors: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._floor_ttl = CACHE_TTL_SECONDS
+        self._max_floors = CACHE_MAX_ENTRIES
+        self._floor_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        self.misses += 1
+        return None
+
+    def fill_token(self) -> int:
+        return self._epoch
+
+    # Values for several keys (None for misses), in one round trip where the backend allows
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, token: Optional[int] = None) -> None:
+        pass
+
+    def set_many(self, entries: Dict[str, bytes], token: Optional[int] = None) -> None:
+        for key, value in entries.items():
+            self.set(key, value, token=token)
+
+    def delete(self, *keys: str) -> None:
+        self._epoch += 1
+        self.invalidations += len(keys)
+
+    # Delete keys and refuse later fills older than their version stamps (local writes and the bus)
+    def invalidate(self, stamps: Dict[str, int]) -> None:
+        now = time.monotonic()
+        with self._floor_lock:
+            for key, stamp in stamps.items():
+                floor = self._floors.pop(key, None)
+                # Re-inserted at the end, so the dict stays ordered by expiry
+                self._floors[key] = (max(stamp, floor[0]) if floor else stamp, now + self._floor_ttl)
+            while self._floors and (len(self._floors) > self._max_floors or next(iter(self._floors.values()))[1] <= now):
+                self._floors.popitem(last=False)
+        self.delete(*stamps)
+
+    # Whether a packed entry is older than the latest invalidation of its key
+    def is_stale(self, key: str, value: bytes) -> bool:
+        with self._floor_lock:
+            floor = self._floors.get(key)
+        if floor is None or floor[1] <= time.monotonic():
+            return False
+        return entry_stamp(value) < floor[0]
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "version_floors": len(self._floors),
+        }
+
+# In-process LRU with a TTL and entry/byte limits
+class LRUCache(ResponseCache):
+    backend = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, token: Optional[int] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if self.is_stale(key, value):
+            return
+        with self._lock:
+            if token is not None and token != self._epoch:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            super().delete(*keys)
+            for key in keys:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = super().stats()
+            stats.update(entries=len(self._entries), bytes=self._bytes,
+                         max_entries=self.max_entries, max_bytes=self.max_bytes)
+            return stats
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+# Works with any Redis-compatible client (get, mget, set with px, pipeline, delete)
+class RedisCache(ResponseCache):
+    backend = "redis"
+
+    def __init__(self, client, ttl: float, prefix: str = "bookstore:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, token: Optional[int] = None) -> None:
+        if (token is not None and token != self._epoch) or self.is_stale(key, value):
+            return
+        self.client.set(self.prefix + key, value, px=max(1, int(self.ttl * 1000)))
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        values = self.client.mget([self.prefix + key for key in keys])
+        hits = sum(value is not None for value in values)
+        self.hits += hits
+        self.misses += len(values) - hits
+        return values
+
+    def set_many(self, entries: Dict[str, bytes], token: Optional[int] = None) -> None:
+        if not entries or (token is not None and token != self._epoch):
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in entries.items():
+            if self.is_stale(key, value):
+                continue
+            pipeline.set(self.prefix + key, value, px=max(1, int(self.ttl * 1000)))
+        pipeline.execute()
+
+    def delete(self, *keys: str) -> None:
+        super().delete(*keys)
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+def create_cache() -> ResponseCache:
+    if CACHE_BACKEND == "memory":
+        return LRUCache(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_TTL_SECONDS)
+    if CACHE_BACKEND == "redis":
+        import redis  # optional dependency
+        return RedisCache(redis.Redis.from_url(REDIS_URL), CACHE_TTL_SECONDS)
+    return ResponseCache()
+
+def book_key(book_id: int) -> str:
+    return f"book:{book_id}"
+
+def encode_book(book: Book) -> bytes:
+    with serialization_timer():
+        return BookResponse.model_validate(book).model_dump_json().encode()
+
+# Entries carry updated_at in front of the body so validators need no JSON decoding. Bodies above
+# COMPRESSION_MIN_SIZE are compressed here, once, and stored after the body; the header line
+# lists their codings and sizes: "<updated_at> gzip=812 br=745"
+def pack_entry(updated_at: datetime, body: bytes) -> bytes:
+    variants = precompress(body)
+    header = updated_at.isoformat() + "".join(f" {encoding}={len(data)}" for encoding, data in variants.items())
+    return header.encode() + b"\n" + body + b"".join(variants.values())
+
+# updated_at, the identity body and its precompressed variants by coding
+def unpack_entry(entry: bytes) -> Tuple[datetime, bytes, Dict[str, bytes]]:
+    header, _, body = entry.partition(b"\n")
+    version, *sizes = header.decode().split(" ")
+    variants = {}
+    end = len(body)
+    for encoding, size in reversed([size.split("=") for size in sizes]):
+        variants[encoding] = body[end - int(size):end]
+        end -= int(size)
+    return datetime.fromisoformat(version), body[:end], dict(reversed(variants.items()))
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# updated_at as integer microseconds (naive, as stored; the same in every worker whatever its timezone)
+def version_stamp(updated_at: datetime) -> int:
+    return (updated_at - _EPOCH) // _MICROSECOND
+
+def entry_stamp(entry: bytes) -> int:
+    return version_stamp(datetime.fromisoformat(entry[:entry.index(b"\n")].split(b" ", 1)[0].decode()))
+
+# Drop cached books after a committed write, here and through the bus in every other worker.
+# `updated_at` is the rows' new version; for deletes, the newest version they can have had
+# (the deleted row's, or the time of the delete), bumped so that version is refused as well
+def invalidate_books(book_ids: Iterable[int], updated_at: datetime, deleted: bool = False) -> None:
+    stamp = version_stamp(updated_at) + (1 if deleted else 0)
+    stamps = {book_key(book_id): stamp for book_id in book_ids}
+    book_cache.invalidate(stamps)
+    invalidation_bus.publish(stamps)
+
+book_cache = create_cache()
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Optional
+from sqlalchemy import DateTime, column, table
+from coalesce import on_write_commit
+
+# Append-only change log behind GET /books/changes, written by triggers on `books` (see
+# database.sql) in the same transaction as every insert, update and delete. seq comes from
+# AUTO_INCREMENT when the row is inserted, so concurrent transactions can commit out of seq
+# order; BookCRUD.get_changes stops before gaps that may still fill so a consumer never skips one.
+CHANGE_TABLE = "book_changes"
+UPSERT = "upsert"
+DELETE = "delete"
+
+book_changes = table(CHANGE_TABLE, column("seq"), column("book_id"), column("op"), column("changed_at", DateTime))
+
+# Wakes change-feed waiters on the event loop when this process commits a write
+class ChangeWatcher:
+    def __init__(self):
+        # Bumped on the event loop for every local commit that wrote
+        self.version = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+
+    # Called after a commit, from any thread
+    def notify(self) -> None:
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+
+    # Current version to wait on; call it before reading the log, on the event loop
+    def mark(self) -> int:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._event = loop, asyncio.Event()
+        return self.version
+
+    # Return once `version` (from mark) is outdated by a local commit, or after `timeout` seconds
+    async def wait(self, version: int, timeout: float) -> None:
+        if self.version != version:
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _wake(self) -> None:
+        self.version += 1
+        if self._event is not None:
+            self._event.set()
+            self._event = asyncio.Event()
+
+# Create the watcher shared by long-poll and SSE consumers
+change_watcher = ChangeWatcher()
+on_write_commit(change_watcher.notify)
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+from fastapi import Request
+from fastapi.responses import Response
+
+# ETag / Last-Modified pair describing one version of a resource
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(_as_utc(self.last_modified), usegmt=True)
+        return headers
+
+def book_validators(book_id: int, updated_at: datetime) -> Validators:
+    return Validators(f'W/"b{book_id}-{updated_at:%Y%m%d%H%M%S%f}"', updated_at)
+
+# The collection version is the row count plus max(updated_at)
+def collection_validators(count: int, latest: Optional[datetime]) -> Validators:
+    version = f"{latest:%Y%m%d%H%M%S%f}" if latest else "0"
+    return Validators(f'W/"c{count}-{version}"', latest)
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = _opaque_tag(validators.etag)
+        return any(_opaque_tag(tag) == current for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return _as_utc(validators.last_modified).replace(microsecond=0) <= since
+
+def not_modified(validators: Validators) -> Response:
+    return Response(status_code=304, headers=validators.headers())
+
+# Weak comparison: ignore the W/ prefix
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive local time (datetime.now)
+    return value.astimezone(timezone.utc)
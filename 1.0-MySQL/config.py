@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,7 +9,78 @@ DB_PORT = int(os.getenv("DB_PORT", "3306"))
 DB_USER = os.getenv("DB_USER", "root")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 DB_NAME = os.getenv("DB_NAME", "bookstore")
+# Per-engine pool size (serve.py derives both from --db-connections)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# Read replicas: comma-separated host[:port] list sharing the primary's user, password and database
+DB_REPLICA_HOSTS = [host.strip() for host in os.getenv("DB_REPLICA_HOSTS", "").split(",") if host.strip()]
+# round_robin or least_loaded (fewest checked-out connections)
+REPLICA_STRATEGY = os.getenv("REPLICA_STRATEGY", "round_robin")
+# Seconds a client's reads stay on the primary after it writes (read-your-writes)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Seconds a replica that failed its pre-ping is skipped before being tried again
+REPLICA_COOLDOWN_SECONDS = float(os.getenv("REPLICA_COOLDOWN_SECONDS", "5"))
 PORT = int(os.getenv("PORT", "8000"))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+# Batch get-by-ids: ids per request and ids per IN query
+BATCH_GET_MAX_IDS = int(os.getenv("BATCH_GET_MAX_IDS", "5000"))
+BATCH_GET_CHUNK_SIZE = int(os.getenv("BATCH_GET_CHUNK_SIZE", "1000"))
+# Use the async engine (aiomysql) and async handlers for the core book routes
+ASYNC_DB = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+# Write-behind POST /books: creates are queued and inserted together, one multi-row INSERT and one
+# commit every WRITE_BEHIND_MAX_ROWS rows or WRITE_BEHIND_MAX_DELAY_MS; each request is answered after
+# its batch commits. A full queue (WRITE_BEHIND_QUEUE_SIZE) makes requests wait for room up to
+# WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS, then answers 503
+WRITE_BEHIND = os.getenv("WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "500"))
+WRITE_BEHIND_MAX_DELAY_MS = float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS", "5"))
+WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS = float(os.getenv("WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS", "1"))
+# Response cache for GET /books/{book_id} (memory, redis or none)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Cross-worker cache invalidation (none, socket for same-host workers, redis, or memory for tests);
+# serve.py selects socket with a private directory when it runs several workers
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "none")
+INVALIDATION_SOCKET_DIR = os.getenv("INVALIDATION_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "bookstore-invalidation"))
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "bookstore:invalidations")
+# Single-flight: identical concurrent reads share one query; waiters give up after the timeout
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "5"))
+# /books/search backend: fulltext (MySQL FULLTEXT) or trigram (in-memory, typo-tolerant)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "fulltext")
+# Share of the query's trigrams a book must contain, and how far back each sync re-reads updated_at
+# (keep it above replica lag when searches read from replicas)
+TRIGRAM_THRESHOLD = float(os.getenv("TRIGRAM_THRESHOLD", "0.3"))
+TRIGRAM_SYNC_LAG_SECONDS = float(os.getenv("TRIGRAM_SYNC_LAG_SECONDS", "5"))
+# /books/suggest: distinct values kept per field (least recently written dropped first) and sync re-read window
+SUGGEST_MAX_VALUES = int(os.getenv("SUGGEST_MAX_VALUES", "1000000"))
+SUGGEST_SYNC_LAG_SECONDS = float(os.getenv("SUGGEST_SYNC_LAG_SECONDS", "5"))
+# /books/changes: longest long-poll wait, how often waiting consumers re-read the log for other workers'
+# writes, and how long a seq gap holds the feed back at least. A change whose transaction takes longer
+# than that to commit (after statements that began before it) can be skipped, so the default matches
+# InnoDB's default innodb_lock_wait_timeout
+CHANGES_MAX_WAIT_SECONDS = float(os.getenv("CHANGES_MAX_WAIT_SECONDS", "30"))
+CHANGES_POLL_SECONDS = float(os.getenv("CHANGES_POLL_SECONDS", "1"))
+CHANGES_GAP_SECONDS = float(os.getenv("CHANGES_GAP_SECONDS", "50"))
+# Response compression: codings in order of preference (br and zstd need the brotli and zstandard
+# packages), smallest body worth compressing, and the level profile for routes without their own
+# (fast, default or best; see compression.ROUTE_PROFILES)
+COMPRESSION = os.getenv("COMPRESSION", "true").lower() in ("1", "true", "yes")
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_PROFILE = os.getenv("COMPRESSION_PROFILE", "default")
+# Server-Timing headers, JSON request logs and Prometheus /metrics
+INSTRUMENTATION = os.getenv("INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Flag a request as N+1 when one statement repeats this many times
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+# Readiness probe: seconds between background SELECT 1 probes, and the probe timeout
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
 APP_NAME = "FastAPI Book Management API"
 APP_VERSION = "1.0.0"
 APP_DESCRIPTION = "Book Management API with MySQL database" 
\ No newline at end of file
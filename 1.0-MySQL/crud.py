@@ -1,7 +1,31 @@
-from sqlmodel import Session, select, or_
-from typing import List, Optional
+from sqlmodel import Session, select, or_, delete, update, func
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from cache import invalidate_books
+from changes import UPSERT, book_changes
+from config import BATCH_GET_CHUNK_SIZE, CHANGES_GAP_SECONDS, SEARCH_BACKEND
+from facets import FACET_COLUMNS, FACETS, TOTAL, facet_counts, facet_value
 from models import Book
-from schemas import BookCreate, BookUpdate
+from filters import BookFilters
+from pagination import decode_cursor, encode_cursor, parse_sort, seek_condition, sort_order
+from schemas import BookBulkCreate, BookBulkUpdate, BookCreate, BookUpdate
+from search import build_boolean_query, fulltext_score
+from serialization import BOOK_FIELDS
+from suggest import suggest_index
+from trigram import search_index
+
+# Columns in BookResponse order, selected as plain tuples (no ORM identity map)
+BOOK_COLUMNS = (
+    Book.id, Book.title, Book.author, Book.published_year,
+    Book.genre, Book.created_at, Book.updated_at
+)
+COLUMNS_BY_FIELD = dict(zip(BOOK_FIELDS, BOOK_COLUMNS))
+# Columns GET /books/suggest completes
+SUGGEST_COLUMNS = {"title": Book.title, "author": Book.author}
+# Columns compared when new rows are read back by id
+INSERTED_COLUMNS = (Book.title, Book.author, Book.published_year, Book.genre, Book.updated_at)
 
 class BookCRUD:
     @staticmethod
@@ -10,16 +34,151 @@ class BookCRUD:
         db.add(book)
         db.commit()
         db.refresh(book)
+        # Announced too, so no worker keeps an entry of an earlier book with this id (a bulk upsert can reuse one)
+        invalidate_books([book.id], book.updated_at)
         return book
 
+    # One multi-row INSERT without committing; BookRow dicts in input order
+    @staticmethod
+    def insert_books(db: Session, books: List[BookCreate]) -> List[Dict[str, object]]:
+        now = datetime.now()
+        # created_at is a DATETIME (whole seconds): rounded here so the rows returned match the stored ones
+        rows = [{**book.model_dump(), "created_at": now.replace(microsecond=0), "updated_at": now} for book in books]
+        return [{"id": book_id, **row} for book_id, row in zip(BookCRUD.insert_new_rows(db, rows), rows)]
+
+    # Insert rows without ids in one multi-row INSERT (without committing) and return their ids in order.
+    # A multi-row "simple insert" gets LAST_INSERT_ID() onwards in steps of @@auto_increment_increment
+    # (more than 1 on Galera or multi-primary setups) when InnoDB hands it a consecutive block, which
+    # innodb_autoinc_lock_mode 2 does not promise while other inserts run. So the ids are read back: if
+    # any is not one of these rows, the INSERT is undone and the rows go in one at a time instead.
+    @staticmethod
+    def insert_new_rows(db: Session, rows: List[Dict[str, object]]) -> List[int]:
+        table = Book.__table__
+        step = BookCRUD._auto_increment_step(db)
+        savepoint = db.begin_nested()
+        result = db.connection().execute(insert(table).values(rows))
+        ids = [result.lastrowid + offset * step for offset in range(len(rows))]
+        if BookCRUD._rows_inserted(db, ids, rows):
+            savepoint.commit()
+            return ids
+        savepoint.rollback()
+        return [db.connection().execute(insert(table).values(row)).lastrowid for row in rows]
+
+    @staticmethod
+    def _auto_increment_step(db: Session) -> int:
+        return db.connection().execute(text("SELECT @@auto_increment_increment")).scalar_one()
+
+    # Whether `ids` hold exactly `rows`, in order (this transaction sees its own uncommitted rows)
+    @staticmethod
+    def _rows_inserted(db: Session, ids: List[int], rows: List[Dict[str, object]]) -> bool:
+        found = {
+            row[0]: tuple(row[1:])
+            for row in db.connection().execute(select(Book.id, *INSERTED_COLUMNS).where(Book.id.in_(ids)))
+        }
+        return all(
+            found.get(book_id) == tuple(row[column.key] for column in INSERTED_COLUMNS)
+            for book_id, row in zip(ids, rows)
+        )
+
+    @staticmethod
+    def get_books(db: Session, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Book]:
+        query = select(Book).order_by(*BookCRUD._sort_order(sort)).offset(skip).limit(limit)
+        return db.exec(query).all()
+
+    @staticmethod
+    def get_books_page(
+        db: Session, cursor: str = "", limit: int = 100, sort: str = "id"
+    ) -> Tuple[List[Book], Optional[str]]:
+        books = db.exec(BookCRUD._page_query(cursor, limit, sort)).all()
+        return BookCRUD._page_result(books, limit, sort)
+
+    # Column-tuple variants of the list queries (`fields` first), for the fast serialization path
+    @staticmethod
+    def get_book_rows(
+        db: Session, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> List[tuple]:
+        query = (
+            select(*BookCRUD._columns(fields, sort))
+            .where(*filters.conditions())
+            .order_by(*BookCRUD._sort_order(sort))
+            .offset(skip)
+            .limit(limit)
+        )
+        return db.exec(query).all()
+
+    @staticmethod
+    def get_book_rows_page(
+        db: Session, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> Tuple[List[tuple], Optional[str]]:
+        query = BookCRUD._page_query(cursor, limit, sort, BookCRUD._columns(fields, sort), filters)
+        rows = db.exec(query).all()
+        return BookCRUD._page_result(rows, limit, sort)
+
+    # Columns for `fields`, followed by any sort keys the next cursor needs
+    @staticmethod
+    def _columns(fields: Sequence[str], sort: str) -> tuple:
+        names = list(fields) + [key.name for key in parse_sort(sort) if key.name not in fields]
+        return tuple(COLUMNS_BY_FIELD[name] for name in names)
+
     @staticmethod
-    def get_books(db: Session, skip: int = 0, limit: int = 100) -> List[Book]:
-        return db.exec(select(Book).offset(skip).limit(limit)).all()
+    def iter_book_rows(db: Session, batch_size: int = 1000) -> Iterator[Sequence[tuple]]:
+        # yield_per switches PyMySQL to an unbuffered server-side cursor
+        query = select(*BOOK_COLUMNS).order_by(Book.id).execution_options(yield_per=batch_size)
+        yield from db.exec(query).partitions()
+
+    @staticmethod
+    def _page_query(
+        cursor: str, limit: int, sort: str, columns: tuple = (Book,), filters: BookFilters = BookFilters()
+    ):
+        query = select(*columns).where(*filters.conditions())
+        position = decode_cursor(cursor, sort)
+        if position is not None:
+            query = query.where(seek_condition(sort, position))
+        # Fetch one extra row to know whether another page exists
+        return query.order_by(*BookCRUD._sort_order(sort)).limit(limit + 1)
+
+    @staticmethod
+    def _page_result(books: Sequence[Book], limit: int, sort: str) -> Tuple[List[Book], Optional[str]]:
+        if len(books) <= limit:
+            return list(books), None
+        books = books[:limit]
+        return list(books), encode_cursor(sort, books[-1])
+
+    @staticmethod
+    def _sort_order(sort: str):
+        return sort_order(sort)
 
     @staticmethod
     def get_book(db: Session, book_id: int) -> Optional[Book]:
         return db.get(Book, book_id)
 
+    # BOOK_COLUMNS tuples for `ids` in no particular order, one IN query per chunk
+    @staticmethod
+    def get_book_rows_by_ids(db: Session, ids: Sequence[int]) -> List[tuple]:
+        rows = []
+        for query in BookCRUD._ids_queries(ids):
+            rows.extend(db.exec(query).all())
+        return rows
+
+    # Chunked so a few thousand ids never become one huge statement
+    @staticmethod
+    def _ids_queries(ids: Sequence[int]) -> List:
+        return [
+            select(*BOOK_COLUMNS).where(Book.id.in_(ids[start:start + BATCH_GET_CHUNK_SIZE]))
+            for start in range(0, len(ids), BATCH_GET_CHUNK_SIZE)
+        ]
+
+    @staticmethod
+    def get_book_version(db: Session, book_id: int) -> Optional[datetime]:
+        return db.exec(select(Book.updated_at).where(Book.id == book_id)).first()
+
+    @staticmethod
+    def get_collection_version(db: Session) -> Tuple[int, Optional[datetime]]:
+        count, latest = db.exec(select(func.count(Book.id), func.max(Book.updated_at))).one()
+        return count, latest
+
     @staticmethod
     def update_book(db: Session, book_id: int, book_data: BookUpdate) -> Optional[Book]:
         book = db.get(Book, book_id)
@@ -30,6 +189,7 @@ class BookCRUD:
             setattr(book, field, value)
         db.commit()
         db.refresh(book)
+        invalidate_books([book_id], book.updated_at)
         return book
 
     @staticmethod
@@ -39,18 +199,342 @@ class BookCRUD:
             return None
         db.delete(book)
         db.commit()
+        invalidate_books([book_id], book.updated_at, deleted=True)
         return book
 
     @staticmethod
-    def search_books(db: Session, search_term: str) -> List[Book]:
-        query = select(Book).where(
-            or_(
-                Book.title.ilike(f"%{search_term}%"),
-                Book.author.ilike(f"%{search_term}%"),
-                Book.genre.ilike(f"%{search_term}%"),
-                Book.published_year.ilike(f"%{search_term}%")
-            )
+    def bulk_create_books(db: Session, items: List[BookBulkCreate]) -> List[Tuple[str, Optional[int]]]:
+        now = datetime.now()
+        table = Book.__table__
+        outcomes: List[Tuple[str, Optional[int]]] = [None] * len(items)
+        new_rows, new_positions, upsert_rows, upsert_positions = [], [], [], []
+        for position, item in enumerate(items):
+            row = item.model_dump(exclude={"id"})
+            row.update(created_at=now, updated_at=now)
+            if item.id is None:
+                new_rows.append(row)
+                new_positions.append(position)
+            else:
+                row["id"] = item.id
+                upsert_rows.append(row)
+                upsert_positions.append(position)
+        try:
+            if new_rows:
+                for position, book_id in zip(new_positions, BookCRUD.insert_new_rows(db, new_rows)):
+                    outcomes[position] = ("created", book_id)
+            if upsert_rows:
+                stmt = mysql_insert(table).values(upsert_rows)
+                stmt = stmt.on_duplicate_key_update(
+                    {
+                        name: stmt.inserted[name]
+                        for name in ("title", "author", "published_year", "genre", "updated_at")
+                    }
+                )
+                db.connection().execute(stmt)
+                for position, row in zip(upsert_positions, upsert_rows):
+                    outcomes[position] = ("upserted", row["id"])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if upsert_rows:
+            invalidate_books((row["id"] for row in upsert_rows), now)
+        return outcomes
+
+    @staticmethod
+    def bulk_update_books(db: Session, items: List[BookBulkUpdate]) -> List[Tuple[str, Optional[int]]]:
+        now = datetime.now()
+        try:
+            existing = BookCRUD._existing_ids(db, [item.id for item in items])
+            rows = [
+                {**item.model_dump(exclude_unset=True), "id": item.id, "updated_at": now}
+                for item in items if item.id in existing
+            ]
+            if rows:
+                # ORM bulk UPDATE by primary key, executemany per distinct column set
+                db.exec(update(Book), params=rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        invalidate_books(existing, now)
+        return [("updated" if item.id in existing else "not_found", item.id) for item in items]
+
+    @staticmethod
+    def bulk_delete_books(db: Session, book_ids: List[int]) -> List[Tuple[str, Optional[int]]]:
+        try:
+            existing = BookCRUD._existing_ids(db, book_ids)
+            if existing:
+                db.exec(delete(Book).where(Book.id.in_(existing)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        # Every deleted row's updated_at is older than the time of the delete
+        invalidate_books(existing, datetime.now(), deleted=True)
+        return [("deleted" if book_id in existing else "not_found", book_id) for book_id in book_ids]
+
+    @staticmethod
+    def _existing_ids(db: Session, book_ids: List[int]) -> set:
+        return set(db.exec(select(Book.id).where(Book.id.in_(set(book_ids)))).all())
+
+    @staticmethod
+    def search_books(db: Session, search_term: str, limit: int = 100) -> List[Book]:
+        books = db.exec(BookCRUD._search_query(search_term, limit)).all()
+        year_query = BookCRUD._year_query(search_term, limit)
+        if year_query is not None and len(books) < limit:
+            return BookCRUD._merge_results(books, db.exec(year_query).all(), limit)
+        return books
+
+    # From the trigram index when it is the search backend
+    @staticmethod
+    def search_book_rows(db: Session, search_term: str, limit: int = 100) -> List[tuple]:
+        if SEARCH_BACKEND == "trigram":
+            return BookCRUD.fuzzy_search_book_rows(db, search_term, limit)
+        rows = db.exec(BookCRUD._search_query(search_term, limit, BOOK_COLUMNS)).all()
+        year_query = BookCRUD._year_query(search_term, limit, BOOK_COLUMNS)
+        if year_query is not None and len(rows) < limit:
+            return BookCRUD._merge_results(rows, db.exec(year_query).all(), limit)
+        return rows
+
+    # Typo-tolerant search through the in-memory trigram index, best matches first
+    @staticmethod
+    def fuzzy_search_book_rows(db: Session, search_term: str, limit: int = 100) -> List[tuple]:
+        BookCRUD.sync_search_index(db)
+        rows: List[tuple] = []
+        ids = search_index.search(search_term, limit)
+        while ids:
+            found = BookCRUD._ranked_rows(ids, BookCRUD.get_book_rows_by_ids(db, ids))
+            rows.extend(found)
+            if len(found) == len(ids):
+                break
+            # Deleted books just left the index, so the next ranks move up
+            ids = search_index.search(search_term, limit)[len(rows):]
+        return rows
+
+    # Feed books written since the last sync (by any process) into the trigram index
+    @staticmethod
+    def sync_search_index(db: Session) -> int:
+        query = BookCRUD._changed_query(search_index.since())
+        return search_index.apply(db.exec(query.execution_options(yield_per=5000)))
+
+    # Searchable columns of books written at or after `since` (all books when None)
+    @staticmethod
+    def _changed_query(since: Optional[datetime]):
+        query = select(Book.id, Book.title, Book.author, Book.genre, Book.updated_at)
+        return query if since is None else query.where(Book.updated_at >= since)
+
+    # Newest distinct `field` values starting with `prefix`, from the prefix index
+    @staticmethod
+    def suggest(db: Session, field: str, prefix: str, limit: int = 10) -> List[str]:
+        BookCRUD.sync_suggest_index(db)
+        column = SUGGEST_COLUMNS[field]
+        values = suggest_index.top(field, prefix, limit)
+        while values:
+            # One indexed IN lookup confirms some book still has each value
+            present = set(db.exec(select(column).where(column.in_(values)).distinct()).all())
+            if len(present) == len(values):
+                break
+            suggest_index.remove(field, (value for value in values if value not in present))
+            values = suggest_index.top(field, prefix, limit)
+        return values
+
+    # Feed titles and authors written since the last sync (by any process) into the prefix index
+    @staticmethod
+    def sync_suggest_index(db: Session) -> int:
+        query = BookCRUD._suggest_query(suggest_index.since())
+        return suggest_index.apply(db.exec(query.execution_options(yield_per=5000)))
+
+    # (title, author, updated_at) of books written at or after `since` (all books when None)
+    @staticmethod
+    def _suggest_query(since: Optional[datetime]):
+        query = select(Book.title, Book.author, Book.updated_at)
+        return query if since is None else query.where(Book.updated_at >= since)
+
+    # Rows in ranked id order; ids without a row were deleted and are removed from the index
+    @staticmethod
+    def _ranked_rows(ids: Sequence[int], rows: Sequence[tuple]) -> List[tuple]:
+        by_id = {row.id: row for row in rows}
+        search_index.remove(book_id for book_id in ids if book_id not in by_id)
+        return [by_id[book_id] for book_id in ids if book_id in by_id]
+
+    @staticmethod
+    def scan_books(db: Session, search_term: str, limit: int = 100) -> List[Book]:
+        return db.exec(BookCRUD._scan_query(search_term, limit)).all()
+
+    @staticmethod
+    def _search_query(search_term: str, limit: int, columns: tuple = (Book,)):
+        boolean_query = build_boolean_query(search_term)
+        if boolean_query is None:
+            return BookCRUD._scan_query(search_term, limit, columns)
+        score = fulltext_score(boolean_query)
+        return select(*columns).where(score).order_by(score.desc()).limit(limit)
+
+    @staticmethod
+    def _year_query(search_term: str, limit: int, columns: tuple = (Book,)):
+        # Years are not part of the FULLTEXT index; use idx_published_year instead
+        if build_boolean_query(search_term) is None or not search_term.strip().isdigit():
+            return None
+        return select(*columns).where(Book.published_year == int(search_term)).limit(limit)
+
+    @staticmethod
+    def _merge_results(books: Sequence[Book], extra: Sequence[Book], limit: int) -> List[Book]:
+        seen = {book.id for book in books}
+        merged = list(books) + [book for book in extra if book.id not in seen]
+        return merged[:limit]
+
+    @staticmethod
+    def _scan_query(search_term: str, limit: int, columns: tuple = (Book,)):
+        return select(*columns).where(BookCRUD._scan_condition(search_term)).limit(limit)
+
+    @staticmethod
+    def _scan_condition(search_term: str):
+        return or_(
+            Book.title.ilike(f"%{search_term}%"),
+            Book.author.ilike(f"%{search_term}%"),
+            Book.genre.ilike(f"%{search_term}%"),
+            Book.published_year.ilike(f"%{search_term}%")
         )
-        return db.exec(query).all()
+
+    # The rows search_books would return (without its limit), as a WHERE clause
+    @staticmethod
+    def _search_condition(search_term: str):
+        boolean_query = build_boolean_query(search_term)
+        if boolean_query is None:
+            return BookCRUD._scan_condition(search_term)
+        condition = fulltext_score(boolean_query)
+        if search_term.strip().isdigit():
+            condition = or_(condition, Book.published_year == int(search_term))
+        return condition
+
+    # Up to `limit` change log rows after `since`, each book once at its latest seq (upserts with the current row)
+    @staticmethod
+    def get_changes(db: Session, since: int, limit: int = 1000) -> Dict[str, object]:
+        # Read before the log: a writer that commits in between is then in the log instead
+        oldest_writer = BookCRUD._oldest_writer_start(db)
+        log = db.exec(
+            select(book_changes.c.seq, book_changes.c.book_id, book_changes.c.op, book_changes.c.changed_at, func.now(6))
+            .where(book_changes.c.seq > since)
+            .order_by(book_changes.c.seq)
+            .limit(limit)
+        ).all()
+        visible = BookCRUD._committed_prefix(log, since, oldest_writer)
+        latest = {book_id: (seq, op) for seq, book_id, op, _, _ in visible}
+        upserts = [book_id for book_id, (_, op) in latest.items() if op == UPSERT]
+        rows = {row.id: row for row in BookCRUD.get_book_rows_by_ids(db, upserts)}
+        changes = []
+        for book_id, (seq, op) in sorted(latest.items(), key=lambda item: item[1][0]):
+            if op == UPSERT:
+                row = rows.get(book_id)
+                if row is None:
+                    # Deleted after this batch was read; a later change reports it
+                    continue
+                changes.append({"seq": seq, "op": op, "id": book_id, "book": dict(zip(BOOK_FIELDS, row))})
+            else:
+                changes.append({"seq": seq, "op": op, "id": book_id, "book": None})
+        return {
+            "changes": changes,
+            "next_since": visible[-1].seq if visible else since,
+            "has_more": len(visible) == limit,
+        }
+
+    # Log rows up to the first seq gap that may still fill: the transaction that took the missing seq
+    # may not have committed yet. A gap is taken for a rollback only once no transaction that started
+    # before the row after it is still writing, and it is older than CHANGES_GAP_SECONDS (by the database
+    # clock; this also covers a writer whose statement began before the transaction that took the gap)
+    @staticmethod
+    def _committed_prefix(log: Sequence[tuple], since: int, oldest_writer: Optional[datetime] = None) -> Sequence[tuple]:
+        gap = timedelta(seconds=CHANGES_GAP_SECONDS)
+        expected = since + 1
+        for index, (seq, _, _, changed_at, now) in enumerate(log):
+            if seq != expected and (
+                now - changed_at < gap or (oldest_writer is not None and oldest_writer <= changed_at)
+            ):
+                return log[:index]
+            expected = seq + 1
+        return log
+
+    # Start of the oldest other transaction that has written rows (None if there is none); needs PROCESS
+    @staticmethod
+    def _oldest_writer_start(db: Session) -> Optional[datetime]:
+        return db.connection().execute(text(
+            "SELECT MIN(trx_started) FROM information_schema.INNODB_TRX"
+            " WHERE trx_mysql_thread_id <> CONNECTION_ID() AND trx_rows_modified > 0"
+        )).scalar_one()
+
+    @staticmethod
+    def get_facets(
+        db: Session, facets: Sequence[str] = FACETS, limit: int = 20, search_term: Optional[str] = None
+    ) -> Dict[str, object]:
+        if search_term is None:
+            # Read the trigger-maintained counters: O(#values), independent of the number of books
+            total = db.exec(select(facet_counts.c.book_count).where(facet_counts.c.facet == TOTAL)).first() or 0
+            queries = {
+                name: select(facet_counts.c.value, facet_counts.c.book_count)
+                .where(facet_counts.c.facet == name)
+                .order_by(facet_counts.c.book_count.desc(), facet_counts.c.value)
+                .limit(limit)
+                for name in facets
+            }
+        else:
+            # Search results have no counters; group the matching rows instead
+            condition = BookCRUD._search_condition(search_term)
+            total = db.exec(select(func.count()).select_from(Book).where(condition)).one()
+            queries = {
+                name: BookCRUD._group_query(FACET_COLUMNS[name], condition).limit(limit)
+                for name in facets
+            }
+        return {
+            "total": total,
+            "facets": {
+                name: [{"value": facet_value(name, value), "count": count} for value, count in db.exec(query)]
+                for name, query in queries.items()
+            },
+        }
+
+    @staticmethod
+    def _group_query(expression, condition):
+        count = func.count()
+        return (
+            select(expression, count)
+            .where(condition, expression.is_not(None))
+            .group_by(expression)
+            .order_by(count.desc(), expression)
+        )
+
+    @staticmethod
+    def get_stats(db: Session, search_term: Optional[str] = None) -> Dict[str, object]:
+        if search_term is None:
+            # Counters give the per-facet figures; MIN/MAX are read from the ends of idx_published_year
+            counters = db.exec(
+                select(facet_counts.c.facet, func.count(), func.sum(facet_counts.c.book_count))
+                .group_by(facet_counts.c.facet)
+            ).all()
+            sums = {facet: (values, books) for facet, values, books in counters}
+            total = int(sums.get(TOTAL, (0, 0))[1])
+            distinct = {name: sums.get(name, (0, 0))[0] for name in FACETS}
+            counted = {name: int(sums.get(name, (0, 0))[1]) for name in FACETS}
+            earliest, latest = db.exec(select(func.min(Book.published_year), func.max(Book.published_year))).one()
+        else:
+            condition = BookCRUD._search_condition(search_term)
+            row = db.exec(
+                select(
+                    func.count(),
+                    *(func.count(func.distinct(FACET_COLUMNS[name])) for name in FACETS),
+                    *(func.count(FACET_COLUMNS[name]) for name in FACETS),
+                    func.min(Book.published_year),
+                    func.max(Book.published_year),
+                ).where(condition)
+            ).one()
+            total, earliest, latest = row[0], row[-2], row[-1]
+            distinct = dict(zip(FACETS, row[1:1 + len(FACETS)]))
+            counted = dict(zip(FACETS, row[1 + len(FACETS):1 + 2 * len(FACETS)]))
+        return {
+            "total": total,
+            "distinct": distinct,
+            "missing": {name: total - counted[name] for name in FACETS},
+            "earliest_year": earliest,
+            "latest_year": latest,
+        }
 
 book_crud = BookCRUD() 
\ No newline at end of file
@@ -0,0 +1,153 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, func
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from cache import invalidate_books
+from config import SEARCH_BACKEND
+from crud import BOOK_COLUMNS, SUGGEST_COLUMNS, BookCRUD
+from filters import BookFilters
+from models import Book
+from schemas import BookCreate, BookUpdate
+from serialization import BOOK_FIELDS
+from suggest import suggest_index
+from trigram import search_index
+
+# Same queries as BookCRUD, executed on the async engine
+class AsyncBookCRUD:
+    @staticmethod
+    async def create_book(db: AsyncSession, book_data: BookCreate) -> Book:
+        book = Book(**book_data.model_dump())
+        db.add(book)
+        await db.commit()
+        await db.refresh(book)
+        # Announced too, so no worker keeps an entry of an earlier book with this id (a bulk upsert can reuse one)
+        invalidate_books([book.id], book.updated_at)
+        return book
+
+    @staticmethod
+    async def get_books(db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Book]:
+        query = select(Book).order_by(*BookCRUD._sort_order(sort)).offset(skip).limit(limit)
+        return (await db.exec(query)).all()
+
+    @staticmethod
+    async def get_books_page(
+        db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id"
+    ) -> Tuple[List[Book], Optional[str]]:
+        books = (await db.exec(BookCRUD._page_query(cursor, limit, sort))).all()
+        return BookCRUD._page_result(books, limit, sort)
+
+    @staticmethod
+    async def get_book_rows(
+        db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> List[tuple]:
+        query = (
+            select(*BookCRUD._columns(fields, sort))
+            .where(*filters.conditions())
+            .order_by(*BookCRUD._sort_order(sort))
+            .offset(skip)
+            .limit(limit)
+        )
+        return (await db.exec(query)).all()
+
+    @staticmethod
+    async def get_book_rows_page(
+        db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> Tuple[List[tuple], Optional[str]]:
+        query = BookCRUD._page_query(cursor, limit, sort, BookCRUD._columns(fields, sort), filters)
+        rows = (await db.exec(query)).all()
+        return BookCRUD._page_result(rows, limit, sort)
+
+    @staticmethod
+    async def get_book(db: AsyncSession, book_id: int) -> Optional[Book]:
+        return await db.get(Book, book_id)
+
+    @staticmethod
+    async def get_book_rows_by_ids(db: AsyncSession, ids: Sequence[int]) -> List[tuple]:
+        rows = []
+        for query in BookCRUD._ids_queries(ids):
+            rows.extend((await db.exec(query)).all())
+        return rows
+
+    @staticmethod
+    async def get_book_version(db: AsyncSession, book_id: int) -> Optional[datetime]:
+        return (await db.exec(select(Book.updated_at).where(Book.id == book_id))).first()
+
+    @staticmethod
+    async def get_collection_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        count, latest = (await db.exec(select(func.count(Book.id), func.max(Book.updated_at)))).one()
+        return count, latest
+
+    @staticmethod
+    async def update_book(db: AsyncSession, book_id: int, book_data: BookUpdate) -> Optional[Book]:
+        book = await db.get(Book, book_id)
+        if not book:
+            return None
+        update_data = book_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(book, field, value)
+        await db.commit()
+        await db.refresh(book)
+        invalidate_books([book_id], book.updated_at)
+        return book
+
+    @staticmethod
+    async def delete_book(db: AsyncSession, book_id: int) -> Optional[Book]:
+        book = await db.get(Book, book_id)
+        if not book:
+            return None
+        await db.delete(book)
+        await db.commit()
+        invalidate_books([book_id], book.updated_at, deleted=True)
+        return book
+
+    @staticmethod
+    async def search_books(db: AsyncSession, search_term: str, limit: int = 100) -> List[Book]:
+        books = (await db.exec(BookCRUD._search_query(search_term, limit))).all()
+        year_query = BookCRUD._year_query(search_term, limit)
+        if year_query is not None and len(books) < limit:
+            return BookCRUD._merge_results(books, (await db.exec(year_query)).all(), limit)
+        return books
+
+    # From the trigram index when it is the search backend
+    @staticmethod
+    async def search_book_rows(db: AsyncSession, search_term: str, limit: int = 100) -> List[tuple]:
+        if SEARCH_BACKEND == "trigram":
+            return await AsyncBookCRUD.fuzzy_search_book_rows(db, search_term, limit)
+        rows = (await db.exec(BookCRUD._search_query(search_term, limit, BOOK_COLUMNS))).all()
+        year_query = BookCRUD._year_query(search_term, limit, BOOK_COLUMNS)
+        if year_query is not None and len(rows) < limit:
+            return BookCRUD._merge_results(rows, (await db.exec(year_query)).all(), limit)
+        return rows
+
+    # Typo-tolerant search through the in-memory trigram index, best matches first
+    @staticmethod
+    async def fuzzy_search_book_rows(db: AsyncSession, search_term: str, limit: int = 100) -> List[tuple]:
+        search_index.apply((await db.exec(BookCRUD._changed_query(search_index.since()))).all())
+        rows: List[tuple] = []
+        ids = search_index.search(search_term, limit)
+        while ids:
+            found = BookCRUD._ranked_rows(ids, await AsyncBookCRUD.get_book_rows_by_ids(db, ids))
+            rows.extend(found)
+            if len(found) == len(ids):
+                break
+            # Deleted books just left the index, so the next ranks move up
+            ids = search_index.search(search_term, limit)[len(rows):]
+        return rows
+
+    # Newest distinct `field` values starting with `prefix`, from the prefix index
+    @staticmethod
+    async def suggest(db: AsyncSession, field: str, prefix: str, limit: int = 10) -> List[str]:
+        suggest_index.apply((await db.exec(BookCRUD._suggest_query(suggest_index.since()))).all())
+        column = SUGGEST_COLUMNS[field]
+        values = suggest_index.top(field, prefix, limit)
+        while values:
+            present = set((await db.exec(select(column).where(column.in_(values)).distinct())).all())
+            if len(present) == len(values):
+                break
+            suggest_index.remove(field, (value for value in values if value not in present))
+            values = suggest_index.top(field, prefix, limit)
+        return values
+
+async_book_crud = AsyncBookCRUD()
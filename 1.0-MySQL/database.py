@@ -1,21 +1,125 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from contextlib import asynccontextmanager
-from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME
+from typing import Dict, List
+from fastapi import Request
+from config import DB_HOST, DB_PORT, DB_USER, DB_PASSWORD, DB_NAME, ASYNC_DB, HEALTH_PROBE_INTERVAL, HEALTH_PROBE_TIMEOUT
+from config import DB_REPLICA_HOSTS, REPLICA_STRATEGY, REPLICA_COOLDOWN_SECONDS, DB_POOL_SIZE, DB_MAX_OVERFLOW, SEARCH_BACKEND
+from config import WRITE_BEHIND, WRITE_BEHIND_MAX_ROWS, WRITE_BEHIND_MAX_DELAY_MS, WRITE_BEHIND_QUEUE_SIZE, WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS
+from bus import invalidation_bus
+from cache import book_cache, invalidate_books
+from crud import book_crud
+from probe import HealthProbe
+from replicas import ReplicaRouter, RoutingSession, reads_from_primary
+from schemas import BookCreate
+from writer import BatchWriter
 
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=10,
-    max_overflow=20
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
 )
 
-def get_session():
+ASYNC_DATABASE_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Only created when enabled, so sync-only deployments hold no second pool
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+) if ASYNC_DB else None
+
+# Read replicas share the primary's credentials, database and pool settings
+def replica_url(driver: str, host: str) -> str:
+    name, _, port = host.partition(":")
+    return f"mysql+{driver}://{DB_USER}:{DB_PASSWORD}@{name}:{port or DB_PORT}/{DB_NAME}"
+
+replica_engines = [
+    create_engine(replica_url("pymysql", host), pool_pre_ping=True, pool_recycle=300, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    for host in DB_REPLICA_HOSTS
+]
+async_replica_engines = [
+    create_async_engine(replica_url("aiomysql", host), pool_pre_ping=True, pool_recycle=300, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    for host in DB_REPLICA_HOSTS
+] if ASYNC_DB else []
+
+# Without replicas every session goes straight to the primary engine
+replica_router = ReplicaRouter(engine, replica_engines, REPLICA_STRATEGY, REPLICA_COOLDOWN_SECONDS) if replica_engines else None
+async_replica_router = (
+    ReplicaRouter(async_engine, async_replica_engines, REPLICA_STRATEGY, REPLICA_COOLDOWN_SECONDS)
+    if async_replica_engines else None
+)
+
+# Background SELECT 1 whose cached result answers the health endpoints
+db_probe = HealthProbe(engine, interval=HEALTH_PROBE_INTERVAL, timeout=HEALTH_PROBE_TIMEOUT)
+
+# Insert and commit one write-behind batch on the primary
+def write_created_books(books: List[BookCreate]) -> List[Dict[str, object]]:
     with Session(engine) as session:
+        rows = book_crud.insert_books(session, books)
+        session.commit()
+    # Announced too, so no worker keeps an entry of an earlier book with one of these ids
+    invalidate_books([row["id"] for row in rows], rows[0]["updated_at"])
+    return rows
+
+# Write-behind batcher for POST /books (its thread starts with the first create, in the worker)
+create_batcher = BatchWriter(
+    write_created_books,
+    max_rows=WRITE_BEHIND_MAX_ROWS,
+    max_delay=WRITE_BEHIND_MAX_DELAY_MS / 1000,
+    max_pending=WRITE_BEHIND_QUEUE_SIZE,
+    queue_timeout=WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS
+) if WRITE_BEHIND else None
+
+def new_session(primary_only: bool = False) -> Session:
+    if replica_router is None:
+        return Session(engine)
+    return RoutingSession(replica_router, primary_only=primary_only)
+
+def get_session(request: Request):
+    with new_session(primary_only=reads_from_primary(request)) as session:
+        yield session
+
+async def get_async_session(request: Request):
+    if async_replica_router is None:
+        session = AsyncSession(async_engine, expire_on_commit=False)
+    else:
+        session = AsyncSession(
+            sync_session_class=RoutingSession,
+            router=async_replica_router,
+            primary_only=reads_from_primary(request),
+            expire_on_commit=False
+        )
+    async with session:
         yield session
 
 @asynccontextmanager
 async def lifespan(app=None):
     # SQLModel.metadata.create_all(engine)  # Uncomment if you want auto-create
-    yield 
\ No newline at end of file
+    with new_session() as session:
+        # Build the in-memory indexes before serving, so no request pays for them
+        if SEARCH_BACKEND == "trigram":
+            book_crud.sync_search_index(session)
+        book_crud.sync_suggest_index(session)
+    await db_probe.start()
+    # Apply the other workers' writes to this worker's response cache
+    invalidation_bus.start(book_cache.invalidate)
+    yield
+    invalidation_bus.stop()
+    await db_probe.stop()
+    # Queued creates are written before the pools close
+    if create_batcher is not None:
+        create_batcher.stop()
+    # Close pooled connections on graceful shutdown
+    engine.dispose()
+    for replica in replica_engines:
+        replica.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose() 
\ No newline at end of file
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime
+from typing import Iterator
+from crud import BOOK_COLUMNS, book_crud
+from database import new_session
+
+EXPORT_FIELDS = tuple(column.key for column in BOOK_COLUMNS)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+def _encode_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _encode_row(row) -> str:
+    return json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_encode_default, separators=(",", ":"))
+
+def stream_books(fmt: str = "ndjson", batch_size: int = 1000) -> Iterator[bytes]:
+    # The generator owns its session so it stays open while the response streams (served by a replica if any)
+    with new_session() as db:
+        if fmt == "json":
+            yield b"["
+        first = True
+        for rows in book_crud.iter_book_rows(db, batch_size=batch_size):
+            encoded = [_encode_row(row) for row in rows]
+            if fmt == "json":
+                chunk = ",".join(encoded)
+                yield (chunk if first else "," + chunk).encode()
+            else:
+                yield ("\n".join(encoded) + "\n").encode()
+            first = False
+        if fmt == "json":
+            yield b"]"
@@ -0,0 +1,23 @@
+from sqlalchemy import column, table
+from models import Book
+
+# Grouped counts per facet value in book_facet_counts, kept current by triggers on `books`
+# (see database.sql), so unfiltered facet and stats requests read O(#values) summary rows.
+# NULL values are not counted; the `total` facet holds the row count under the empty value.
+FACET_TABLE = "book_facet_counts"
+TOTAL = "total"
+
+# Facet name -> expression grouped by the search-scoped queries (the triggers compute the same)
+FACET_COLUMNS = {
+    "genre": Book.genre,
+    "author": Book.author,
+    "decade": (Book.published_year // 10 * 10).label("decade"),
+}
+
+FACETS = tuple(FACET_COLUMNS)
+
+facet_counts = table(FACET_TABLE, column("facet"), column("value"), column("book_count"))
+
+# Counter values are stored as text; decades come back as integers
+def facet_value(facet: str, value) -> object:
+    return int(value) if facet == "decade" and value is not None else value
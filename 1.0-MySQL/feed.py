@@ -0,0 +1,46 @@
+import time
+from typing import AsyncIterator, Dict
+from starlette.concurrency import run_in_threadpool
+from changes import change_watcher
+from config import CHANGES_POLL_SECONDS
+from crud import book_crud
+from database import new_session
+from serialization import encode_change
+
+# Seconds between SSE comment lines on an idle stream (keeps proxies from closing it)
+KEEPALIVE_SECONDS = 15
+
+# One batch of the change feed, on its own session (callers may outlive the request). Always from the
+# primary: only its INNODB_TRX shows the transactions that may still fill a seq gap
+def read_changes(since: int, limit: int) -> Dict[str, object]:
+    with new_session(primary_only=True) as db:
+        return book_crud.get_changes(db, since, limit)
+
+# The next batch after `since`, waiting up to `wait` seconds for one (long-poll)
+async def wait_for_changes(since: int, limit: int, wait: float) -> Dict[str, object]:
+    deadline = time.monotonic() + wait
+    while True:
+        version = change_watcher.mark()
+        batch = await run_in_threadpool(read_changes, since, limit)
+        remaining = deadline - time.monotonic()
+        # next_since also moves when every change read was superseded, which is progress too
+        if batch["next_since"] != since or remaining <= 0:
+            return batch
+        # Local commits wake the wait at once; other workers' are picked up by the re-read
+        await change_watcher.wait(version, min(remaining, CHANGES_POLL_SECONDS))
+
+# Server-sent events: one `upsert` or `delete` event per change, its seq as the event id
+async def stream_changes(since: int, limit: int) -> AsyncIterator[bytes]:
+    yield b"retry: 1000\n\n"
+    while True:
+        batch = await wait_for_changes(since, limit, KEEPALIVE_SECONDS)
+        if batch["next_since"] == since:
+            yield b": keepalive\n\n"
+            continue
+        events = [
+            b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["op"].encode(), encode_change(change))
+            for change in batch["changes"]
+        ]
+        if events:
+            yield b"".join(events)
+        since = batch["next_since"]
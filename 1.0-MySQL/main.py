@@ -1,25 +1,63 @@
-from fastapi import FastAPI, HTTPException, Query, Depends
-from typing import List
-from database import lifespan, get_session, engine
-from schemas import BookCreate, BookResponse, BookUpdate
+from fastapi import FastAPI, HTTPException, Query, Depends, Request
+from fastapi.responses import Response, StreamingResponse
+from typing import List, Literal, Optional, Union
+from functools import partial
+from pydantic import TypeAdapter
+from database import lifespan, get_session, engine, async_engine, create_batcher, db_probe, replica_router, replica_engines, async_replica_engines
+from probe import pool_stats
+from schemas import BookBatch, BookBatchGet, BookBulkCreate, BookBulkUpdate, BookChanges, BookCreate, BookFacets, BookPage, BookResponse, BookStats, BookSuggestions, BookUpdate, BulkResult
 from service import book_service
-from config import PORT, APP_NAME, APP_VERSION, APP_DESCRIPTION, DB_HOST, DB_PORT, DB_NAME
-from sqlmodel import Session, select
+from export import MEDIA_TYPES, stream_books
+from feed import stream_changes, wait_for_changes
+from bulk import bulk_request_body, run_bulk
+from crud import book_crud
+from cache import book_cache
+from bus import invalidation_bus
+from coalesce import read_flights
+from trigram import search_index
+from suggest import MAX_SUGGESTIONS, suggest_index
+from serialization import encode_changes, json_response
+from filters import FIELDS_PATTERN, BookFilters, get_book_filters, parse_fields
+from pagination import SORT_PATTERN
+from batch import IDS_PATTERN, parse_ids
+from compression import CompressionMiddleware, codecs, precompressed_response
+from conditional import book_validators, collection_validators, is_conditional, is_not_modified, not_modified
+from config import PORT, APP_NAME, APP_VERSION, APP_DESCRIPTION, DB_HOST, DB_PORT, DB_NAME, BULK_BATCH_SIZE, ASYNC_DB
+from config import INSTRUMENTATION, SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD, READ_YOUR_WRITES_SECONDS, SEARCH_BACKEND
+from config import CHANGES_MAX_WAIT_SECONDS, WRITE_BEHIND, COMPRESSION, COMPRESSION_MIN_SIZE, COMPRESSION_PROFILE
+from instrumentation import instrument_app
+from replicas import ReadYourWritesMiddleware
+from sqlmodel import Session
 from models import Book
 from datetime import datetime
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Negotiated zstd/br/gzip above COMPRESSION_MIN_SIZE; added first so the timing middleware wraps it
+if COMPRESSION:
+    app.add_middleware(CompressionMiddleware, codecs=codecs, minimum_size=COMPRESSION_MIN_SIZE, profile=COMPRESSION_PROFILE)
+
+# Server-Timing header, JSON request logs and Prometheus /metrics
+if INSTRUMENTATION:
+    instrument_app(
+        app, [engine, async_engine, *replica_engines, *async_replica_engines],
+        slow_query_ms=SLOW_QUERY_MS, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD
+    )
+
+# Clients that just wrote read from the primary for READ_YOUR_WRITES_SECONDS
+if replica_router is not None:
+    app.add_middleware(ReadYourWritesMiddleware, window=READ_YOUR_WRITES_SECONDS)
+
+# Database status comes from the cached readiness probe, not a query per call
 def health_check():
-    try:
-        with Session(engine) as session:
-            session.exec(select(Book).limit(1))
-            db_status = "Connected"
-            db_message = "Database connection successful"
-    except Exception as e:
+    probe = db_probe.latest()
+    if probe.ok:
+        db_status = "Connected"
+        db_message = "Database connection successful"
+    else:
         db_status = "Error"
-        db_message = f"Database connection failed: {str(e)}"
+        db_message = f"Database connection failed: {probe.error}"
     return {
         "status": "healthy" if db_status == "Connected" else "unhealthy",
         "server": {
@@ -45,24 +83,197 @@ def health_check():
 def root():
     return health_check()
 
+# Liveness: the process is serving requests; never touches the database
+@app.get("/livez")
+async def liveness():
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+# Readiness from the last background probe plus live pool counters; 503 when not ready
+@app.get("/readyz")
+def readiness(response: Response):
+    probe = db_probe.latest()
+    ready = db_probe.is_ready(probe)
+    if not ready:
+        response.status_code = 503
+    pools = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_stats(async_engine)
+    body = {
+        "status": "ready" if ready else "unready",
+        "timestamp": datetime.now().isoformat(),
+        "database": db_probe.describe(probe),
+        "pool": pools,
+    }
+    if replica_router is not None:
+        body["replicas"] = replica_router.stats()
+    if create_batcher is not None:
+        body["write_behind"] = create_batcher.stats()
+    return body
+
 @app.post("/books", response_model=BookResponse)
 def create_book(book_data: BookCreate, db: Session = Depends(get_session)):
     return book_service.create_book(db, book_data)
 
-@app.get("/books", response_model=List[BookResponse])
-def get_books(db: Session = Depends(get_session), skip: int = 0, limit: int = 100):
-    return book_service.get_books(db, skip=skip, limit=limit)
+@app.get("/books", response_model=Union[List[BookResponse], BookPage, BookBatch])
+def get_books(
+    request: Request,
+    db: Session = Depends(get_session),
+    filters: BookFilters = Depends(get_book_filters),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
+):
+    if ids is not None:
+        return batch_get(db, parse_ids(ids))
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*book_service.get_collection_version(db))
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Column tuples are encoded straight to JSON; response_model only documents the shape
+    selected = parse_fields(fields)
+    if cursor is None:
+        body = book_service.get_books_json(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=selected)
+        return json_response(body, headers=validators.headers())
+    try:
+        body = book_service.get_books_page_json(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=selected
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(body, headers=validators.headers())
 
 @app.get("/books/search", response_model=List[BookResponse])
-def search_books(q: str = Query(..., description="Search term to find in title, author, or genre"), db: Session = Depends(get_session)):
-    return book_service.search_books(db, q)
+def search_books(
+    q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_session)
+):
+    return json_response(book_service.search_books_json(db, q, limit=limit))
+
+# Typeahead completions for a prefix (case and accent insensitive, most recently written first)
+@app.get("/books/suggest", response_model=BookSuggestions)
+def suggest_books(
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions"),
+    db: Session = Depends(get_session)
+):
+    return book_service.suggest(db, field, prefix, limit=limit)
+
+# Grouped counts for the UI; without q they come from the trigger-maintained counters
+@app.get("/books/facets", response_model=BookFacets)
+def get_facets(
+    facet: List[Literal["genre", "author", "decade"]] = Query(
+        ["genre", "author", "decade"], description="Facets to count (repeat the parameter for several)"
+    ),
+    q: Optional[str] = Query(None, description="Only count books matching this search term"),
+    limit: int = Query(20, ge=1, le=1000),
+    db: Session = Depends(get_session)
+):
+    return book_service.get_facets(db, facet, limit=limit, search_term=q)
+
+@app.get("/books/stats", response_model=BookStats)
+def get_stats(
+    q: Optional[str] = Query(None, description="Only include books matching this search term"),
+    db: Session = Depends(get_session)
+):
+    return book_service.get_stats(db, search_term=q)
+
+@app.get("/books/export", response_class=StreamingResponse)
+def export_books(
+    format: Literal["ndjson", "json"] = "ndjson",
+    batch_size: int = Query(1000, ge=1, le=10000)
+):
+    return StreamingResponse(stream_books(format, batch_size=batch_size), media_type=MEDIA_TYPES[format])
+
+# Books created, updated or deleted after `since` in seq order, each at its latest change (long-poll with wait)
+@app.get("/books/changes", response_model=BookChanges)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Last seq already applied (0 replays the whole catalog)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch"),
+    wait: float = Query(0, ge=0, le=CHANGES_MAX_WAIT_SECONDS, description="Seconds to wait for a change when there is none yet")
+):
+    return json_response(encode_changes(await wait_for_changes(since, limit, wait)))
+
+# The same changes pushed as server-sent events (upsert/delete events, seq as the event id)
+@app.get("/books/changes/stream", response_class=StreamingResponse)
+def stream_book_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last seq already applied (Last-Event-ID takes precedence)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch")
+):
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        stream_changes(since, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+BULK_CREATE_ITEM = TypeAdapter(BookBulkCreate)
+BULK_UPDATE_ITEM = TypeAdapter(BookBulkUpdate)
+BULK_DELETE_ITEM = TypeAdapter(int)
+
+@app.post("/books/bulk", response_model=BulkResult, openapi_extra=bulk_request_body(BookBulkCreate.model_json_schema()))
+async def bulk_create_books(
+    request: Request,
+    db: Session = Depends(get_session),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=10000)
+):
+    return await run_bulk(request, BULK_CREATE_ITEM, partial(book_crud.bulk_create_books, db), batch_size)
+
+@app.patch("/books/bulk", response_model=BulkResult, openapi_extra=bulk_request_body(BookBulkUpdate.model_json_schema()))
+async def bulk_update_books(
+    request: Request,
+    db: Session = Depends(get_session),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=10000)
+):
+    return await run_bulk(request, BULK_UPDATE_ITEM, partial(book_crud.bulk_update_books, db), batch_size)
+
+@app.delete("/books/bulk", response_model=BulkResult, openapi_extra=bulk_request_body({"type": "integer"}))
+async def bulk_delete_books(
+    request: Request,
+    db: Session = Depends(get_session),
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=10000)
+):
+    return await run_bulk(request, BULK_DELETE_ITEM, partial(book_crud.bulk_delete_books, db), batch_size)
+
+# Many books by id in one round trip: items in request order, unknown ids under missing
+@app.post("/books/batch-get", response_model=BookBatch)
+def batch_get_books(request_data: BookBatchGet, db: Session = Depends(get_session)):
+    return batch_get(db, request_data.ids)
+
+def batch_get(db: Session, ids: List[int]) -> Response:
+    try:
+        return json_response(book_service.get_books_by_ids_json(db, ids))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 @app.get("/books/{book_id}", response_model=BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_session)):
-    book = book_service.get_book(db, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return book
+def get_book(book_id: int, request: Request, db: Session = Depends(get_session)):
+    cached = book_service.get_cached_book(book_id)
+    if cached is None and is_conditional(request):
+        # Revalidate against updated_at alone before loading the full row
+        updated_at = book_service.get_book_version(db, book_id)
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        validators = book_validators(book_id, updated_at)
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+    if cached is None:
+        cached = book_service.load_book(db, book_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+    updated_at, body, variants = cached
+    validators = book_validators(book_id, updated_at)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Sent as cached, compressed or not: the compression middleware skips encoded responses
+    return precompressed_response(request, body, variants, validators.headers())
 
 @app.put("/books/{book_id}", response_model=BookResponse)
 def update_book(book_id: int, book_data: BookUpdate, db: Session = Depends(get_session)):
@@ -78,6 +289,28 @@ def delete_book(book_id: int, db: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Book not found")
     return book
 
+@app.get("/cache/stats")
+def cache_stats():
+    return {**book_cache.stats(), "bus": invalidation_bus.stats()}
+
+# Single-flight counters per route (queries run, requests that shared one, waiter timeouts)
+@app.get("/coalescing/stats")
+def coalescing_stats():
+    return read_flights.stats()
 
+# Trigram search index size (books, trigrams, postings and their bytes; empty unless SEARCH_BACKEND=trigram)
+# and the typeahead prefix index (values per field)
+@app.get("/search-index/stats")
+def search_index_stats():
+    return {"backend": SEARCH_BACKEND, **search_index.stats(), "suggest": suggest_index.stats()}
 
+# Serve the core book routes from the async engine when enabled
+if ASYNC_DB:
+    from routes_async import router as async_router, replace_routes
+    replace_routes(app, async_router)
 
+# Write-behind creates: POST /books is batched into multi-row INSERTs, answered after their commit
+if WRITE_BEHIND:
+    from routes_async import replace_routes
+    from routes_write_behind import router as write_behind_router
+    replace_routes(app, write_behind_router)
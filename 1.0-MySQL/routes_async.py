@@ -0,0 +1,127 @@
+from fastapi import APIRouter, FastAPI, HTTPException, Query, Depends, Request
+from fastapi.responses import Response
+from typing import List, Literal, Optional, Union
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import get_async_session
+from schemas import BookBatch, BookBatchGet, BookCreate, BookPage, BookResponse, BookSuggestions, BookUpdate
+from service_async import async_book_service
+from serialization import json_response
+from filters import FIELDS_PATTERN, BookFilters, get_book_filters, parse_fields
+from pagination import SORT_PATTERN
+from batch import IDS_PATTERN, parse_ids
+from compression import precompressed_response
+from conditional import book_validators, collection_validators, is_conditional, is_not_modified, not_modified
+from suggest import MAX_SUGGESTIONS
+
+# Async versions of the core book routes, swapped in when ASYNC_DB is enabled.
+# Paths and parameters mirror main.py; export and bulk routes stay sync.
+router = APIRouter()
+
+@router.post("/books", response_model=BookResponse)
+async def create_book(book_data: BookCreate, db: AsyncSession = Depends(get_async_session)):
+    return await async_book_service.create_book(db, book_data)
+
+@router.get("/books", response_model=Union[List[BookResponse], BookPage, BookBatch])
+async def get_books(
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+    filters: BookFilters = Depends(get_book_filters),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
+):
+    if ids is not None:
+        return await batch_get(db, parse_ids(ids))
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*await async_book_service.get_collection_version(db))
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Column tuples are encoded straight to JSON; response_model only documents the shape
+    selected = parse_fields(fields)
+    if cursor is None:
+        body = await async_book_service.get_books_json(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=selected)
+        return json_response(body, headers=validators.headers())
+    try:
+        body = await async_book_service.get_books_page_json(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=selected
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(body, headers=validators.headers())
+
+@router.get("/books/search", response_model=List[BookResponse])
+async def search_books(
+    q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_session)
+):
+    return json_response(await async_book_service.search_books_json(db, q, limit=limit))
+
+# Typeahead completions for a prefix (case and accent insensitive, most recently written first)
+@router.get("/books/suggest", response_model=BookSuggestions)
+async def suggest_books(
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    return await async_book_service.suggest(db, field, prefix, limit=limit)
+
+# Many books by id in one round trip: items in request order, unknown ids under missing
+@router.post("/books/batch-get", response_model=BookBatch)
+async def batch_get_books(request_data: BookBatchGet, db: AsyncSession = Depends(get_async_session)):
+    return await batch_get(db, request_data.ids)
+
+async def batch_get(db: AsyncSession, ids: List[int]) -> Response:
+    try:
+        return json_response(await async_book_service.get_books_by_ids_json(db, ids))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@router.get("/books/{book_id}", response_model=BookResponse)
+async def get_book(book_id: int, request: Request, db: AsyncSession = Depends(get_async_session)):
+    cached = async_book_service.get_cached_book(book_id)
+    if cached is None and is_conditional(request):
+        # Revalidate against updated_at alone before loading the full row
+        updated_at = await async_book_service.get_book_version(db, book_id)
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        validators = book_validators(book_id, updated_at)
+        if is_not_modified(request, validators):
+            return not_modified(validators)
+    if cached is None:
+        cached = await async_book_service.load_book(db, book_id)
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+    updated_at, body, variants = cached
+    validators = book_validators(book_id, updated_at)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Sent as cached, compressed or not: the compression middleware skips encoded responses
+    return precompressed_response(request, body, variants, validators.headers())
+
+@router.put("/books/{book_id}", response_model=BookResponse)
+async def update_book(book_id: int, book_data: BookUpdate, db: AsyncSession = Depends(get_async_session)):
+    book = await async_book_service.update_book(db, book_id, book_data)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+@router.delete("/books/{book_id}", response_model=BookResponse)
+async def delete_book(book_id: int, db: AsyncSession = Depends(get_async_session)):
+    book = await async_book_service.delete_book(db, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+def replace_routes(app: FastAPI, router: APIRouter) -> None:
+    # Swap same-path, same-method routes in place so route order is unchanged
+    replacements = {(route.path, frozenset(route.methods)): route for route in router.routes}
+    app.router.routes = [
+        replacements.get((route.path, frozenset(getattr(route, "methods", None) or ())), route)
+        for route in app.router.routes
+    ]
+    app.openapi_schema = None
@@ -0,0 +1,16 @@
+import queue
+from fastapi import APIRouter, HTTPException
+from database import create_batcher
+from schemas import BookCreate, BookResponse
+
+# POST /books through the write-behind batcher, swapped in when WRITE_BEHIND is enabled.
+# Creates are inserted in groups (one multi-row INSERT, one commit) and each request is
+# answered with its own row only after that commit, so a 200 still means the book is durable.
+router = APIRouter()
+
+@router.post("/books", response_model=BookResponse)
+async def create_book(book_data: BookCreate):
+    try:
+        return await create_batcher.run(book_data)
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Too many pending writes, retry later", headers={"Retry-After": "1"})
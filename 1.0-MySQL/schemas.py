@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional, Union
 
 class BookCreate(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -24,4 +24,70 @@ class BookUpdate(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
     published_year: Optional[int] = None
-    genre: Optional[str] = None 
\ No newline at end of file
+    genre: Optional[str] = None 
+
+class BookPage(BaseModel):
+    items: List[BookResponse]
+    next_cursor: Optional[str] = None
+
+class BookBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+# Items in request order; ids with no book are listed under missing
+class BookBatch(BaseModel):
+    items: List[BookResponse]
+    missing: List[int]
+
+# Typeahead completions, newest first
+class BookSuggestions(BaseModel):
+    field: str
+    prefix: str
+    suggestions: List[str]
+
+# One change log entry: the current row for upserts, null for deletes
+class BookChange(BaseModel):
+    seq: int
+    op: Literal["upsert", "delete"]
+    id: int
+    book: Optional[BookResponse] = None
+
+# A batch of the change feed; resume with since=next_since
+class BookChanges(BaseModel):
+    changes: List[BookChange]
+    next_since: int
+    has_more: bool
+
+class BookBulkCreate(BookCreate):
+    # An id turns the item into an upsert
+    id: Optional[int] = None
+
+class BookBulkUpdate(BookUpdate):
+    id: int
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+class FacetValue(BaseModel):
+    value: Union[int, str]
+    count: int
+
+class BookFacets(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetValue]]
+
+class BookStats(BaseModel):
+    total: int
+    # Per facet: how many values exist, and how many books have none
+    distinct: Dict[str, int]
+    missing: Dict[str, int]
+    earliest_year: Optional[int] = None
+    latest_year: Optional[int] = None
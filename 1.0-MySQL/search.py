@@ -0,0 +1,20 @@
+import re
+from typing import Optional
+from sqlalchemy.dialects.mysql import match
+from models import Book
+
+# InnoDB ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (default 3)
+FULLTEXT_MIN_TOKEN_SIZE = 3
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def build_boolean_query(search_term: str) -> Optional[str]:
+    tokens = [t for t in _TOKEN_RE.findall(search_term) if len(t) >= FULLTEXT_MIN_TOKEN_SIZE]
+    if not tokens:
+        return None
+    # Every token is required and matched as a prefix
+    return " ".join(f"+{token}*" for token in tokens)
+
+def fulltext_score(boolean_query: str):
+    # Backed by the ft_books_search FULLTEXT index (see database.sql)
+    return match(Book.title, Book.author, Book.genre, against=boolean_query).in_boolean_mode()
@@ -1,8 +1,13 @@
 from sqlmodel import Session, select
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from models import Book
-from schemas import BookCreate, BookResponse, BookUpdate
+from schemas import BookCreate, BookFacets, BookPage, BookResponse, BookStats, BookSuggestions, BookUpdate
 from crud import book_crud
+from filters import BookFilters
+from serialization import BOOK_FIELDS, encode_page, encode_rows
+from cache import book_cache, book_key, encode_book, pack_entry, unpack_entry
+from coalesce import read_flights, search_key
+from batch import cache_books, cached_books, encode_batch, unique_ids
 from datetime import datetime
 
 class BookService:
@@ -12,10 +17,48 @@ class BookService:
         return BookResponse.model_validate(book)
 
     @staticmethod
-    def get_books(db: Session, skip: int = 0, limit: int = 100) -> List[BookResponse]:
-        books = book_crud.get_books(db, skip=skip, limit=limit)
+    def get_books(db: Session, skip: int = 0, limit: int = 100, sort: str = "id") -> List[BookResponse]:
+        books = book_crud.get_books(db, skip=skip, limit=limit, sort=sort)
         return [BookResponse.model_validate(book) for book in books]
 
+    @staticmethod
+    def get_books_page(db: Session, cursor: str = "", limit: int = 100, sort: str = "id") -> BookPage:
+        books, next_cursor = book_crud.get_books_page(db, cursor=cursor, limit=limit, sort=sort)
+        return BookPage(
+            items=[BookResponse.model_validate(book) for book in books],
+            next_cursor=next_cursor
+        )
+
+    # Fast path: column tuples encoded straight to JSON bytes, no BookResponse models
+    @staticmethod
+    def get_books_json(
+        db: Session, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> bytes:
+        rows = book_crud.get_book_rows(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=fields)
+        return encode_rows(rows, fields)
+
+    @staticmethod
+    def get_books_page_json(
+        db: Session, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> bytes:
+        rows, next_cursor = book_crud.get_book_rows_page(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=fields
+        )
+        return encode_page(rows, next_cursor, fields)
+
+    # Identical concurrent searches share one query and one encoded body
+    @staticmethod
+    def search_books_json(db: Session, search_term: str, limit: int = 100) -> bytes:
+        def search() -> bytes:
+            return encode_rows(book_crud.search_book_rows(db, search_term, limit=limit))
+        return read_flights.do(search_key(search_term, limit), search)
+
+    @staticmethod
+    def suggest(db: Session, field: str, prefix: str, limit: int = 10) -> BookSuggestions:
+        return BookSuggestions(field=field, prefix=prefix, suggestions=book_crud.suggest(db, field, prefix, limit))
+
     @staticmethod
     def get_book(db: Session, book_id: int) -> Optional[BookResponse]:
         book = book_crud.get_book(db, book_id)
@@ -23,6 +66,44 @@ class BookService:
             return BookResponse.model_validate(book)
         return None
 
+    # Cached books come from the cache, the rest from chunked IN queries (which refill it).
+    # ValueError when there are too many ids.
+    @staticmethod
+    def get_books_by_ids_json(db: Session, ids: Sequence[int]) -> bytes:
+        ids = unique_ids(ids)
+        bodies, misses = cached_books(ids)
+        if misses:
+            token = book_cache.fill_token()
+            bodies.update(cache_books(book_crud.get_book_rows_by_ids(db, misses), token))
+        return encode_batch(ids, bodies)
+
+    @staticmethod
+    def get_cached_book(book_id: int) -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+        # Cached (updated_at, encoded BookResponse, precompressed variants), without touching the database
+        entry = book_cache.get(book_key(book_id))
+        return unpack_entry(entry) if entry is not None else None
+
+    @staticmethod
+    def load_book(db: Session, book_id: int) -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+        # Cache miss: encode the book and fill the cache (concurrent misses share one load)
+        def load() -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+            token = book_cache.fill_token()
+            book = book_crud.get_book(db, book_id)
+            if not book:
+                return None
+            entry = pack_entry(book.updated_at, encode_book(book))
+            book_cache.set(book_key(book_id), entry, token=token)
+            return unpack_entry(entry)
+        return read_flights.do(("book", book_id), load)
+
+    @staticmethod
+    def get_book_version(db: Session, book_id: int) -> Optional[datetime]:
+        return book_crud.get_book_version(db, book_id)
+
+    @staticmethod
+    def get_collection_version(db: Session) -> Tuple[int, Optional[datetime]]:
+        return book_crud.get_collection_version(db)
+
     @staticmethod
     def update_book(db: Session, book_id: int, book_data: BookUpdate) -> Optional[BookResponse]:
         book = book_crud.update_book(db, book_id, book_data)
@@ -38,8 +119,18 @@ class BookService:
         return None
 
     @staticmethod
-    def search_books(db: Session, search_term: str) -> List[BookResponse]:
-        books = book_crud.search_books(db, search_term)
+    def search_books(db: Session, search_term: str, limit: int = 100) -> List[BookResponse]:
+        books = book_crud.search_books(db, search_term, limit=limit)
         return [BookResponse.model_validate(book) for book in books]
 
+    @staticmethod
+    def get_facets(
+        db: Session, facets: Sequence[str], limit: int = 20, search_term: Optional[str] = None
+    ) -> BookFacets:
+        return BookFacets.model_validate(book_crud.get_facets(db, facets, limit=limit, search_term=search_term))
+
+    @staticmethod
+    def get_stats(db: Session, search_term: Optional[str] = None) -> BookStats:
+        return BookStats.model_validate(book_crud.get_stats(db, search_term=search_term))
+
 book_service = BookService() 
\ No newline at end of file
@@ -0,0 +1,126 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from schemas import BookCreate, BookPage, BookResponse, BookSuggestions, BookUpdate
+from crud_async import async_book_crud
+from filters import BookFilters
+from serialization import BOOK_FIELDS, encode_page, encode_rows
+from cache import book_cache, book_key, encode_book, pack_entry, unpack_entry
+from coalesce import read_flights, search_key
+from batch import cache_books, cached_books, encode_batch, unique_ids
+
+class AsyncBookService:
+    @staticmethod
+    async def create_book(db: AsyncSession, book_data: BookCreate) -> BookResponse:
+        book = await async_book_crud.create_book(db, book_data)
+        return BookResponse.model_validate(book)
+
+    @staticmethod
+    async def get_books(db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id") -> List[BookResponse]:
+        books = await async_book_crud.get_books(db, skip=skip, limit=limit, sort=sort)
+        return [BookResponse.model_validate(book) for book in books]
+
+    @staticmethod
+    async def get_books_page(db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id") -> BookPage:
+        books, next_cursor = await async_book_crud.get_books_page(db, cursor=cursor, limit=limit, sort=sort)
+        return BookPage(
+            items=[BookResponse.model_validate(book) for book in books],
+            next_cursor=next_cursor
+        )
+
+    # Fast path: column tuples encoded straight to JSON bytes, no BookResponse models
+    @staticmethod
+    async def get_books_json(
+        db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> bytes:
+        rows = await async_book_crud.get_book_rows(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=fields)
+        return encode_rows(rows, fields)
+
+    @staticmethod
+    async def get_books_page_json(
+        db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> bytes:
+        rows, next_cursor = await async_book_crud.get_book_rows_page(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=fields
+        )
+        return encode_page(rows, next_cursor, fields)
+
+    # Identical concurrent searches share one query and one encoded body
+    @staticmethod
+    async def search_books_json(db: AsyncSession, search_term: str, limit: int = 100) -> bytes:
+        async def search() -> bytes:
+            return encode_rows(await async_book_crud.search_book_rows(db, search_term, limit=limit))
+        return await read_flights.do_async(search_key(search_term, limit), search)
+
+    @staticmethod
+    async def suggest(db: AsyncSession, field: str, prefix: str, limit: int = 10) -> BookSuggestions:
+        suggestions = await async_book_crud.suggest(db, field, prefix, limit)
+        return BookSuggestions(field=field, prefix=prefix, suggestions=suggestions)
+
+    @staticmethod
+    async def get_book(db: AsyncSession, book_id: int) -> Optional[BookResponse]:
+        book = await async_book_crud.get_book(db, book_id)
+        if book:
+            return BookResponse.model_validate(book)
+        return None
+
+    # Cached books come from the cache, the rest from chunked IN queries (which refill it).
+    # ValueError when there are too many ids.
+    @staticmethod
+    async def get_books_by_ids_json(db: AsyncSession, ids: Sequence[int]) -> bytes:
+        ids = unique_ids(ids)
+        bodies, misses = cached_books(ids)
+        if misses:
+            token = book_cache.fill_token()
+            bodies.update(cache_books(await async_book_crud.get_book_rows_by_ids(db, misses), token))
+        return encode_batch(ids, bodies)
+
+    @staticmethod
+    def get_cached_book(book_id: int) -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+        # Cached (updated_at, encoded BookResponse, precompressed variants), without touching the database
+        entry = book_cache.get(book_key(book_id))
+        return unpack_entry(entry) if entry is not None else None
+
+    @staticmethod
+    async def load_book(db: AsyncSession, book_id: int) -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+        # Cache miss: encode the book and fill the cache (concurrent misses share one load)
+        async def load() -> Optional[Tuple[datetime, bytes, Dict[str, bytes]]]:
+            token = book_cache.fill_token()
+            book = await async_book_crud.get_book(db, book_id)
+            if not book:
+                return None
+            entry = pack_entry(book.updated_at, encode_book(book))
+            book_cache.set(book_key(book_id), entry, token=token)
+            return unpack_entry(entry)
+        return await read_flights.do_async(("book", book_id), load)
+
+    @staticmethod
+    async def get_book_version(db: AsyncSession, book_id: int) -> Optional[datetime]:
+        return await async_book_crud.get_book_version(db, book_id)
+
+    @staticmethod
+    async def get_collection_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        return await async_book_crud.get_collection_version(db)
+
+    @staticmethod
+    async def update_book(db: AsyncSession, book_id: int, book_data: BookUpdate) -> Optional[BookResponse]:
+        book = await async_book_crud.update_book(db, book_id, book_data)
+        if book:
+            return BookResponse.model_validate(book)
+        return None
+
+    @staticmethod
+    async def delete_book(db: AsyncSession, book_id: int) -> Optional[BookResponse]:
+        book = await async_book_crud.delete_book(db, book_id)
+        if book:
+            return BookResponse.model_validate(book)
+        return None
+
+    @staticmethod
+    async def search_books(db: AsyncSession, search_term: str, limit: int = 100) -> List[BookResponse]:
+        books = await async_book_crud.search_books(db, search_term, limit=limit)
+        return [BookResponse.model_validate(book) for book in books]
+
+async_book_service = AsyncBookService()
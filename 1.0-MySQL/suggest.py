@@ -0,0 +1,190 @@
+import bisect
+import heapq
+import threading
+from functools import lru_cache
+from operator import itemgetter
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import SUGGEST_MAX_VALUES, SUGGEST_SYNC_LAG_SECONDS
+from trigram import words
+
+# Sorted in-memory prefix index of distinct titles and authors for GET /books/suggest.
+# Each field keeps its values in one list ordered by suggest_key (only the display
+# strings are stored; bisect normalizes the ~20 values it probes) plus a parallel
+# array of the newest updated_at per value, which ranks completions. Small prefix
+# ranges are ranked per request; large ones (one or two letters over a big catalog)
+# keep a memoized top list that writes update in place.
+#
+# Like the trigram index it follows the table through updated_at, so every write path
+# and other workers are picked up. Values no book has any more are dropped when a
+# suggestion fails the existence check against the table.
+
+FIELDS = ("title", "author")
+# Prefix ranges up to this many values are ranked on every request
+_SCAN_LIMIT = 512
+# Completions kept per memoized prefix; also the largest `limit` a request may ask for
+MAX_SUGGESTIONS = 50
+# Batches larger than this (or 1/16 of a field) are merged by re-sorting instead of inserted one by one
+_MERGE_BATCH = 4096
+# Upper bound for the keys under a prefix
+_MAX_CHAR = "\U0010ffff"
+
+# Cached: authors repeat across books, and bisect probes the same values again and again
+# Normalized form completions are matched and ordered by ("Brontë, Charlotte" -> "bronte charlotte")
+@lru_cache(maxsize=65536)
+def suggest_key(value: str) -> str:
+    return " ".join(words(value))
+
+# Distinct values of one field sorted by suggest_key, with the newest updated_at of each
+class _Completions:
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.latest = array("d")
+        # prefix key -> [(updated_at, key, value)] newest first, for ranges above _SCAN_LIMIT
+        self.memo: Dict[str, List[Tuple[float, str, str]]] = {}
+
+    def find(self, key: str) -> int:
+        return bisect.bisect_left(self.values, key, key=suggest_key)
+
+    # Insert a value or move it to a newer updated_at; False when nothing changed
+    def upsert(self, key: str, value: str, updated: float) -> bool:
+        position = self.find(key)
+        if position < len(self.values) and suggest_key(self.values[position]) == key:
+            if updated < self.latest[position] or (updated == self.latest[position] and value == self.values[position]):
+                return False
+            self.values[position] = value
+            self.latest[position] = updated
+        else:
+            self.values.insert(position, value)
+            self.latest.insert(position, updated)
+        for end in range(1, len(key) + 1):
+            memo = self.memo.get(key[:end])
+            if memo is not None:
+                memo = [entry for entry in memo if entry[1] != key]
+                memo.append((updated, key, value))
+                memo.sort(reverse=True)
+                self.memo[key[:end]] = memo[:MAX_SUGGESTIONS]
+        return True
+
+    # Apply many values at once: one re-sort instead of a list insert each
+    def merge(self, batch: Dict[str, Tuple[float, str]]) -> None:
+        merged = {suggest_key(value): (updated, value) for value, updated in zip(self.values, self.latest)}
+        for key, (updated, value) in batch.items():
+            if key not in merged or updated >= merged[key][0]:
+                merged[key] = (updated, value)
+        self._load(sorted(merged.items(), key=itemgetter(0)))
+
+    def remove(self, value: str) -> None:
+        key = suggest_key(value)
+        position = self.find(key)
+        if position < len(self.values) and self.values[position] == value:
+            del self.values[position]
+            del self.latest[position]
+            # The memoized lists may now be short of entries further down; rebuild them on demand
+            for end in range(1, len(key) + 1):
+                self.memo.pop(key[:end], None)
+
+    def top(self, key: str, limit: int) -> List[str]:
+        low = self.find(key)
+        high = bisect.bisect_left(self.values, key + _MAX_CHAR, lo=low, key=suggest_key)
+        if high - low <= _SCAN_LIMIT:
+            best = heapq.nlargest(limit, range(low, high), key=self.latest.__getitem__)
+            return [self.values[position] for position in best]
+        memo = self.memo.get(key)
+        if memo is None:
+            best = heapq.nlargest(MAX_SUGGESTIONS, range(low, high), key=self.latest.__getitem__)
+            memo = self.memo[key] = [
+                (self.latest[position], suggest_key(self.values[position]), self.values[position])
+                for position in best
+            ]
+        return [value for _, _, value in memo[:limit]]
+
+    # Keep the `keep` most recently written values (memory bound)
+    def evict_oldest(self, keep: int) -> None:
+        cutoff = heapq.nlargest(keep, self.latest)[-1]
+        kept = [(value, updated) for value, updated in zip(self.values, self.latest) if updated >= cutoff]
+        self.values = [value for value, _ in kept]
+        self.latest = array("d", (updated for _, updated in kept))
+        self.memo.clear()
+
+    def _load(self, items: List[Tuple[str, Tuple[float, str]]]) -> None:
+        self.values = [value for _, (_, value) in items]
+        self.latest = array("d", (updated for _, (updated, _) in items))
+        self.memo.clear()
+
+# Typeahead completions per field, newest first
+class SuggestIndex:
+
+    def __init__(self, max_values: int, sync_lag: float):
+        self.max_values = max_values
+        self.sync_lag = timedelta(seconds=sync_lag)
+        self.watermark: Optional[datetime] = None
+        self._fields = {field: _Completions() for field in FIELDS}
+        self._lock = threading.Lock()
+
+    # Oldest updated_at the next sync must read (None: the index is empty, read everything)
+    def since(self) -> Optional[datetime]:
+        return None if self.watermark is None else self.watermark - self.sync_lag
+
+    # Add (title, author, updated_at) rows, newest value per key winning
+    def apply(self, rows: Iterable[Tuple[str, str, datetime]]) -> int:
+        titles: Dict[str, Tuple[float, str]] = {}
+        authors: Dict[str, Tuple[float, str]] = {}
+        newest = self.watermark
+        # Plain tuple unpacking: attribute access on result rows dominates a full build otherwise
+        for title, author, updated_at in rows:
+            updated = updated_at.timestamp()
+            for batch, value in ((titles, title), (authors, author)):
+                if value:
+                    key = suggest_key(value)
+                    seen = batch.get(key)
+                    if seen is None or updated >= seen[0]:
+                        batch[key] = (updated, value)
+            if newest is None or updated_at > newest:
+                newest = updated_at
+        changed = 0
+        with self._lock:
+            for field, batch in (("title", titles), ("author", authors)):
+                completions = self._fields[field]
+                if len(batch) > min(_MERGE_BATCH, max(64, len(completions.values) // 16)):
+                    completions.merge(batch)
+                    changed += len(batch)
+                else:
+                    changed += sum(
+                        completions.upsert(key, value, updated) for key, (updated, value) in batch.items()
+                    )
+                if len(completions.values) > self.max_values:
+                    completions.evict_oldest(self.max_values)
+            if newest is not None and (self.watermark is None or newest > self.watermark):
+                self.watermark = newest
+        return changed
+
+    # Up to `limit` values of `field` starting with `prefix` (after normalization), newest first
+    def top(self, field: str, prefix: str, limit: int) -> List[str]:
+        key = suggest_key(prefix)
+        if not key:
+            return []
+        with self._lock:
+            return self._fields[field].top(key, min(limit, MAX_SUGGESTIONS))
+
+    # Drop values no book has any more
+    def remove(self, field: str, values: Iterable[str]) -> None:
+        with self._lock:
+            for value in values:
+                self._fields[field].remove(value)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "fields": {
+                    field: {"values": len(completions.values), "memoized_prefixes": len(completions.memo)}
+                    for field, completions in self._fields.items()
+                },
+                "max_values": self.max_values,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+            }
+
+# Create the prefix index behind GET /books/suggest (built at startup)
+suggest_index = SuggestIndex(SUGGEST_MAX_VALUES, SUGGEST_SYNC_LAG_SECONDS)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules live at the top of the variant (run as `python -m pytest tests` from 1.0-MySQL)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
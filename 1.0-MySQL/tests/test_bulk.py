@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.mysql.dml import OnDuplicateClause
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, select
+
+import database
+from crud import BookCRUD
+from main import app
+from models import Book
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+# A SQLite file stands in for MySQL: ON DUPLICATE KEY UPDATE col = VALUES(col) becomes its
+# ON CONFLICT equivalent on the primary key
+@compiles(OnDuplicateClause, "sqlite")
+def on_conflict_do_update(clause, compiler, **kw):
+    assignments = ", ".join(f"{name} = excluded.{value.name}" for name, value in clause.update.items())
+    return f"ON CONFLICT (id) DO UPDATE SET {assignments}"
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'books.db'}")
+    Book.__table__.create(engine)
+    # SQLite has no @@auto_increment_increment
+    monkeypatch.setattr(BookCRUD, "_auto_increment_step", staticmethod(lambda db: 1))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def client(engine):
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[database.get_session] = get_session
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+@pytest.fixture
+def commits(engine):
+    count = [0]
+
+    @event.listens_for(engine, "commit")
+    def committed(connection):
+        count[0] += 1
+
+    return count
+
+def stored(engine):
+    with Session(engine) as session:
+        return {book.id: book for book in session.exec(select(Book))}
+
+def statuses(result):
+    return [(item["status"], item["id"]) for item in result["results"]]
+
+def test_json_array_creates_and_upserts(client, engine):
+    existing = client.post("/books/bulk", json=[{"title": "Before", "author": "Bulk"}]).json()["results"][0]["id"]
+    result = client.post("/books/bulk", json=[
+        {"title": "New 1", "author": "Bulk"},
+        {"id": existing, "title": "After", "author": "Bulk", "genre": "Upserted"},
+        {"title": "New 2", "author": "Bulk", "published_year": 2001},
+    ]).json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (3, 3, 0)
+    assert [status for status, _ in statuses(result)] == ["created", "upserted", "created"]
+    assert statuses(result)[1] == ("upserted", existing)
+    books = stored(engine)
+    assert len(books) == 3
+    assert (books[existing].title, books[existing].genre) == ("After", "Upserted")
+    assert [books[book_id].title for _, book_id in statuses(result)] == ["New 1", "After", "New 2"]
+
+def test_ndjson_body(client, engine):
+    lines = [json.dumps({"title": f"Line {index}", "author": "Bulk"}) for index in range(3)]
+    body = ("\n".join(lines[:2]) + "\n\n" + lines[2]).encode()
+    result = client.post("/books/bulk", content=body, headers=NDJSON).json()
+    assert result["succeeded"] == 3
+    books = stored(engine)
+    assert [books[book_id].title for _, book_id in statuses(result)] == ["Line 0", "Line 1", "Line 2"]
+
+def test_invalid_item_fails_alone(client, engine):
+    result = client.post("/books/bulk", json=[
+        {"title": "Valid 1", "author": "Bulk"},
+        {"title": "No author"},
+        {"title": "Valid 2", "author": "Bulk", "published_year": "not a year"},
+        {"title": "Valid 3", "author": "Bulk"},
+    ]).json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (4, 2, 2)
+    assert [item["status"] for item in result["results"]] == ["created", "invalid", "invalid", "created"]
+    assert "author" in result["results"][1]["error"]
+    assert "published_year" in result["results"][2]["error"]
+    assert sorted(book.title for book in stored(engine).values()) == ["Valid 1", "Valid 3"]
+
+def test_invalid_ndjson_line_fails_alone(client):
+    body = b'{"title": "Good", "author": "Bulk"}\n{"title": \n{"title": "Also good", "author": "Bulk"}\n'
+    result = client.post("/books/bulk", content=body, headers=NDJSON).json()
+    assert [item["status"] for item in result["results"]] == ["created", "invalid", "created"]
+
+def test_missing_ids_on_patch_and_delete(client, engine):
+    created = client.post("/books/bulk", json=[{"title": "Patch me", "author": "Bulk"}, {"title": "Delete me", "author": "Bulk"}]).json()
+    first, second = [book_id for _, book_id in statuses(created)]
+    missing = 10 ** 9
+    result = client.patch("/books/bulk", json=[{"id": first, "genre": "Patched"}, {"id": missing, "genre": "Nope"}]).json()
+    assert statuses(result) == [("updated", first), ("not_found", missing)]
+    assert (result["succeeded"], result["failed"]) == (1, 1)
+    assert (stored(engine)[first].title, stored(engine)[first].genre) == ("Patch me", "Patched")
+
+    result = client.request("DELETE", "/books/bulk", json=[missing, second]).json()
+    assert statuses(result) == [("not_found", missing), ("deleted", second)]
+    assert list(stored(engine)) == [first]
+
+def test_batch_size_splits_transactions(client, engine, commits):
+    books = [{"title": f"Batched {index}", "author": "Bulk"} for index in range(5)]
+    # The invalid item never reaches a batch: five valid items in batches of two are three commits
+    result = client.post("/books/bulk", params={"batch_size": 2}, json=books[:2] + [{"title": "Invalid"}] + books[2:]).json()
+    assert result["succeeded"] == 5
+    assert commits[0] == 3
+    commits[0] = 0
+    result = client.request("DELETE", "/books/bulk", params={"batch_size": 4}, json=list(stored(engine))).json()
+    assert result["succeeded"] == 5
+    assert commits[0] == 2
+    assert stored(engine) == {}
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import crud
+from crud import BookCRUD
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+@pytest.fixture(autouse=True)
+def gap_seconds(monkeypatch):
+    monkeypatch.setattr(crud, "CHANGES_GAP_SECONDS", 50)
+
+# Log rows as get_changes reads them: (seq, book_id, op, changed_at, database now)
+def log(*entries):
+    return [(seq, seq * 10, "upsert", NOW - timedelta(seconds=age), NOW) for seq, age in entries]
+
+def seqs(rows):
+    return [row[0] for row in rows]
+
+def test_log_without_gaps_is_returned_whole():
+    assert seqs(BookCRUD._committed_prefix(log((1, 60), (2, 1), (3, 0)), 0)) == [1, 2, 3]
+
+def test_empty_log():
+    assert BookCRUD._committed_prefix([], 7) == []
+
+def test_young_gap_holds_the_feed_back():
+    # Seq 3 was taken but not committed yet: whatever follows waits for it
+    assert seqs(BookCRUD._committed_prefix(log((1, 10), (2, 10), (4, 10), (5, 0)), 0)) == [1, 2]
+
+def test_young_gap_right_after_since():
+    assert BookCRUD._committed_prefix(log((6, 10), (7, 0)), 4) == []
+
+def test_old_gap_is_a_rollback():
+    assert seqs(BookCRUD._committed_prefix(log((1, 90), (3, 60), (4, 0)), 0)) == [1, 3, 4]
+
+def test_old_gap_holds_while_an_earlier_writer_runs():
+    # The writer that took seq 2 has been waiting on a lock since before seq 3 was written
+    rows = log((1, 90), (3, 60), (4, 0))
+    assert seqs(BookCRUD._committed_prefix(rows, 0, NOW - timedelta(seconds=70))) == [1]
+    # A writer that started after seq 3 cannot hold seq 2
+    assert seqs(BookCRUD._committed_prefix(rows, 0, NOW - timedelta(seconds=30))) == [1, 3, 4]
+
+def test_since_in_the_middle_of_the_log():
+    rows = log((5, 90), (6, 80), (8, 10), (9, 0))
+    assert seqs(BookCRUD._committed_prefix(rows[1:], 5)) == [6]
+    # Seqs at or below since are not gaps
+    assert seqs(BookCRUD._committed_prefix(rows[2:], 7)) == [8, 9]
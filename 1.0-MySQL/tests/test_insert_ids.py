@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import create_engine, event, func, insert
+from sqlmodel import Session, select
+
+from crud import BookCRUD
+from models import Book
+from schemas import BookCreate
+
+# A SQLite file stands in for MySQL. Its lastrowid after a multi-row INSERT is the last row's id, not
+# the first, so the ids computed from it miss just as they do when InnoDB interleaves another insert
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'books.db'}")
+
+    # pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Book.__table__.create(engine)
+    # SQLite has no @@auto_increment_increment
+    monkeypatch.setattr(BookCRUD, "_auto_increment_step", staticmethod(lambda db: 1))
+    yield engine
+    engine.dispose()
+
+def stored(engine):
+    with Session(engine) as session:
+        return {book.id: book.title for book in session.exec(select(Book))}
+
+def test_single_row_ids_are_read_back(engine):
+    with Session(engine) as session:
+        rows = BookCRUD.insert_books(session, [BookCreate(title="Dune", author="Herbert")])
+        session.commit()
+    assert stored(engine) == {rows[0]["id"]: "Dune"}
+
+def test_mismatched_ids_fall_back_to_one_row_at_a_time(engine):
+    with Session(engine) as session:
+        session.execute(insert(Book.__table__).values(title="Existing", author="A", created_at=func.now(), updated_at=func.now()))
+        books = [BookCreate(title=f"Book {index}", author="B") for index in range(5)]
+        rows = BookCRUD.insert_books(session, books)
+        session.commit()
+    # The multi-row INSERT was undone: each book is stored once, under the id returned for it
+    assert stored(engine) == {1: "Existing", **{row["id"]: row["title"] for row in rows}}
+    assert [row["title"] for row in rows] == [book.title for book in books]
+
+def test_ids_out_of_order_are_not_trusted(engine, monkeypatch):
+    with Session(engine) as session:
+        session.execute(insert(Book.__table__).values(title="Other", author="A", created_at=func.now(), updated_at=func.now()))
+        session.commit()
+    # A step that maps the computed ids onto the right rows in the wrong order
+    monkeypatch.setattr(BookCRUD, "_auto_increment_step", staticmethod(lambda db: -1))
+    with Session(engine) as session:
+        rows = BookCRUD.insert_books(session, [BookCreate(title="Mine", author="B"), BookCreate(title="Also mine", author="B")])
+        session.commit()
+    assert stored(engine) == {1: "Other", **{row["id"]: row["title"] for row in rows}}
+    assert len(stored(engine)) == 3
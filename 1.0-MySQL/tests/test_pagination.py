@@ -0,0 +1,33 @@
+import base64
+import json
+
+import pytest
+
+from pagination import decode_cursor, encode_cursor
+
+# A cursor as a client could forge it
+def cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+class Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+def test_round_trip():
+    row = Row(id=7, title="Dune", author="Herbert", published_year=None, genre="Science Fiction")
+    assert decode_cursor(encode_cursor("genre,-published_year", row), "genre,-published_year") == ("Science Fiction", None, 7)
+    assert decode_cursor(encode_cursor("id", row), "id") == (7,)
+
+@pytest.mark.parametrize("payload,sort", [
+    ({"s": "title", "v": [{"$gt": 1}], "id": 1}, "title"),
+    ({"s": "title", "v": [["a", "b"]], "id": 1}, "title"),
+    ({"s": "title", "v": [5], "id": 1}, "title"),
+    ({"s": "published_year", "v": ["1999"], "id": 1}, "published_year"),
+    ({"s": "published_year", "v": [True], "id": 1}, "published_year"),
+    ({"s": "author", "v": [None], "id": 1}, "author"),
+    ({"s": "id", "id": "1"}, "id"),
+    ({"s": "title", "v": ["a", "b"], "id": 1}, "title"),
+])
+def test_tampered_cursor_is_malformed(payload, sort):
+    with pytest.raises(ValueError, match="Malformed cursor"):
+        decode_cursor(cursor(payload), sort)
@@ -0,0 +1,156 @@
+import pytest
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.engine import Connection
+
+import replicas
+from replicas import STICKY_COOKIE, ReadYourWritesMiddleware, ReplicaRouter, RoutingSession, reads_from_primary
+
+# SQLite files stand in for the primary and its replicas; each holds a row naming the server,
+# so a read shows which one answered it
+metadata = MetaData()
+servers = Table("servers", metadata, Column("id", Integer, primary_key=True), Column("name", String, nullable=False))
+
+def server(path, name: str):
+    engine = create_engine(f"sqlite:///{path}", pool_pre_ping=True)
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(servers).values(name=name))
+    return engine
+
+# A replica whose connections always fail, as an unreachable host does
+def dead_replica(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}", pool_pre_ping=True)
+
+def answered_by(session) -> str:
+    return session.execute(select(servers.c.name).order_by(servers.c.id)).scalars().first()
+
+@pytest.fixture
+def primary(tmp_path):
+    engine = server(tmp_path / "primary.db", "primary")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def replica(tmp_path):
+    engine = server(tmp_path / "replica.db", "replica")
+    yield engine
+    engine.dispose()
+
+# time.monotonic stand-in for the cooldown
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(replicas.time, "monotonic", clock)
+    return clock
+
+def test_reads_go_to_the_replica(primary, replica):
+    router = ReplicaRouter(primary, [replica])
+    with RoutingSession(router) as session:
+        assert answered_by(session) == "replica"
+        assert isinstance(session._replica, Connection)
+
+def test_primary_only_sessions_read_the_primary(primary, replica):
+    with RoutingSession(ReplicaRouter(primary, [replica]), primary_only=True) as session:
+        assert answered_by(session) == "primary"
+
+def test_writes_and_later_reads_stay_on_the_primary(primary, replica):
+    with RoutingSession(ReplicaRouter(primary, [replica])) as session:
+        session.execute(insert(servers).values(name="written"))
+        assert session.primary_only
+        # Read-your-writes: the uncommitted row is only visible on the primary's connection
+        assert session.execute(select(servers.c.name).where(servers.c.name == "written")).scalar() == "written"
+        assert answered_by(session) == "primary"
+        session.commit()
+    with primary.connect() as conn:
+        assert conn.execute(select(servers.c.name).where(servers.c.name == "written")).scalar() == "written"
+    with replica.connect() as conn:
+        assert conn.execute(select(servers.c.name).where(servers.c.name == "written")).scalar() is None
+
+def test_round_robin_spreads_sessions(tmp_path, primary):
+    first, second = server(tmp_path / "r1.db", "replica-1"), server(tmp_path / "r2.db", "replica-2")
+    router = ReplicaRouter(primary, [first, second])
+    seen = []
+    for _ in range(4):
+        with RoutingSession(router) as session:
+            seen.append(answered_by(session))
+    assert sorted(seen) == ["replica-1", "replica-1", "replica-2", "replica-2"]
+
+def test_failed_replica_falls_back_to_the_primary(tmp_path, primary, clock):
+    dead = dead_replica(tmp_path)
+    router = ReplicaRouter(primary, [dead], cooldown=5)
+    with RoutingSession(router) as session:
+        assert answered_by(session) == "primary"
+    assert router.stats()[0]["available"] is False
+    assert router.candidates() == []
+    clock.now += 5
+    assert router.candidates() == [dead]
+
+def test_failed_replica_sits_out_its_cooldown(tmp_path, primary, replica, clock):
+    dead = dead_replica(tmp_path)
+    router = ReplicaRouter(primary, [dead, replica], cooldown=5)
+    for _ in range(3):
+        with RoutingSession(router) as session:
+            assert answered_by(session) == "replica"
+    # Tried once, then skipped until the cooldown expires
+    assert router.candidates() == [replica]
+    clock.now += 5
+    assert dead in router.candidates()
+
+def test_unknown_strategy_is_rejected(primary):
+    with pytest.raises(ValueError, match="Unknown replica strategy"):
+        ReplicaRouter(primary, [], strategy="random")
+
+@pytest.fixture
+def client(primary, replica):
+    router = ReplicaRouter(primary, [replica])
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=5)
+
+    def get_db(request: Request):
+        with RoutingSession(router, primary_only=reads_from_primary(request)) as session:
+            yield session
+
+    @app.get("/server")
+    def read(db=Depends(get_db)):
+        return {"server": answered_by(db)}
+
+    @app.post("/server")
+    def write(fail: bool = False, db=Depends(get_db)):
+        if fail:
+            raise HTTPException(status_code=422, detail="rejected")
+        db.execute(insert(servers).values(name="written"))
+        db.commit()
+        return {"server": answered_by(db)}
+
+    with TestClient(app) as client:
+        yield client
+
+def test_sticky_cookie_sends_reads_after_a_write_to_the_primary(client, monkeypatch):
+    assert client.get("/server").json() == {"server": "replica"}
+    response = client.post("/server")
+    assert response.json() == {"server": "primary"}
+    assert STICKY_COOKIE in response.cookies
+    assert client.get("/server").json() == {"server": "primary"}
+    # Once the window has passed, reads go back to the replica
+    now = replicas.time.time()
+    monkeypatch.setattr(replicas.time, "time", lambda: now + 6)
+    assert client.get("/server").json() == {"server": "replica"}
+
+def test_failed_writes_set_no_sticky_cookie(client):
+    response = client.post("/server", params={"fail": True})
+    assert response.status_code == 422
+    assert STICKY_COOKIE not in response.cookies
+    assert client.get("/server").json() == {"server": "replica"}
+
+def test_malformed_sticky_cookie_reads_the_replica(client):
+    client.cookies.set(STICKY_COOKIE, "soon")
+    assert client.get("/server").json() == {"server": "replica"}
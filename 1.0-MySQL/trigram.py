@@ -0,0 +1,192 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from config import TRIGRAM_THRESHOLD, TRIGRAM_SYNC_LAG_SECONDS
+
+# In-memory trigram index over title, author and genre for typo-tolerant search
+# (SEARCH_BACKEND=trigram). Documents are numbered in the order they are indexed, so
+# each trigram's postings are an ascending array of 32-bit document numbers (4 bytes
+# per entry, no per-entry objects). A changed book gets a new document and its old one
+# is tombstoned; postings are renumbered once tombstones outnumber live documents.
+#
+# The index follows the table through updated_at (indexed): every search first applies
+# rows written since the newest version it has seen, minus TRIGRAM_SYNC_LAG_SECONDS for
+# transactions that committed out of timestamp order. That covers every write path and
+# other worker processes alike. Deleted books are dropped when a search fails to load them.
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_EMPTY = array("I")
+# Compaction never runs for fewer tombstones than this
+_MIN_DEAD = 1024
+
+def _new_postings() -> array:
+    return array("I")
+
+# Casefolded words of `text` with accents removed ("Brontë" -> "bronte")
+def words(text: str) -> List[str]:
+    if text.isascii():
+        return _WORD_RE.findall(text.lower())
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return _WORD_RE.findall("".join(ch for ch in decomposed if not unicodedata.combining(ch)))
+
+# Distinct trigrams of every word, padded like pg_trgm ("  w", " wo", ... "rd ") so word starts count double
+def trigrams(text: str) -> Set[str]:
+    found = words(text)
+    if not found:
+        return set()
+    # One pass over "  word1   word2 ": the windows spanning a gap end in two spaces and are dropped
+    padded = "  " + "   ".join(found) + " "
+    grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+    grams.discard("   ")
+    for word in found[:-1]:
+        grams.discard(word[-1] + "  ")
+    return grams
+
+# Searchable text of a book (or a row with title, author and genre)
+def book_text(book) -> str:
+    return " ".join(filter(None, (book.title, book.author, book.genre)))
+
+# Trigram inverted index answering ranked fuzzy queries with book ids
+class TrigramIndex:
+
+    def __init__(self, threshold: float, sync_lag: float):
+        self.threshold = threshold
+        self.sync_lag = timedelta(seconds=sync_lag)
+        self.watermark: Optional[datetime] = None
+        self._postings: Dict[str, array] = defaultdict(_new_postings)
+        self._books = array("I")    # document -> book id (0 once replaced or removed)
+        self._sizes = array("H")    # document -> distinct trigrams
+        self._docs: Dict[int, int] = {}    # book id -> current document
+        self._dead = 0
+        # Books applied within the sync lag: book id -> (updated_at, text), so re-read rows are skipped
+        self._recent: Dict[int, Tuple[datetime, str]] = {}
+        self._lock = threading.Lock()
+
+    # Oldest updated_at the next sync must read (None: the index is empty, read everything)
+    def since(self) -> Optional[datetime]:
+        return None if self.watermark is None else self.watermark - self.sync_lag
+
+    # Index new and changed books from rows with id, title, author, genre and updated_at
+    def apply(self, rows: Iterable) -> int:
+        changed = 0
+        with self._lock:
+            for row in rows:
+                text = book_text(row)
+                seen = self._recent.get(row.id)
+                if seen is not None and (seen[0] > row.updated_at or seen[1] == text):
+                    continue
+                self._replace(row.id, text)
+                self._recent[row.id] = (row.updated_at, text)
+                if self.watermark is None or row.updated_at > self.watermark:
+                    self.watermark = row.updated_at
+                changed += 1
+            if changed:
+                since = self.since()
+                self._recent = {book_id: seen for book_id, seen in self._recent.items() if seen[0] >= since}
+                self._compact_if_sparse()
+        return changed
+
+    # Drop deleted books
+    def remove(self, book_ids: Iterable[int]) -> None:
+        with self._lock:
+            for book_id in book_ids:
+                self._recent.pop(book_id, None)
+                self._kill(self._docs.pop(book_id, None))
+            self._compact_if_sparse()
+
+    # Ids of the books most similar to `query`, best first
+    def search(self, query: str, limit: int) -> List[int]:
+        # Ranked by the query trigrams a book contains (word similarity), then by the share of
+        # the book's trigrams matched, so shorter close matches come first; ties by id
+        grams = trigrams(query)
+        if not grams:
+            return []
+        needed = max(1, math.ceil(self.threshold * len(grams)))
+        with self._lock:
+            lists = sorted((self._postings.get(gram, _EMPTY) for gram in grams), key=len)
+            # A book missing all of the len - needed + 1 rarest trigrams cannot reach `needed`,
+            # so only those postings are scanned; the common ones are probed per candidate
+            split = len(lists) - needed + 1
+            hits = Counter()
+            for postings in lists[:split]:
+                hits.update(postings)
+            common = lists[split:]
+            for index, postings in enumerate(common):
+                remaining = len(common) - index
+                for doc, count in list(hits.items()):
+                    if count + remaining < needed:
+                        del hits[doc]
+                        continue
+                    position = bisect.bisect_left(postings, doc)
+                    if position < len(postings) and postings[position] == doc:
+                        hits[doc] = count + 1
+            books, sizes = self._books, self._sizes
+            best = heapq.nsmallest(
+                limit,
+                (
+                    (-count, -count / sizes[doc], books[doc])
+                    for doc, count in hits.items() if count >= needed and books[doc]
+                )
+            )
+        return [book_id for _, _, book_id in best]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entries = sum(len(postings) for postings in self._postings.values())
+            return {
+                "books": len(self._docs),
+                "tombstones": self._dead,
+                "trigrams": len(self._postings),
+                "postings": entries,
+                "postings_bytes": entries * _EMPTY.itemsize,
+                "threshold": self.threshold,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+            }
+
+    def _replace(self, book_id: int, text: str) -> None:
+        self._kill(self._docs.pop(book_id, None))
+        grams = trigrams(text)
+        if not grams:
+            return
+        doc = len(self._books)
+        self._books.append(book_id)
+        self._sizes.append(min(len(grams), 0xFFFF))
+        postings = self._postings
+        for gram in grams:
+            postings[gram].append(doc)
+        self._docs[book_id] = doc
+
+    def _kill(self, doc: Optional[int]) -> None:
+        if doc is not None:
+            self._books[doc] = 0
+            self._dead += 1
+
+    # Renumber live documents once tombstones outnumber them (keeps memory proportional to the catalog)
+    def _compact_if_sparse(self) -> None:
+        if self._dead < max(_MIN_DEAD, len(self._docs)):
+            return
+        renumbered = array("l", [-1]) * len(self._books)
+        books, sizes = array("I"), array("H")
+        for doc, book_id in enumerate(self._books):
+            if book_id:
+                renumbered[doc] = len(books)
+                books.append(book_id)
+                sizes.append(self._sizes[doc])
+        postings = defaultdict(_new_postings)
+        for gram, docs in self._postings.items():
+            live = array("I", (renumbered[doc] for doc in docs if renumbered[doc] >= 0))
+            if live:
+                postings[gram] = live
+        self._postings, self._books, self._sizes = postings, books, sizes
+        self._docs = {book_id: doc for doc, book_id in enumerate(books)}
+        self._dead = 0
+
+# Create the trigram index used when SEARCH_BACKEND=trigram
+search_index = TrigramIndex(TRIGRAM_THRESHOLD, TRIGRAM_SYNC_LAG_SECONDS)
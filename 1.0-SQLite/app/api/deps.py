@@ -1,7 +1,28 @@
-from typing import Annotated
-from fastapi import Depends
+from typing import Annotated, Optional
+from fastapi import Depends, Query
 from sqlmodel import Session
-from ..database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..database import get_async_session, get_read_session, get_session
+from ..filters import BookFilters
 
 # Database session dependency
-SessionDep = Annotated[Session, Depends(get_session)] 
\ No newline at end of file
+SessionDep = Annotated[Session, Depends(get_session)]
+
+# Session for read-only routes
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+
+# Async database session dependency (ASYNC_DB=true)
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)] 
+
+def get_book_filters(
+    author: Optional[str] = Query(None, description="Exact author"),
+    genre: Optional[str] = Query(None, description="Exact genre"),
+    year_from: Optional[int] = Query(None, description="Published in or after this year"),
+    year_to: Optional[int] = Query(None, description="Published in or before this year"),
+    title_prefix: Optional[str] = Query(None, min_length=1, description="Title starts with (case-sensitive)")
+) -> BookFilters:
+    """Dependency collecting the typed GET /books filters"""
+    return BookFilters(author, genre, year_from, year_to, title_prefix)
+
+# Typed filters for GET /books
+BookFiltersDep = Annotated[BookFilters, Depends(get_book_filters)]
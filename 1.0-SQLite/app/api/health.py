@@ -1,23 +1,27 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 from datetime import datetime
-from sqlmodel import Session, select
-from ..database import engine
-from ..models import Book
+from ..database import async_engine, create_batcher, db_probe, db_writer, engine, read_engine
+from ..probe import pool_stats
 from ..config import settings
+from ..bus import invalidation_bus
+from ..cache import book_cache
+from ..coalesce import read_flights
+from ..snapshot import catalog_snapshot
+from ..suggest import suggest_index
+from ..trigram import search_index
 
 router = APIRouter()
 
 @router.get("/")
 def health_check():
-    """Health check endpoint"""
-    try:
-        with Session(engine) as session:
-            result = session.exec(select(Book).limit(1))
-            db_status = "Connected"
-            db_message = "Database connection successful"
-    except Exception as e:
+    """Health check endpoint (database status from the cached readiness probe)"""
+    probe = db_probe.latest()
+    if probe.ok:
+        db_status = "Connected"
+        db_message = "Database connection successful"
+    else:
         db_status = "Error"
-        db_message = f"Database connection failed: {str(e)}"
+        db_message = f"Database connection failed: {probe.error}"
     
     return {
         "status": "healthy" if db_status == "Connected" else "unhealthy",
@@ -50,4 +54,55 @@ def health_check():
                 "DELETE /books/{book_id}"
             ]
         }
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/livez")
+async def liveness():
+    """Liveness: the process is serving requests; never touches the database"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@router.get("/readyz")
+def readiness(response: Response):
+    """Readiness from the last background probe plus live pool counters; 503 when not ready"""
+    probe = db_probe.latest()
+    ready = db_probe.is_ready(probe)
+    if not ready:
+        response.status_code = 503
+    pools = {"sync": pool_stats(engine)}
+    if read_engine is not engine:
+        pools["read"] = pool_stats(read_engine)
+    if async_engine is not None:
+        pools["async"] = pool_stats(async_engine)
+    body = {
+        "status": "ready" if ready else "unready",
+        "timestamp": datetime.now().isoformat(),
+        "database": db_probe.describe(probe),
+        "pool": pools,
+    }
+    if db_writer is not None:
+        body["writer"] = db_writer.stats()
+    if create_batcher is not None:
+        body["write_behind"] = create_batcher.stats()
+    return body
+
+@router.get("/cache/stats")
+def cache_stats():
+    """Response cache counters (hits, misses, evictions) and the cross-worker invalidation bus"""
+    return {**book_cache.stats(), "bus": invalidation_bus.stats()}
+
+@router.get("/coalescing/stats")
+def coalescing_stats():
+    """Single-flight counters per route (queries run, requests that shared one, waiter timeouts)"""
+    return read_flights.stats()
+
+@router.get("/search-index/stats")
+def search_index_stats():
+    """Trigram index size (empty unless SEARCH_BACKEND=trigram) and the typeahead prefix index"""
+    return {"backend": settings.search_backend, **search_index.stats(), "suggest": suggest_index.stats()}
+
+@router.get("/snapshot/stats")
+def snapshot_stats():
+    """Columnar catalog snapshot size (bytes per column and per book) and refresh counters"""
+    if catalog_snapshot is None:
+        return {"enabled": False}
+    return {"enabled": True, **catalog_snapshot.stats()}
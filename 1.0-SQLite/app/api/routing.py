@@ -0,0 +1,16 @@
+from fastapi import APIRouter, FastAPI
+from typing import List, Optional
+
+def replace_routes(app: FastAPI, router: APIRouter, prefix: str = "", tags: Optional[List[str]] = None) -> None:
+    """Swap the app's routes for same-path, same-method routes from `router`, keeping their order"""
+    staging = APIRouter()
+    staging.include_router(router, prefix=prefix, tags=tags)
+    replacements = {
+        (route.path, frozenset(route.methods)): route
+        for route in staging.routes
+    }
+    app.router.routes = [
+        replacements.get((route.path, frozenset(getattr(route, "methods", None) or ())), route)
+        for route in app.router.routes
+    ]
+    app.openapi_schema = None
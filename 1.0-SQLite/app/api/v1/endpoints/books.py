@@ -1,40 +1,222 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from functools import partial
+from pydantic import TypeAdapter
+from sqlmodel import Session
+from typing import List, Literal, Optional, Union
 from ....crud import book_crud
-from ....schemas import BookCreate, BookResponse, BookUpdate
-from ....api.deps import SessionDep
+from ....config import settings
+from ....serialization import encode_changes, encode_page, encode_rows, json_response
+from ....schemas import (
+    BookBatch, BookBatchGet, BookBulkCreate, BookBulkUpdate, BookChanges, BookCreate, BookFacets, BookPage, BookResponse,
+    BookStats, BookSuggestions, BookUpdate, BulkResult
+)
+from ....api.deps import BookFiltersDep, ReadSessionDep, SessionDep
+from ....filters import FIELDS_PATTERN, parse_fields
+from ....pagination import SORT_PATTERN
+from ....coalesce import read_flights, search_key
+from ....batch import IDS_PATTERN, cache_books, cached_books, encode_batch, parse_ids, unique_ids
+from ....bulk import bulk_request_body, run_bulk
+from ....cache import book_cache, book_key, encode_book, pack_entry, unpack_entry
+from ....compression import precompressed_response
+from ....conditional import (
+    book_validators, collection_validators, is_conditional, is_not_modified, not_modified
+)
+from ....export import MEDIA_TYPES, stream_books
+from ....feed import stream_changes, wait_for_changes
+from ....suggest import MAX_SUGGESTIONS
 
 router = APIRouter()
 
+BULK_CREATE_ITEM = TypeAdapter(BookBulkCreate)
+BULK_UPDATE_ITEM = TypeAdapter(BookBulkUpdate)
+BULK_DELETE_ITEM = TypeAdapter(int)
+
+BatchSizeQuery = Query(settings.bulk_batch_size, ge=1, le=10000, description="Items committed per transaction")
+
 @router.post("", response_model=BookResponse)
 def create_book(book_data: BookCreate, db: SessionDep):
     """Create a new book"""
     return book_crud.create_book(db, book_data)
 
-@router.get("", response_model=List[BookResponse])
+@router.get("", response_model=Union[List[BookResponse], BookPage, BookBatch])
 def get_books(
-    db: SessionDep,
+    request: Request,
+    db: ReadSessionDep,
+    filters: BookFiltersDep,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of records to return")
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
 ):
-    """Get all books with pagination"""
-    return book_crud.get_books(db, skip=skip, limit=limit)
+    """Get books with typed filters, multi-key sorting, sparse fields and offset or keyset (cursor) pagination"""
+    if ids is not None:
+        return _batch_get(db, parse_ids(ids))
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*book_crud.get_collection_version(db))
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Column tuples are encoded straight to JSON; response_model only documents the shape
+    selected = parse_fields(fields)
+    if cursor is None:
+        rows = book_crud.get_book_rows(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=selected)
+        return json_response(encode_rows(rows, selected), headers=validators.headers())
+    try:
+        rows, next_cursor = book_crud.get_book_rows_page(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=selected
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(encode_page(rows, next_cursor, selected), headers=validators.headers())
 
 @router.get("/search", response_model=List[BookResponse])
 def search_books(
-    db: SessionDep,
-    q: str = Query(..., description="Search term to find in title, author, or genre")
+    db: ReadSessionDep,
+    q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return")
+):
+    """Search books by term (ranked, prefix matching)"""
+    # Identical concurrent searches share one query and one encoded body
+    def search() -> bytes:
+        return encode_rows(book_crud.search_book_rows(db, q, limit=limit))
+    return json_response(read_flights.do(search_key(q, limit), search))
+
+@router.get("/suggest", response_model=BookSuggestions)
+def suggest_books(
+    db: ReadSessionDep,
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions")
+):
+    """Typeahead completions for a prefix (case and accent insensitive, most recently written first)"""
+    suggestions = book_crud.suggest(db, field, prefix, limit)
+    return BookSuggestions(field=field, prefix=prefix, suggestions=suggestions)
+
+@router.get("/facets", response_model=BookFacets)
+def get_facets(
+    db: ReadSessionDep,
+    filters: BookFiltersDep,
+    facet: List[Literal["genre", "author", "decade"]] = Query(
+        ["genre", "author", "decade"], description="Facets to count (repeat the parameter for several)"
+    ),
+    q: Optional[str] = Query(None, description="Only count books matching this search term"),
+    limit: int = Query(20, ge=1, le=1000, description="Values returned per facet, most common first")
+):
+    """Book counts per genre, author and publication decade, optionally within the typed GET /books filters"""
+    return book_crud.get_facets(db, facet, limit=limit, search_term=q, filters=filters)
+
+@router.get("/stats", response_model=BookStats)
+def get_stats(
+    db: ReadSessionDep,
+    q: Optional[str] = Query(None, description="Only include books matching this search term")
+):
+    """Book count, distinct and missing values per facet and the publication year range"""
+    return book_crud.get_stats(db, search_term=q)
+
+@router.get("/export", response_class=StreamingResponse)
+def export_books(
+    format: Literal["ndjson", "json"] = Query("ndjson", description="NDJSON lines or a JSON array"),
+    batch_size: int = Query(1000, ge=1, le=10000, description="Rows fetched per round trip")
+):
+    """Stream the whole catalog without loading it into memory"""
+    return StreamingResponse(
+        stream_books(format, batch_size=batch_size),
+        media_type=MEDIA_TYPES[format]
+    )
+
+@router.get("/changes", response_model=BookChanges)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Last seq already applied (0 replays the whole catalog)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch"),
+    wait: float = Query(
+        0, ge=0, le=settings.changes_max_wait_seconds, description="Seconds to wait for a change when there is none yet"
+    )
+):
+    """Books created, updated or deleted after `since` in seq order, each at its latest change (long-poll with wait)"""
+    return json_response(encode_changes(await wait_for_changes(since, limit, wait)))
+
+@router.get("/changes/stream", response_class=StreamingResponse)
+def stream_book_changes(
+    request: Request,
+    since: int = Query(0, ge=0, description="Last seq already applied (Last-Event-ID takes precedence)"),
+    limit: int = Query(1000, ge=1, le=10000, description="Change log entries read per batch")
 ):
-    """Search books by term"""
-    return book_crud.search_books(db, q)
+    """Push changes after `since` as server-sent events (upsert/delete events, seq as the event id)"""
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        stream_changes(since, limit),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/bulk", response_model=BulkResult, openapi_extra=bulk_request_body(BookBulkCreate.model_json_schema()))
+async def bulk_create_books(request: Request, db: SessionDep, batch_size: int = BatchSizeQuery):
+    """Create books from a JSON array or NDJSON stream (items with an id are upserted)"""
+    return await run_bulk(request, BULK_CREATE_ITEM, partial(book_crud.bulk_create_books, db), batch_size)
+
+@router.patch("/bulk", response_model=BulkResult, openapi_extra=bulk_request_body(BookBulkUpdate.model_json_schema()))
+async def bulk_update_books(request: Request, db: SessionDep, batch_size: int = BatchSizeQuery):
+    """Partially update books from a JSON array or NDJSON stream"""
+    return await run_bulk(request, BULK_UPDATE_ITEM, partial(book_crud.bulk_update_books, db), batch_size)
+
+@router.delete("/bulk", response_model=BulkResult, openapi_extra=bulk_request_body({"type": "integer"}))
+async def bulk_delete_books(request: Request, db: SessionDep, batch_size: int = BatchSizeQuery):
+    """Delete books by id from a JSON array or NDJSON stream"""
+    return await run_bulk(request, BULK_DELETE_ITEM, partial(book_crud.bulk_delete_books, db), batch_size)
+
+@router.post("/batch-get", response_model=BookBatch)
+def batch_get_books(request_data: BookBatchGet, db: ReadSessionDep):
+    """Get many books by id in one round trip (items in request order, unknown ids under missing)"""
+    return _batch_get(db, request_data.ids)
+
+def _batch_get(db: Session, ids: List[int]) -> Response:
+    """Serve cached books from the cache and load the rest with chunked IN queries"""
+    try:
+        ids = unique_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    bodies, misses = cached_books(ids)
+    if misses:
+        token = book_cache.fill_token()
+        bodies.update(cache_books(book_crud.get_book_rows_by_ids(db, misses), token))
+    return json_response(encode_batch(ids, bodies))
 
 @router.get("/{book_id}", response_model=BookResponse)
-def get_book(book_id: int, db: SessionDep):
-    """Get a book by ID"""
-    book = book_crud.get_book(db, book_id)
-    if not book:
-        raise HTTPException(status_code=404, detail="Book not found")
-    return book
+def get_book(book_id: int, request: Request, db: ReadSessionDep):
+    """Get a book by ID (cached; supports If-None-Match / If-Modified-Since)"""
+    key = book_key(book_id)
+    entry = book_cache.get(key)
+    if entry is None:
+        if is_conditional(request):
+            # Revalidate against updated_at alone before loading the full row
+            updated_at = book_crud.get_book_version(db, book_id)
+            if updated_at is None:
+                raise HTTPException(status_code=404, detail="Book not found")
+            validators = book_validators(book_id, updated_at)
+            if is_not_modified(request, validators):
+                return not_modified(validators)
+        def load() -> Optional[bytes]:
+            token = book_cache.fill_token()
+            book = book_crud.get_book(db, book_id)
+            if not book:
+                return None
+            entry = pack_entry(book.updated_at, encode_book(book))
+            book_cache.set(key, entry, token=token)
+            return entry
+        # Concurrent misses for the same book share one load and cache fill
+        entry = read_flights.do(("book", book_id), load)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+    updated_at, body, variants = unpack_entry(entry)
+    validators = book_validators(book_id, updated_at)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Sent as cached, compressed or not: the compression middleware skips encoded responses
+    return precompressed_response(request, body, variants, validators.headers())
 
 @router.put("/{book_id}", response_model=BookResponse)
 def update_book(book_id: int, book_data: BookUpdate, db: SessionDep):
@@ -0,0 +1,148 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Literal, Optional, Union
+from ....cache import book_cache, book_key, encode_book, pack_entry, unpack_entry
+from ....compression import precompressed_response
+from ....conditional import (
+    book_validators, collection_validators, is_conditional, is_not_modified, not_modified
+)
+from ....crud_async import async_book_crud
+from ....serialization import encode_page, encode_rows, json_response
+from ....schemas import BookBatch, BookBatchGet, BookCreate, BookPage, BookResponse, BookSuggestions, BookUpdate
+from ....api.deps import AsyncSessionDep, BookFiltersDep
+from ....filters import FIELDS_PATTERN, parse_fields
+from ....pagination import SORT_PATTERN
+from ....coalesce import read_flights, search_key
+from ....batch import IDS_PATTERN, cache_books, cached_books, encode_batch, parse_ids, unique_ids
+from ....suggest import MAX_SUGGESTIONS
+
+# Async versions of the core book routes, swapped in when ASYNC_DB is enabled.
+# Paths and parameters mirror books.py; export and bulk routes stay sync.
+router = APIRouter()
+
+@router.post("", response_model=BookResponse)
+async def create_book(book_data: BookCreate, db: AsyncSessionDep):
+    """Create a new book"""
+    return await async_book_crud.create_book(db, book_data)
+
+@router.get("", response_model=Union[List[BookResponse], BookPage, BookBatch])
+async def get_books(
+    request: Request,
+    db: AsyncSessionDep,
+    filters: BookFiltersDep,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from next_cursor (send an empty value for the first page)"),
+    sort: str = Query("id", pattern=SORT_PATTERN, description="Comma-separated sort keys, \"-\" for descending (ties broken by id)"),
+    fields: Optional[str] = Query(None, pattern=FIELDS_PATTERN, description="Comma-separated fields to return (id is always included)"),
+    ids: Optional[str] = Query(None, pattern=IDS_PATTERN, description="Comma-separated ids to fetch in request order (other parameters are ignored)")
+):
+    """Get books with typed filters, multi-key sorting, sparse fields and offset or keyset (cursor) pagination"""
+    if ids is not None:
+        return await _batch_get(db, parse_ids(ids))
+    # Read the version before the page, so a concurrent write can only make the ETag older
+    validators = collection_validators(*await async_book_crud.get_collection_version(db))
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Column tuples are encoded straight to JSON; response_model only documents the shape
+    selected = parse_fields(fields)
+    if cursor is None:
+        rows = await async_book_crud.get_book_rows(db, skip=skip, limit=limit, sort=sort, filters=filters, fields=selected)
+        return json_response(encode_rows(rows, selected), headers=validators.headers())
+    try:
+        rows, next_cursor = await async_book_crud.get_book_rows_page(
+            db, cursor=cursor, limit=limit, sort=sort, filters=filters, fields=selected
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return json_response(encode_page(rows, next_cursor, selected), headers=validators.headers())
+
+@router.get("/search", response_model=List[BookResponse])
+async def search_books(
+    db: AsyncSessionDep,
+    q: str = Query(..., description="Search term to find in title, author, or genre"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return")
+):
+    """Search books by term (ranked, prefix matching)"""
+    # Identical concurrent searches share one query and one encoded body
+    async def search() -> bytes:
+        return encode_rows(await async_book_crud.search_book_rows(db, q, limit=limit))
+    return json_response(await read_flights.do_async(search_key(q, limit), search))
+
+@router.get("/suggest", response_model=BookSuggestions)
+async def suggest_books(
+    db: AsyncSessionDep,
+    prefix: str = Query(..., min_length=1, max_length=255, description="What the user has typed so far"),
+    field: Literal["title", "author"] = Query("title", description="Field to complete"),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS, description="Maximum number of completions")
+):
+    """Typeahead completions for a prefix (case and accent insensitive, most recently written first)"""
+    suggestions = await async_book_crud.suggest(db, field, prefix, limit)
+    return BookSuggestions(field=field, prefix=prefix, suggestions=suggestions)
+
+@router.post("/batch-get", response_model=BookBatch)
+async def batch_get_books(request_data: BookBatchGet, db: AsyncSessionDep):
+    """Get many books by id in one round trip (items in request order, unknown ids under missing)"""
+    return await _batch_get(db, request_data.ids)
+
+async def _batch_get(db: AsyncSession, ids: List[int]) -> Response:
+    """Serve cached books from the cache and load the rest with chunked IN queries"""
+    try:
+        ids = unique_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    bodies, misses = cached_books(ids)
+    if misses:
+        token = book_cache.fill_token()
+        bodies.update(cache_books(await async_book_crud.get_book_rows_by_ids(db, misses), token))
+    return json_response(encode_batch(ids, bodies))
+
+@router.get("/{book_id}", response_model=BookResponse)
+async def get_book(book_id: int, request: Request, db: AsyncSessionDep):
+    """Get a book by ID (cached; supports If-None-Match / If-Modified-Since)"""
+    key = book_key(book_id)
+    entry = book_cache.get(key)
+    if entry is None:
+        if is_conditional(request):
+            # Revalidate against updated_at alone before loading the full row
+            updated_at = await async_book_crud.get_book_version(db, book_id)
+            if updated_at is None:
+                raise HTTPException(status_code=404, detail="Book not found")
+            validators = book_validators(book_id, updated_at)
+            if is_not_modified(request, validators):
+                return not_modified(validators)
+        async def load() -> Optional[bytes]:
+            token = book_cache.fill_token()
+            book = await async_book_crud.get_book(db, book_id)
+            if not book:
+                return None
+            entry = pack_entry(book.updated_at, encode_book(book))
+            book_cache.set(key, entry, token=token)
+            return entry
+        # Concurrent misses for the same book share one load and cache fill
+        entry = await read_flights.do_async(("book", book_id), load)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+    updated_at, body, variants = unpack_entry(entry)
+    validators = book_validators(book_id, updated_at)
+    if is_not_modified(request, validators):
+        return not_modified(validators)
+    # Sent as cached, compressed or not: the compression middleware skips encoded responses
+    return precompressed_response(request, body, variants, validators.headers())
+
+@router.put("/{book_id}", response_model=BookResponse)
+async def update_book(book_id: int, book_data: BookUpdate, db: AsyncSessionDep):
+    """Update a book"""
+    book = await async_book_crud.update_book(db, book_id, book_data)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+@router.delete("/{book_id}", response_model=BookResponse)
+async def delete_book(book_id: int, db: AsyncSessionDep):
+    """Delete a book"""
+    book = await async_book_crud.delete_book(db, book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException
+from functools import partial
+from ....cache import invalidate_books
+from ....crud import book_crud
+from ....database import db_writer
+from ....schemas import BookCreate, BookResponse, BookUpdate
+
+# Write routes for the SQLite production profile, swapped in when SQLITE_PRODUCTION is enabled.
+# Each write is queued to the single writer and answered once its group commit has landed.
+router = APIRouter()
+
+@router.post("", response_model=BookResponse)
+async def create_book(book_data: BookCreate):
+    """Create a new book"""
+    book = await db_writer.run(partial(book_crud.add_book, book_data=book_data))
+    invalidate_books([book.id], book.updated_at)
+    return book
+
+@router.put("/{book_id}", response_model=BookResponse)
+async def update_book(book_id: int, book_data: BookUpdate):
+    """Update a book"""
+    book = await db_writer.run(partial(book_crud.apply_book_update, book_id=book_id, book_data=book_data))
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    invalidate_books([book_id], book.updated_at)
+    return book
+
+@router.delete("/{book_id}", response_model=BookResponse)
+async def delete_book(book_id: int):
+    """Delete a book"""
+    book = await db_writer.run(partial(book_crud.remove_book, book_id=book_id))
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    invalidate_books([book_id], book.updated_at, deleted=True)
+    return book
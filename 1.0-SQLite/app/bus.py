@@ -0,0 +1,244 @@
+import json
+import os
+import queue
+import socket
+import threading
+import uuid
+from contextlib import suppress
+from typing import Callable, Dict, List, Optional
+from .config import settings
+
+# Cross-worker invalidation for the in-process response cache. Every write publishes the
+# cache keys it touched with a version stamp (see cache.version_stamp); every worker applies
+# what the others publish. Messages only ever delete entries and raise the cache's per-key
+# floor, so one that arrives late, twice or out of order cannot bring an older book back.
+# Delivery is best effort: a message lost to a dead peer or a broker outage leaves that
+# worker's entry stale for at most CACHE_TTL_SECONDS.
+
+InvalidationHandler = Callable[[Dict[str, int]], None]
+
+class InvalidationBus:
+    """Base transport with no peers: publishing is a no-op (single worker)"""
+    transport = "none"
+    # Keys per message; bulk writes are split so each message fits one datagram
+    max_keys = 256
+
+    def __init__(self):
+        self.node: Optional[str] = None
+        self.published = 0
+        self.received = 0
+        self.failed = 0
+        self._handler: Optional[InvalidationHandler] = None
+
+    def start(self, handler: InvalidationHandler) -> None:
+        """Join the bus; `handler(stamps)` is called with every other worker's invalidations"""
+        # Named here rather than in __init__: serve.py imports the app before forking its workers
+        self.node = uuid.uuid4().hex
+        self._handler = handler
+        self._open()
+
+    def stop(self) -> None:
+        self._handler = None
+        self._close()
+
+    def publish(self, stamps: Dict[str, int]) -> None:
+        """Send `{cache key: version stamp}` to the other workers (never raises: the write already committed)"""
+        if self._handler is None or not stamps or self.transport == "none":
+            return
+        items = list(stamps.items())
+        for offset in range(0, len(items), self.max_keys):
+            payload = json.dumps({"node": self.node, "stamps": dict(items[offset:offset + self.max_keys])})
+            try:
+                self._send(payload.encode())
+                self.published += 1
+            except Exception:
+                self.failed += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {"transport": self.transport, "published": self.published,
+                "received": self.received, "failed": self.failed}
+
+    def _receive(self, payload: bytes) -> None:
+        message = json.loads(payload)
+        if message["node"] == self.node:
+            return
+        handler = self._handler
+        if handler is not None:
+            self.received += 1
+            handler({key: int(stamp) for key, stamp in message["stamps"].items()})
+
+    def _open(self) -> None:
+        pass
+
+    def _close(self) -> None:
+        pass
+
+    def _send(self, payload: bytes) -> None:
+        pass
+
+class SocketBus(InvalidationBus):
+    """Same-host workers: one UNIX datagram socket per worker in a shared directory"""
+    transport = "socket"
+    # A peer whose receive queue stays full this long misses the message
+    send_timeout = 0.1
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path: Optional[str] = None
+        self._socket: Optional[socket.socket] = None
+        self._sender: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def peers(self) -> List[str]:
+        """Socket paths of the other workers"""
+        with os.scandir(self.directory) as entries:
+            return [entry.path for entry in entries if entry.name.endswith(".sock") and entry.path != self.path]
+
+    def _open(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{self.node}.sock")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        # Lets the listener notice stop() without a wake-up message
+        self._socket.settimeout(1.0)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.settimeout(self.send_timeout)
+        self._thread = threading.Thread(target=self._listen, args=(self._socket,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def _listen(self, sock: socket.socket) -> None:
+        while self._handler is not None:
+            try:
+                payload = sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            with suppress(ValueError, KeyError):
+                self._receive(payload)
+
+    def _send(self, payload: bytes) -> None:
+        failed = False
+        for peer in self.peers():
+            try:
+                self._sender.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a worker that died without closing it
+                with suppress(FileNotFoundError):
+                    os.unlink(peer)
+            except OSError:
+                failed = True
+        if failed:
+            raise OSError("invalidation not delivered to every peer")
+
+    def _close(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for sock in (self._socket, self._sender):
+            if sock is not None:
+                sock.close()
+        self._socket = self._sender = None
+        if self.path is not None:
+            with suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+class PubSubBus(InvalidationBus):
+    """Workers on any host, over a Redis-compatible pub/sub client (publish, pubsub)"""
+    transport = "pubsub"
+
+    def __init__(self, client, channel: str):
+        super().__init__()
+        self.client = client
+        self.channel = channel
+        self._subscription = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _open(self) -> None:
+        self._subscription = self.client.pubsub(ignore_subscribe_messages=True)
+        self._subscription.subscribe(self.channel)
+        self._thread = threading.Thread(target=self._listen, args=(self._subscription,), name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def _listen(self, subscription) -> None:
+        while self._handler is not None:
+            try:
+                message = subscription.get_message(timeout=1.0)
+            except Exception:
+                # Broker unreachable: keep retrying, entries cached meanwhile expire with the TTL
+                threading.Event().wait(1.0)
+                continue
+            if message is not None and message["type"] == "message":
+                with suppress(ValueError, KeyError):
+                    self._receive(message["data"])
+
+    def _send(self, payload: bytes) -> None:
+        self.client.publish(self.channel, payload)
+
+    def _close(self) -> None:
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+
+class InProcessPubSub:
+    """In-process stand-in for a Redis pub/sub client (tests, or several buses in one process)"""
+
+    def __init__(self):
+        self._subscriptions: List["_Subscription"] = []
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: bytes) -> int:
+        with self._lock:
+            subscriptions = [subscription for subscription in self._subscriptions if channel in subscription.channels]
+        for subscription in subscriptions:
+            subscription.queue.put({"type": "message", "channel": channel, "data": message})
+        return len(subscriptions)
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "_Subscription":
+        subscription = _Subscription(self)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def _remove(self, subscription: "_Subscription") -> None:
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+class _Subscription:
+    """Queue of messages for one InProcessPubSub subscriber"""
+
+    def __init__(self, broker: InProcessPubSub):
+        self.broker = broker
+        self.channels: set = set()
+        self.queue: "queue.Queue" = queue.Queue()
+
+    def subscribe(self, *channels: str) -> None:
+        self.channels.update(channels)
+
+    def get_message(self, timeout: float = 0.0) -> Optional[dict]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        self.broker._remove(self)
+
+def create_bus() -> InvalidationBus:
+    """Build the transport selected by INVALIDATION_BUS"""
+    if settings.invalidation_bus == "socket":
+        return SocketBus(settings.invalidation_socket_dir)
+    if settings.invalidation_bus == "redis":
+        import redis  # optional dependency
+        return PubSubBus(redis.Redis.from_url(settings.redis_url), settings.invalidation_channel)
+    if settings.invalidation_bus == "memory":
+        return PubSubBus(InProcessPubSub(), settings.invalidation_channel)
+    return InvalidationBus()
+
+# Create the bus instance (joined in the lifespan, once per worker)
+invalidation_bus = create_bus()
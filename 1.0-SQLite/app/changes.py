@@ -0,0 +1,95 @@
+import asyncio
+from typing import Optional
+from sqlalchemy import Engine, column, table, text
+from .coalesce import on_write_commit
+
+# Append-only change log behind GET /books/changes. Triggers on `books` (like the FTS
+# index and facet counters) add one row per inserted, updated or deleted book inside the
+# writing transaction, so every write path is logged and a rolled-back write never is.
+# AUTOINCREMENT keeps `seq` strictly increasing and never reuses one; since SQLite has a
+# single writer, rows become visible in seq order and a consumer can resume after the
+# last seq it has seen.
+CHANGE_TABLE = "book_changes"
+UPSERT = "upsert"
+DELETE = "delete"
+
+CHANGE_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        book_id INTEGER NOT NULL,
+        op TEXT NOT NULL
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_changes_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {CHANGE_TABLE}(book_id, op) VALUES (new.id, '{UPSERT}');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_changes_au AFTER UPDATE ON books BEGIN
+        INSERT INTO {CHANGE_TABLE}(book_id, op) VALUES (new.id, '{UPSERT}');
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_changes_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {CHANGE_TABLE}(book_id, op) VALUES (old.id, '{DELETE}');
+    END
+    """,
+]
+
+# Lightweight table construct used by BookCRUD.get_changes
+book_changes = table(CHANGE_TABLE, column("seq"), column("book_id"), column("op"))
+
+def create_change_log(engine: Engine) -> None:
+    """Create the change log and triggers; existing books are logged as upserts so since=0 replays the catalog"""
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": CHANGE_TABLE}
+        ).first()
+        for statement in CHANGE_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {CHANGE_TABLE}(book_id, op) SELECT id, '{UPSERT}' FROM books ORDER BY id"))
+
+class ChangeWatcher:
+    """Wakes change-feed waiters on the event loop when this process commits a write"""
+
+    def __init__(self):
+        # Bumped on the event loop for every local commit that wrote
+        self.version = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """Called after a commit, from any thread"""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wake)
+
+    def mark(self) -> int:
+        """Current version to wait on; call it before reading the log, on the event loop"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._event = loop, asyncio.Event()
+        return self.version
+
+    async def wait(self, version: int, timeout: float) -> None:
+        """Return once `version` (from mark) is outdated by a local commit, or after `timeout` seconds"""
+        if self.version != version:
+            return
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _wake(self) -> None:
+        self.version += 1
+        if self._event is not None:
+            self._event.set()
+            self._event = asyncio.Event()
+
+# Create the watcher shared by long-poll and SSE consumers
+change_watcher = ChangeWatcher()
+on_write_commit(change_watcher.notify)
@@ -0,0 +1,261 @@
+import gzip
+import zlib
+from typing import Dict, Iterable, Mapping, Optional
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .config import settings
+
+try:
+    import brotli  # optional dependency
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard  # optional dependency
+except ImportError:
+    zstandard = None
+
+# Level per codec for each profile: "fast" for streamed exports (compressed on every download),
+# "default" for computed responses, "best" for bodies compressed once and kept in the response cache
+PROFILES: Dict[str, Dict[str, int]] = {
+    "fast": {"zstd": 1, "br": 1, "gzip": 1},
+    "default": {"zstd": 3, "br": 4, "gzip": 6},
+    "best": {"zstd": 19, "br": 11, "gzip": 9},
+}
+
+# Profile by route template (None leaves the route alone); other routes use COMPRESSION_PROFILE
+ROUTE_PROFILES: Dict[str, Optional[str]] = {
+    "/books/export": "fast",
+    # Every event would wait for the compressor's next flush
+    "/books/changes/stream": None,
+}
+
+CACHE_PROFILE = "best"
+
+# Content types worth compressing (text/event-stream is excluded for the same reason as above)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+class GzipCodec:
+    """gzip through the standard library"""
+    name = "gzip"
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    def stream(self, level: int) -> "GzipStream":
+        return GzipStream(level)
+
+class GzipStream:
+    """Incremental gzip; each write is flushed so the client can decode it at once"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+class BrotliCodec:
+    """Brotli (br) through the brotli package"""
+    name = "br"
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return brotli.compress(data, quality=level)
+
+    def stream(self, level: int) -> "BrotliStream":
+        return BrotliStream(level)
+
+class BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def close(self) -> bytes:
+        return self._compressor.finish()
+
+class ZstdCodec:
+    """Zstandard (zstd) through the zstandard package"""
+    name = "zstd"
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def stream(self, level: int) -> "ZstdStream":
+        return ZstdStream(level)
+
+class ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def write(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def close(self) -> bytes:
+        return self._compressor.flush()
+
+def available_codecs() -> Dict[str, object]:
+    """Every codec whose module is installed"""
+    codecs = {"gzip": GzipCodec()}
+    if brotli is not None:
+        codecs["br"] = BrotliCodec()
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCodec()
+    return codecs
+
+def create_codecs(encodings: str) -> Dict[str, object]:
+    """Installed codecs named in COMPRESSION_ENCODINGS, in order of preference"""
+    installed = available_codecs()
+    names = [name.strip().lower() for name in encodings.split(",") if name.strip()]
+    return {name: installed[name] for name in names if name in installed}
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+def negotiate(header: Optional[str], encodings: Iterable[str]) -> Optional[str]:
+    """The client's best accepted coding among `encodings` (ties go to the earlier one); None for identity"""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    # An explicit identity preferred over every coding wins
+    if best is not None and accepted.get("identity", 0.0) > best_quality:
+        return None
+    return best
+
+def weak_etag(etag: str) -> str:
+    """The ETag of an encoded representation: weak, since each coding has different bytes (RFC 9110 8.8.3)"""
+    # Weak comparison still matches it against If-None-Match sent with either form
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """Every enabled coding of a body about to be cached (empty below COMPRESSION_MIN_SIZE)"""
+    if not settings.compression or len(body) < settings.compression_min_size:
+        return {}
+    return {name: codec.compress(body, PROFILES[CACHE_PROFILE][name]) for name, codec in codecs.items()}
+
+def precompressed_response(request: Request, body: bytes, variants: Mapping[str, bytes], headers: Dict[str, str]) -> Response:
+    """A cached JSON body, or the variant cached for the client's best accepted coding, sent as is"""
+    if variants and settings.compression:
+        headers = {**headers, "Vary": "Accept-Encoding"}
+        # Variants may come from another worker (shared cache) with more codecs installed
+        encoding = negotiate(request.headers.get("accept-encoding"), variants)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            if "ETag" in headers:
+                headers["ETag"] = weak_etag(headers["ETag"])
+            body = variants[encoding]
+    return Response(content=body, media_type="application/json", headers=headers)
+
+class CompressionMiddleware:
+    """Compress responses above a size threshold with the client's best accepted coding"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codecs: Mapping[str, object],
+        minimum_size: int = 1024,
+        profile: str = "default",
+        route_profiles: Mapping[str, Optional[str]] = ROUTE_PROFILES,
+    ):
+        self.app = app
+        self.codecs = codecs
+        self.minimum_size = minimum_size
+        self.profile = profile
+        self.route_profiles = route_profiles
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.codecs:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.codecs)
+        start: Optional[Message] = None
+        stream = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, stream, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body message shows whether the response is streamed
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if stream is not None:
+                data = stream.write(body) if body else b""
+                if not more_body:
+                    data += stream.close()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(scope=start)
+            profile = self.route_profile(scope)
+            compressible = profile is not None and self.is_compressible(start["status"], headers)
+            if compressible and "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if not compressible or encoding is None or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            codec = self.codecs[encoding]
+            level = PROFILES[profile][encoding]
+            headers["Content-Encoding"] = encoding
+            if "etag" in headers:
+                headers["ETag"] = weak_etag(headers["etag"])
+            if more_body:
+                # Streamed (exports): compress chunk by chunk, each one flushed as it is sent
+                del headers["Content-Length"]
+                stream = codec.stream(level)
+                body = stream.write(body)
+            else:
+                body = codec.compress(body, level)
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def route_profile(self, scope: Scope) -> Optional[str]:
+        path = getattr(scope.get("route"), "path", None)
+        return self.route_profiles[path] if path in self.route_profiles else self.profile
+
+    def is_compressible(self, status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+
+# Codecs enabled by COMPRESSION_ENCODINGS, in order of preference
+codecs = create_codecs(settings.compression_encodings)
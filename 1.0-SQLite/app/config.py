@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,11 +12,102 @@ class Settings(BaseSettings):
     
     # Database Configuration
     db_name: str = os.getenv("DB_NAME", "bookstore.db")
+    # Per-engine pool size (serve.py derives both from --db-connections)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    
+    # Use the async engine (aiosqlite) and async handlers for the core book routes
+    async_db: bool = os.getenv("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+    
+    # Production profile: WAL and tuned pragmas, a read-only pool for reads and a single
+    # group-committing writer for POST/PUT/DELETE /books
+    sqlite_production: bool = os.getenv("SQLITE_PRODUCTION", "false").lower() in ("1", "true", "yes")
+    sqlite_busy_timeout_ms: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    sqlite_cache_size_kib: int = int(os.getenv("SQLITE_CACHE_SIZE_KIB", "65536"))
+    sqlite_mmap_size: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    sqlite_read_pool_size: int = int(os.getenv("SQLITE_READ_POOL_SIZE", "10"))
+    sqlite_read_max_overflow: int = int(os.getenv("SQLITE_READ_MAX_OVERFLOW", os.getenv("SQLITE_READ_POOL_SIZE", "10")))
+    # The writer uses one connection; bulk routes open up to this many more on the write engine
+    sqlite_write_max_overflow: int = int(os.getenv("SQLITE_WRITE_MAX_OVERFLOW", "4"))
+    sqlite_writer_max_batch: int = int(os.getenv("SQLITE_WRITER_MAX_BATCH", "256"))
+    
+    # Write-behind POST /books: creates are queued and inserted together, one multi-row INSERT and one
+    # commit every WRITE_BEHIND_MAX_ROWS rows or WRITE_BEHIND_MAX_DELAY_MS; each request is answered
+    # after its batch commits. A full queue (WRITE_BEHIND_QUEUE_SIZE) makes requests wait for room up
+    # to WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS, then answers 503
+    write_behind: bool = os.getenv("WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+    write_behind_max_rows: int = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "500"))
+    write_behind_max_delay_ms: float = float(os.getenv("WRITE_BEHIND_MAX_DELAY_MS", "5"))
+    write_behind_queue_size: int = int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "10000"))
+    write_behind_queue_timeout_seconds: float = float(os.getenv("WRITE_BEHIND_QUEUE_TIMEOUT_SECONDS", "1"))
+    
+    # Response Cache (memory, redis or none)
+    cache_backend: str = os.getenv("CACHE_BACKEND", "memory")
+    cache_max_entries: int = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+    cache_max_bytes: int = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    cache_ttl_seconds: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+    redis_url: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Cross-worker cache invalidation (none, socket for same-host workers, redis, or memory for tests);
+    # serve.py selects socket with a private directory when it runs several workers
+    invalidation_bus: str = os.getenv("INVALIDATION_BUS", "none")
+    invalidation_socket_dir: str = os.getenv(
+        "INVALIDATION_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "bookstore-invalidation")
+    )
+    invalidation_channel: str = os.getenv("INVALIDATION_CHANNEL", "bookstore:invalidations")
+    
+    # Single-flight: identical concurrent reads share one query; waiters give up after the timeout
+    single_flight: bool = os.getenv("SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+    single_flight_timeout_seconds: float = float(os.getenv("SINGLE_FLIGHT_TIMEOUT_SECONDS", "5"))
+    
+    # /books/search backend: fts (SQLite FTS5, prefix matching) or trigram (in-memory, typo-tolerant)
+    search_backend: str = os.getenv("SEARCH_BACKEND", "fts")
+    # Share of the query's trigrams a book must contain, and how far back each sync re-reads updated_at
+    trigram_threshold: float = float(os.getenv("TRIGRAM_THRESHOLD", "0.3"))
+    trigram_sync_lag_seconds: float = float(os.getenv("TRIGRAM_SYNC_LAG_SECONDS", "2"))
+    
+    # Typeahead (GET /books/suggest): distinct values kept per field, and how far back each sync re-reads updated_at
+    suggest_max_values: int = int(os.getenv("SUGGEST_MAX_VALUES", "1000000"))
+    suggest_sync_lag_seconds: float = float(os.getenv("SUGGEST_SYNC_LAG_SECONDS", "2"))
+    
+    # Columnar in-memory snapshot serving GET /books and GET /books/facets (needs numpy),
+    # and the change log entries read per refresh
+    catalog_snapshot: bool = os.getenv("CATALOG_SNAPSHOT", "false").lower() in ("1", "true", "yes")
+    snapshot_refresh_batch: int = int(os.getenv("SNAPSHOT_REFRESH_BATCH", "10000"))
+    
+    # Change feed (GET /books/changes): longest long-poll wait, and how often waiting consumers
+    # re-read the log for writes from other workers (local writes wake them at once)
+    changes_max_wait_seconds: float = float(os.getenv("CHANGES_MAX_WAIT_SECONDS", "30"))
+    changes_poll_seconds: float = float(os.getenv("CHANGES_POLL_SECONDS", "1"))
     
     # Server Configuration
     port: int = int(os.getenv("PORT", "8000"))
     environment: str = os.getenv("ENVIRONMENT", "development")
     
+    # Bulk Operations
+    bulk_batch_size: int = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+    
+    # Batch get-by-ids (GET /books?ids=, POST /books/batch-get): ids per request and per IN query
+    batch_get_max_ids: int = int(os.getenv("BATCH_GET_MAX_IDS", "5000"))
+    batch_get_chunk_size: int = int(os.getenv("BATCH_GET_CHUNK_SIZE", "500"))
+    
+    # Response compression: codings in order of preference (br and zstd need the brotli and
+    # zstandard packages), smallest body worth compressing, and the level profile for routes
+    # without their own (fast, default or best; see compression.ROUTE_PROFILES)
+    compression: bool = os.getenv("COMPRESSION", "true").lower() in ("1", "true", "yes")
+    compression_encodings: str = os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    compression_profile: str = os.getenv("COMPRESSION_PROFILE", "default")
+    
+    # Request/SQL instrumentation (Server-Timing, JSON logs, /metrics)
+    instrumentation: bool = os.getenv("INSTRUMENTATION", "true").lower() in ("1", "true", "yes")
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    n_plus_one_threshold: int = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+    
+    # Readiness probe (background SELECT 1 served from cache by /readyz and /)
+    health_probe_interval: float = float(os.getenv("HEALTH_PROBE_INTERVAL", "5"))
+    health_probe_timeout: float = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+    
     # Application Configuration
     app_name: str = "FastAPI Book Management API"
     app_version: str = "1.0.0"
@@ -26,6 +118,10 @@ class Settings(BaseSettings):
     def database_url(self) -> str:
         return f"sqlite:///{self.db_name}"
     
+    @property
+    def async_database_url(self) -> str:
+        return f"sqlite+aiosqlite:///{self.db_name}"
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -1,7 +1,30 @@
-from sqlmodel import Session, select, or_
-from typing import List, Optional
+from sqlmodel import Session, and_, select, or_, delete, update, func
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .cache import invalidate_books
+from .changes import UPSERT, book_changes
+from .config import settings
+from .facets import FACET_COLUMNS, FACETS, TOTAL, facet_counts, facet_value
 from .models import Book
-from .schemas import BookCreate, BookUpdate
+from .filters import BookFilters
+from .pagination import decode_cursor, encode_cursor, parse_sort, seek_condition, sort_order
+from .schemas import BookBulkCreate, BookBulkUpdate, BookCreate, BookUpdate
+from .search import books_fts, build_match_query, fts_match
+from .serialization import BOOK_FIELDS
+from .snapshot import catalog_snapshot
+from .suggest import suggest_index
+from .trigram import search_index
+
+# Columns in BookResponse order, selected as plain tuples (no ORM identity map)
+BOOK_COLUMNS = (
+    Book.id, Book.title, Book.author, Book.published_year,
+    Book.genre, Book.created_at, Book.updated_at
+)
+COLUMNS_BY_FIELD = dict(zip(BOOK_FIELDS, BOOK_COLUMNS))
+# Columns GET /books/suggest completes
+SUGGEST_COLUMNS = {"title": Book.title, "author": Book.author}
 
 class BookCRUD:
     """CRUD operations for Book model"""
@@ -9,6 +32,16 @@ class BookCRUD:
     @staticmethod
     def create_book(db: Session, book_data: BookCreate) -> Book:
         """Create a new book"""
+        book = BookCRUD.add_book(db, book_data)
+        db.commit()
+        db.refresh(book)
+        # Other workers may still cache this id (SQLite reuses the highest id after a delete)
+        invalidate_books([book.id], book.updated_at)
+        return book
+    
+    @staticmethod
+    def add_book(db: Session, book_data: BookCreate) -> Book:
+        """Insert a book without committing (the caller owns the transaction)"""
         book = Book(
             title=book_data.title,
             author=book_data.author,
@@ -16,24 +49,165 @@ class BookCRUD:
             genre=book_data.genre
         )
         db.add(book)
-        db.commit()
-        db.refresh(book)
+        db.flush()
         return book
     
     @staticmethod
-    def get_books(db: Session, skip: int = 0, limit: int = 100) -> List[Book]:
+    def insert_books(db: Session, books: List[BookCreate]) -> List[tuple]:
+        """Insert books in one multi-row INSERT without committing; BOOK_COLUMNS rows in input order"""
+        now = datetime.now()
+        table = Book.__table__
+        rows = [{**book.model_dump(), "created_at": now, "updated_at": now} for book in books]
+        stmt = insert(table).returning(*(table.c[column.key] for column in BOOK_COLUMNS), sort_by_parameter_order=True)
+        return db.exec(stmt, params=rows).all()
+    
+    @staticmethod
+    def get_books(db: Session, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Book]:
         """Get all books with pagination"""
-        books = db.exec(select(Book).offset(skip).limit(limit)).all()
+        query = select(Book).order_by(*BookCRUD._sort_order(sort)).offset(skip).limit(limit)
+        books = db.exec(query).all()
         return books
     
+    @staticmethod
+    def get_books_page(
+        db: Session, cursor: str = "", limit: int = 100, sort: str = "id"
+    ) -> Tuple[List[Book], Optional[str]]:
+        """Get a page of books after `cursor` using an index seek (keyset pagination)"""
+        books = db.exec(BookCRUD._page_query(cursor, limit, sort)).all()
+        return BookCRUD._page_result(books, limit, sort)
+    
+    @staticmethod
+    def get_book_rows(
+        db: Session, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> List[tuple]:
+        """Like get_books, but as column tuples (`fields` first) for the fast serialization path"""
+        if catalog_snapshot is not None:
+            BookCRUD.sync_catalog_snapshot(db)
+            return catalog_snapshot.rows(fields, sort, filters, skip, limit)
+        query = (
+            select(*BookCRUD._columns(fields, sort))
+            .where(*filters.conditions())
+            .order_by(*BookCRUD._sort_order(sort))
+            .offset(skip)
+            .limit(limit)
+        )
+        return db.exec(query).all()
+    
+    @staticmethod
+    def get_book_rows_page(
+        db: Session, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> Tuple[List[tuple], Optional[str]]:
+        """Like get_books_page, but as column tuples (`fields` first)"""
+        if catalog_snapshot is not None:
+            BookCRUD.sync_catalog_snapshot(db)
+            rows = catalog_snapshot.rows(fields, sort, filters, limit=limit + 1, position=decode_cursor(cursor, sort))
+            return BookCRUD._page_result(rows, limit, sort)
+        query = BookCRUD._page_query(cursor, limit, sort, BookCRUD._columns(fields, sort), filters)
+        rows = db.exec(query).all()
+        return BookCRUD._page_result(rows, limit, sort)
+    
+    @staticmethod
+    def sync_catalog_snapshot(db: Session) -> int:
+        """Load the columnar snapshot, or apply books written since its change log position (by any process)"""
+        if not catalog_snapshot.loaded:
+            # The log position is read first: changes racing the load are applied again, which is harmless
+            seq = db.exec(select(func.coalesce(func.max(book_changes.c.seq), 0))).one()
+            return catalog_snapshot.load((row for rows in BookCRUD.iter_book_rows(db, 10000) for row in rows), seq)
+        changed = 0
+        while True:
+            since = catalog_snapshot.seq
+            batch = BookCRUD.get_changes(db, since, settings.snapshot_refresh_batch)
+            changed += catalog_snapshot.apply(batch["changes"], since, batch["next_since"])
+            if not batch["has_more"]:
+                return changed
+    
+    @staticmethod
+    def _columns(fields: Sequence[str], sort: str) -> tuple:
+        """Columns for `fields`, followed by any sort keys the next cursor needs"""
+        names = list(fields) + [key.name for key in parse_sort(sort) if key.name not in fields]
+        return tuple(COLUMNS_BY_FIELD[name] for name in names)
+    
+    @staticmethod
+    def iter_book_rows(db: Session, batch_size: int = 1000) -> Iterator[Sequence[tuple]]:
+        """Stream every book as column tuples, `batch_size` rows at a time"""
+        query = select(*BOOK_COLUMNS).order_by(Book.id).execution_options(yield_per=batch_size)
+        yield from db.exec(query).partitions()
+    
+    @staticmethod
+    def _page_query(
+        cursor: str, limit: int, sort: str, columns: tuple = (Book,), filters: BookFilters = BookFilters()
+    ):
+        """Keyset query for the page after `cursor`"""
+        query = select(*columns).where(*filters.conditions())
+        position = decode_cursor(cursor, sort)
+        if position is not None:
+            query = query.where(seek_condition(sort, position))
+        # Fetch one extra row to know whether another page exists
+        return query.order_by(*BookCRUD._sort_order(sort)).limit(limit + 1)
+    
+    @staticmethod
+    def _page_result(books: Sequence[Book], limit: int, sort: str) -> Tuple[List[Book], Optional[str]]:
+        """Trim the extra row fetched by _page_query and derive next_cursor (books or rows)"""
+        if len(books) <= limit:
+            return list(books), None
+        books = books[:limit]
+        return list(books), encode_cursor(sort, books[-1])
+    
+    @staticmethod
+    def _sort_order(sort: str):
+        """ORDER BY columns for a sort expression, always ending with the primary key"""
+        return sort_order(sort)
+    
     @staticmethod
     def get_book(db: Session, book_id: int) -> Optional[Book]:
         """Get a book by ID"""
         return db.get(Book, book_id)
     
+    @staticmethod
+    def get_book_rows_by_ids(db: Session, ids: Sequence[int]) -> List[tuple]:
+        """BOOK_COLUMNS tuples for `ids` in no particular order, one IN query per chunk"""
+        rows = []
+        for query in BookCRUD._ids_queries(ids):
+            rows.extend(db.exec(query).all())
+        return rows
+    
+    @staticmethod
+    def _ids_queries(ids: Sequence[int]) -> List:
+        """Primary key lookups, chunked to stay well under SQLite's bound parameter limit"""
+        size = settings.batch_get_chunk_size
+        return [
+            select(*BOOK_COLUMNS).where(Book.id.in_(ids[start:start + size]))
+            for start in range(0, len(ids), size)
+        ]
+    
+    @staticmethod
+    def get_book_version(db: Session, book_id: int) -> Optional[datetime]:
+        """Get a book's updated_at without loading the whole row"""
+        return db.exec(select(Book.updated_at).where(Book.id == book_id)).first()
+    
+    @staticmethod
+    def get_collection_version(db: Session) -> Tuple[int, Optional[datetime]]:
+        """Row count and latest updated_at, used as the collection version"""
+        count, latest = db.exec(select(func.count(Book.id), func.max(Book.updated_at))).one()
+        return count, latest
+    
     @staticmethod
     def update_book(db: Session, book_id: int, book_data: BookUpdate) -> Optional[Book]:
         """Update a book"""
+        book = BookCRUD.apply_book_update(db, book_id, book_data)
+        if not book:
+            return None
+        
+        db.commit()
+        db.refresh(book)
+        invalidate_books([book_id], book.updated_at)
+        return book
+    
+    @staticmethod
+    def apply_book_update(db: Session, book_id: int, book_data: BookUpdate) -> Optional[Book]:
+        """Update a book without committing; the caller commits and invalidates the cache"""
         book = db.get(Book, book_id)
         if not book:
             return None
@@ -43,34 +217,345 @@ class BookCRUD:
         for field, value in update_data.items():
             setattr(book, field, value)
         
-        db.commit()
-        db.refresh(book)
+        db.flush()
         return book
     
     @staticmethod
     def delete_book(db: Session, book_id: int) -> Optional[Book]:
         """Delete a book"""
+        book = BookCRUD.remove_book(db, book_id)
+        if not book:
+            return None
+        
+        db.commit()
+        invalidate_books([book_id], book.updated_at, deleted=True)
+        return book
+    
+    @staticmethod
+    def remove_book(db: Session, book_id: int) -> Optional[Book]:
+        """Delete a book without committing; the caller commits and invalidates the cache"""
         book = db.get(Book, book_id)
         if not book:
             return None
         
         db.delete(book)
-        db.commit()
+        db.flush()
         return book
     
     @staticmethod
-    def search_books(db: Session, search_term: str) -> List[Book]:
-        """Search books by term"""
-        query = select(Book).where(
-            or_(
-                Book.title.ilike(f"%{search_term}%"),
-                Book.author.ilike(f"%{search_term}%"),
-                Book.genre.ilike(f"%{search_term}%"),
-                Book.published_year.ilike(f"%{search_term}%")
-            )
-        )
-        books = db.exec(query).all()
+    def bulk_create_books(db: Session, items: List[BookBulkCreate]) -> List[Tuple[str, Optional[int]]]:
+        """Insert a batch of books in one transaction; items with an id are upserted"""
+        now = datetime.now()
+        table = Book.__table__
+        outcomes: List[Tuple[str, Optional[int]]] = [None] * len(items)
+        new_rows, new_positions, upsert_rows, upsert_positions = [], [], [], []
+        for position, item in enumerate(items):
+            row = item.model_dump(exclude={"id"})
+            row.update(created_at=now, updated_at=now)
+            if item.id is None:
+                new_rows.append(row)
+                new_positions.append(position)
+            else:
+                row["id"] = item.id
+                upsert_rows.append(row)
+                upsert_positions.append(position)
+        try:
+            if new_rows:
+                # executemany with RETURNING is sent as multi-row INSERT ... VALUES batches
+                stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+                ids = db.exec(stmt, params=new_rows).scalars().all()
+                for position, book_id in zip(new_positions, ids):
+                    outcomes[position] = ("created", book_id)
+            if upsert_rows:
+                stmt = sqlite_insert(table)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[table.c.id],
+                    set_={
+                        name: stmt.excluded[name]
+                        for name in ("title", "author", "published_year", "genre", "updated_at")
+                    }
+                )
+                db.exec(stmt, params=upsert_rows)
+                for position, row in zip(upsert_positions, upsert_rows):
+                    outcomes[position] = ("upserted", row["id"])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        if upsert_rows:
+            invalidate_books((row["id"] for row in upsert_rows), now)
+        return outcomes
+    
+    @staticmethod
+    def bulk_update_books(db: Session, items: List[BookBulkUpdate]) -> List[Tuple[str, Optional[int]]]:
+        """Partially update a batch of books by primary key in one transaction"""
+        now = datetime.now()
+        try:
+            existing = BookCRUD._existing_ids(db, [item.id for item in items])
+            rows = [
+                {**item.model_dump(exclude_unset=True), "id": item.id, "updated_at": now}
+                for item in items if item.id in existing
+            ]
+            if rows:
+                # ORM bulk UPDATE by primary key, executemany per distinct column set
+                db.exec(update(Book), params=rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        invalidate_books(existing, now)
+        return [("updated" if item.id in existing else "not_found", item.id) for item in items]
+    
+    @staticmethod
+    def bulk_delete_books(db: Session, book_ids: List[int]) -> List[Tuple[str, Optional[int]]]:
+        """Delete a batch of books by id in one transaction"""
+        try:
+            existing = BookCRUD._existing_ids(db, book_ids)
+            if existing:
+                db.exec(delete(Book).where(Book.id.in_(existing)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        # Every deleted row's updated_at is older than the time of the delete
+        invalidate_books(existing, datetime.now(), deleted=True)
+        return [("deleted" if book_id in existing else "not_found", book_id) for book_id in book_ids]
+    
+    @staticmethod
+    def _existing_ids(db: Session, book_ids: List[int]) -> set:
+        """Subset of `book_ids` present in the table"""
+        return set(db.exec(select(Book.id).where(Book.id.in_(set(book_ids)))).all())
+    
+    @staticmethod
+    def search_books(db: Session, search_term: str, limit: int = 100) -> List[Book]:
+        """Search books by term using the FTS5 index, best matches first"""
+        books = db.exec(BookCRUD._search_query(search_term, limit)).all()
+        return books
+    
+    @staticmethod
+    def search_book_rows(db: Session, search_term: str, limit: int = 100) -> List[tuple]:
+        """Like search_books, but as BOOK_COLUMNS tuples (from the trigram index when it is the search backend)"""
+        if settings.search_backend == "trigram":
+            return BookCRUD.fuzzy_search_book_rows(db, search_term, limit)
+        return db.exec(BookCRUD._search_query(search_term, limit, BOOK_COLUMNS)).all()
+    
+    @staticmethod
+    def fuzzy_search_book_rows(db: Session, search_term: str, limit: int = 100) -> List[tuple]:
+        """Typo-tolerant search through the in-memory trigram index, best matches first"""
+        BookCRUD.sync_search_index(db)
+        rows: List[tuple] = []
+        ids = search_index.search(search_term, limit)
+        while ids:
+            found = BookCRUD._ranked_rows(ids, BookCRUD.get_book_rows_by_ids(db, ids))
+            rows.extend(found)
+            if len(found) == len(ids):
+                break
+            # Deleted books just left the index, so the next ranks move up
+            ids = search_index.search(search_term, limit)[len(rows):]
+        return rows
+    
+    @staticmethod
+    def sync_search_index(db: Session) -> int:
+        """Feed books written since the last sync (by any process) into the trigram index"""
+        query = BookCRUD._changed_query(search_index.since())
+        return search_index.apply(db.exec(query.execution_options(yield_per=5000)))
+    
+    @staticmethod
+    def _changed_query(since: Optional[datetime]):
+        """Searchable columns of books written at or after `since` (all books when None)"""
+        query = select(Book.id, Book.title, Book.author, Book.genre, Book.updated_at)
+        return query if since is None else query.where(Book.updated_at >= since)
+    
+    @staticmethod
+    def suggest(db: Session, field: str, prefix: str, limit: int = 10) -> List[str]:
+        """Newest distinct `field` values starting with `prefix`, from the prefix index"""
+        BookCRUD.sync_suggest_index(db)
+        column = SUGGEST_COLUMNS[field]
+        values = suggest_index.top(field, prefix, limit)
+        while values:
+            # One indexed IN lookup confirms some book still has each value
+            present = set(db.exec(select(column).where(column.in_(values)).distinct()).all())
+            if len(present) == len(values):
+                break
+            suggest_index.remove(field, (value for value in values if value not in present))
+            values = suggest_index.top(field, prefix, limit)
+        return values
+    
+    @staticmethod
+    def sync_suggest_index(db: Session) -> int:
+        """Feed titles and authors written since the last sync (by any process) into the prefix index"""
+        query = BookCRUD._suggest_query(suggest_index.since())
+        return suggest_index.apply(db.exec(query.execution_options(yield_per=5000)))
+    
+    @staticmethod
+    def _suggest_query(since: Optional[datetime]):
+        """(title, author, updated_at) of books written at or after `since` (all books when None)"""
+        query = select(Book.title, Book.author, Book.updated_at)
+        return query if since is None else query.where(Book.updated_at >= since)
+    
+    @staticmethod
+    def _ranked_rows(ids: Sequence[int], rows: Sequence[tuple]) -> List[tuple]:
+        """Rows in ranked id order; ids without a row were deleted and are removed from the index"""
+        by_id = {row.id: row for row in rows}
+        search_index.remove(book_id for book_id in ids if book_id not in by_id)
+        return [by_id[book_id] for book_id in ids if book_id in by_id]
+    
+    @staticmethod
+    def scan_books(db: Session, search_term: str, limit: int = 100) -> List[Book]:
+        """Search books by substring (full table scan, used as a fallback)"""
+        books = db.exec(BookCRUD._scan_query(search_term, limit)).all()
         return books
+    
+    @staticmethod
+    def _search_query(search_term: str, limit: int, columns: tuple = (Book,)):
+        """FTS5 query for a search term, or a substring scan when it has no tokens"""
+        match_query = build_match_query(search_term)
+        if match_query is None:
+            return BookCRUD._scan_query(search_term, limit, columns)
+        return (
+            select(*columns)
+            .join(books_fts, books_fts.c.rowid == Book.id)
+            .where(fts_match.op("MATCH")(match_query))
+            .order_by(books_fts.c.rank)
+            .limit(limit)
+        )
+    
+    @staticmethod
+    def _scan_query(search_term: str, limit: int, columns: tuple = (Book,)):
+        """Substring query across title, author, genre and year"""
+        return select(*columns).where(BookCRUD._scan_condition(search_term)).limit(limit)
+    
+    @staticmethod
+    def _scan_condition(search_term: str):
+        """Substring match across title, author, genre and year"""
+        return or_(
+            Book.title.ilike(f"%{search_term}%"),
+            Book.author.ilike(f"%{search_term}%"),
+            Book.genre.ilike(f"%{search_term}%"),
+            Book.published_year.ilike(f"%{search_term}%")
+        )
+    
+    @staticmethod
+    def _search_condition(search_term: str):
+        """Books matching a search term as a WHERE clause (FTS5, or a substring scan without tokens)"""
+        match_query = build_match_query(search_term)
+        if match_query is None:
+            return BookCRUD._scan_condition(search_term)
+        return Book.id.in_(select(books_fts.c.rowid).where(fts_match.op("MATCH")(match_query)))
+    
+    @staticmethod
+    def get_changes(db: Session, since: int, limit: int = 1000) -> Dict[str, object]:
+        """Up to `limit` change log rows after `since`, each book once at its latest seq (upserts with the current row)"""
+        log = db.exec(
+            select(book_changes.c.seq, book_changes.c.book_id, book_changes.c.op)
+            .where(book_changes.c.seq > since)
+            .order_by(book_changes.c.seq)
+            .limit(limit)
+        ).all()
+        latest = {book_id: (seq, op) for seq, book_id, op in log}
+        upserts = [book_id for book_id, (_, op) in latest.items() if op == UPSERT]
+        rows = {row.id: row for row in BookCRUD.get_book_rows_by_ids(db, upserts)}
+        changes = []
+        for book_id, (seq, op) in sorted(latest.items(), key=lambda item: item[1][0]):
+            if op == UPSERT:
+                row = rows.get(book_id)
+                if row is None:
+                    # Deleted after this batch was read; a later change reports it
+                    continue
+                changes.append({"seq": seq, "op": op, "id": book_id, "book": dict(zip(BOOK_FIELDS, row))})
+            else:
+                changes.append({"seq": seq, "op": op, "id": book_id, "book": None})
+        return {
+            "changes": changes,
+            "next_since": log[-1].seq if log else since,
+            "has_more": len(log) == limit,
+        }
+    
+    @staticmethod
+    def get_facets(
+        db: Session, facets: Sequence[str] = FACETS, limit: int = 20, search_term: Optional[str] = None,
+        filters: BookFilters = BookFilters()
+    ) -> Dict[str, object]:
+        """Most common values per facet with their book counts, optionally within filtered or search results"""
+        if catalog_snapshot is not None and search_term is None:
+            BookCRUD.sync_catalog_snapshot(db)
+            return catalog_snapshot.facets(facets, limit, filters)
+        conditions = filters.conditions()
+        if search_term is None and not conditions:
+            # Read the trigger-maintained counters: O(#values), independent of the number of books
+            total = db.exec(select(facet_counts.c.book_count).where(facet_counts.c.facet == TOTAL)).first() or 0
+            queries = {
+                name: select(facet_counts.c.value, facet_counts.c.book_count)
+                .where(facet_counts.c.facet == name)
+                .order_by(facet_counts.c.book_count.desc(), facet_counts.c.value)
+                .limit(limit)
+                for name in facets
+            }
+        else:
+            # Search results have no counters; group the matching rows instead
+            if search_term is not None:
+                conditions.append(BookCRUD._search_condition(search_term))
+            condition = and_(*conditions)
+            total = db.exec(select(func.count()).select_from(Book).where(condition)).one()
+            queries = {
+                name: BookCRUD._group_query(FACET_COLUMNS[name], condition).limit(limit)
+                for name in facets
+            }
+        return {
+            "total": total,
+            "facets": {
+                name: [{"value": facet_value(name, value), "count": count} for value, count in db.exec(query)]
+                for name, query in queries.items()
+            },
+        }
+    
+    @staticmethod
+    def _group_query(expression, condition):
+        """Book counts per non-null value of `expression` among rows matching `condition`"""
+        count = func.count()
+        return (
+            select(expression, count)
+            .where(condition, expression.is_not(None))
+            .group_by(expression)
+            .order_by(count.desc(), expression)
+        )
+    
+    @staticmethod
+    def get_stats(db: Session, search_term: Optional[str] = None) -> Dict[str, object]:
+        """Book count, distinct and missing values per facet and the publication year range"""
+        if search_term is None:
+            # Counters give the per-facet figures; each year bound is a single index seek
+            counters = db.exec(
+                select(facet_counts.c.facet, func.count(), func.sum(facet_counts.c.book_count))
+                .group_by(facet_counts.c.facet)
+            ).all()
+            sums = {facet: (values, books) for facet, values, books in counters}
+            total = sums.get(TOTAL, (0, 0))[1]
+            distinct = {name: sums.get(name, (0, 0))[0] for name in FACETS}
+            counted = {name: sums.get(name, (0, 0))[1] for name in FACETS}
+            earliest = db.exec(select(func.min(Book.published_year))).one()
+            latest = db.exec(select(func.max(Book.published_year))).one()
+        else:
+            condition = BookCRUD._search_condition(search_term)
+            row = db.exec(
+                select(
+                    func.count(),
+                    *(func.count(func.distinct(FACET_COLUMNS[name])) for name in FACETS),
+                    *(func.count(FACET_COLUMNS[name]) for name in FACETS),
+                    func.min(Book.published_year),
+                    func.max(Book.published_year),
+                ).where(condition)
+            ).one()
+            total, earliest, latest = row[0], row[-2], row[-1]
+            distinct = dict(zip(FACETS, row[1:1 + len(FACETS)]))
+            counted = dict(zip(FACETS, row[1 + len(FACETS):1 + 2 * len(FACETS)]))
+        return {
+            "total": total,
+            "distinct": distinct,
+            "missing": {name: total - counted[name] for name in FACETS},
+            "earliest_year": earliest,
+            "latest_year": latest,
+        }
 
 # Create CRUD instance
 book_crud = BookCRUD() 
\ No newline at end of file
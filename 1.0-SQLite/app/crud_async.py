@@ -0,0 +1,175 @@
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import select, func
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from .cache import invalidate_books
+from .config import settings
+from .crud import BOOK_COLUMNS, SUGGEST_COLUMNS, BookCRUD
+from .filters import BookFilters
+from .models import Book
+from .schemas import BookCreate, BookUpdate
+from .pagination import decode_cursor
+from .serialization import BOOK_FIELDS
+from .snapshot import catalog_snapshot
+from .suggest import suggest_index
+from .trigram import search_index
+
+class AsyncBookCRUD:
+    """Async CRUD operations for Book model (same queries as BookCRUD)"""
+
+    @staticmethod
+    async def create_book(db: AsyncSession, book_data: BookCreate) -> Book:
+        """Create a new book"""
+        book = Book(**book_data.model_dump())
+        db.add(book)
+        await db.commit()
+        await db.refresh(book)
+        # Other workers may still cache this id (SQLite reuses the highest id after a delete)
+        invalidate_books([book.id], book.updated_at)
+        return book
+
+    @staticmethod
+    async def get_books(db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id") -> List[Book]:
+        """Get all books with pagination"""
+        query = select(Book).order_by(*BookCRUD._sort_order(sort)).offset(skip).limit(limit)
+        books = (await db.exec(query)).all()
+        return books
+
+    @staticmethod
+    async def get_books_page(
+        db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id"
+    ) -> Tuple[List[Book], Optional[str]]:
+        """Get a page of books after `cursor` using an index seek (keyset pagination)"""
+        books = (await db.exec(BookCRUD._page_query(cursor, limit, sort))).all()
+        return BookCRUD._page_result(books, limit, sort)
+
+    @staticmethod
+    async def get_book_rows(
+        db: AsyncSession, skip: int = 0, limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> List[tuple]:
+        """Like get_books, but as column tuples (`fields` first) for the fast serialization path"""
+        if catalog_snapshot is not None:
+            await db.run_sync(BookCRUD.sync_catalog_snapshot)
+            return catalog_snapshot.rows(fields, sort, filters, skip, limit)
+        query = (
+            select(*BookCRUD._columns(fields, sort))
+            .where(*filters.conditions())
+            .order_by(*BookCRUD._sort_order(sort))
+            .offset(skip)
+            .limit(limit)
+        )
+        return (await db.exec(query)).all()
+
+    @staticmethod
+    async def get_book_rows_page(
+        db: AsyncSession, cursor: str = "", limit: int = 100, sort: str = "id",
+        filters: BookFilters = BookFilters(), fields: Sequence[str] = BOOK_FIELDS
+    ) -> Tuple[List[tuple], Optional[str]]:
+        """Like get_books_page, but as column tuples (`fields` first)"""
+        if catalog_snapshot is not None:
+            await db.run_sync(BookCRUD.sync_catalog_snapshot)
+            rows = catalog_snapshot.rows(fields, sort, filters, limit=limit + 1, position=decode_cursor(cursor, sort))
+            return BookCRUD._page_result(rows, limit, sort)
+        query = BookCRUD._page_query(cursor, limit, sort, BookCRUD._columns(fields, sort), filters)
+        rows = (await db.exec(query)).all()
+        return BookCRUD._page_result(rows, limit, sort)
+
+    @staticmethod
+    async def get_book(db: AsyncSession, book_id: int) -> Optional[Book]:
+        """Get a book by ID"""
+        return await db.get(Book, book_id)
+
+    @staticmethod
+    async def get_book_rows_by_ids(db: AsyncSession, ids: Sequence[int]) -> List[tuple]:
+        """BOOK_COLUMNS tuples for `ids` in no particular order, one IN query per chunk"""
+        rows = []
+        for query in BookCRUD._ids_queries(ids):
+            rows.extend((await db.exec(query)).all())
+        return rows
+
+    @staticmethod
+    async def get_book_version(db: AsyncSession, book_id: int) -> Optional[datetime]:
+        """Get a book's updated_at without loading the whole row"""
+        return (await db.exec(select(Book.updated_at).where(Book.id == book_id))).first()
+
+    @staticmethod
+    async def get_collection_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """Row count and latest updated_at, used as the collection version"""
+        count, latest = (await db.exec(select(func.count(Book.id), func.max(Book.updated_at)))).one()
+        return count, latest
+
+    @staticmethod
+    async def update_book(db: AsyncSession, book_id: int, book_data: BookUpdate) -> Optional[Book]:
+        """Update a book"""
+        book = await db.get(Book, book_id)
+        if not book:
+            return None
+
+        # Update only provided fields
+        update_data = book_data.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            setattr(book, field, value)
+
+        await db.commit()
+        await db.refresh(book)
+        invalidate_books([book_id], book.updated_at)
+        return book
+
+    @staticmethod
+    async def delete_book(db: AsyncSession, book_id: int) -> Optional[Book]:
+        """Delete a book"""
+        book = await db.get(Book, book_id)
+        if not book:
+            return None
+
+        await db.delete(book)
+        await db.commit()
+        invalidate_books([book_id], book.updated_at, deleted=True)
+        return book
+
+    @staticmethod
+    async def search_books(db: AsyncSession, search_term: str, limit: int = 100) -> List[Book]:
+        """Search books by term using the FTS5 index, best matches first"""
+        books = (await db.exec(BookCRUD._search_query(search_term, limit))).all()
+        return books
+
+    @staticmethod
+    async def search_book_rows(db: AsyncSession, search_term: str, limit: int = 100) -> List[tuple]:
+        """Like search_books, but as BOOK_COLUMNS tuples (from the trigram index when it is the search backend)"""
+        if settings.search_backend == "trigram":
+            return await AsyncBookCRUD.fuzzy_search_book_rows(db, search_term, limit)
+        query = BookCRUD._search_query(search_term, limit, BOOK_COLUMNS)
+        return (await db.exec(query)).all()
+
+    @staticmethod
+    async def fuzzy_search_book_rows(db: AsyncSession, search_term: str, limit: int = 100) -> List[tuple]:
+        """Typo-tolerant search through the in-memory trigram index, best matches first"""
+        search_index.apply((await db.exec(BookCRUD._changed_query(search_index.since()))).all())
+        rows: List[tuple] = []
+        ids = search_index.search(search_term, limit)
+        while ids:
+            found = BookCRUD._ranked_rows(ids, await AsyncBookCRUD.get_book_rows_by_ids(db, ids))
+            rows.extend(found)
+            if len(found) == len(ids):
+                break
+            # Deleted books just left the index, so the next ranks move up
+            ids = search_index.search(search_term, limit)[len(rows):]
+        return rows
+
+    @staticmethod
+    async def suggest(db: AsyncSession, field: str, prefix: str, limit: int = 10) -> List[str]:
+        """Newest distinct `field` values starting with `prefix`, from the prefix index"""
+        suggest_index.apply((await db.exec(BookCRUD._suggest_query(suggest_index.since()))).all())
+        column = SUGGEST_COLUMNS[field]
+        values = suggest_index.top(field, prefix, limit)
+        while values:
+            present = set((await db.exec(select(column).where(column.in_(values)).distinct())).all())
+            if len(present) == len(values):
+                break
+            suggest_index.remove(field, (value for value in values if value not in present))
+            values = suggest_index.top(field, prefix, limit)
+        return values
+
+# Create async CRUD instance
+async_book_crud = AsyncBookCRUD()
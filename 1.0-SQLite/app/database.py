@@ -1,24 +1,142 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from contextlib import asynccontextmanager
+from functools import partial
+from typing import List
+from .bus import invalidation_bus
+from .cache import book_cache, invalidate_books
 from .config import settings
+from .crud import book_crud
+from .models import Book
+from .schemas import BookCreate
+from .search import create_search_index
+from .facets import create_facet_counts
+from .changes import create_change_log
+from .probe import HealthProbe
+from .snapshot import catalog_snapshot
+from .pragmas import apply_pragmas, production_pragmas, use_immediate_transactions
+from .writer import BatchWriter, WriteQueue
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False}
-)
+# Create the async engine only when enabled, so sync-only deployments hold no second pool
+async_engine = create_async_engine(
+    settings.async_database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
+) if settings.async_db else None
+
+# The production profile gets a writer engine, a read pool and the single writer; otherwise one engine does it all
+db_writer = None
+
+if settings.sqlite_production:
+    pragmas = production_pragmas(
+        settings.sqlite_busy_timeout_ms, settings.sqlite_cache_size_kib, settings.sqlite_mmap_size
+    )
+    # A single writer needs only a small pool; WAL is persistent, so setting it here is enough
+    engine = create_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=settings.sqlite_write_max_overflow
+    )
+    apply_pragmas(engine, {"journal_mode": "WAL", **pragmas})
+    use_immediate_transactions(engine)
+    # WAL readers never block on the writer; query_only makes the pool read-only
+    read_engine = create_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=settings.sqlite_read_max_overflow
+    )
+    apply_pragmas(read_engine, {**pragmas, "query_only": "ON"})
+    if async_engine is not None:
+        apply_pragmas(async_engine.sync_engine, pragmas)
+    db_writer = WriteQueue(engine, max_batch=settings.sqlite_writer_max_batch)
+else:
+    # Create database engine
+    engine = create_engine(
+        settings.database_url,
+        connect_args={"check_same_thread": False},
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow
+    )
+    # Reads use the same engine
+    read_engine = engine
+
+def write_created_books(books: List[BookCreate]) -> List[tuple]:
+    """Insert and commit one write-behind batch (through the single writer in the production profile)"""
+    if db_writer is not None:
+        rows = db_writer.submit(partial(book_crud.insert_books, books=books)).result()
+    else:
+        with Session(engine) as session:
+            rows = book_crud.insert_books(session, books)
+            session.commit()
+    # Other workers may still cache these ids (SQLite reuses the highest id after a delete)
+    invalidate_books([row.id for row in rows], rows[0].updated_at)
+    return rows
+
+# Write-behind batcher for POST /books (its thread starts with the first create, in the worker)
+create_batcher = BatchWriter(
+    write_created_books,
+    max_rows=settings.write_behind_max_rows,
+    max_delay=settings.write_behind_max_delay_ms / 1000,
+    max_pending=settings.write_behind_queue_size,
+    queue_timeout=settings.write_behind_queue_timeout_seconds
+) if settings.write_behind else None
+
+# Background SELECT 1 whose cached result answers the health endpoints
+db_probe = HealthProbe(read_engine, interval=settings.health_probe_interval, timeout=settings.health_probe_timeout)
 
 def create_db_and_tables():
     """Create database and tables"""
     SQLModel.metadata.create_all(engine)
+    # create_all skips existing tables, so add indexes declared since they were created
+    for index in Book.__table__.indexes:
+        index.create(engine, checkfirst=True)
+    create_search_index(engine)
+    create_facet_counts(engine)
+    create_change_log(engine)
 
 def get_session():
     """Dependency to get database session"""
     with Session(engine) as session:
         yield session
 
+def get_read_session():
+    """Dependency to get a session for reads (the read-only pool in the production profile)"""
+    with Session(read_engine) as session:
+        yield session
+
+async def get_async_session():
+    """Dependency to get an async database session"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
 @asynccontextmanager
-async def lifespan():
+async def lifespan(app=None):
     """Application lifespan manager"""
     create_db_and_tables()
-    yield 
\ No newline at end of file
+    with Session(read_engine) as session:
+        # Build the in-memory indexes before serving, so no request pays for them
+        if settings.search_backend == "trigram":
+            book_crud.sync_search_index(session)
+        book_crud.sync_suggest_index(session)
+        if catalog_snapshot is not None:
+            book_crud.sync_catalog_snapshot(session)
+    await db_probe.start()
+    # Apply the other workers' writes to this worker's response cache
+    invalidation_bus.start(book_cache.invalidate)
+    yield
+    invalidation_bus.stop()
+    await db_probe.stop()
+    # Queued creates are written before the writer they may go through stops
+    if create_batcher is not None:
+        create_batcher.stop()
+    if db_writer is not None:
+        db_writer.stop()
+    # Close pooled connections on graceful shutdown
+    engine.dispose()
+    if read_engine is not engine:
+        read_engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose() 
\ No newline at end of file
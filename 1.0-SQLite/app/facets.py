@@ -0,0 +1,97 @@
+from typing import List
+from sqlalchemy import Engine, column, table, text
+from .models import Book
+
+# Grouped counts per facet value, kept current by triggers on `books` (like the FTS index),
+# so unfiltered facet and stats requests read O(#values) summary rows instead of every book.
+# NULL values are not counted; `total` holds the row count under the empty value.
+FACET_TABLE = "book_facet_counts"
+TOTAL = "total"
+
+# Facet name -> SQL expression over a books row (`{row}` is new or old inside the triggers)
+FACET_SQL = {
+    "genre": "{row}.genre",
+    "author": "{row}.author",
+    "decade": "{row}.published_year / 10 * 10",
+}
+
+# The same expressions for GROUP BY queries over a filtered set of books
+FACET_COLUMNS = {
+    "genre": Book.genre,
+    "author": Book.author,
+    "decade": (Book.published_year // 10 * 10).label("decade"),
+}
+
+FACETS = tuple(FACET_SQL)
+
+def _bump(row: str, delta: int) -> List[str]:
+    """Statements adding `delta` to the counters of one books row"""
+    values = [f"SELECT '{TOTAL}' AS facet, '' AS value"] + [
+        f"SELECT '{name}', {sql.format(row=row)}" for name, sql in FACET_SQL.items()
+    ]
+    statements = [
+        f"""
+        INSERT INTO {FACET_TABLE}(facet, value, book_count)
+        SELECT facet, value, {delta} FROM ({" UNION ALL ".join(values)}) WHERE value IS NOT NULL
+        ON CONFLICT(facet, value) DO UPDATE SET book_count = book_count + excluded.book_count;
+        """
+    ]
+    if delta < 0:
+        # Drop values no book has any more, so the table stays as small as the facet lists
+        matches = " OR ".join(
+            f"(facet = '{name}' AND value = {sql.format(row=row)})" for name, sql in FACET_SQL.items()
+        )
+        statements.append(f"DELETE FROM {FACET_TABLE} WHERE book_count <= 0 AND ({matches});")
+    return statements
+
+FACET_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {FACET_TABLE} (
+        facet TEXT NOT NULL,
+        value TEXT NOT NULL,
+        book_count INTEGER NOT NULL,
+        PRIMARY KEY (facet, value)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_facets_ai AFTER INSERT ON books BEGIN
+        {"".join(_bump("new", 1))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_facets_ad AFTER DELETE ON books BEGIN
+        {"".join(_bump("old", -1))}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_facets_au
+    AFTER UPDATE OF author, genre, published_year ON books BEGIN
+        {"".join(_bump("old", -1) + _bump("new", 1))}
+    END
+    """,
+]
+
+# Lightweight table construct used by BookCRUD.get_facets
+facet_counts = table(FACET_TABLE, column("facet"), column("value"), column("book_count"))
+
+def create_facet_counts(engine: Engine) -> None:
+    """Create the facet counter table and triggers, backfilling existing rows"""
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FACET_TABLE}
+        ).first()
+        for statement in FACET_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FACET_TABLE} SELECT '{TOTAL}', '', COUNT(*) FROM books"))
+            for name, sql in FACET_SQL.items():
+                expression = sql.format(row="books")
+                conn.execute(text(
+                    f"INSERT INTO {FACET_TABLE} SELECT '{name}', {expression}, COUNT(*) FROM books "
+                    f"WHERE {expression} IS NOT NULL GROUP BY {expression}"
+                ))
+
+def facet_value(facet: str, value) -> object:
+    """Counter values are stored as text; decades come back as integers"""
+    return int(value) if facet == "decade" and value is not None else value
@@ -0,0 +1,46 @@
+import time
+from typing import AsyncIterator, Dict
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+from .changes import change_watcher
+from .config import settings
+from .crud import book_crud
+from .database import read_engine
+from .serialization import encode_change
+
+# Seconds between SSE comment lines on an idle stream (keeps proxies from closing it)
+KEEPALIVE_SECONDS = 15
+
+def read_changes(since: int, limit: int) -> Dict[str, object]:
+    """One batch of the change feed, on its own read session (callers may outlive the request)"""
+    with Session(read_engine) as db:
+        return book_crud.get_changes(db, since, limit)
+
+async def wait_for_changes(since: int, limit: int, wait: float) -> Dict[str, object]:
+    """The next batch after `since`, waiting up to `wait` seconds for one (long-poll)"""
+    deadline = time.monotonic() + wait
+    while True:
+        version = change_watcher.mark()
+        batch = await run_in_threadpool(read_changes, since, limit)
+        remaining = deadline - time.monotonic()
+        # next_since also moves when every change read was superseded, which is progress too
+        if batch["next_since"] != since or remaining <= 0:
+            return batch
+        # Local commits wake the wait at once; other workers' are picked up by the re-read
+        await change_watcher.wait(version, min(remaining, settings.changes_poll_seconds))
+
+async def stream_changes(since: int, limit: int) -> AsyncIterator[bytes]:
+    """Server-sent events: one `upsert` or `delete` event per change, its seq as the event id"""
+    yield b"retry: 1000\n\n"
+    while True:
+        batch = await wait_for_changes(since, limit, KEEPALIVE_SECONDS)
+        if batch["next_since"] == since:
+            yield b": keepalive\n\n"
+            continue
+        events = [
+            b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["op"].encode(), encode_change(change))
+            for change in batch["changes"]
+        ]
+        if events:
+            yield b"".join(events)
+        since = batch["next_since"]
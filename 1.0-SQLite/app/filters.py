@@ -0,0 +1,55 @@
+from typing import List, NamedTuple, Optional, Tuple
+from .models import Book
+from .serialization import BOOK_FIELDS
+
+# Comma-separated BookResponse fields for sparse GET /books responses
+_FIELD = f"({'|'.join(BOOK_FIELDS)})"
+FIELDS_PATTERN = f"^{_FIELD}(,{_FIELD})*$"
+
+class BookFilters(NamedTuple):
+    """Typed GET /books filters, each mapped to an index-friendly predicate"""
+    author: Optional[str] = None
+    genre: Optional[str] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    title_prefix: Optional[str] = None
+
+    def conditions(self) -> List:
+        """WHERE clauses: equality and ranges on indexed columns, never a leading wildcard"""
+        conditions = []
+        if self.author is not None:
+            conditions.append(Book.author == self.author)
+        if self.genre is not None:
+            conditions.append(Book.genre == self.genre)
+        if self.year_from is not None:
+            conditions.append(Book.published_year >= self.year_from)
+        if self.year_to is not None:
+            conditions.append(Book.published_year <= self.year_to)
+        if self.title_prefix:
+            conditions.extend(prefix_range(Book.title, self.title_prefix))
+        return conditions
+
+def prefix_range(column, prefix: str) -> List:
+    """`column` starts with `prefix`, as a range idx_title can seek (SQLite only optimizes LIKE for NOCASE indexes)"""
+    conditions = [column >= prefix]
+    upper = prefix_upper(prefix)
+    if upper is not None:
+        conditions.append(column < upper)
+    return conditions
+
+def prefix_upper(prefix: str) -> Optional[str]:
+    """Smallest string after every string starting with `prefix` (None when there is none)"""
+    following = ord(prefix[-1]) + 1
+    if following == 0xD800:
+        # Surrogates cannot be stored; skip to the next encodable code point
+        following = 0xE000
+    if following > 0x10FFFF:
+        return None
+    return prefix[:-1] + chr(following)
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Requested fields in response order, always including id; None selects every field"""
+    if not fields:
+        return BOOK_FIELDS
+    requested = set(fields.split(",")) | {"id"}
+    return tuple(name for name in BOOK_FIELDS if name in requested)
@@ -0,0 +1,54 @@
+import json
+import logging
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from .stats import current_stats
+
+logger = logging.getLogger("bookstore.sql")
+
+def instrument_engine(engine, slow_query_ms: float) -> None:
+    """Time every statement on `engine` (sync or async) and log the slow ones"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if getattr(sync_engine, "_instrumented", False):
+        return
+    sync_engine._instrumented = True
+    slow_query_seconds = slow_query_ms / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = current_stats.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+            stats.statement_counts[statement] += 1
+        if elapsed >= slow_query_seconds:
+            if stats is not None:
+                stats.slow_queries += 1
+            logger.warning(json.dumps({
+                "event": "slow_query",
+                "duration_ms": round(elapsed * 1000, 3),
+                "statement": " ".join(statement.split())[:1000],
+            }))
+
+def instrument_sessions() -> None:
+    """Count rows returned through ORM sessions (sync and async) during a request"""
+    if not event.contains(Session, "do_orm_execute", _count_rows):
+        event.listen(Session, "do_orm_execute", _count_rows)
+
+def _count_rows(state: ORMExecuteState):
+    stats = current_stats.get()
+    if stats is None or not state.is_select:
+        return None
+    options = state.execution_options
+    # Streamed results (export) must not be buffered just to be counted
+    if options.get("yield_per") or options.get("stream_results"):
+        return None
+    frozen = state.invoke_statement().freeze()
+    stats.rows += len(frozen.data)
+    return frozen()
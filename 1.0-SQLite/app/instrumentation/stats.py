@@ -0,0 +1,40 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional
+
+@dataclass
+class RequestStats:
+    """Counters for one request, filled in by the SQL hooks and serialization timers"""
+    started: float = field(default_factory=time.perf_counter)
+    statements: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    serialization_time: float = 0.0
+    slow_queries: int = 0
+    statement_counts: Counter = field(default_factory=Counter)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def repeated_statements(self, threshold: int) -> List[str]:
+        """Statements run at least `threshold` times in this request (likely N+1 loads)"""
+        return [statement for statement, count in self.statement_counts.items() if count >= threshold]
+
+# Set by the middleware; copied into threadpool workers along with the rest of the context
+current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+@contextmanager
+def serialization_timer() -> Iterator[None]:
+    """Add the time spent in the block to the current request's serialization time"""
+    stats = current_stats.get()
+    if stats is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialization_time += time.perf_counter() - started
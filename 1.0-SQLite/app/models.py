@@ -1,10 +1,16 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from datetime import datetime
 from typing import Optional
 
 class Book(SQLModel, table=True):
     """Book database model"""
     __tablename__ = "books"
+    # Filter on one column, order by the next (the primary key is implicitly last)
+    __table_args__ = (
+        Index("ix_books_genre_published_year", "genre", "published_year"),
+        Index("ix_books_author_published_year", "author", "published_year"),
+    )
     
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(index=True, max_length=255, nullable=False)
@@ -12,4 +18,9 @@ class Book(SQLModel, table=True):
     published_year: Optional[int] = Field(index=True, nullable=True)
     genre: Optional[str] = Field(index=True, max_length=100, nullable=True)
     created_at: datetime = Field(default_factory=datetime.now, nullable=False)
-    updated_at: datetime = Field(default_factory=datetime.now, nullable=False) 
\ No newline at end of file
+    updated_at: datetime = Field(
+        default_factory=datetime.now,
+        nullable=False,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.now}
+    ) 
\ No newline at end of file
@@ -0,0 +1,123 @@
+import base64
+import json
+from typing import Any, NamedTuple, Optional, Tuple
+from sqlmodel import and_, or_
+from sqlalchemy import false, tuple_
+from .models import Book
+
+# Sort keys usable for ordering and keyset pagination. Each is indexed (the
+# index implicitly ends with the primary key), and ties are always broken by
+# id, so (keys..., id) seeks are served from an index.
+SORT_COLUMNS = {
+    "id": Book.id,
+    "title": Book.title,
+    "author": Book.author,
+    "published_year": Book.published_year,
+    "genre": Book.genre,
+}
+# Type of each sort key's values in a cursor (NULL only where the column allows it)
+SORT_TYPES = {"id": int, "title": str, "author": str, "published_year": int, "genre": str}
+
+# Comma-separated sort keys, each optionally prefixed with "-" for descending
+_SORT_KEY = f"-?({'|'.join(SORT_COLUMNS)})"
+SORT_PATTERN = f"^{_SORT_KEY}(,{_SORT_KEY})*$"
+
+class SortKey(NamedTuple):
+    """One ORDER BY column and its direction"""
+    name: str
+    descending: bool = False
+
+def parse_sort(sort: str) -> Tuple[SortKey, ...]:
+    """Parse "genre,-published_year" into sort keys that always end with id"""
+    keys = []
+    for part in sort.split(","):
+        name = part.lstrip("-")
+        if name not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort key {name!r}")
+        if any(key.name == name for key in keys):
+            continue
+        keys.append(SortKey(name, part.startswith("-")))
+        if name == "id":
+            # id is unique, so later keys can never matter
+            break
+    if keys[-1].name != "id":
+        # Break ties in the last key's direction, so one index can be scanned forwards or backwards
+        keys.append(SortKey("id", keys[-1].descending))
+    return tuple(keys)
+
+def sort_order(sort: str) -> tuple:
+    """ORDER BY columns for a sort expression"""
+    return tuple(
+        SORT_COLUMNS[key.name].desc() if key.descending else SORT_COLUMNS[key.name]
+        for key in parse_sort(sort)
+    )
+
+def encode_cursor(sort: str, book: Book) -> str:
+    """Encode the position right after `book` (a Book or a row with the sort columns) as an opaque cursor"""
+    keys = parse_sort(sort)
+    payload = {"s": sort, "id": book.id}
+    if len(keys) > 1:
+        payload["v"] = [getattr(book, key.name) for key in keys[:-1]]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Tuple[Any, ...]]:
+    """Decode a cursor into the sort key values of the last row seen; an empty cursor means the first page"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != sort:
+            raise ValueError("Cursor was issued for a different sort order")
+        values = payload.get("v", [])
+        if not isinstance(values, list):
+            # Single-key cursors issued before multi-key sorting
+            values = [values]
+        position = (*values, payload["id"])
+        keys = parse_sort(sort)
+        # Tampered values must not reach the driver or the snapshot's comparisons
+        if len(position) != len(keys) or not all(_is_sort_value(key.name, value) for key, value in zip(keys, position)):
+            raise ValueError("Malformed cursor")
+    except (KeyError, TypeError, json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    return position
+
+def _is_sort_value(name: str, value: Any) -> bool:
+    """Whether a cursor value has the type of sort column `name` (a JSON bool is not an int here)"""
+    if value is None:
+        return SORT_COLUMNS[name].nullable
+    return type(value) is SORT_TYPES[name]
+
+def seek_condition(sort: str, position: Tuple[Any, ...]):
+    """WHERE clause selecting rows strictly after `position` in the sort order"""
+    keys = parse_sort(sort)
+    columns = [SORT_COLUMNS[key.name] for key in keys]
+    if len(keys) == 1:
+        return _after(columns[0], position[0], keys[0].descending)
+    descending = {key.descending for key in keys}
+    if len(descending) == 1 and None not in position:
+        # One direction: a row-value comparison the index can seek on. Ascending, it also
+        # skips NULLs correctly (they sort first); descending NULLs sort last and need the
+        # expanded form unless the columns are NOT NULL.
+        if not descending.pop():
+            return tuple_(*columns) > tuple_(*position)
+        if not any(column.nullable for column in columns):
+            return tuple_(*columns) < tuple_(*position)
+    # Expanded form: equal on the leading keys and strictly after on the next one
+    clauses = []
+    for index, (key, column, value) in enumerate(zip(keys, columns, position)):
+        equal = [
+            earlier.is_(None) if earlier_value is None else earlier == earlier_value
+            for earlier, earlier_value in zip(columns[:index], position[:index])
+        ]
+        clauses.append(and_(*equal, _after(column, value, key.descending)))
+    return or_(*clauses)
+
+def _after(column, value: Any, descending: bool):
+    """Rows strictly after `value` in one column; NULLs sort first ascending and last descending"""
+    if value is None:
+        return false() if descending else column.is_not(None)
+    if descending:
+        return or_(column < value, column.is_(None)) if column.nullable else column < value
+    return column > value
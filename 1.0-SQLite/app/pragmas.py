@@ -0,0 +1,39 @@
+from typing import Dict, Union
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+Pragmas = Dict[str, Union[int, str]]
+
+def production_pragmas(busy_timeout_ms: int, cache_size_kib: int, mmap_size: int) -> Pragmas:
+    """Per-connection pragmas for the production profile (journal_mode is set on the write pool)"""
+    return {
+        "synchronous": "NORMAL",
+        "busy_timeout": busy_timeout_ms,
+        # Negative cache_size is in KiB rather than pages
+        "cache_size": -cache_size_kib,
+        "mmap_size": mmap_size,
+        "temp_store": "MEMORY",
+    }
+
+def apply_pragmas(engine: Engine, pragmas: Pragmas) -> None:
+    """Run `PRAGMA name = value` on every new DBAPI connection of `engine`"""
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+def use_immediate_transactions(engine: Engine) -> None:
+    """Let SQLAlchemy emit BEGIN on `engine`, as BEGIN IMMEDIATE"""
+    # pysqlite delays BEGIN until the first write and breaks SAVEPOINT; taking the write lock
+    # up front also avoids SQLITE_BUSY when a read transaction later upgrades to a write
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import time
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+class ProbeResult(NamedTuple):
+    """Outcome of one SELECT 1 probe"""
+    ok: bool
+    checked_at: datetime
+    latency: float
+    # Time spent waiting for a pool connection, the first thing to grow when the pool is saturated
+    wait: float
+    error: Optional[str]
+
+class HealthProbe:
+    """Database readiness from a periodic background SELECT 1, so health checks do not compete for the pool"""
+
+    def __init__(self, engine, interval: float = 5.0, timeout: float = 2.0):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self.result: Optional[ProbeResult] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def check(self) -> ProbeResult:
+        """Run SELECT 1 now and cache the result"""
+        started = time.perf_counter()
+        wait = 0.0
+        error = None
+        try:
+            with self.engine.connect() as connection:
+                wait = time.perf_counter() - started
+                connection.execute(text("SELECT 1"))
+        except Exception as e:
+            error = str(e)
+        self.result = ProbeResult(error is None, datetime.now(), time.perf_counter() - started, wait, error)
+        return self.result
+
+    def latest(self) -> ProbeResult:
+        """Cached result; without the background task, probe inline at most once per interval"""
+        result = self.result
+        if result is not None and (self.running or self.age(result) < self.interval):
+            return result
+        with self._lock:
+            if self.result is not result:
+                return self.result
+            return self.check()
+
+    def age(self, result: ProbeResult) -> float:
+        return (datetime.now() - result.checked_at).total_seconds()
+
+    def is_ready(self, result: ProbeResult) -> bool:
+        """Ready when the last probe passed and is recent (a stuck probe loop is not ready)"""
+        return result.ok and self.age(result) <= 3 * self.interval + self.timeout
+
+    def describe(self, result: ProbeResult) -> Dict[str, Any]:
+        return {
+            "status": "Connected" if result.ok else "Error",
+            "checked_at": result.checked_at.isoformat(),
+            "age_seconds": round(self.age(result), 3),
+            "latency_ms": round(result.latency * 1000, 3),
+            "pool_wait_ms": round(result.wait * 1000, 3),
+            "error": result.error,
+        }
+
+    async def probe(self) -> None:
+        try:
+            await asyncio.wait_for(run_in_threadpool(self.check), self.timeout)
+        except asyncio.TimeoutError:
+            # The pool wait or the query itself hangs; report it without waiting any longer
+            self.result = ProbeResult(
+                False, datetime.now(), self.timeout, self.timeout, f"Probe timed out after {self.timeout}s"
+            )
+
+    async def start(self) -> None:
+        """Probe once, then keep probing every `interval` seconds in the background"""
+        await self.probe()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.probe()
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Live connection pool counters from `engine.pool` (sync or async engine)"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats: Dict[str, Any] = {"class": type(pool).__name__}
+    # QueuePool reports all of these; StaticPool/NullPool only some
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if counter is not None:
+            stats[name] = counter()
+    if "overflow" in stats:
+        # Negative until pool_size connections have been opened
+        stats["overflow"] = max(0, stats["overflow"])
+    return stats
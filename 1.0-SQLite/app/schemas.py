@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Literal, Optional, Union
 
 class BookCreate(BaseModel):
     """Schema for creating a book"""
@@ -30,4 +30,77 @@ class BookUpdate(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
     published_year: Optional[int] = None
-    genre: Optional[str] = None 
\ No newline at end of file
+    genre: Optional[str] = None 
+
+class BookPage(BaseModel):
+    """Schema for a keyset-paginated page of books"""
+    items: List[BookResponse]
+    next_cursor: Optional[str] = None
+
+class BookBatchGet(BaseModel):
+    """Schema for a batch get-by-ids request"""
+    ids: List[int] = Field(..., min_length=1)
+
+class BookBatch(BaseModel):
+    """Schema for a batch get-by-ids response (items in request order)"""
+    items: List[BookResponse]
+    missing: List[int]
+
+class BookSuggestions(BaseModel):
+    """Schema for typeahead completions (newest first)"""
+    field: str
+    prefix: str
+    suggestions: List[str]
+
+class BookChange(BaseModel):
+    """Schema for one change log entry (book is the current row for upserts, null for deletes)"""
+    seq: int
+    op: Literal["upsert", "delete"]
+    id: int
+    book: Optional[BookResponse] = None
+
+class BookChanges(BaseModel):
+    """Schema for a batch of the change feed (resume with since=next_since)"""
+    changes: List[BookChange]
+    next_since: int
+    has_more: bool
+
+class BookBulkCreate(BookCreate):
+    """Schema for a bulk create item (an id turns it into an upsert)"""
+    id: Optional[int] = None
+
+class BookBulkUpdate(BookUpdate):
+    """Schema for a bulk update item"""
+    id: int
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single bulk item"""
+    index: int
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    """Schema for a bulk operation response"""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+class FacetValue(BaseModel):
+    """A facet value and the number of books that have it"""
+    value: Union[int, str]
+    count: int
+
+class BookFacets(BaseModel):
+    """Schema for grouped book counts per facet"""
+    total: int
+    facets: Dict[str, List[FacetValue]]
+
+class BookStats(BaseModel):
+    """Schema for catalog statistics"""
+    total: int
+    distinct: Dict[str, int]
+    missing: Dict[str, int]
+    earliest_year: Optional[int] = None
+    latest_year: Optional[int] = None
@@ -0,0 +1,64 @@
+import re
+from typing import Optional
+from sqlalchemy import Engine, column, literal_column, table, text
+
+# FTS5 virtual table mirroring the searchable columns of `books`.
+# It is an external-content table, so the text itself is only stored once
+# (in `books`) and the triggers below keep the index in sync on every write.
+FTS_TABLE = "books_fts"
+
+FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, author, genre, published_year,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, author, genre, published_year)
+        VALUES (new.id, new.title, new.author, new.genre, new.published_year);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, genre, published_year)
+        VALUES ('delete', old.id, old.title, old.author, old.genre, old.published_year);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_au
+    AFTER UPDATE OF title, author, genre, published_year ON books BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, author, genre, published_year)
+        VALUES ('delete', old.id, old.title, old.author, old.genre, old.published_year);
+        INSERT INTO {FTS_TABLE}(rowid, title, author, genre, published_year)
+        VALUES (new.id, new.title, new.author, new.genre, new.published_year);
+    END
+    """,
+]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Lightweight table construct used by BookCRUD.search_books
+books_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+fts_match = literal_column(FTS_TABLE)
+
+def create_search_index(engine: Engine) -> None:
+    """Create the FTS5 index and triggers, backfilling existing rows"""
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first()
+        for statement in FTS_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def build_match_query(search_term: str) -> Optional[str]:
+    """Turn free text into an FTS5 prefix query (every token must match)"""
+    tokens = _TOKEN_RE.findall(search_term)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
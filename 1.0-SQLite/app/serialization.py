@@ -0,0 +1,81 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing_extensions import TypedDict
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from .instrumentation import serialization_timer
+
+try:
+    import orjson  # optional dependency
+except ImportError:
+    orjson = None
+
+class BookRow(TypedDict):
+    """BookResponse as a plain dict, serialized without building models"""
+    id: int
+    title: str
+    author: str
+    published_year: Optional[int]
+    genre: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+class BookRowPage(TypedDict):
+    items: List[BookRow]
+    next_cursor: Optional[str]
+
+class BookChangeRow(TypedDict):
+    seq: int
+    op: str
+    id: int
+    book: Optional[BookRow]
+
+class BookChangeBatch(TypedDict):
+    changes: List[BookChangeRow]
+    next_since: int
+    has_more: bool
+
+BOOK_FIELDS = tuple(BookRow.__annotations__)
+
+# Serializers are compiled once; dump_json on a TypedDict does not validate
+_rows_adapter = TypeAdapter(List[BookRow])
+_page_adapter = TypeAdapter(BookRowPage)
+_change_adapter = TypeAdapter(BookChangeRow)
+_changes_adapter = TypeAdapter(BookChangeBatch)
+# Sparse rows (a subset of BookRow's keys)
+_any_adapter = TypeAdapter(Any)
+
+def rows_to_dicts(rows: Iterable[Sequence], fields: Sequence[str] = BOOK_FIELDS) -> List[Dict[str, object]]:
+    """Column tuples (`fields` first, in BOOK_COLUMNS order) to BookResponse-shaped dicts"""
+    return [dict(zip(fields, row)) for row in rows]
+
+def encode_rows(rows: Iterable[Sequence], fields: Sequence[str] = BOOK_FIELDS) -> bytes:
+    """Encode column tuples as the JSON body of a List[BookResponse]"""
+    with serialization_timer():
+        items = rows_to_dicts(rows, fields)
+        if orjson is not None:
+            return orjson.dumps(items)
+        adapter = _rows_adapter if fields == BOOK_FIELDS else _any_adapter
+        return adapter.dump_json(items)
+
+def encode_page(rows: Iterable[Sequence], next_cursor: Optional[str], fields: Sequence[str] = BOOK_FIELDS) -> bytes:
+    """Encode column tuples as the JSON body of a BookPage"""
+    with serialization_timer():
+        page = {"items": rows_to_dicts(rows, fields), "next_cursor": next_cursor}
+        if orjson is not None:
+            return orjson.dumps(page)
+        adapter = _page_adapter if fields == BOOK_FIELDS else _any_adapter
+        return adapter.dump_json(page)
+
+def encode_changes(batch: BookChangeBatch) -> bytes:
+    """Encode BookCRUD.get_changes output as the JSON body of a BookChanges"""
+    with serialization_timer():
+        return orjson.dumps(batch) if orjson is not None else _changes_adapter.dump_json(batch)
+
+def encode_change(change: BookChangeRow) -> bytes:
+    """Encode one change as JSON (an SSE data line)"""
+    return orjson.dumps(change) if orjson is not None else _change_adapter.dump_json(change)
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Raw JSON response, bypassing response_model validation"""
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,625 @@
+import bisect
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from .config import settings
+from .filters import BookFilters, prefix_upper
+from .pagination import SortKey, parse_sort
+
+try:
+    import numpy as np  # optional dependency
+except ImportError:
+    np = None
+
+# Columnar read model of the books table for GET /books and GET /books/facets
+# (CATALOG_SNAPSHOT=true). One NumPy array per column, in id order: ids, years and
+# timestamps as int64 (microseconds since the epoch), author and genre as int32 codes
+# into interned string tables, and titles as offsets into one UTF-8 buffer. Filters
+# are vectorized masks, sorts a lexsort over integer keys, and only the rows of the
+# returned page are turned back into Python values.
+#
+# Strings sort as ranks that order exactly like SQLite's BINARY collation. Title ranks
+# leave gaps, so a changed title usually gets a rank between its neighbours, and any
+# string (a cursor value or prefix bound not in the catalog) has a rank strictly
+# between those of the titles around it.
+#
+# The snapshot is loaded in the lifespan and follows the change log (GET /books/changes),
+# so every write path, deletes and other workers are picked up before each request.
+
+# Stored for a NULL published_year; sorts first like SQLite's NULLs
+_NULL_YEAR = -(2 ** 63)
+# Code of a NULL genre
+_NULL_CODE = -1
+# Title ranks are spread over (0, _MAX_RANK)
+_MAX_RANK = 2 ** 62
+# Sort keys are clamped to this range, so a cursor value can never overflow int64
+_MAX_KEY = 2 ** 63 - 1
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# Books changed per refresh that are re-inserted into the title order by binary search; more re-sort it
+_REORDER_BATCH = 256
+# Rows tested per slice when scanning in id order, doubled each time
+_SCAN_CHUNK = 4096
+
+_COLUMNS = ("id", "published_year", "author", "genre", "created_at", "updated_at", "title_start", "title_length", "title_rank")
+_DTYPES = {"author": "int32", "genre": "int32", "title_length": "int32"}
+
+@lru_cache(maxsize=256)
+def _row_type(names: Tuple[str, ...]):
+    """Named tuple class for rows of `names` (read by name like SQL result rows)"""
+    return namedtuple("SnapshotRow", names)
+
+def _micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+class _Strings:
+    """Interned values of one text column, with their sort ranks"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        # Values and their codes in sort order; built on first use, then kept current by intern
+        self._sorted: Optional[List[str]] = None
+        self._order: Optional[List[int]] = None
+        self._ranks = None
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NULL_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            if self._sorted is not None:
+                index = bisect.bisect_left(self._sorted, value)
+                self._sorted.insert(index, value)
+                self._order.insert(index, code)
+            self._ranks = None
+        return code
+
+    def ranks(self):
+        """Odd rank of every code in sort order, then -1 for NULL (so codes index it directly)"""
+        if self._ranks is None:
+            if self._sorted is None:
+                self._order = sorted(range(len(self.values)), key=self.values.__getitem__)
+                self._sorted = [self.values[code] for code in self._order]
+            ranks = np.empty(len(self._order) + 1, dtype=np.int64)
+            ranks[np.array(self._order, dtype=np.int64)] = np.arange(1, 2 * len(self._order) + 1, 2)
+            ranks[-1] = -1
+            self._ranks = ranks
+        return self._ranks
+
+    def rank(self, value: Optional[str]) -> int:
+        """Rank of any value: its own when interned, otherwise the even number between its neighbours"""
+        if value is None:
+            return -1
+        ranks = self.ranks()
+        code = self.codes.get(value)
+        if code is not None:
+            return int(ranks[code])
+        return 2 * bisect.bisect_left(self._sorted, value)
+
+    def nbytes(self) -> int:
+        size = sum(sys.getsizeof(value) for value in self.values) + sys.getsizeof(self.values) + sys.getsizeof(self.codes)
+        if self._sorted is not None:
+            size += sys.getsizeof(self._sorted) + sys.getsizeof(self._order)
+        return size + (0 if self._ranks is None else self._ranks.nbytes)
+
+class CatalogSnapshot:
+    """Columnar in-memory copy of the books table, refreshed from the change log"""
+
+    def __init__(self):
+        self.loaded = False
+        # Last change log seq applied
+        self.seq = 0
+        self.refreshes = 0
+        self.changes_applied = 0
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self._set_columns({name: np.empty(0, dtype=_DTYPES.get(name, "int64")) for name in _COLUMNS})
+        self._strings = {"author": _Strings(), "genre": _Strings()}
+        self._titles = bytearray()
+        # Bytes of _titles still referenced (changed titles are appended, the old bytes left behind)
+        self._title_bytes = 0
+        # Ids ordered by title rank: binary searches over the titles, and title sorts read it in order
+        self._by_title = np.empty(0, dtype=np.int64)
+        # Unfiltered facet counts, until the next change
+        self._facet_counts: Dict[str, tuple] = {}
+
+    def _set_columns(self, columns: Dict[str, "np.ndarray"]) -> None:
+        # _buffers may have room for more rows at the end; _columns are views of the rows in use
+        self._buffers = dict(columns)
+        self._columns = dict(columns)
+
+    def _append_columns(self, columns: Dict[str, "np.ndarray"]) -> None:
+        """Add rows after the last one, into the spare room of the buffers when there is some"""
+        size, count = len(self._columns["id"]), len(columns["id"])
+        for name, column in columns.items():
+            buffer = self._buffers[name]
+            if size + count > len(buffer):
+                # Grow by a quarter, so adding books one at a time copies each column rarely
+                grown = np.empty(size + count + size // 4, dtype=buffer.dtype)
+                grown[:size] = buffer[:size]
+                buffer = self._buffers[name] = grown
+            buffer[size:size + count] = column
+            self._columns[name] = buffer[:size + count]
+
+    def load(self, rows: Iterable[tuple], seq: int) -> int:
+        """Replace the contents with `rows` (BOOK_COLUMNS tuples in id order) as of change log `seq`"""
+        with self._lock:
+            self._clear()
+            values = {name: [] for name in _COLUMNS}
+            # _append_row, unrolled: this runs once per book at startup
+            ids, years, starts, lengths = values["id"], values["published_year"], values["title_start"], values["title_length"]
+            authors, genres = self._strings["author"].intern, self._strings["genre"].intern
+            author_codes, genre_codes, created, updated = values["author"], values["genre"], values["created_at"], values["updated_at"]
+            titles = self._titles
+            for book_id, title, author, year, genre, created_at, updated_at in rows:
+                title = title.encode()
+                ids.append(book_id)
+                years.append(_NULL_YEAR if year is None else year)
+                author_codes.append(authors(author))
+                genre_codes.append(genres(genre))
+                created.append((created_at - _EPOCH) // _MICROSECOND)
+                updated.append((updated_at - _EPOCH) // _MICROSECOND)
+                starts.append(len(titles))
+                lengths.append(len(title))
+                titles += title
+            self._title_bytes = len(titles)
+            values["title_rank"] = [0] * len(ids)
+            self._set_columns({name: np.array(column, dtype=_DTYPES.get(name, "int64")) for name, column in values.items()})
+            self._rank_titles()
+            self.seq = seq
+            self.loaded = True
+            return len(self._columns["id"])
+
+    def _append_row(self, values: Dict[str, list], book_id: int, book: dict) -> None:
+        """Add one book's column values to `values`, its title to the buffer and its strings to the tables"""
+        title = book["title"].encode()
+        values["id"].append(book_id)
+        values["published_year"].append(_NULL_YEAR if book["published_year"] is None else book["published_year"])
+        values["author"].append(self._strings["author"].intern(book["author"]))
+        values["genre"].append(self._strings["genre"].intern(book["genre"]))
+        values["created_at"].append(_micros(book["created_at"]))
+        values["updated_at"].append(_micros(book["updated_at"]))
+        values["title_start"].append(len(self._titles))
+        values["title_length"].append(len(title))
+        values["title_rank"].append(0)
+        self._titles += title
+        self._title_bytes += len(title)
+
+    def apply(self, changes: Sequence[dict], since: int, seq: int) -> int:
+        """Apply change feed entries (BookCRUD.get_changes) read after `since`; skipped if another thread got there first"""
+        with self._lock:
+            if self.seq != since:
+                return 0
+            if changes:
+                self._apply(changes)
+                self.refreshes += 1
+                self.changes_applied += len(changes)
+            self.seq = seq
+            return len(changes)
+
+    def _apply(self, changes: Sequence[dict]) -> None:
+        upserts = {change["id"]: change["book"] for change in changes if change["book"] is not None}
+        deleted = np.array([change["id"] for change in changes if change["book"] is None], dtype=np.int64)
+        ids = self._columns["id"]
+        upserted = np.array(sorted(upserts), dtype=np.int64)
+        positions = np.searchsorted(ids, upserted)
+        present = self._present(positions, upserted)
+        gone = np.searchsorted(ids, deleted)
+        gone = gone[self._present(gone, deleted)]
+        # Looked up while the title order still matches the columns: ranks for the new titles,
+        # and where the changed and deleted books sit in the title order now
+        title_ranks = self._new_title_ranks({book["title"].encode() for book in upserts.values()})
+        stale = None
+        if len(upserted) <= _REORDER_BATCH:
+            stale = [self._title_index(position) for position in np.concatenate([positions[present], gone]).tolist()]
+
+        values = {name: [] for name in _COLUMNS}
+        for book_id in upserted.tolist():
+            self._append_row(values, book_id, upserts[book_id])
+            values["title_rank"][-1] = title_ranks.get(upserts[book_id]["title"].encode(), 0)
+        columns = {name: np.array(column, dtype=_DTYPES.get(name, "int64")) for name, column in values.items()}
+        self._title_bytes -= int(self._columns["title_length"][positions[present]].sum())
+        self._title_bytes -= int(self._columns["title_length"][gone].sum())
+
+        # Changed rows in place, then deletes, then new rows (both keep the id order)
+        for name, column in columns.items():
+            self._columns[name][positions[present]] = column[present]
+        if len(gone):
+            self._set_columns({name: np.delete(column, gone) for name, column in self._columns.items()})
+        added = ~present
+        if added.any():
+            new = {name: column[added] for name, column in columns.items()}
+            if not len(self._columns["id"]) or new["id"][0] > self._columns["id"][-1]:
+                # The usual case: new books get the highest ids
+                self._append_columns(new)
+            else:
+                at = np.searchsorted(self._columns["id"], new["id"])
+                self._set_columns({name: np.insert(self._columns[name], at, column) for name, column in new.items()})
+
+        if title_ranks.pop(None, False):
+            # A gap ran out of ranks: spread all titles out again
+            self._rank_titles()
+        else:
+            self._reorder_titles(stale, upserted)
+        if len(self._titles) > 2 * self._title_bytes + 65536:
+            self._compact_titles()
+        self._facet_counts.clear()
+
+    def _present(self, positions, ids):
+        """Which of `ids` (at their searchsorted `positions`) are in the snapshot"""
+        column = self._columns["id"]
+        if not len(column):
+            return np.zeros(len(ids), dtype=bool)
+        return (positions < len(column)) & (column[np.minimum(positions, len(column) - 1)] == ids)
+
+    def _title(self, position: int) -> bytes:
+        start = int(self._columns["title_start"][position])
+        return bytes(self._titles[start:start + int(self._columns["title_length"][position])])
+
+    def _title_position(self, index: int) -> int:
+        """Column position of the `index`-th id in title order"""
+        return int(np.searchsorted(self._columns["id"], self._by_title[index]))
+
+    def _bisect_title(self, value: bytes) -> int:
+        """Index in title order of the first title >= `value`"""
+        lo, hi = 0, len(self._by_title)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._title(self._title_position(mid)) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _title_slot(self, value: bytes) -> Tuple[Optional[int], int, int]:
+        """(rank of `value` if some book has that title, rank just below it, rank just above it)"""
+        index = self._bisect_title(value)
+        below = int(self._columns["title_rank"][self._title_position(index - 1)]) if index else 0
+        if index == len(self._by_title):
+            return None, below, _MAX_RANK
+        position = self._title_position(index)
+        rank = int(self._columns["title_rank"][position])
+        if self._title(position) == value:
+            return rank, below, rank
+        return None, below, rank
+
+    def _title_rank(self, value: str) -> int:
+        """Rank of any title: its own if a book has it, else one strictly between its neighbours"""
+        rank, below, above = self._title_slot(value.encode())
+        return rank if rank is not None else (below + above) // 2
+
+    def _new_title_ranks(self, titles: Iterable[bytes]) -> Dict[Optional[bytes], int]:
+        """Ranks for `titles`; the None key is set when some gap is too narrow (re-rank everything)"""
+        ranks: Dict[Optional[bytes], int] = {}
+        gaps: Dict[Tuple[int, int], List[bytes]] = {}
+        for title in sorted(titles):
+            rank, below, above = self._title_slot(title)
+            if rank is not None:
+                ranks[title] = rank
+            else:
+                gaps.setdefault((below, above), []).append(title)
+        for (below, above), inserted in gaps.items():
+            # Keep a free rank on both sides of each new one for cursors between them
+            step = (above - below) // (len(inserted) + 1)
+            if step < 2:
+                ranks[None] = True
+                break
+            for offset, title in enumerate(inserted, 1):
+                ranks[title] = below + offset * step
+        return ranks
+
+    def _rank_titles(self) -> None:
+        """Assign every title a rank from scratch, evenly spread (equal titles share one)"""
+        starts = self._columns["title_start"].tolist()
+        ends = (self._columns["title_start"] + self._columns["title_length"]).tolist()
+        titles = self._titles
+        order = sorted(range(len(starts)), key=lambda position: titles[starts[position]:ends[position]])
+        ranks = np.empty(len(order), dtype=np.int64)
+        dense, previous = 0, None
+        for position in order:
+            title = titles[starts[position]:ends[position]]
+            if title != previous:
+                dense += 1
+                previous = title
+            ranks[position] = dense
+        self._columns["title_rank"][:] = ranks * (_MAX_RANK // (dense + 1))
+        self._by_title = self._columns["id"][np.array(order, dtype=np.int64)]
+
+    def _reorder_titles(self, stale: Optional[List[int]], upserted) -> None:
+        """Drop the `stale` indexes from the title order and put the `upserted` ids back at their new ranks"""
+        if stale is None:
+            self._by_title = self._columns["id"][np.argsort(self._columns["title_rank"], kind="stable")]
+            return
+        if stale:
+            self._by_title = np.delete(self._by_title, stale)
+        ranks = self._columns["title_rank"][np.searchsorted(self._columns["id"], upserted)]
+        order = np.argsort(ranks, kind="stable")
+        # Indexes into the remaining order; one insert puts every book back
+        at = [self._bisect_rank(rank) for rank in ranks[order].tolist()]
+        self._by_title = np.insert(self._by_title, at, upserted[order])
+
+    def _rank_at(self, index: int) -> int:
+        return int(self._columns["title_rank"][self._title_position(index)])
+
+    def _title_index(self, position: int) -> int:
+        """Index in title order of the book at column `position`"""
+        book_id = self._columns["id"][position]
+        index = self._bisect_rank(int(self._columns["title_rank"][position]))
+        # Usually the first of its title; long runs of one title are searched at once
+        for index in range(index, min(index + 64, len(self._by_title))):
+            if self._by_title[index] == book_id:
+                return index
+        return int(np.flatnonzero(self._by_title == book_id)[0])
+
+    def _bisect_rank(self, rank: int) -> int:
+        """Index in title order of the first title ranked >= `rank`"""
+        lo, hi = 0, len(self._by_title)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._columns["title_rank"][self._title_position(mid)] < rank:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _compact_titles(self) -> None:
+        """Copy the referenced titles into a new buffer, dropping the bytes of replaced ones"""
+        titles = bytearray()
+        starts = []
+        for start, length in zip(self._columns["title_start"].tolist(), self._columns["title_length"].tolist()):
+            starts.append(len(titles))
+            titles += self._titles[start:start + length]
+        self._titles = titles
+        self._title_bytes = len(titles)
+        self._columns["title_start"][:] = starts
+
+    def rows(
+        self, fields: Sequence[str], sort: str = "id", filters: BookFilters = BookFilters(),
+        skip: int = 0, limit: int = 100, position: Optional[tuple] = None
+    ) -> List[tuple]:
+        """Like BookCRUD.get_book_rows (`fields` plus the sort keys), after `position` (a decoded cursor) if given"""
+        keys = parse_sort(sort)
+        names = tuple(fields) + tuple(key.name for key in keys if key.name not in fields)
+        with self._lock:
+            if position is not None:
+                position = self._cursor_keys(keys, position)
+            positions = self._select(keys, filters, position, skip + limit)[skip:]
+            row = _row_type(names)
+            return [row(*values) for values in zip(*(self._values(name, positions) for name in names))]
+
+    def facets(self, names: Sequence[str], limit: int = 20, filters: BookFilters = BookFilters()) -> Dict[str, object]:
+        """Like BookCRUD.get_facets: most common values per facet among the filtered books"""
+        with self._lock:
+            mask = self._mask(filters, slice(None))
+            total = len(self._columns["id"]) if mask is None else int(np.count_nonzero(mask))
+            return {"total": total, "facets": {name: self._facet(name, mask, limit) for name in names}}
+
+    def _facet(self, name: str, mask, limit: int) -> List[Dict[str, object]]:
+        if mask is not None:
+            values, counts, ranks = self._count(name, mask)
+        else:
+            if name not in self._facet_counts:
+                self._facet_counts[name] = self._count(name, None)
+            values, counts, ranks = self._facet_counts[name]
+        if len(values) > limit:
+            # Only values counted at least as often as the limit-th one can make the list
+            cut = np.partition(counts, len(counts) - limit)[len(counts) - limit]
+            kept = counts >= cut
+            values, counts, ranks = values[kept], counts[kept], ranks[kept]
+        top = np.lexsort((ranks, -counts))[:limit]
+        labels = values[top].tolist()
+        if name != "decade":
+            labels = [self._strings[name].values[code] for code in labels]
+        return [{"value": label, "count": int(count)} for label, count in zip(labels, counts[top].tolist())]
+
+    def _count(self, name: str, mask) -> tuple:
+        """(values, book counts, sort ranks) of one facet's non-null values among the books in `mask`"""
+        column = self._columns["published_year" if name == "decade" else name]
+        if mask is not None:
+            column = column[mask]
+        if name == "decade":
+            years = column[column != _NULL_YEAR]
+            # Truncating division, like SQLite's published_year / 10 * 10
+            values, counts = np.unique(np.abs(years) // 10 * 10 * np.sign(years), return_counts=True)
+            return values, counts, values
+        counts = np.bincount(column[column != _NULL_CODE], minlength=len(self._strings[name].values))
+        values = np.flatnonzero(counts)
+        return values, counts[values], self._strings[name].ranks()[values]
+
+    def _mask(self, filters: BookFilters, rows: slice):
+        """Boolean mask of the books in `rows` (a slice of positions) matching `filters`; None when unfiltered"""
+        conditions = []
+        for name in ("author", "genre"):
+            value = getattr(filters, name)
+            if value is not None:
+                code = self._strings[name].codes.get(value)
+                conditions.append(self._columns[name][rows] == (_NULL_CODE - 1 if code is None else code))
+        years = self._columns["published_year"][rows]
+        if filters.year_from is not None:
+            conditions.append(years >= max(filters.year_from, _NULL_YEAR + 1))
+        if filters.year_to is not None:
+            conditions.append((years <= filters.year_to) & (years != _NULL_YEAR))
+        if filters.title_prefix:
+            ranks = self._columns["title_rank"][rows]
+            upper = prefix_upper(filters.title_prefix)
+            condition = ranks >= self._title_rank(filters.title_prefix)
+            if upper is not None:
+                condition &= ranks < self._title_rank(upper)
+            conditions.append(condition)
+        if not conditions:
+            return None
+        mask = conditions[0]
+        for condition in conditions[1:]:
+            mask &= condition
+        return mask
+
+    def _select(self, keys: Tuple[SortKey, ...], filters: BookFilters, position: Optional[List[int]], count: int):
+        """Positions of the first `count` matching books after `position` (sort keys, see _cursor_keys)"""
+        if keys[0].name == "id":
+            return self._scan(filters, keys[0].descending, position, count)
+        if keys[0].name == "title" and filters._replace(title_prefix=None) == BookFilters():
+            return self._walk_titles(keys, filters.title_prefix, position, count)
+        mask = self._mask(filters, slice(None))
+        candidates = np.arange(len(self._columns["id"])) if mask is None else np.flatnonzero(mask)
+        return self._first(keys, candidates, position, count)
+
+    def _first(self, keys: Tuple[SortKey, ...], candidates, position: Optional[List[int]], count: int):
+        """The first `count` of the `candidates` positions after `position`, in sort order"""
+        values = [self._sort_keys(key, candidates) for key in keys]
+        if position is not None:
+            after = np.zeros(len(candidates), dtype=bool)
+            equal = np.ones(len(candidates), dtype=bool)
+            for column, value in zip(values, position):
+                after |= equal & (column > value)
+                equal &= column == value
+            candidates = candidates[after]
+            values = [column[after] for column in values]
+        if len(candidates) > 4 * count:
+            # Only books up to the count-th smallest leading key can make the page
+            cut = np.partition(values[0], count - 1)[count - 1]
+            kept = values[0] <= cut
+            candidates = candidates[kept]
+            values = [column[kept] for column in values]
+        return candidates[np.lexsort(values[::-1])[:count]]
+
+    def _walk_titles(self, keys: Tuple[SortKey, ...], prefix: Optional[str], position: Optional[List[int]], count: int):
+        """Title sorts read the title order from the cursor (or prefix) on, `count` books plus the ties of the last title"""
+        descending = keys[0].descending
+        lo, hi = 0, len(self._by_title)
+        if prefix:
+            lo = self._bisect_rank(self._title_rank(prefix))
+            upper = prefix_upper(prefix)
+            if upper is not None:
+                hi = self._bisect_rank(self._title_rank(upper))
+        if position is not None:
+            # Books with the cursor's own title stay in range; _first drops those up to the cursor
+            if descending:
+                hi = min(hi, self._bisect_rank(~position[0] + 1))
+            else:
+                lo = max(lo, self._bisect_rank(position[0]))
+        window = count
+        while True:
+            if descending:
+                start, stop = max(lo, hi - window), hi
+                if start > lo:
+                    start = max(lo, self._bisect_rank(self._rank_at(start)))
+            else:
+                start, stop = lo, min(hi, lo + window)
+                if stop < hi:
+                    stop = min(hi, self._bisect_rank(self._rank_at(stop - 1) + 1))
+            candidates = np.searchsorted(self._columns["id"], self._by_title[start:stop])
+            selected = self._first(keys, candidates, position, count)
+            if len(selected) == count or (start == lo and stop == hi):
+                return selected
+            window *= 4
+
+    def _scan(self, filters: BookFilters, descending: bool, position: Optional[List[int]], count: int):
+        """Id order needs no sort: walk the columns from the cursor, filtering slices until `count` books match"""
+        ids = self._columns["id"]
+        start, stop = 0, len(ids)
+        if position is not None:
+            # Descending keys are complemented (see _sort_keys)
+            if descending:
+                stop = int(np.searchsorted(ids, ~position[0], "left"))
+            else:
+                start = int(np.searchsorted(ids, position[0], "right"))
+        found, total, chunk = [], 0, max(_SCAN_CHUNK, 2 * count)
+        while start < stop and total < count:
+            lo, hi = (max(start, stop - chunk), stop) if descending else (start, min(stop, start + chunk))
+            mask = self._mask(filters, slice(lo, hi))
+            hits = np.arange(lo, hi) if mask is None else np.flatnonzero(mask) + lo
+            found.append(hits[::-1] if descending else hits)
+            total += len(hits)
+            if descending:
+                stop = lo
+            else:
+                start = hi
+            chunk *= 2
+        return np.concatenate(found)[:count] if found else np.empty(0, dtype=np.int64)
+
+    def _sort_keys(self, key: SortKey, positions):
+        """int64 sort key of `key` for the books at `positions` (complemented when descending)"""
+        if key.name == "id" or key.name == "title":
+            values = self._columns["title_rank" if key.name == "title" else "id"][positions]
+        elif key.name == "published_year":
+            values = self._columns["published_year"][positions]
+        else:
+            values = self._strings[key.name].ranks()[self._columns[key.name][positions]]
+        # ~x reverses the order without overflowing, and keeps NULLs last
+        return ~values if key.descending else values
+
+    def _cursor_keys(self, keys: Tuple[SortKey, ...], position: tuple) -> List[int]:
+        """Map decoded cursor values onto the sort keys of _sort_keys"""
+        values = []
+        try:
+            for key, value in zip(keys, position):
+                if key.name == "title":
+                    value = self._title_rank(value)
+                elif key.name in self._strings:
+                    if value is not None and not isinstance(value, str):
+                        raise TypeError(value)
+                    value = self._strings[key.name].rank(value)
+                elif value is None:
+                    if key.name == "id":
+                        raise TypeError(value)
+                    value = _NULL_YEAR
+                else:
+                    value = max(min(int(value), _MAX_KEY), _NULL_YEAR + 1)
+                values.append(~value if key.descending else value)
+        except (TypeError, AttributeError) as e:
+            raise ValueError("Malformed cursor") from e
+        return values
+
+    def _values(self, name: str, positions) -> list:
+        """Python values of one column at `positions`"""
+        if name == "title":
+            starts = self._columns["title_start"][positions].tolist()
+            lengths = self._columns["title_length"][positions].tolist()
+            return [self._titles[start:start + length].decode() for start, length in zip(starts, lengths)]
+        column = self._columns[name][positions].tolist()
+        if name in self._strings:
+            strings = self._strings[name].values
+            return [None if code == _NULL_CODE else strings[code] for code in column]
+        if name == "published_year":
+            return [None if year == _NULL_YEAR else year for year in column]
+        if name in ("created_at", "updated_at"):
+            return [_EPOCH + timedelta(microseconds=value) for value in column]
+        return column
+
+    def stats(self) -> Dict[str, object]:
+        """Size of the snapshot: books, bytes per column and per book, and refresh counters"""
+        with self._lock:
+            books = len(self._columns["id"])
+            nbytes = {name: buffer.nbytes for name, buffer in self._buffers.items()}
+            nbytes["titles"] = len(self._titles)
+            nbytes["title_order"] = self._by_title.nbytes
+            nbytes.update({f"{name}_strings": strings.nbytes() for name, strings in self._strings.items()})
+            total = sum(nbytes.values())
+            return {
+                "books": books,
+                "seq": self.seq,
+                "refreshes": self.refreshes,
+                "changes_applied": self.changes_applied,
+                "bytes": nbytes,
+                "total_bytes": total,
+                "bytes_per_book": round(total / books, 1) if books else 0,
+            }
+
+def create_snapshot() -> Optional[CatalogSnapshot]:
+    """The snapshot selected by CATALOG_SNAPSHOT, or None to serve every read from SQL"""
+    if not settings.catalog_snapshot:
+        return None
+    if np is None:
+        raise RuntimeError("CATALOG_SNAPSHOT=true requires numpy (pip install numpy)")
+    return CatalogSnapshot()
+
+# Create the snapshot instance (loaded in the lifespan, once per worker)
+catalog_snapshot = create_snapshot()
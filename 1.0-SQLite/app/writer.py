@@ -0,0 +1,201 @@
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+WriteJob = Callable[[Session], Any]
+# Writes a batch of items in one transaction and returns one result per item, after the commit
+BatchFlush = Callable[[List[Any]], List[Any]]
+
+_STOP = object()
+
+class WriteQueue:
+    """Serializes writes through one writer thread that commits queued jobs together (group commit)"""
+
+    def __init__(self, engine: Engine, max_batch: int = 256):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.batches = 0
+        self.jobs = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, job: WriteJob) -> Future:
+        """Queue `job(session)`; the future resolves once the batch holding it has committed"""
+        self._ensure_started()
+        future: Future = Future()
+        # Run the job in the caller's context so request instrumentation still sees its SQL
+        self._queue.put((job, future, contextvars.copy_context()))
+        return future
+
+    async def run(self, job: WriteJob) -> Any:
+        """Await a job's committed result without holding a threadpool thread"""
+        return await asyncio.wrap_future(self.submit(job))
+
+    def stats(self) -> dict:
+        """Committed batches and jobs; jobs / batches is the average group size"""
+        return {"batches": self.batches, "jobs": self.jobs, "pending": self._queue.qsize()}
+
+    def stop(self, timeout: float = 30) -> None:
+        """Commit what is already queued, then stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            # Everything that queued up while the previous batch committed goes into this one
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._queue.put(_STOP)
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[WriteJob, Future, contextvars.Context]]) -> None:
+        """Run each job in its own savepoint, then commit the whole batch once"""
+        outcomes = []
+        try:
+            with Session(self.engine, expire_on_commit=False) as session:
+                for job, future, context in batch:
+                    try:
+                        with session.begin_nested():
+                            outcomes.append((future, context.run(job, session), None))
+                    except Exception as e:
+                        # Only this job's savepoint is rolled back; the rest of the batch still commits
+                        outcomes.append((future, None, e))
+                session.commit()
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.jobs += len(batch)
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+class BatchWriter:
+    """Write-behind group commit: queued items are written together every `max_rows` items or `max_delay` seconds"""
+
+    def __init__(self, flush: BatchFlush, max_rows: int = 500, max_delay: float = 0.005,
+                 max_pending: int = 10000, queue_timeout: float = 1.0):
+        self.flush = flush
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.queue_timeout = queue_timeout
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+        self.waited = 0
+        self.rejected = 0
+        # Bounded: once max_pending items wait, submitters wait for room (backpressure)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Future:
+        """Queue `item`, waiting up to `timeout` seconds for room (queue.Full when there is none)"""
+        self._ensure_started()
+        future: Future = Future()
+        if timeout is None:
+            self._queue.put_nowait((item, future))
+        else:
+            self._queue.put((item, future), timeout=timeout)
+        return future
+
+    async def run(self, item: Any) -> Any:
+        """Await an item's result, which only arrives once the batch holding it has committed"""
+        try:
+            future = self.submit(item)
+        except queue.Full:
+            # Backpressure: wait for room in a threadpool thread rather than on the event loop
+            self.waited += 1
+            try:
+                future = await run_in_threadpool(self.submit, item, self.queue_timeout)
+            except queue.Full:
+                self.rejected += 1
+                raise
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """Committed batches and items (items / batches is the average batch), failures and queue pressure"""
+        return {"batches": self.batches, "items": self.items, "failed": self.failed,
+                "waited": self.waited, "rejected": self.rejected, "pending": self._queue.qsize()}
+
+    def stop(self, timeout: float = 30) -> None:
+        """Write what is already queued, then stop the batcher thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            # The first item starts the clock: the batch is written when full or max_delay later
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_rows:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    self._write(batch)
+                    return
+                batch.append(item)
+            self._write(batch)
+
+    def _write(self, batch: List[Tuple[Any, Future]]) -> None:
+        # Requests cancelled while queued (client gone) are dropped rather than written unanswered
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = self.flush([item for item, _ in batch])
+        except Exception as e:
+            self.failed += len(batch)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
+from app.compression import CompressionMiddleware, codecs
 from app.config import settings
-from app.database import lifespan
+from app.database import async_engine, engine, lifespan, read_engine
+from app.instrumentation import instrument_app
 from app.api.health import router as health_router
+from app.api.routing import replace_routes
 from app.api.v1.endpoints.books import router as books_router
+from app.api.v1.endpoints.books_async import router as books_async_router
+from app.api.v1.endpoints.books_writer import router as books_writer_router
+from app.api.v1.endpoints.books_write_behind import router as books_write_behind_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,6 +24,36 @@ app = FastAPI(
 app.include_router(health_router, tags=["health"])
 app.include_router(books_router, prefix="/books", tags=["books"])
 
+# Negotiated zstd/br/gzip above COMPRESSION_MIN_SIZE; added first so the timing middleware wraps it
+if settings.compression:
+    app.add_middleware(
+        CompressionMiddleware,
+        codecs=codecs,
+        minimum_size=settings.compression_min_size,
+        profile=settings.compression_profile
+    )
+
+# Request timing, SQL statement hooks and a Prometheus /metrics endpoint
+if settings.instrumentation:
+    instrument_app(
+        app,
+        engines=[engine, read_engine, async_engine],
+        slow_query_ms=settings.slow_query_ms,
+        n_plus_one_threshold=settings.n_plus_one_threshold
+    )
+
+# Serve the core book routes from the async engine when enabled
+if settings.async_db:
+    replace_routes(app, books_async_router, prefix="/books", tags=["books"])
+
+# Production profile: writes go through the single group-committing writer
+if settings.sqlite_production:
+    replace_routes(app, books_writer_router, prefix="/books", tags=["books"])
+
+# Write-behind creates: POST /books is batched into multi-row INSERTs, answered after their commit
+if settings.write_behind:
+    replace_routes(app, books_write_behind_router, prefix="/books", tags=["books"])
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,199 @@
+# Production launcher: preloads the app, then forks N uvicorn workers sharing one listening socket.
+#
+#   python serve.py --workers 8 --db-connections 150
+#
+# --db-connections is the budget for all workers together; each worker's pools are sized from it
+# before the app creates its engines. Every worker has its own writer (SQLITE_PRODUCTION), so writes
+# from different workers still meet at SQLite's file lock and wait up to SQLITE_BUSY_TIMEOUT_MS.
+# Shutdown (SIGTERM/SIGINT) lets in-flight requests finish, then the app lifespan disposes every pool.
+import argparse
+import importlib.util
+import math
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from contextlib import suppress
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+LOOPS = ("auto", "uvloop", "asyncio")
+HTTP_PROTOCOLS = ("auto", "httptools", "h11")
+# A worker that exits sooner than this after starting is treated as crashing, not restarted in a loop
+MIN_WORKER_UPTIME = 5.0
+
+def env_flag(name: str) -> bool:
+    return os.getenv(name, "false").lower() in ("1", "true", "yes")
+
+# uvloop/httptools when installed (auto), or insist on them
+def resolve(choice: str, fast: str, fallback: str) -> str:
+    installed = importlib.util.find_spec(fast) is not None
+    if choice == "auto":
+        return fast if installed else fallback
+    if choice == fast and not installed:
+        sys.exit(f"{fast} is not installed (pip install {fast})")
+    return choice
+
+# Split a connection budget over workers and the engines each worker opens to the database
+def pool_settings(budget: int, workers: int, engines_per_worker: int) -> Dict[str, str]:
+    per_engine = budget // (workers * engines_per_worker)
+    if per_engine < 1:
+        sys.exit(f"--db-connections {budget} is too small for {workers} workers x {engines_per_worker} engines")
+    # Half kept open, half opened for bursts; pool_size + max_overflow never exceeds the share
+    pool_size = max(1, math.ceil(per_engine / 2))
+    return {"DB_POOL_SIZE": str(pool_size), "DB_MAX_OVERFLOW": str(per_engine - pool_size)}
+
+# The production profile's engines get the same per-engine share: the read-only pool takes the split
+# as is, the write engine keeps its one writer connection and at most its configured overflow
+def production_pool_settings(pools: Dict[str, str]) -> Dict[str, str]:
+    share = int(pools["DB_POOL_SIZE"]) + int(pools["DB_MAX_OVERFLOW"])
+    write_overflow = min(int(os.getenv("SQLITE_WRITE_MAX_OVERFLOW", "4")), share - 1)
+    return {
+        "SQLITE_READ_POOL_SIZE": pools["DB_POOL_SIZE"],
+        "SQLITE_READ_MAX_OVERFLOW": pools["DB_MAX_OVERFLOW"],
+        "SQLITE_WRITE_MAX_OVERFLOW": str(write_overflow),
+    }
+
+def load_app(target: str):
+    module_name, _, attribute = target.partition(":")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or "app")
+
+# Create the schema once before forking; the workers' lifespans then find it in place instead of
+# racing each other's CREATE TABLE
+def prepare_database() -> None:
+    from app.database import create_db_and_tables, engine, read_engine
+    create_db_and_tables()
+    # Workers must not inherit the parent's pooled SQLite connections
+    engine.dispose()
+    read_engine.dispose()
+
+def run_worker(config, sock) -> None:
+    import uvicorn
+    # Own process group, so a terminal Ctrl+C reaches the supervisor only and is forwarded once
+    os.setpgid(0, 0)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    code = 1
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+        code = 0
+    finally:
+        # Never fall back into the supervisor's loop in the child
+        os._exit(code)
+
+def supervise(config, sock, workers: int) -> int:
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(config, sock)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        if stopping:
+            return
+        stopping = True
+        print(f"[serve] stopping {len(children)} workers (graceful timeout {config.timeout_graceful_shutdown}s)",
+              file=sys.stderr)
+        for pid in children:
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started = children.pop(pid, None)
+        if started is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        print(f"[serve] worker {pid} exited with {code}", file=sys.stderr)
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            # Crashing on startup (bad config, port, database): give up instead of fork-looping
+            exit_code = 1
+            stop(signal.SIGTERM, None)
+        else:
+            spawn()
+    sock.close()
+    return exit_code
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--app", default="main:app", help="module:attribute of the ASGI app")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "0")) or os.cpu_count() or 1,
+                        help="Worker processes (default: WORKERS or the number of CPU cores)")
+    parser.add_argument("--loop", choices=LOOPS, default=os.getenv("LOOP", "auto"))
+    parser.add_argument("--http", choices=HTTP_PROTOCOLS, default=os.getenv("HTTP_PROTOCOL", "auto"))
+    parser.add_argument("--db-connections", type=int, default=int(os.getenv("DB_CONNECTION_BUDGET", "0")),
+                        help="Connections all workers together may open (0 keeps the configured pools)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="Seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    if args.db_connections:
+        production = env_flag("SQLITE_PRODUCTION")
+        # SQLITE_PRODUCTION replaces the engine with a write engine and a read-only pool
+        engines_per_worker = (2 if env_flag("ASYNC_DB") else 1) + (1 if production else 0)
+        settings = pool_settings(args.db_connections, args.workers, engines_per_worker)
+        if production:
+            settings.update(production_pool_settings(settings))
+        os.environ.update(settings)
+        per_worker = (int(settings["DB_POOL_SIZE"]) + int(settings["DB_MAX_OVERFLOW"])) * engines_per_worker
+        print(f"[serve] {args.workers} workers x {per_worker} connections "
+              f"(pool {settings['DB_POOL_SIZE']} + overflow {settings['DB_MAX_OVERFLOW']} per engine) "
+              f"<= {args.db_connections}", file=sys.stderr)
+
+    import uvicorn
+    loop = resolve(args.loop, "uvloop", "asyncio")
+    http = resolve(args.http, "httptools", "h11")
+    print(f"[serve] loop={loop} http={http} workers={args.workers}", file=sys.stderr)
+
+    # Each worker keeps its own response cache; unless a bus is configured, they invalidate each
+    # other's over UNIX sockets in a directory private to this launch
+    bus_dir = None
+    if args.workers > 1 and hasattr(os, "fork") and not os.getenv("INVALIDATION_BUS"):
+        bus_dir = tempfile.mkdtemp(prefix="bookstore-bus-")
+        os.environ.update(INVALIDATION_BUS="socket", INVALIDATION_SOCKET_DIR=bus_dir)
+
+    # Preload: import errors surface once, before forking, and workers share the imported code
+    app = load_app(args.app)
+    config = uvicorn.Config(
+        app, host=args.host, port=args.port, loop=loop, http=http,
+        timeout_graceful_shutdown=args.graceful_timeout, log_level=args.log_level,
+    )
+    if args.workers == 1 or not hasattr(os, "fork"):
+        if args.workers > 1:
+            print("[serve] os.fork is unavailable; running a single worker", file=sys.stderr)
+        uvicorn.Server(config).run()
+        return 0
+    prepare_database()
+    sock = config.bind_socket()
+    try:
+        return supervise(config, sock, args.workers)
+    finally:
+        if bus_dir is not None:
+            shutil.rmtree(bus_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
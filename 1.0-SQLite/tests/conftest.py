@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read once, at import: point the app at a throwaway database before any test imports it
+os.environ.setdefault("DB_NAME", os.path.join(tempfile.mkdtemp(prefix="bookstore-tests-"), "test.db"))
+os.environ.setdefault("INSTRUMENTATION", "false")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture(scope="session")
+def client():
+    """The app, with its lifespan, on the throwaway database"""
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as client:
+        yield client
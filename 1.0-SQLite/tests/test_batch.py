@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app import batch, database
+from app.batch import encode_batch, unique_ids
+
+@pytest.fixture
+def books(client):
+    return [client.post("/books", json={"title": f"Batch {index}", "author": "Batch"}).json()["id"] for index in range(4)]
+
+def titles(response):
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return [item["title"] for item in body["items"]], body["missing"]
+
+def set_title_in_sql(book_id, title):
+    # Behind the app's back: nothing invalidates the cached body
+    with database.engine.begin() as conn:
+        conn.execute(text("UPDATE books SET title = :title WHERE id = :id"), {"title": title, "id": book_id})
+
+def test_unique_ids_keeps_first_occurrences_in_order():
+    assert unique_ids([5, 3, 5, 1, 3]) == [5, 3, 1]
+
+def test_unique_ids_limit(monkeypatch):
+    monkeypatch.setattr(batch.settings, "batch_get_max_ids", 3)
+    assert unique_ids([1, 2, 3, 3, 2]) == [1, 2, 3]
+    with pytest.raises(ValueError):
+        unique_ids([1, 2, 3, 4])
+
+def test_encode_batch_splices_bodies_in_request_order():
+    bodies = {1: b'{"id":1}', 2: b'{"id":2}'}
+    assert json.loads(encode_batch([2, 9, 1, 8], bodies)) == {"items": [{"id": 2}, {"id": 1}], "missing": [9, 8]}
+    assert json.loads(encode_batch([], {})) == {"items": [], "missing": []}
+
+def test_request_order_duplicates_and_missing(client, books):
+    first, second, third, _ = books
+    missing = 10 ** 9
+    requested = [third, first, missing, third, second, first]
+    expected = (["Batch 2", "Batch 0", "Batch 1"], [missing])
+    assert titles(client.post("/books/batch-get", json={"ids": requested})) == expected
+    assert titles(client.get("/books", params={"ids": ",".join(map(str, requested))})) == expected
+
+def test_items_are_full_books(client, books):
+    items = client.post("/books/batch-get", json={"ids": books[:1]}).json()["items"]
+    assert items == [client.get(f"/books/{books[0]}").json()]
+
+def test_too_many_ids(client, books, monkeypatch):
+    monkeypatch.setattr(batch.settings, "batch_get_max_ids", 3)
+    # Repeats do not count towards the limit
+    assert client.post("/books/batch-get", json={"ids": books[:3] + books[:3]}).status_code == 200
+    assert client.post("/books/batch-get", json={"ids": books}).status_code == 422
+    assert client.get("/books", params={"ids": ",".join(map(str, books))}).status_code == 422
+
+def test_cache_hits_and_misses_in_one_call(client, books):
+    cached, uncached = books[0], books[1]
+    client.get(f"/books/{cached}")
+    set_title_in_sql(cached, "Changed in SQL")
+    set_title_in_sql(uncached, "Loaded from SQL")
+    # The hit is the cached body, the miss is read from the database
+    assert titles(client.post("/books/batch-get", json={"ids": [uncached, cached]})) == (["Loaded from SQL", "Batch 0"], [])
+    # ... and the miss was cached on the way
+    set_title_in_sql(uncached, "Changed again")
+    assert titles(client.post("/books/batch-get", json={"ids": [uncached]})) == (["Loaded from SQL"], [])
+    assert client.get(f"/books/{uncached}").json()["title"] == "Loaded from SQL"
+
+def test_chunked_lookups(client, books, monkeypatch):
+    monkeypatch.setattr(batch.settings, "batch_get_chunk_size", 2)
+    assert titles(client.post("/books/batch-get", json={"ids": books[::-1]})) == ([f"Batch {index}" for index in (3, 2, 1, 0)], [])
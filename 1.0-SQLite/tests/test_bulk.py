@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from sqlalchemy import event
+
+from app import database
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+@pytest.fixture
+def commits():
+    """Number of transactions committed on the write engine while the test runs"""
+    count = [0]
+
+    def committed(connection):
+        count[0] += 1
+
+    event.listen(database.engine, "commit", committed)
+    yield count
+    event.remove(database.engine, "commit", committed)
+
+def create(client, **book):
+    return client.post("/books", json={"author": "Bulk", **book}).json()["id"]
+
+def statuses(result):
+    return [(item["status"], item["id"]) for item in result["results"]]
+
+def test_json_array_creates_and_upserts(client):
+    existing = create(client, title="Before")
+    result = client.post("/books/bulk", json=[
+        {"title": "New 1", "author": "Bulk"},
+        {"id": existing, "title": "After", "author": "Bulk", "genre": "Upserted"},
+        {"title": "New 2", "author": "Bulk", "published_year": 2001},
+    ]).json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (3, 3, 0)
+    assert [status for status, _ in statuses(result)] == ["created", "upserted", "created"]
+    new_1, _, new_2 = [book_id for _, book_id in statuses(result)]
+    assert statuses(result)[1] == ("upserted", existing)
+    assert client.get(f"/books/{existing}").json()["title"] == "After"
+    assert client.get(f"/books/{existing}").json()["genre"] == "Upserted"
+    assert client.get(f"/books/{new_1}").json()["title"] == "New 1"
+    assert client.get(f"/books/{new_2}").json()["published_year"] == 2001
+
+def test_ndjson_body(client):
+    lines = [json.dumps({"title": f"Line {index}", "author": "Bulk"}) for index in range(3)]
+    body = ("\n".join(lines[:2]) + "\n\n" + lines[2]).encode()
+    result = client.post("/books/bulk", content=body, headers=NDJSON).json()
+    assert result["succeeded"] == 3
+    assert [client.get(f"/books/{book_id}").json()["title"] for _, book_id in statuses(result)] == ["Line 0", "Line 1", "Line 2"]
+
+def test_invalid_item_fails_alone(client):
+    result = client.post("/books/bulk", json=[
+        {"title": "Valid 1", "author": "Bulk"},
+        {"title": "No author"},
+        {"title": "Valid 2", "author": "Bulk", "published_year": "not a year"},
+        {"title": "Valid 3", "author": "Bulk"},
+    ]).json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (4, 2, 2)
+    assert [item["status"] for item in result["results"]] == ["created", "invalid", "invalid", "created"]
+    assert "author" in result["results"][1]["error"]
+    assert "published_year" in result["results"][2]["error"]
+    for item in (result["results"][0], result["results"][3]):
+        assert client.get(f"/books/{item['id']}").status_code == 200
+
+def test_invalid_ndjson_line_fails_alone(client):
+    body = b'{"title": "Good", "author": "Bulk"}\n{"title": \n{"title": "Also good", "author": "Bulk"}\n'
+    result = client.post("/books/bulk", content=body, headers=NDJSON).json()
+    assert [item["status"] for item in result["results"]] == ["created", "invalid", "created"]
+
+def test_body_that_is_not_an_array(client):
+    assert client.post("/books/bulk", json={"title": "Alone", "author": "Bulk"}).status_code == 400
+
+def test_missing_ids_on_patch_and_delete(client):
+    first, second = create(client, title="Patch me"), create(client, title="Delete me")
+    missing = 10 ** 9
+    result = client.patch("/books/bulk", json=[{"id": first, "genre": "Patched"}, {"id": missing, "genre": "Nope"}]).json()
+    assert statuses(result) == [("updated", first), ("not_found", missing)]
+    assert (result["succeeded"], result["failed"]) == (1, 1)
+    assert client.get(f"/books/{first}").json()["genre"] == "Patched"
+    assert client.get(f"/books/{first}").json()["title"] == "Patch me"
+
+    result = client.request("DELETE", "/books/bulk", json=[missing, second]).json()
+    assert statuses(result) == [("not_found", missing), ("deleted", second)]
+    assert client.get(f"/books/{second}").status_code == 404
+    assert client.get(f"/books/{first}").status_code == 200
+
+def test_batch_size_splits_transactions(client, commits):
+    books = [{"title": f"Batched {index}", "author": "Bulk"} for index in range(5)]
+    # The invalid item never reaches a batch: five valid items in batches of two are three commits
+    result = client.post("/books/bulk", params={"batch_size": 2}, json=books[:2] + [{"title": "Invalid"}] + books[2:]).json()
+    assert result["succeeded"] == 5
+    assert commits[0] == 3
+    ids = [book_id for status, book_id in statuses(result) if status == "created"]
+    commits[0] = 0
+    result = client.request("DELETE", "/books/bulk", params={"batch_size": 4}, json=ids).json()
+    assert result["succeeded"] == 5
+    assert commits[0] == 2
@@ -0,0 +1,130 @@
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import cache
+from app.bus import InProcessPubSub, InvalidationBus, PubSubBus, SocketBus
+from app.cache import LRUCache, book_key, invalidate_books, pack_entry
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+def entry(updated_at: datetime) -> bytes:
+    return pack_entry(updated_at, b'{"id": 1}')
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for the bus")
+        time.sleep(0.005)
+
+class Worker:
+    """One worker's response cache joined to a bus"""
+
+    def __init__(self, bus: InvalidationBus):
+        self.cache = LRUCache(max_entries=100, max_bytes=100_000, ttl=60)
+        self.bus = bus
+        bus.start(self.cache.invalidate)
+
+    def write(self, monkeypatch, book_ids, updated_at: datetime, deleted: bool = False) -> None:
+        """Commit-side invalidation as this worker runs it"""
+        monkeypatch.setattr(cache, "book_cache", self.cache)
+        monkeypatch.setattr(cache, "invalidation_bus", self.bus)
+        invalidate_books(book_ids, updated_at, deleted=deleted)
+
+@pytest.fixture
+def workers():
+    broker = InProcessPubSub()
+    pair = [Worker(PubSubBus(broker, "invalidations")) for _ in range(2)]
+    yield pair
+    for worker in pair:
+        worker.bus.stop()
+
+def test_write_in_one_worker_evicts_the_other(workers, monkeypatch):
+    a, b = workers
+    key = book_key(1)
+    a.cache.set(key, entry(T0))
+    b.cache.set(key, entry(T0))
+    a.write(monkeypatch, [1], T0 + timedelta(seconds=1))
+    assert a.cache.get(key) is None
+    wait_for(lambda: b.bus.received == 1)
+    assert b.cache.get(key) is None
+    # A worker ignores its own messages
+    assert a.bus.received == 0 and a.bus.published == 1
+
+def test_late_stale_fill_is_rejected_by_the_version_floor(workers, monkeypatch):
+    a, b = workers
+    key = book_key(1)
+    # B reads version T0 and takes its fill token, then A's write is announced before B fills
+    token = b.cache.fill_token()
+    a.write(monkeypatch, [1], T0 + timedelta(seconds=1))
+    wait_for(lambda: b.bus.received == 1)
+    b.cache.set(key, entry(T0), token=token)
+    assert b.cache.get(key) is None
+    # Read before the write but filled after it with a fresh token (a lagging replica): still refused
+    b.cache.set(key, entry(T0), token=b.cache.fill_token())
+    assert b.cache.get(key) is None
+    b.cache.set(key, entry(T0 + timedelta(seconds=1)), token=b.cache.fill_token())
+    assert b.cache.get(key) == entry(T0 + timedelta(seconds=1))
+
+def test_out_of_order_messages_keep_the_newest_floor(workers, monkeypatch):
+    a, b = workers
+    key = book_key(1)
+    a.write(monkeypatch, [1], T0 + timedelta(seconds=2))
+    a.write(monkeypatch, [1], T0 + timedelta(seconds=1))
+    wait_for(lambda: b.bus.received == 2)
+    b.cache.set(key, entry(T0 + timedelta(seconds=1)))
+    assert b.cache.get(key) is None
+    assert b.cache.stats()["version_floors"] == 1
+
+def test_delete_refuses_the_deleted_version(workers, monkeypatch):
+    a, b = workers
+    a.write(monkeypatch, [1], T0, deleted=True)
+    wait_for(lambda: b.bus.received == 1)
+    b.cache.set(book_key(1), entry(T0))
+    assert b.cache.get(book_key(1)) is None
+
+def test_bulk_writes_are_split_into_messages(workers, monkeypatch):
+    a, b = workers
+    a.write(monkeypatch, range(a.bus.max_keys + 1), T0)
+    wait_for(lambda: b.bus.received == 2)
+    assert a.bus.published == 2
+    assert b.cache.stats()["version_floors"] == a.bus.max_keys + 1
+
+def test_socket_bus_between_two_workers(tmp_path, monkeypatch):
+    a, b = Worker(SocketBus(str(tmp_path))), Worker(SocketBus(str(tmp_path)))
+    try:
+        assert b.bus.peers() == [a.bus.path]
+        b.cache.set(book_key(1), entry(T0))
+        a.write(monkeypatch, [1], T0 + timedelta(seconds=1))
+        wait_for(lambda: b.bus.received == 1)
+        assert b.cache.get(book_key(1)) is None
+        b.cache.set(book_key(1), entry(T0))
+        assert b.cache.get(book_key(1)) is None
+    finally:
+        a.bus.stop()
+        b.bus.stop()
+    assert os.listdir(tmp_path) == []
+
+def test_socket_bus_removes_dead_peers(tmp_path, monkeypatch):
+    # A socket file left behind by a worker that died without closing it
+    dead = tmp_path / "dead.sock"
+    orphan = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    orphan.bind(str(dead))
+    orphan.close()
+    a = Worker(SocketBus(str(tmp_path)))
+    try:
+        a.write(monkeypatch, [1], T0)
+        assert not dead.exists()
+        assert a.bus.failed == 0
+    finally:
+        a.bus.stop()
+
+def test_publish_without_peers_or_before_start_is_a_no_op():
+    bus = InvalidationBus()
+    bus.publish({book_key(1): 1})
+    assert bus.stats()["published"] == 0
+    assert PubSubBus(InProcessPubSub(), "invalidations").stats()["published"] == 0
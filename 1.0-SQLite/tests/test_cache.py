@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import cache
+from app.cache import LRUCache, RedisCache, book_key, invalidate_books, pack_entry
+
+class FakeClock:
+    """time.monotonic stand-in moved by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakeRedis:
+    """The part of the redis client RedisCache uses, with px expiry on a FakeClock"""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.data = {}
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append("get")
+        entry = self.data.get(key)
+        if entry is None or entry[1] <= self.clock():
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+    def mget(self, keys):
+        self.calls.append("mget")
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, px=None):
+        self.data[key] = (value, self.clock() + px / 1000 if px else float("inf"))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, px=None):
+        self.commands.append((key, value, px))
+
+    def execute(self):
+        for key, value, px in self.commands:
+            self.client.set(key, value, px=px)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def redis_cache(clock):
+    return RedisCache(FakeRedis(clock), ttl=60)
+
+def entry(updated_at: datetime, body: bytes = b'{"id": 1}') -> bytes:
+    return pack_entry(updated_at, body)
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+def test_lru_get_set_and_ttl(clock):
+    lru = LRUCache(max_entries=10, max_bytes=10_000, ttl=30)
+    assert lru.get("a") is None
+    lru.set("a", entry(T0))
+    assert lru.get("a") == entry(T0)
+    clock.now += 31
+    assert lru.get("a") is None
+    assert lru.stats()["expirations"] == 1
+    assert lru.stats()["entries"] == 0
+
+def test_lru_evicts_least_recently_used(clock):
+    lru = LRUCache(max_entries=2, max_bytes=10_000, ttl=30)
+    lru.set("a", entry(T0))
+    lru.set("b", entry(T0))
+    lru.get("a")
+    lru.set("c", entry(T0))
+    assert lru.get("b") is None
+    assert lru.get("a") is not None and lru.get("c") is not None
+    assert lru.stats()["evictions"] == 1
+
+def test_lru_byte_limit(clock):
+    value = entry(T0)
+    lru = LRUCache(max_entries=10, max_bytes=2 * len(value), ttl=30)
+    for key in "abc":
+        lru.set(key, value)
+    assert lru.stats()["entries"] == 2 and lru.stats()["bytes"] == 2 * len(value)
+    # Larger than the whole cache: never stored
+    lru.set("big", b"x" * (3 * len(value)))
+    assert lru.get("big") is None
+
+def test_redis_get_set_and_ttl(redis_cache, clock):
+    assert redis_cache.get("a") is None
+    redis_cache.set("a", entry(T0))
+    assert redis_cache.client.data["bookstore:a"][1] == clock.now + 60
+    assert redis_cache.get("a") == entry(T0)
+    clock.now += 61
+    assert redis_cache.get("a") is None
+    assert (redis_cache.hits, redis_cache.misses) == (1, 2)
+
+def test_redis_get_many_is_one_round_trip(redis_cache):
+    redis_cache.set_many({"a": entry(T0), "b": entry(T0)})
+    redis_cache.client.calls.clear()
+    assert redis_cache.get_many(["a", "missing", "b"]) == [entry(T0), None, entry(T0)]
+    assert redis_cache.client.calls.count("mget") == 1
+    assert (redis_cache.hits, redis_cache.misses) == (2, 1)
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_fill_token_loses_to_concurrent_delete(backend, redis_cache):
+    store = redis_cache if backend == "redis" else LRUCache(10, 10_000, 30)
+    token = store.fill_token()
+    # The row is read, then a write deletes the key before the fill lands
+    store.delete("a")
+    store.set("a", entry(T0), token=token)
+    assert store.get("a") is None
+    store.set_many({"a": entry(T0)}, token=token)
+    assert store.get("a") is None
+    store.set("a", entry(T0), token=store.fill_token())
+    assert store.get("a") == entry(T0)
+
+def test_invalidate_books_sets_version_floor(redis_cache, monkeypatch):
+    monkeypatch.setattr(cache, "book_cache", redis_cache)
+    key = book_key(1)
+    redis_cache.set(key, entry(T0))
+    invalidate_books([1], T0 + timedelta(seconds=1))
+    assert redis_cache.get(key) is None
+    # A fill read before the write (another worker, a lagging replica) is refused, even with a fresh token
+    redis_cache.set(key, entry(T0), token=redis_cache.fill_token())
+    assert redis_cache.get(key) is None
+    redis_cache.set(key, entry(T0 + timedelta(seconds=1)), token=redis_cache.fill_token())
+    assert redis_cache.get(key) == entry(T0 + timedelta(seconds=1))
+
+def test_invalidate_deleted_books_refuses_last_version(redis_cache, monkeypatch):
+    monkeypatch.setattr(cache, "book_cache", redis_cache)
+    invalidate_books([2], T0, deleted=True)
+    redis_cache.set(book_key(2), entry(T0))
+    assert redis_cache.get(book_key(2)) is None
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app import database, feed
+
+def head():
+    """The last seq in the change log"""
+    with database.engine.connect() as conn:
+        return conn.execute(text("SELECT COALESCE(MAX(seq), 0) FROM book_changes")).scalar_one()
+
+def changes(client, **params):
+    response = client.get("/books/changes", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def replay(client, since=0, limit=1000):
+    """Every change after `since`, batch by batch as a mirror would read them"""
+    entries = []
+    while True:
+        batch = changes(client, since=since, limit=limit)
+        entries += batch["changes"]
+        assert batch["next_since"] >= since
+        since = batch["next_since"]
+        if not batch["has_more"]:
+            return entries, since
+
+def test_writes_updates_and_deletes(client):
+    since = head()
+    # The deleted book is not the newest, so SQLite does not hand its id to the next insert
+    gone = client.post("/books", json={"title": "Gone", "author": "Feed"}).json()["id"]
+    kept = client.post("/books", json={"title": "Kept", "author": "Feed"}).json()["id"]
+    client.put(f"/books/{kept}", json={"title": "Kept, renamed"})
+    client.delete(f"/books/{gone}")
+    added = client.post("/books", json={"title": "Added", "author": "Feed"}).json()["id"]
+
+    batch = changes(client, since=since)
+    # Each book once, at its latest change, in seq order
+    assert [(change["op"], change["id"]) for change in batch["changes"]] == [("upsert", kept), ("delete", gone), ("upsert", added)]
+    seqs = [change["seq"] for change in batch["changes"]]
+    assert seqs == sorted(seqs) and seqs[0] > since
+    assert batch["changes"][0]["book"]["title"] == "Kept, renamed"
+    assert batch["changes"][0]["book"] == client.get(f"/books/{kept}").json()
+    assert batch["changes"][1]["book"] is None
+    assert (batch["next_since"], batch["has_more"]) == (head(), False)
+    assert batch["next_since"] == seqs[-1]
+
+    # Nothing after the head
+    assert changes(client, since=batch["next_since"]) == {"changes": [], "next_since": batch["next_since"], "has_more": False}
+
+def test_limit_pages_through_the_log(client):
+    since = head()
+    ids = [client.post("/books", json={"title": f"Paged {index}", "author": "Feed"}).json()["id"] for index in range(5)]
+    first = changes(client, since=since, limit=2)
+    assert [change["id"] for change in first["changes"]] == ids[:2]
+    assert first["has_more"] is True and first["next_since"] == first["changes"][-1]["seq"]
+    entries, end = replay(client, since, limit=2)
+    assert [change["id"] for change in entries] == ids
+    assert end == head()
+
+def test_since_zero_replays_the_catalog(client):
+    client.post("/books", json={"title": "Replayed", "author": "Feed"})
+    deleted = client.post("/books", json={"title": "Replayed, then deleted", "author": "Feed"}).json()["id"]
+    client.delete(f"/books/{deleted}")
+    mirror = {}
+    entries, _ = replay(client, 0, limit=100)
+    for change in entries:
+        if change["op"] == "upsert":
+            mirror[change["id"]] = change["book"]
+        else:
+            mirror.pop(change["id"], None)
+    with database.engine.connect() as conn:
+        catalog = dict(conn.execute(text("SELECT id, title FROM books")).all())
+    assert {book_id: book["title"] for book_id, book in mirror.items()} == catalog
+    assert deleted not in mirror
+
+def test_long_poll_returns_when_a_write_happens(client, monkeypatch):
+    # No periodic re-read within the test: only the local commit can wake the wait
+    monkeypatch.setattr(feed.settings, "changes_poll_seconds", 30)
+    since = head()
+    writer = threading.Timer(0.3, lambda: client.post("/books", json={"title": "Awaited", "author": "Feed"}))
+    writer.start()
+    try:
+        start = time.monotonic()
+        batch = changes(client, since=since, wait=10)
+        elapsed = time.monotonic() - start
+    finally:
+        writer.join()
+    assert [change["book"]["title"] for change in batch["changes"]] == ["Awaited"]
+    assert 0.2 < elapsed < 5
+
+def test_long_poll_times_out_empty(client):
+    since = head()
+    start = time.monotonic()
+    assert changes(client, since=since, wait=0.3) == {"changes": [], "next_since": since, "has_more": False}
+    assert time.monotonic() - start >= 0.3
@@ -0,0 +1,76 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, GzipCodec, negotiate, precompressed_response, weak_etag
+from app.conditional import Validators, is_not_modified
+from app.config import settings
+
+BODY = b'{"items": [' + b",".join(b'{"title": "Dune"}' for _ in range(200)) + b"]}"
+
+@pytest.fixture
+def small_app():
+    """The middleware alone, on routes that set strong and weak ETags"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, codecs={"gzip": GzipCodec()}, minimum_size=100)
+
+    @app.get("/strong")
+    def strong():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+    @app.get("/weak")
+    def weak():
+        return Response(BODY, media_type="application/json", headers={"ETag": 'W/"v1"'})
+
+    @app.get("/cached")
+    def cached(request: Request):
+        return precompressed_response(request, BODY, {"gzip": gzip.compress(BODY)}, {"ETag": '"v1"'})
+
+    return TestClient(app)
+
+def test_weak_etag():
+    assert weak_etag('"v1"') == 'W/"v1"'
+    assert weak_etag('W/"v1"') == 'W/"v1"'
+
+@pytest.mark.parametrize("path", ["/strong", "/cached"])
+def test_encoded_responses_get_a_weak_etag(small_app, path, monkeypatch):
+    monkeypatch.setattr(settings, "compression", True)
+    encoded = small_app.get(path, headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip"
+    assert encoded.headers["etag"] == 'W/"v1"'
+    assert encoded.content == BODY
+    identity = small_app.get(path, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"v1"'
+
+def test_weak_etags_pass_through(small_app):
+    assert small_app.get("/weak", headers={"Accept-Encoding": "gzip"}).headers["etag"] == 'W/"v1"'
+
+class FakeRequest:
+    def __init__(self, **headers):
+        self.headers = headers
+
+@pytest.mark.parametrize("sent", ['"v1"', 'W/"v1"', '"v0", W/"v1"'])
+@pytest.mark.parametrize("current", ['"v1"', 'W/"v1"'])
+def test_if_none_match_accepts_both_forms(sent, current):
+    assert is_not_modified(FakeRequest(**{"if-none-match": sent}), Validators(current, None))
+
+def test_if_none_match_other_version():
+    assert not is_not_modified(FakeRequest(**{"if-none-match": 'W/"v0"'}), Validators('"v1"', None))
+
+def test_negotiate():
+    assert negotiate("gzip;q=0.5, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=0", ["gzip"]) is None
+    assert negotiate("*", ["zstd", "gzip"]) == "zstd"
+    assert negotiate("gzip;q=0.5, identity", ["gzip"]) is None
+    assert negotiate(None, ["gzip"]) is None
+
+def test_conditional_get_matches_across_codings(client):
+    book = client.post("/books", json={"title": "Emma", "author": "Austen"}).json()
+    etag = client.get(f"/books/{book['id']}", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    for tag in (etag, etag.removeprefix("W/")):
+        response = client.get(f"/books/{book['id']}", headers={"If-None-Match": tag, "Accept-Encoding": "gzip"})
+        assert response.status_code == 304
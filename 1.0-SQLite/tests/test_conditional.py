@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import Request
+
+from app.cache import book_cache, book_key
+from app.conditional import book_validators, collection_validators, is_not_modified
+from app.crud import book_crud
+from app.crud_async import async_book_crud
+
+UPDATED_AT = datetime(2024, 5, 1, 12, 30, 15, 654321, tzinfo=timezone.utc)
+VALIDATORS = book_validators(7, UPDATED_AT)
+
+def request(**headers):
+    return Request({"type": "http", "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]})
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value, usegmt=True)
+
+def test_validators():
+    assert VALIDATORS.etag == 'W/"b7-20240501123015654321"'
+    assert VALIDATORS.headers()["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert collection_validators(0, None).etag == 'W/"c0-0"'
+
+@pytest.mark.parametrize("if_none_match,expected", [
+    ('W/"b7-20240501123015654321"', True),
+    # Weak comparison: the strong form of the same tag matches too
+    ('"b7-20240501123015654321"', True),
+    ('"other", W/"b7-20240501123015654321"', True),
+    ('  "b7-20240501123015654321" ', True),
+    ("*", True),
+    ('W/"b7-20240501123015654320"', False),
+    ('W/"b8-20240501123015654321"', False),
+    ("", False),
+])
+def test_if_none_match(if_none_match, expected):
+    assert is_not_modified(request(if_none_match=if_none_match), VALIDATORS) is expected
+
+@pytest.mark.parametrize("since,expected", [
+    # The header drops the microseconds of updated_at
+    (UPDATED_AT.replace(microsecond=0), True),
+    (UPDATED_AT + timedelta(seconds=1), True),
+    (UPDATED_AT - timedelta(seconds=1), False),
+])
+def test_if_modified_since_at_one_second_resolution(since, expected):
+    assert is_not_modified(request(if_modified_since=http_date(since)), VALIDATORS) is expected
+
+def test_if_none_match_takes_precedence():
+    headers = {"if_none_match": '"stale"', "if_modified_since": http_date(UPDATED_AT + timedelta(days=1))}
+    assert is_not_modified(request(**headers), VALIDATORS) is False
+
+def test_unparseable_if_modified_since():
+    assert is_not_modified(request(if_modified_since="yesterday"), VALIDATORS) is False
+    assert is_not_modified(request(), VALIDATORS) is False
+
+@pytest.fixture
+def book(client):
+    return client.post("/books", json={"title": "Conditional", "author": "Etag"}).json()["id"]
+
+def test_book_revalidation(client, book):
+    response = client.get(f"/books/{book}")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    for headers in ({"If-None-Match": etag}, {"If-None-Match": etag.removeprefix("W/")}, {"If-None-Match": "*"}, {"If-Modified-Since": last_modified}):
+        revalidated = client.get(f"/books/{book}", headers=headers)
+        assert revalidated.status_code == 304, headers
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+    assert client.get(f"/books/{book}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+def test_cache_miss_revalidates_without_loading_the_row(client, book, monkeypatch):
+    etag = client.get(f"/books/{book}").headers["etag"]
+    book_cache.delete(book_key(book))
+
+    def not_loaded(*args, **kwargs):
+        raise AssertionError("the row was loaded")
+
+    monkeypatch.setattr(book_crud, "get_book", not_loaded)
+    monkeypatch.setattr(async_book_crud, "get_book", not_loaded)
+    assert client.get(f"/books/{book}", headers={"If-None-Match": etag}).status_code == 304
+    # Nothing was loaded, so nothing was cached
+    assert book_cache.get(book_key(book)) is None
+    assert client.get(f"/books/{10 ** 9}", headers={"If-None-Match": etag}).status_code == 404
+
+def test_etags_change_after_put(client, book):
+    etag = client.get(f"/books/{book}").headers["etag"]
+    collection_etag = client.get("/books", params={"limit": 1}).headers["etag"]
+    assert client.get("/books", params={"limit": 1}, headers={"If-None-Match": collection_etag}).status_code == 304
+
+    assert client.put(f"/books/{book}", json={"title": "Changed"}).status_code == 200
+    response = client.get(f"/books/{book}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["title"] == "Changed"
+    assert client.get(f"/books/{book}", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+    response = client.get("/books", params={"limit": 1}, headers={"If-None-Match": collection_etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != collection_etag
@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import text
+
+from app import crud, database
+from app.facets import FACET_SQL, FACET_TABLE, TOTAL
+
+def grouped_counts():
+    """Every facet's counts as GROUP BY computes them over the books table"""
+    with database.engine.connect() as conn:
+        counts = {TOTAL: {"": conn.execute(text("SELECT COUNT(*) FROM books")).scalar_one()}}
+        for name, sql in FACET_SQL.items():
+            expression = sql.format(row="books")
+            counts[name] = {
+                str(value): count for value, count in conn.execute(text(
+                    f"SELECT {expression}, COUNT(*) FROM books WHERE {expression} IS NOT NULL GROUP BY {expression}"
+                ))
+            }
+    return counts
+
+def counter_rows():
+    with database.engine.connect() as conn:
+        counts = {}
+        for facet, value, count in conn.execute(text(f"SELECT facet, value, book_count FROM {FACET_TABLE}")):
+            counts.setdefault(facet, {})[value] = count
+    return counts
+
+def assert_counters_match(client):
+    expected = grouped_counts()
+    assert counter_rows() == {facet: values for facet, values in expected.items() if values}
+
+    facets = client.get("/books/facets", params={"limit": 1000}).json()
+    assert facets["total"] == expected[TOTAL][""]
+    for name in FACET_SQL:
+        assert len(facets["facets"][name]) < 1000
+        assert {str(item["value"]): item["count"] for item in facets["facets"][name]} == expected[name]
+
+    with database.engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT COUNT(*), COUNT(DISTINCT genre), COUNT(DISTINCT author), COUNT(DISTINCT published_year / 10),"
+            " COUNT(genre), COUNT(author), COUNT(published_year), MIN(published_year), MAX(published_year) FROM books"
+        )).one()
+    total = row[0]
+    assert client.get("/books/stats").json() == {
+        "total": total,
+        "distinct": {"genre": row[1], "author": row[2], "decade": row[3]},
+        "missing": {"genre": total - row[4], "author": total - row[5], "decade": total - row[6]},
+        "earliest_year": row[7],
+        "latest_year": row[8],
+    }
+
+@pytest.fixture(autouse=True)
+def counters_only(monkeypatch):
+    # With CATALOG_SNAPSHOT on, facets would come from the snapshot instead of the counters
+    monkeypatch.setattr(crud, "catalog_snapshot", None)
+
+def test_counters_follow_every_write(client):
+    assert_counters_match(client)
+
+    created = [
+        client.post("/books", json=book).json()["id"] for book in (
+            {"title": "Counted", "author": "Facet A", "published_year": 1999, "genre": "Facet Genre"},
+            {"title": "No genre", "author": "Facet A", "published_year": 2000},
+            {"title": "No year", "author": "Facet B", "genre": "Facet Genre"},
+            {"title": "Nothing", "author": "Facet C"},
+        )
+    ]
+    assert_counters_match(client)
+
+    # Upsert an existing book to NULLs and a new id through the bulk endpoint
+    result = client.post("/books/bulk", json=[
+        {"id": created[0], "title": "Counted", "author": "Facet B", "published_year": None, "genre": None},
+        {"id": max(created) + 1000, "title": "Upserted", "author": "Facet D", "published_year": 1850, "genre": "Facet Other"},
+        {"title": "Bulk new", "author": "Facet A", "published_year": 1851, "genre": "Facet Other"},
+    ]).json()
+    assert result["failed"] == 0
+    created += [item["id"] for item in result["results"][1:]]
+    assert_counters_match(client)
+
+    # Move a book across decades, from NULL to a value and back
+    result = client.patch("/books/bulk", json=[
+        {"id": created[1], "published_year": 2010, "genre": "Facet Genre"},
+        {"id": created[2], "published_year": 1990},
+        {"id": created[3], "genre": None, "published_year": None},
+        {"id": created[4], "author": "Facet A"},
+    ]).json()
+    assert result["failed"] == 0
+    assert_counters_match(client)
+
+    assert client.put(f"/books/{created[0]}", json={"author": "Facet E", "genre": "Facet Genre"}).status_code == 200
+    # A title-only update must not touch the counters
+    assert client.put(f"/books/{created[2]}", json={"title": "Renamed"}).status_code == 200
+    assert_counters_match(client)
+
+    assert client.delete(f"/books/{created[5]}").status_code == 200
+    assert_counters_match(client)
+
+    result = client.request("DELETE", "/books/bulk", json=created[:5]).json()
+    assert result["failed"] == 0
+    assert_counters_match(client)
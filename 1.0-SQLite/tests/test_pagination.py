@@ -0,0 +1,60 @@
+import base64
+import json
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas import BookResponse
+
+def cursor(payload) -> str:
+    """A cursor as a client could forge it"""
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+class Row:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+def test_round_trip():
+    row = Row(id=7, title="Dune", author="Herbert", published_year=None, genre="Science Fiction")
+    assert decode_cursor(encode_cursor("genre,-published_year", row), "genre,-published_year") == ("Science Fiction", None, 7)
+    assert decode_cursor(encode_cursor("id", row), "id") == (7,)
+    assert decode_cursor("", "title") is None
+
+def test_single_key_cursor_without_list():
+    assert decode_cursor(cursor({"s": "title", "v": "Dune", "id": 3}), "title") == ("Dune", 3)
+
+@pytest.mark.parametrize("payload,sort", [
+    ({"s": "title", "v": [{"$gt": 1}], "id": 1}, "title"),
+    ({"s": "title", "v": [["a", "b"]], "id": 1}, "title"),
+    ({"s": "title", "v": {"title": "a"}, "id": 1}, "title"),
+    ({"s": "title", "v": [5], "id": 1}, "title"),
+    ({"s": "published_year", "v": ["1999"], "id": 1}, "published_year"),
+    ({"s": "published_year", "v": [1999.5], "id": 1}, "published_year"),
+    ({"s": "published_year", "v": [True], "id": 1}, "published_year"),
+    # title and author are NOT NULL
+    ({"s": "author", "v": [None], "id": 1}, "author"),
+    ({"s": "id", "id": "1"}, "id"),
+    ({"s": "id", "id": None}, "id"),
+    ({"s": "id", "id": [1]}, "id"),
+    ({"s": "title", "v": ["a", "b"], "id": 1}, "title"),
+    ({"s": "title", "id": 1}, "title"),
+    ({"s": "id", "id": 1}, "title"),
+    (["not", "an", "object"], "id"),
+])
+def test_tampered_cursor_is_malformed(payload, sort):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor(payload), sort)
+
+def test_garbage_cursor_is_malformed():
+    with pytest.raises(ValueError):
+        decode_cursor("not base64!", "id")
+
+def test_tampered_cursor_is_a_400(client):
+    for title in ("Dune", "Emma"):
+        assert client.post("/books", json={"title": title, "author": "A", "published_year": 1965}).status_code == 200
+    page = client.get("/books", params={"cursor": "", "limit": 1, "sort": "title"}).json()
+    assert BookResponse.model_validate(page["items"][0])
+    assert client.get("/books", params={"cursor": page["next_cursor"], "limit": 1, "sort": "title"}).status_code == 200
+    for values in ([{"title": "x"}], [["x"]], [1]):
+        response = client.get("/books", params={"cursor": cursor({"s": "title", "v": values, "id": 1}), "sort": "title"})
+        assert response.status_code == 400, response.text
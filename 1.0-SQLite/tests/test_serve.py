@@ -0,0 +1,29 @@
+import pytest
+
+import serve
+
+def connections(pools, engines_per_worker, workers):
+    return (int(pools["DB_POOL_SIZE"]) + int(pools["DB_MAX_OVERFLOW"])) * engines_per_worker * workers
+
+@pytest.mark.parametrize("budget,workers,engines", [(40, 4, 1), (40, 4, 2), (40, 4, 3), (7, 2, 3), (150, 8, 2)])
+def test_pool_settings_stay_within_budget(budget, workers, engines):
+    assert connections(serve.pool_settings(budget, workers, engines), engines, workers) <= budget
+
+def test_production_pools_use_the_same_share(monkeypatch):
+    monkeypatch.delenv("SQLITE_WRITE_MAX_OVERFLOW", raising=False)
+    # Write engine and read-only pool: two engines per worker
+    pools = serve.pool_settings(40, 4, 2)
+    production = serve.production_pool_settings(pools)
+    share = int(pools["DB_POOL_SIZE"]) + int(pools["DB_MAX_OVERFLOW"])
+    assert int(production["SQLITE_READ_POOL_SIZE"]) + int(production["SQLITE_READ_MAX_OVERFLOW"]) == share
+    assert 1 + int(production["SQLITE_WRITE_MAX_OVERFLOW"]) <= share
+    assert production["SQLITE_WRITE_MAX_OVERFLOW"] == "4"
+
+def test_small_share_caps_the_write_engine(monkeypatch):
+    monkeypatch.setenv("SQLITE_WRITE_MAX_OVERFLOW", "4")
+    production = serve.production_pool_settings(serve.pool_settings(12, 4, 3))
+    assert production["SQLITE_WRITE_MAX_OVERFLOW"] == "0"
+
+def test_budget_too_small_exits():
+    with pytest.raises(SystemExit):
+        serve.pool_settings(5, 4, 2)
@@ -0,0 +1,101 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app import crud, crud_async
+from app.snapshot import CatalogSnapshot
+
+SORTS = ["id", "-id", "title", "-title", "author,title", "genre,-published_year", "-published_year,title", "published_year,-genre,-id"]
+FILTERS = [
+    {},
+    {"author": "Asimov"},
+    {"genre": "Science Fiction"},
+    {"year_from": 1950, "year_to": 1990},
+    {"title_prefix": "Found"},
+]
+BOOKS = [
+    ("Foundation", "Asimov", 1951, "Science Fiction"),
+    ("Foundation and Empire", "Asimov", 1952, "Science Fiction"),
+    ("Second Foundation", "Asimov", 1953, None),
+    ("foundation", "Asimov", None, "Science Fiction"),
+    ("Foundations", "Herbert", 1990, "Essay"),
+    ("Dune", "Herbert", 1965, "Science Fiction"),
+    ("Dune", "Herbert", 1965, "Science Fiction"),
+    ("Émile", "Rousseau", 1762, "Philosophy"),
+    ("Emma", "Austen", 1815, None),
+    ("Zed", "Asimov", None, None),
+    ("Found", "Le Guin", 1974, "Science Fiction"),
+    ("Foundry", "Le Guin", 1974, "Essay"),
+]
+
+@pytest.fixture
+def snapshot():
+    """A snapshot separate from the app's, loaded from the test database on its first read"""
+    return CatalogSnapshot()
+
+@pytest.fixture
+def catalog(client):
+    return [
+        client.post("/books", json=dict(zip(("title", "author", "published_year", "genre"), book))).json()["id"]
+        for book in BOOKS
+    ]
+
+def get(client, monkeypatch, snapshot, path, params):
+    """The response body of `path` with reads served by `snapshot` (None: from SQL)"""
+    with monkeypatch.context() as patch:
+        patch.setattr(crud, "catalog_snapshot", snapshot)
+        patch.setattr(crud_async, "catalog_snapshot", snapshot)
+        response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def cursor_walk(client, monkeypatch, snapshot, params):
+    ids, cursor = [], ""
+    while cursor is not None:
+        page = get(client, monkeypatch, snapshot, "/books", {**params, "cursor": cursor, "limit": 7})
+        ids += [book["id"] for book in page["items"]]
+        cursor = page["next_cursor"]
+    return ids
+
+def assert_same_results(client, monkeypatch, snapshot):
+    for filters in FILTERS:
+        for sort in SORTS:
+            params = {**filters, "sort": sort}
+            for page in ({"limit": 1000}, {"skip": 3, "limit": 5}):
+                expected = get(client, monkeypatch, None, "/books", {**params, **page})
+                assert get(client, monkeypatch, snapshot, "/books", {**params, **page}) == expected, params
+            walked = cursor_walk(client, monkeypatch, None, params)
+            assert walked == [book["id"] for book in get(client, monkeypatch, None, "/books", {**params, "limit": 1000})]
+            assert cursor_walk(client, monkeypatch, snapshot, params) == walked, params
+        for params in ({**filters, "limit": 1000}, {**filters, "limit": 2, "facet": ["genre", "decade"]}):
+            expected = get(client, monkeypatch, None, "/books/facets", params)
+            assert get(client, monkeypatch, snapshot, "/books/facets", params) == expected, params
+    sparse = {"sort": "-title", "fields": "title,genre", "limit": 1000}
+    assert get(client, monkeypatch, snapshot, "/books", sparse) == get(client, monkeypatch, None, "/books", sparse)
+
+def test_snapshot_matches_sql(client, monkeypatch, snapshot, catalog):
+    assert_same_results(client, monkeypatch, snapshot)
+
+def test_snapshot_follows_single_writes(client, monkeypatch, snapshot, catalog):
+    assert_same_results(client, monkeypatch, snapshot)
+    # Titles that move to either end of the title order and between existing ranks
+    client.put(f"/books/{catalog[0]}", json={"title": "Aardvark", "genre": None})
+    client.put(f"/books/{catalog[5]}", json={"title": "Foundation and Earth", "published_year": 1986})
+    client.put(f"/books/{catalog[9]}", json={"title": "zzz", "author": "Herbert"})
+    client.delete(f"/books/{catalog[1]}")
+    client.post("/books", json={"title": "Foundation's Edge", "author": "Asimov", "published_year": 1982})
+    assert_same_results(client, monkeypatch, snapshot)
+
+def test_snapshot_follows_bulk_writes(client, monkeypatch, snapshot, catalog):
+    assert_same_results(client, monkeypatch, snapshot)
+    created = client.post("/books/bulk", json=[
+        {"title": f"Foundation {index:03d}", "author": "Asimov", "published_year": 1950 + index, "genre": "Science Fiction"}
+        for index in range(300)
+    ] + [{"id": catalog[2], "title": "Found Again", "author": "Asimov", "published_year": None, "genre": "Essay"}]).json()
+    assert created["failed"] == 0
+    new_ids = [result["id"] for result in created["results"][:300]]
+    assert client.patch("/books/bulk", json=[
+        {"id": book_id, "title": f"Renamed {book_id}", "genre": None} for book_id in new_ids[::3]
+    ]).json()["failed"] == 0
+    assert client.request("DELETE", "/books/bulk", json=new_ids[1::3] + catalog[6:8]).json()["failed"] == 0
+    assert_same_results(client, monkeypatch, snapshot)
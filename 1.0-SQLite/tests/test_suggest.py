@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import suggest
+from app.suggest import SuggestIndex, suggest_key
+
+START = datetime(2024, 1, 1)
+
+def at(seconds):
+    return START + timedelta(seconds=seconds)
+
+@pytest.fixture
+def index():
+    index = SuggestIndex(max_values=1000, sync_lag=2)
+    index.apply([
+        ("Foundation", "Isaac Asimov", at(1)),
+        ("Foundation and Empire", "Isaac Asimov", at(2)),
+        ("Fahrenheit 451", "Ray Bradbury", at(3)),
+        ("Germinal", "Émile Zola", at(4)),
+        ("Jane Eyre", "Charlotte Brontë", at(5)),
+        ("Dune", "Frank Herbert", at(6)),
+    ])
+    return index
+
+def test_suggest_key():
+    assert suggest_key("Brontë, Charlotte") == "bronte charlotte"
+    assert suggest_key("  FOUNDATION  and  Empire ") == "foundation and empire"
+
+def test_newest_first(index):
+    assert index.top("title", "f", 10) == ["Fahrenheit 451", "Foundation and Empire", "Foundation"]
+    assert index.top("title", "f", 2) == ["Fahrenheit 451", "Foundation and Empire"]
+    assert index.top("title", "foundation a", 10) == ["Foundation and Empire"]
+
+def test_case_and_accent_insensitive(index):
+    assert index.top("author", "emi", 10) == ["Émile Zola"]
+    assert index.top("author", "ÉMI", 10) == ["Émile Zola"]
+    assert index.top("author", "charlotte BRON", 10) == ["Charlotte Brontë"]
+    assert index.top("title", "FOUND", 10) == ["Foundation and Empire", "Foundation"]
+
+def test_like_metacharacters_are_literal(index):
+    # The prefix never reaches a LIKE pattern: % is not a word character, _ is matched as itself
+    assert index.top("title", "%", 10) == []
+    assert index.top("title", "f%n", 10) == []
+    assert index.top("title", "f_", 10) == []
+    assert index.top("title", "_", 10) == []
+    index.apply([("f_stop", "Nobody", at(7))])
+    assert index.top("title", "f_", 10) == ["f_stop"]
+    assert index.top("title", "F_S", 10) == ["f_stop"]
+
+def test_no_match_and_empty_prefix(index):
+    assert index.top("title", "xyz", 10) == []
+    assert index.top("author", "?!", 10) == []
+
+def test_distinct_values_keep_the_newest_spelling(index):
+    assert index.top("author", "isaac", 10) == ["Isaac Asimov"]
+    index.apply([("I, Robot", "ISAAC ASIMOV", at(10))])
+    assert index.top("author", "isaac", 10) == ["ISAAC ASIMOV"]
+    # An older row read again within the sync lag does not win back
+    index.apply([("Foundation", "Isaac Asimov", at(9))])
+    assert index.top("author", "isaac", 10) == ["ISAAC ASIMOV"]
+
+def test_rewritten_values_move_up(index):
+    index.apply([("Foundation", "Isaac Asimov", at(10))])
+    assert index.top("title", "f", 10) == ["Foundation", "Fahrenheit 451", "Foundation and Empire"]
+
+def test_remove(index):
+    index.remove("title", ["Foundation", "Never indexed"])
+    assert index.top("title", "found", 10) == ["Foundation and Empire"]
+    index.remove("author", ["Émile Zola"])
+    assert index.top("author", "emi", 10) == []
+
+def test_memoized_prefixes_follow_writes(monkeypatch, index):
+    monkeypatch.setattr(suggest, "_SCAN_LIMIT", 1)
+    assert index.top("title", "f", 10) == ["Fahrenheit 451", "Foundation and Empire", "Foundation"]
+    assert index.stats()["fields"]["title"]["memoized_prefixes"] == 1
+    index.apply([("Frankenstein", "Mary Shelley", at(10))])
+    assert index.top("title", "f", 2) == ["Frankenstein", "Fahrenheit 451"]
+    index.remove("title", ["Frankenstein"])
+    assert index.top("title", "f", 10) == ["Fahrenheit 451", "Foundation and Empire", "Foundation"]
+
+def test_bulk_merge_matches_inserts(index):
+    rows = [(f"Title {number:03}", f"Author {number % 7}", at(10 + number)) for number in range(200)]
+    merged = SuggestIndex(max_values=1000, sync_lag=2)
+    merged.apply(rows)
+    inserted = SuggestIndex(max_values=1000, sync_lag=2)
+    for row in rows:
+        inserted.apply([row])
+    for field, prefix in (("title", "title 1"), ("title", "t"), ("author", "author")):
+        assert merged.top(field, prefix, 50) == inserted.top(field, prefix, 50)
+    assert merged.top("title", "title 19", 3) == ["Title 199", "Title 198", "Title 197"]
+
+def test_max_values_keeps_the_newest():
+    index = SuggestIndex(max_values=2, sync_lag=2)
+    index.apply([("Alpha", "", at(1)), ("Beta", "", at(2)), ("Gamma", "", at(3))])
+    assert index.top("title", "a", 10) == []
+    assert index.stats()["fields"]["title"]["values"] == 2
+
+def suggestions(client, prefix, field="title"):
+    response = client.get("/books/suggest", params={"prefix": prefix, "field": field})
+    assert response.status_code == 200, response.text
+    return response.json()["suggestions"]
+
+def test_suggest_endpoint_follows_writes(client):
+    created = client.post("/books", json={"title": "Qwzyx Foundation", "author": "Émile Qwzyxton"}).json()
+    assert suggestions(client, "qwzyx f") == ["Qwzyx Foundation"]
+    assert suggestions(client, "EMILE QWZ", field="author") == ["Émile Qwzyxton"]
+
+    client.put(f"/books/{created['id']}", json={"title": "Qwzyx Empire"})
+    assert suggestions(client, "qwzyx") == ["Qwzyx Empire"]
+
+    client.delete(f"/books/{created['id']}")
+    assert suggestions(client, "qwzyx") == []
+    assert suggestions(client, "emile qwz", field="author") == []
+
+def test_suggest_endpoint_like_metacharacters(client):
+    client.post("/books", json={"title": "Vbnmq_Under Score", "author": "Metachar"})
+    assert suggestions(client, "%") == []
+    # A trailing % is dropped like other punctuation, one inside the prefix is not a wildcard
+    assert suggestions(client, "vbnmq%") == ["Vbnmq_Under Score"]
+    assert suggestions(client, "v%score") == []
+    assert suggestions(client, "vbnmq_") == ["Vbnmq_Under Score"]
+    assert suggestions(client, "v_nmq") == []
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import crud, trigram
+from app.trigram import TrigramIndex, trigrams, words
+
+START = datetime(2024, 1, 1)
+
+def row(book_id, title, author="", genre="", seconds=0):
+    """A row shaped like the sync query's (id, title, author, genre, updated_at)"""
+    return SimpleNamespace(
+        id=book_id, title=title, author=author, genre=genre, updated_at=START + timedelta(seconds=seconds)
+    )
+
+@pytest.fixture
+def index():
+    index = TrigramIndex(threshold=0.3, sync_lag=2)
+    index.apply([
+        row(1, "Foundation", "Isaac Asimov", "Science Fiction"),
+        row(2, "Foundation and Empire", "Isaac Asimov", "Science Fiction"),
+        row(3, "Dune", "Frank Herbert", "Science Fiction"),
+        row(4, "Jane Eyre", "Charlotte Brontë", "Classic"),
+    ])
+    return index
+
+def test_words_fold_case_and_accents():
+    assert words("Charlotte BRONTË") == ["charlotte", "bronte"]
+    assert words("Émile Zola") == ["emile", "zola"]
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams("Dune") == {"  d", " du", "dun", "une", "ne "}
+    # No trigram spans two words
+    assert not any(" " in gram.strip() for gram in trigrams("Jane Eyre"))
+
+def test_typos_match(index):
+    assert index.search("Foundaton", 10)[:2] == [1, 2]
+    assert index.search("Asimvo", 10)[:2] == [1, 2]
+    assert index.search("Herbret", 10) == [3]
+
+def test_accents_and_case_are_ignored(index):
+    assert index.search("bronte", 10) == [4]
+    assert index.search("BRONTË", 10) == [4]
+
+def test_shorter_close_matches_rank_first(index):
+    # Both contain every trigram of the query; the shorter text matched a larger share
+    assert index.search("Foundation", 10)[:2] == [1, 2]
+
+def test_unrelated_and_empty_queries(index):
+    assert index.search("Xylophone", 10) == []
+    assert index.search("?!", 10) == []
+
+def test_limit(index):
+    assert len(index.search("Science Fiction", 2)) == 2
+    assert sorted(index.search("Science Fiction", 10)) == [1, 2, 3]
+
+def test_update_replaces_the_old_text(index):
+    index.apply([row(3, "Children of Dune", "Frank Herbert", "Science Fiction", seconds=5)])
+    assert index.search("Chidlren", 10) == [3]
+    index.apply([row(3, "Hyperion", "Dan Simmons", "Science Fiction", seconds=10)])
+    assert index.search("Chidlren", 10) == []
+    assert index.search("Herbert", 10) == []
+    assert index.search("Hyperoin", 10) == [3]
+    assert index.stats()["books"] == 4
+
+def test_resync_within_the_lag_is_skipped(index):
+    index.apply([row(3, "Hyperion", seconds=10)])
+    # The next sync re-reads the last TRIGRAM_SYNC_LAG_SECONDS: unchanged and older rows are no-ops
+    assert index.since() == START + timedelta(seconds=8)
+    assert index.apply([row(3, "Hyperion", seconds=10)]) == 0
+    assert index.apply([row(3, "Dune", seconds=9)]) == 0
+    assert index.search("Hyperion", 10) == [3]
+
+def test_remove(index):
+    index.remove([1, 42])
+    assert index.search("Foundation", 10)[0] == 2
+    assert 1 not in index.search("Foundation", 10)
+    assert index.stats()["books"] == 3
+
+def test_compaction_keeps_results(monkeypatch, index):
+    monkeypatch.setattr(trigram, "_MIN_DEAD", 1)
+    for seconds in range(1, 6):
+        index.apply([row(3, f"Dune {seconds}", seconds=seconds)])
+    assert index.stats()["tombstones"] < 5
+    assert index.search("Foundaton", 10)[:2] == [1, 2]
+    assert index.search("Dune 5", 10)[0] == 3
+    assert index.search("Dune 4", 10)[0] == 3
+
+@pytest.fixture
+def fuzzy(monkeypatch):
+    """/books/search through the trigram index"""
+    monkeypatch.setattr(crud.settings, "search_backend", "trigram")
+
+def search(client, q):
+    response = client.get("/books/search", params={"q": q})
+    assert response.status_code == 200, response.text
+    return [book["title"] for book in response.json()]
+
+def test_search_endpoint_follows_writes(client, fuzzy):
+    created = client.post("/books", json={"title": "Foundation Zanzibarix", "author": "Trigram"}).json()
+    assert "Foundation Zanzibarix" in search(client, "Foundaton Zanzibraix")
+
+    client.put(f"/books/{created['id']}", json={"title": "Quixotic Marmalade"})
+    assert "Foundation Zanzibarix" not in search(client, "Zanzibraix")
+    assert "Quixotic Marmalade" in search(client, "Quixotik Marmalade")
+
+    client.delete(f"/books/{created['id']}")
+    assert "Quixotic Marmalade" not in search(client, "Quixotik Marmalade")
+    # The failed lookup dropped the book from the index
+    assert created["id"] not in trigram.search_index.search("Quixotik Marmalade", 10)
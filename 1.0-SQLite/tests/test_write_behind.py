@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import books_write_behind
+from app.database import write_created_books
+from app.schemas import BookCreate
+from app.writer import BatchWriter
+
+class Recorder:
+    """Flush that records each batch and answers every item with its own result"""
+
+    def __init__(self):
+        self.batches = []
+        self.flushed = threading.Event()
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        self.flushed.set()
+        return [f"done:{item}" for item in items]
+
+def test_full_batch_is_written_without_waiting_for_max_delay():
+    recorder = Recorder()
+    writer = BatchWriter(recorder, max_rows=3, max_delay=30)
+    try:
+        start = time.monotonic()
+        futures = [writer.submit(item) for item in "abc"]
+        assert [future.result(5) for future in futures] == ["done:a", "done:b", "done:c"]
+        assert time.monotonic() - start < 5
+        assert recorder.batches == [["a", "b", "c"]]
+    finally:
+        writer.stop()
+
+def test_partial_batch_is_written_after_max_delay():
+    recorder = Recorder()
+    writer = BatchWriter(recorder, max_rows=100, max_delay=0.2)
+    try:
+        start = time.monotonic()
+        futures = [writer.submit(item) for item in "ab"]
+        assert [future.result(5) for future in futures] == ["done:a", "done:b"]
+        assert time.monotonic() - start >= 0.2
+        assert recorder.batches == [["a", "b"]]
+        assert writer.stats()["batches"] == 1 and writer.stats()["items"] == 2
+    finally:
+        writer.stop()
+
+def test_failed_batch_fails_every_caller():
+    def flush(items):
+        raise RuntimeError("disk full")
+
+    writer = BatchWriter(flush, max_rows=2, max_delay=30)
+    try:
+        futures = [writer.submit(item) for item in "ab"]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="disk full"):
+                future.result(5)
+        assert writer.stats()["failed"] == 2
+    finally:
+        writer.stop()
+
+def test_callers_get_their_own_ids_in_order(client):
+    # `client` runs the lifespan, so the schema exists; writes go through the real insert path
+    writer = BatchWriter(write_created_books, max_rows=20, max_delay=0.05)
+    books = [BookCreate(title=f"Batch {index}", author="Writer", published_year=1900 + index) for index in range(50)]
+
+    async def create_all():
+        return await asyncio.gather(*(writer.run(book) for book in books))
+
+    try:
+        rows = asyncio.run(create_all())
+    finally:
+        writer.stop()
+    assert [(row.title, row.published_year) for row in rows] == [(book.title, book.published_year) for book in books]
+    ids = [row.id for row in rows]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert writer.stats()["batches"] >= 3
+    for row in rows[::10]:
+        assert client.get(f"/books/{row.id}").json()["title"] == row.title
+
+@pytest.fixture
+def stalled_writer(monkeypatch):
+    """A batcher whose flush is stuck and whose one-item queue is full"""
+    release = threading.Event()
+    taken = threading.Event()
+
+    def flush(items):
+        taken.set()
+        release.wait(5)
+        return items
+
+    writer = BatchWriter(flush, max_rows=1, max_delay=0, max_pending=1, queue_timeout=0.05)
+    writer.submit("in flush")
+    taken.wait(5)
+    writer.submit("queued")
+    monkeypatch.setattr(books_write_behind, "create_batcher", writer)
+    yield writer
+    release.set()
+    writer.stop()
+
+def test_full_queue_answers_503(stalled_writer):
+    app = FastAPI()
+    app.include_router(books_write_behind.router, prefix="/books")
+    with TestClient(app) as client:
+        response = client.post("/books", json={"title": "Late", "author": "A"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert stalled_writer.stats()["waited"] == 1 and stalled_writer.stats()["rejected"] == 1
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.pragmas import use_immediate_transactions
+from app.writer import WriteQueue
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'writer.db'}", connect_args={"check_same_thread": False})
+    use_immediate_transactions(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def events(engine):
+    """COMMIT and SAVEPOINT statements issued on the engine"""
+    seen = {"commit": 0, "savepoint": 0, "rollback_savepoint": 0}
+    for name in seen:
+        event.listen(engine, name, lambda *args, name=name: seen.__setitem__(name, seen[name] + 1))
+    return seen
+
+def insert(name: str):
+    def job(session):
+        return session.execute(text("INSERT INTO items (name) VALUES (:name) RETURNING id"), {"name": name}).scalar_one()
+    return job
+
+def fail_after_insert(name: str):
+    def job(session):
+        insert(name)(session)
+        raise ValueError(f"rejected {name}")
+    return job
+
+def names(engine):
+    with engine.connect() as conn:
+        return [row.name for row in conn.execute(text("SELECT name FROM items ORDER BY id"))]
+
+def queued_batch(writer: WriteQueue, jobs):
+    """Submit `jobs` while the writer is held up by a first job, so they all land in the next batch"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker(session):
+        started.set()
+        release.wait(5)
+
+    first = writer.submit(blocker)
+    started.wait(5)
+    futures = [writer.submit(job) for job in jobs]
+    release.set()
+    first.result(5)
+    return futures
+
+def test_batch_commits_once_with_a_savepoint_per_job(engine, events):
+    writer = WriteQueue(engine)
+    futures = queued_batch(writer, [insert("a"), insert("b"), insert("c")])
+    ids = [future.result(5) for future in futures]
+    writer.stop()
+    assert names(engine) == ["a", "b", "c"]
+    assert ids == sorted(ids)
+    assert writer.stats()["batches"] == 2 and writer.stats()["jobs"] == 4
+    # The blocker ran no SQL, so the three queued jobs are the only transaction: one COMMIT
+    assert events["commit"] == 1
+    assert events["savepoint"] == 3
+
+def test_failing_job_rolls_back_only_its_savepoint(engine, events):
+    writer = WriteQueue(engine)
+    futures = queued_batch(writer, [insert("a"), fail_after_insert("b"), insert("c")])
+    assert futures[0].result(5) and futures[2].result(5)
+    with pytest.raises(ValueError, match="rejected b"):
+        futures[1].result(5)
+    writer.stop()
+    assert names(engine) == ["a", "c"]
+    assert events["rollback_savepoint"] == 1
+    assert events["commit"] == 1
+
+def test_max_batch_splits_queued_jobs(engine, events):
+    writer = WriteQueue(engine, max_batch=2)
+    futures = queued_batch(writer, [insert(name) for name in "abcde"])
+    for future in futures:
+        future.result(5)
+    writer.stop()
+    assert names(engine) == list("abcde")
+    assert writer.stats()["batches"] == 4
+
+def test_stop_commits_queued_jobs(engine):
+    writer = WriteQueue(engine)
+    futures = [writer.submit(insert(name)) for name in "ab"]
+    writer.stop()
+    assert all(future.done() for future in futures)
+    assert names(engine) == ["a", "b"]
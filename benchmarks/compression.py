@@ -0,0 +1,168 @@
+"""Measure response compression for the 1.0-SQLite app: bandwidth per request and CPU per byte.
+
+Seeds a throwaway database with generated books and fetches representative bodies (a single
+book, list pages of 100 and 1000 books, a search, facets and the NDJSON export) uncompressed.
+For every installed codec (gzip always; br and zstd with the brotli and zstandard packages) and
+every level profile it reports the compressed size and ratio, compression and decompression time
+per input byte, and for the export the same with the streaming compressor flushed once per chunk
+as the middleware sends it. Finally it times GET requests through the app with and without
+Accept-Encoding, and a cached single book served from its precompressed variant.
+
+    python benchmarks/compression.py --rows 100000 --samples 50
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = (
+    "shadow night river king queen lost city garden winter summer house road star dark light "
+    "silent secret last first stone fire water wind iron glass golden silver hidden broken"
+).split()
+AUTHORS = ("Smith", "Tolkien", "Orwell", "Austen", "Herbert", "Brontë", "Le Guin", "Dickens", "Twain", "Woolf")
+GENRES = ("Fantasy", "Science Fiction", "Mystery", "Romance", "History", "Poetry", "Horror", "Biography")
+
+def book(rng: random.Random, index: int, start: datetime) -> Dict[str, object]:
+    words = rng.sample(WORDS, rng.randint(1, 4))
+    return {
+        "title": " ".join(word.capitalize() for word in words) + f" {rng.randint(1, 99999)}",
+        "author": f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(AUTHORS)} {rng.randint(1, 500)}",
+        "published_year": None if rng.random() < 0.05 else rng.randint(1800, 2024),
+        "genre": None if rng.random() < 0.1 else rng.choice(GENRES),
+        "created_at": start, "updated_at": start + timedelta(seconds=index),
+    }
+
+def setup_app(rows: int, seed: int) -> None:
+    """Point the SQLite app at a fresh database seeded with `rows` books"""
+    os.environ["DB_NAME"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["INSTRUMENTATION"] = "false"
+    sys.path.insert(0, str(ROOT / "1.0-SQLite"))
+    from sqlalchemy import insert
+    from app.database import create_db_and_tables, engine
+    from app.models import Book
+
+    create_db_and_tables()
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=30)
+    with engine.begin() as conn:
+        for offset in range(0, rows, 5000):
+            conn.execute(insert(Book), [book(rng, i, start) for i in range(offset, min(offset + 5000, rows))])
+
+def timed(fn: Callable[[], object], samples: int) -> float:
+    """Median seconds per call"""
+    fn()
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2]
+
+def decompressor(encoding: str) -> Callable[[bytes], bytes]:
+    if encoding == "gzip":
+        return gzip.decompress
+    if encoding == "br":
+        import brotli
+        return brotli.decompress
+    import zstandard
+    return zstandard.ZstdDecompressor().decompressobj().decompress
+
+def codec_report(body: bytes, codecs: Dict[str, object], profiles: Dict[str, Dict[str, int]], samples: int) -> Dict[str, object]:
+    """Size, ratio and per-byte CPU of every codec and profile on one body"""
+    report: Dict[str, object] = {"identity_bytes": len(body)}
+    for encoding, codec in codecs.items():
+        decompress = decompressor(encoding)
+        for profile, levels in profiles.items():
+            level = levels[encoding]
+            compressed = codec.compress(body, level)
+            assert decompress(compressed) == body
+            compress_s = timed(lambda: codec.compress(body, level), samples)
+            decompress_s = timed(lambda: decompress(compressed), samples)
+            report[f"{encoding}/{profile}"] = {
+                "level": level, "bytes": len(compressed), "ratio": round(len(body) / len(compressed), 2),
+                "compress_ns_per_byte": round(compress_s / len(body) * 1e9, 2),
+                "compress_mb_s": round(len(body) / compress_s / 1e6, 1),
+                "decompress_ns_per_byte": round(decompress_s / len(body) * 1e9, 2),
+            }
+    return report
+
+def stream_report(chunks: List[bytes], codecs: Dict[str, object], profiles: Dict[str, Dict[str, int]]) -> Dict[str, object]:
+    """The export compressed as the middleware streams it: one flush per chunk"""
+    size = sum(len(chunk) for chunk in chunks)
+    report: Dict[str, object] = {"identity_bytes": size, "chunks": len(chunks)}
+    for encoding, codec in codecs.items():
+        for profile, levels in profiles.items():
+            start = time.perf_counter()
+            stream = codec.stream(levels[encoding])
+            compressed = sum(len(stream.write(chunk)) for chunk in chunks) + len(stream.close())
+            elapsed = time.perf_counter() - start
+            report[f"{encoding}/{profile}"] = {
+                "level": levels[encoding], "bytes": compressed, "ratio": round(size / compressed, 2),
+                "compress_ns_per_byte": round(elapsed / size * 1e9, 2),
+            }
+    return report
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000, help="Books to seed")
+    parser.add_argument("--samples", type=int, default=50, help="Timed runs per codec, profile and body")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    setup_app(args.rows, args.seed)
+    from fastapi.testclient import TestClient
+    from app.cache import book_cache
+    from app.compression import PROFILES, available_codecs
+    from app.config import settings
+    from app.export import stream_books
+    from main import app
+
+    codecs = available_codecs()
+    identity = {"Accept-Encoding": "identity"}
+    report: Dict[str, object] = {"rows": args.rows, "codecs": list(codecs)}
+    with TestClient(app) as client:
+        book_id = client.get("/books?limit=1", headers=identity).json()[0]["id"]
+        requests = {
+            "single_book": f"/books/{book_id}",
+            "list_100": "/books?limit=100",
+            "list_1000": "/books?limit=1000",
+            "list_100_sparse": "/books?limit=100&fields=title,author",
+            "search_100": "/books/search?q=golden&limit=100",
+            "facets": "/books/facets",
+        }
+        bodies = {name: client.get(path, headers=identity).content for name, path in requests.items()}
+        report["bodies"] = {name: codec_report(body, codecs, PROFILES, args.samples) for name, body in bodies.items()}
+        report["export_stream"] = stream_report(list(stream_books("ndjson", batch_size=1000)), codecs, PROFILES)
+
+        # Whole requests through the middleware, per Accept-Encoding (the default profile for lists)
+        latency: Dict[str, Dict[str, object]] = {}
+        for name in ("list_100", "list_1000", "search_100"):
+            for accept in ["identity"] + list(codecs):
+                response = client.get(requests[name], headers={"Accept-Encoding": accept})
+                latency.setdefault(name, {})[accept] = {
+                    "wire_bytes": len(response.content) if accept == "identity" else int(response.headers["content-length"]),
+                    "p50_ms": round(timed(lambda: client.get(requests[name], headers={"Accept-Encoding": accept}), args.samples) * 1000, 3),
+                }
+        # A cached book above the threshold is compressed once, at fill time, and then served as stored
+        settings.compression_min_size = 0
+        book_cache.delete(f"book:{book_id}")
+        for accept in ["identity"] + list(codecs):
+            response = client.get(requests["single_book"], headers={"Accept-Encoding": accept})
+            latency.setdefault("single_book_cached", {})[accept] = {
+                "wire_bytes": int(response.headers["content-length"]),
+                "p50_ms": round(timed(lambda: client.get(requests["single_book"], headers={"Accept-Encoding": accept}), args.samples) * 1000, 3),
+            }
+        report["requests"] = latency
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Load-test the three app variants and report throughput and latency percentiles.
+
+Each variant runs in its own worker process. The worker seeds the database, then
+drives every endpoint at a fixed concurrency, either in-process through an ASGI
+transport ("asgi") or over HTTP against a uvicorn server ("uvicorn").
+
+    # SQLite variant plus both MySQL variants on a SQLite stand-in, 100k rows
+    python benchmarks/loadtest.py --rows 100000 --concurrency 32 --output results.json
+
+    # Against a real MySQL configured through each variant's .env
+    python benchmarks/loadtest.py --variants mysql mysql-main --backend native
+
+    # Fail (exit 1) when p95 or throughput regress more than 15% against a baseline
+    python benchmarks/loadtest.py --baseline baseline.json --max-regression 0.15
+    python benchmarks/loadtest.py check results.json baseline.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from variants import VARIANTS, WORDS, book_row, load_app, supported_endpoints
+
+ENDPOINTS = ("get_by_id", "list_offset", "list_cursor", "search", "create", "bulk")
+MODES = ("asgi", "uvicorn")
+BULK_SIZE = 100
+# Absolute, because workers chdir into the variant directory
+SCRIPT = str(Path(__file__).resolve())
+
+class Workload:
+    """Builds the next request for an endpoint; one instance per concurrent client"""
+
+    def __init__(self, endpoint: str, rows: int, seed: int):
+        self.endpoint = endpoint
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.cursor = ""
+        self.created = 0
+
+    def request(self) -> Tuple[str, str, Optional[object]]:
+        rng = self.rng
+        if self.endpoint == "get_by_id":
+            return "GET", f"/books/{rng.randint(1, self.rows)}", None
+        if self.endpoint == "list_offset":
+            return "GET", f"/books?skip={rng.randint(0, max(0, self.rows - 100))}&limit=100", None
+        if self.endpoint == "list_cursor":
+            return "GET", f"/books?limit=100&cursor={self.cursor}", None
+        if self.endpoint == "search":
+            return "GET", f"/books/search?q={rng.choice(WORDS)}&limit=20", None
+        if self.endpoint == "create":
+            return "POST", "/books", self._book()
+        if self.endpoint == "bulk":
+            return "POST", "/books/bulk", [self._book() for _ in range(BULK_SIZE)]
+        raise ValueError(f"Unknown endpoint {self.endpoint}")
+
+    def observe(self, response: httpx.Response) -> None:
+        # Walk the collection page by page, starting over at the end
+        if self.endpoint == "list_cursor" and response.status_code == 200:
+            self.cursor = response.json().get("next_cursor") or ""
+
+    def _book(self) -> dict:
+        self.created += 1
+        row = book_row(self.rng, self.rows + self.created, datetime.now())
+        return {key: row[key] for key in ("title", "author", "published_year", "genre")}
+
+async def drive(client: httpx.AsyncClient, endpoint: str, rows: int, requests: int,
+                concurrency: int, warmup: int) -> Dict[str, object]:
+    """Send `requests` requests from `concurrency` clients and summarize the latencies"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = warmup + requests
+    measured_since: Optional[float] = None
+
+    async def client_loop(seed: int) -> None:
+        nonlocal remaining, errors, measured_since
+        workload = Workload(endpoint, rows, seed)
+        while remaining > 0:
+            remaining -= 1
+            measured = remaining < requests
+            method, url, body = workload.request()
+            start = time.perf_counter()
+            if measured and measured_since is None:
+                measured_since = start
+            try:
+                response = await client.request(method, url, json=body)
+            except httpx.HTTPError:
+                errors += measured
+                continue
+            elapsed = time.perf_counter() - start
+            workload.observe(response)
+            if measured:
+                latencies.append(elapsed)
+                errors += response.status_code >= 400
+
+    # Warm-up requests run through the same clients but are not recorded
+    await asyncio.gather(*(client_loop(seed) for seed in range(concurrency)))
+    wall = time.perf_counter() - measured_since if measured_since is not None else 0.0
+    return summarize(endpoint, latencies, errors, wall)
+
+def summarize(endpoint: str, latencies: List[float], errors: int, wall: float) -> Dict[str, object]:
+    latencies = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 3)
+
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(args, db_path: str) -> Tuple[subprocess.Popen, str]:
+    """Run the variant under uvicorn in a child process and wait until it answers"""
+    port = free_port()
+    command = [sys.executable, SCRIPT, "serve", "--variant", args.variant,
+               "--backend", args.backend, "--db", db_path, "--port", str(port)]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            httpx.get(base_url + "/books?limit=1", timeout=1)
+            return server, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 30s")
+
+async def run_worker(args) -> List[Dict[str, object]]:
+    db_path = args.db
+    app, seed = load_app(args.variant, args.backend, db_path)
+    rows = seed(args.rows)
+
+    endpoints = supported_endpoints(args.variant, args.backend, tuple(args.endpoints))
+    server = None
+    if args.mode == "uvicorn":
+        server, base_url = start_server(args, db_path)
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+    else:
+        base_url = "http://asgi"
+        transport = httpx.ASGITransport(app=app)
+
+    results = []
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as client:
+            for endpoint in endpoints:
+                result = await drive(client, endpoint, rows, args.requests, args.concurrency, args.warmup)
+                result.update(variant=args.variant, mode=args.mode, backend=args.backend)
+                print(f"[{args.variant}/{args.mode}] {endpoint}: {result['throughput_rps']} req/s, "
+                      f"p95 {result['p95_ms']} ms, {result['errors']} errors", file=sys.stderr)
+                results.append(result)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return results
+
+def serve(args) -> None:
+    import uvicorn
+    app, _ = load_app(args.variant, args.backend, args.db)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+def run(args) -> int:
+    db_dir = Path(args.db_dir or tempfile.mkdtemp(prefix="bookstore-bench-"))
+    db_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for variant in args.variants:
+        # Seeded databases are reused across runs with the same --db-dir; every
+        # mode then starts from a fresh copy, so earlier writes do not skew it
+        seeded = db_dir / f"{variant}-{args.backend}-{args.rows}.db"
+        subprocess.run([sys.executable, SCRIPT, "seed", "--variant", variant, "--backend", args.backend,
+                        "--db", str(seeded), "--rows", str(args.rows)], check=True, stdout=subprocess.DEVNULL)
+        for mode in args.modes:
+            db_path = seeded
+            if seeded.exists():
+                db_path = db_dir / f"{variant}-{args.backend}-{args.rows}-{mode}.db"
+                shutil.copyfile(seeded, db_path)
+            command = [sys.executable, SCRIPT, "worker", "--variant", variant, "--mode", mode,
+                       "--backend", args.backend, "--db", str(db_path), "--rows", str(args.rows),
+                       "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+                       "--warmup", str(args.warmup), "--endpoints", *args.endpoints]
+            output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+            # The report is the last line; the app may print to stdout while it loads
+            results.extend(json.loads(output.strip().splitlines()[-1]))
+
+    report = {
+        "meta": {
+            "rows": args.rows, "requests": args.requests, "concurrency": args.concurrency,
+            "backend": args.backend, "python": sys.version.split()[0],
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n")
+    else:
+        print(encoded)
+    if args.baseline:
+        return check(report, json.loads(Path(args.baseline).read_text()), args.max_regression)
+    return 0
+
+def check(report: dict, baseline: dict, max_regression: float) -> int:
+    """Compare p95 latency and throughput per (variant, mode, endpoint); 1 on regression"""
+    key = lambda r: (r["variant"], r["mode"], r["endpoint"])
+    previous = {key(r): r for r in baseline["results"]}
+    failures = []
+    for result in report["results"]:
+        base = previous.get(key(result))
+        if base is None:
+            continue
+        name = "/".join(key(result))
+        if base["p95_ms"] and result["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {base['p95_ms']} -> {result['p95_ms']} ms")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+            failures.append(f"{name}: throughput {base['throughput_rps']} -> {result['throughput_rps']} req/s")
+        if result["errors"] > base["errors"]:
+            failures.append(f"{name}: errors {base['errors']} -> {result['errors']}")
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    print(f"{len(failures)} regression(s) beyond {max_regression:.0%}", file=sys.stderr)
+    return 1 if failures else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command")
+
+    def common(p):
+        p.add_argument("--backend", choices=("sqlite", "native"), default="sqlite",
+                       help="sqlite: run the MySQL variants on a SQLite stand-in; native: use each variant's own config")
+        p.add_argument("--rows", type=int, default=1000, help="Books to seed (e.g. 1000, 100000, 1000000)")
+        p.add_argument("--requests", type=int, default=1000, help="Measured requests per endpoint")
+        p.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint")
+        p.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+        p.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+
+    run_parser = sub.add_parser("run", help="Benchmark variants (default)")
+    common(run_parser)
+    run_parser.add_argument("--variants", nargs="+", choices=tuple(VARIANTS), default=list(VARIANTS))
+    run_parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    run_parser.add_argument("--db-dir", help="Directory for seeded databases (reused between runs)")
+    run_parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    run_parser.add_argument("--baseline", help="JSON report to compare against")
+    run_parser.add_argument("--max-regression", type=float, default=0.15, help="Allowed relative regression")
+
+    worker_parser = sub.add_parser("worker", help=argparse.SUPPRESS)
+    common(worker_parser)
+    worker_parser.add_argument("--variant", choices=tuple(VARIANTS), required=True)
+    worker_parser.add_argument("--mode", choices=MODES, required=True)
+    worker_parser.add_argument("--db", required=True)
+
+    seed_parser = sub.add_parser("seed", help=argparse.SUPPRESS)
+    seed_parser.add_argument("--variant", choices=tuple(VARIANTS), required=True)
+    seed_parser.add_argument("--backend", choices=("sqlite", "native"), default="sqlite")
+    seed_parser.add_argument("--db", required=True)
+    seed_parser.add_argument("--rows", type=int, required=True)
+
+    serve_parser = sub.add_parser("serve", help=argparse.SUPPRESS)
+    serve_parser.add_argument("--variant", choices=tuple(VARIANTS), required=True)
+    serve_parser.add_argument("--backend", choices=("sqlite", "native"), default="sqlite")
+    serve_parser.add_argument("--db", required=True)
+    serve_parser.add_argument("--port", type=int, required=True)
+
+    check_parser = sub.add_parser("check", help="Compare two JSON reports")
+    check_parser.add_argument("report")
+    check_parser.add_argument("baseline")
+    check_parser.add_argument("--max-regression", type=float, default=0.15)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in sub.choices:
+        argv = ["run", *argv]
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return 0
+    if args.command == "seed":
+        _, seed = load_app(args.variant, args.backend, args.db)
+        started = time.perf_counter()
+        rows = seed(args.rows)
+        print(f"[{args.variant}] {rows} rows seeded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        return 0
+    if args.command == "serve":
+        serve(args)
+        return 0
+    if args.command == "check":
+        report = json.loads(Path(args.report).read_text())
+        return check(report, json.loads(Path(args.baseline).read_text()), args.max_regression)
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
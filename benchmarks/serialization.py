@@ -0,0 +1,119 @@
+"""Compare the model-based and fast serialization paths for list responses.
+
+Runs against the 1.0-SQLite app on a throwaway database. The 1.0-MySQL service
+layer uses the same encoder, so the relative numbers carry over.
+
+    python benchmarks/serialization.py --rows 20000 --limit 100 1000 --repeat 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def setup_app(rows: int):
+    """Point the SQLite app at a fresh database seeded with `rows` books"""
+    os.environ["DB_NAME"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, str(ROOT / "1.0-SQLite"))
+    from sqlalchemy import insert
+    from app.database import create_db_and_tables, engine
+    from app.models import Book
+
+    create_db_and_tables()
+    now = datetime.now()
+    with engine.begin() as conn:
+        for start in range(0, rows, 5000):
+            conn.execute(insert(Book), [
+                {"title": f"Title {i}", "author": f"Author {i % 997}", "published_year": 1900 + i % 120,
+                 "genre": f"Genre {i % 31}", "created_at": now, "updated_at": now}
+                for i in range(start, min(start + 5000, rows))
+            ])
+
+def model_path(db, limit: int) -> bytes:
+    """What the list endpoints did before: ORM entities, BookResponse models, then response_model"""
+    from app.crud import book_crud
+    from app.schemas import BookResponse
+
+    adapter = _response_adapter()
+    books = [BookResponse.model_validate(book) for book in book_crud.get_books(db, limit=limit)]
+    # FastAPI validates the return value against response_model, dumps it and json.dumps it
+    content = adapter.dump_python(adapter.validate_python(books), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+def fast_path(db, limit: int) -> bytes:
+    from app.crud import book_crud
+    from app.serialization import encode_rows
+
+    return encode_rows(book_crud.get_book_rows(db, limit=limit))
+
+def fast_path_no_orjson(db, limit: int) -> bytes:
+    from app import serialization
+
+    saved, serialization.orjson = serialization.orjson, None
+    try:
+        return fast_path(db, limit)
+    finally:
+        serialization.orjson = saved
+
+@lru_cache(maxsize=None)
+def _response_adapter():
+    """FastAPI builds this once per route, so it is not part of the timed work"""
+    from pydantic import TypeAdapter
+    from app.schemas import BookResponse
+
+    return TypeAdapter(List[BookResponse])
+
+def measure(fn: Callable, db, limit: int, repeat: int) -> Dict[str, float]:
+    fn(db, limit)  # warm up caches and compiled statements
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db, limit)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="Books to seed")
+    parser.add_argument("--limit", type=int, nargs="+", default=[100, 1000], help="Page sizes to measure")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed iterations per case")
+    args = parser.parse_args()
+
+    setup_app(args.rows)
+    from sqlmodel import Session
+    from app.database import engine
+    from app import serialization
+
+    paths = {"model": model_path, "fast": fast_path}
+    if serialization.orjson is not None:
+        paths["fast_typeadapter"] = fast_path_no_orjson
+
+    report = {"rows": args.rows, "orjson": serialization.orjson is not None, "results": []}
+    with Session(engine) as db:
+        for limit in args.limit:
+            bodies = {name: fn(db, limit) for name, fn in paths.items()}
+            same = all(json.loads(body) == json.loads(bodies["model"]) for body in bodies.values())
+            timings = {name: measure(fn, db, limit, args.repeat) for name, fn in paths.items()}
+            report["results"].append({
+                "limit": limit,
+                "identical_output": same,
+                "timings": timings,
+                "speedup": round(timings["model"]["mean_ms"] / timings["fast"]["mean_ms"], 2),
+            })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Compare the columnar catalog snapshot with the SQL path for GET /books and GET /books/facets.
+
+Runs against the 1.0-SQLite app on a throwaway database seeded with generated books
+(needs numpy). Reports the snapshot's load time and memory per book next to the memory
+of the same books as Book ORM objects and as row tuples, then per-request latency of
+BookCRUD.get_book_rows / get_book_rows_page / get_facets with and without the snapshot
+for a mix of filters, sorts and pages, and the cost of picking up single writes.
+
+    python benchmarks/snapshot.py --rows 1000000 --samples 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = (
+    "shadow night river king queen lost city garden winter summer house road star dark light "
+    "silent secret last first stone fire water wind iron glass golden silver hidden broken"
+).split()
+AUTHORS = ("Smith", "Tolkien", "Orwell", "Austen", "Herbert", "Brontë", "Le Guin", "Dickens", "Twain", "Woolf")
+GENRES = ("Fantasy", "Science Fiction", "Mystery", "Romance", "History", "Poetry", "Horror", "Biography")
+
+def book(rng: random.Random, index: int, start: datetime) -> Dict[str, object]:
+    words = rng.sample(WORDS, rng.randint(1, 4))
+    return {
+        "title": " ".join(word.capitalize() for word in words) + f" {rng.randint(1, 99999)}",
+        "author": f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(AUTHORS)} {rng.randint(1, 500)}",
+        "published_year": None if rng.random() < 0.05 else rng.randint(1800, 2024),
+        "genre": None if rng.random() < 0.1 else rng.choice(GENRES),
+        "created_at": start, "updated_at": start + timedelta(seconds=index),
+    }
+
+def setup_app(rows: int, seed: int) -> None:
+    """Point the SQLite app at a fresh database seeded with `rows` books, snapshot enabled"""
+    os.environ["DB_NAME"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["CATALOG_SNAPSHOT"] = "true"
+    sys.path.insert(0, str(ROOT / "1.0-SQLite"))
+    from sqlalchemy import insert
+    from app.database import create_db_and_tables, engine
+    from app.models import Book
+
+    create_db_and_tables()
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=30)
+    with engine.begin() as conn:
+        for offset in range(0, rows, 5000):
+            conn.execute(insert(Book), [book(rng, i, start) for i in range(offset, min(offset + 5000, rows))])
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+    return {"mean_ms": round(sum(samples) / len(samples) * 1000, 3), "p50_ms": pick(0.5),
+            "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(samples[-1] * 1000, 3)}
+
+def measure(fn: Callable[[], object], samples: int) -> Dict[str, float]:
+    fn()
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return percentiles(times)
+
+def traced_bytes(build: Callable[[], object]) -> int:
+    """Bytes still allocated by `build` while its result is alive"""
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Books to seed")
+    parser.add_argument("--samples", type=int, default=200, help="Timed requests per case and path")
+    parser.add_argument("--orm-sample", type=int, default=100_000, help="Books loaded as ORM objects and tuples for the memory comparison")
+    parser.add_argument("--writes", type=int, default=200, help="Single writes picked up incrementally")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    setup_app(args.rows, args.seed)
+    from sqlmodel import Session, select
+    from app import crud
+    from app.crud import BOOK_COLUMNS, book_crud
+    from app.database import engine
+    from app.filters import BookFilters
+    from app.models import Book
+    from app.snapshot import catalog_snapshot
+
+    report: Dict[str, object] = {"rows": args.rows}
+    with Session(engine) as db:
+        start = time.perf_counter()
+        book_crud.sync_catalog_snapshot(db)
+        report["load_seconds"] = round(time.perf_counter() - start, 2)
+        stats = catalog_snapshot.stats()
+        report["snapshot"] = {"bytes_per_book": stats["bytes_per_book"], "total_mb": round(stats["total_bytes"] / 2**20, 1)}
+
+        # The SQL path's memory per book: every row of a list request as ORM objects or as tuples
+        sample = min(args.orm_sample, args.rows)
+        with Session(engine) as fresh:
+            orm = traced_bytes(lambda: fresh.exec(select(Book).limit(sample)).all())
+        tuples = traced_bytes(lambda: db.exec(select(*BOOK_COLUMNS).limit(sample)).all())
+        report["sql_bytes_per_book"] = {"orm_objects": round(orm / sample, 1), "row_tuples": round(tuples / sample, 1)}
+
+        position = db.exec(select(Book.id).offset(args.rows // 2).limit(1)).one()
+        cases = {
+            "first_page_by_id": dict(sort="id"),
+            "offset_10000": dict(sort="id", skip=10000),
+            "after_cursor_by_id": dict(sort="id", cursor=f"middle:{position}"),
+            "genre_newest_first": dict(sort="-published_year", filters=BookFilters(genre="Mystery")),
+            "author_years_by_title": dict(sort="title", filters=BookFilters(author="A. Smith 1", year_from=1900, year_to=2000)),
+            "title_prefix": dict(sort="title", filters=BookFilters(title_prefix="Golden Star")),
+            "genre_decade_by_author": dict(sort="author,-published_year", filters=BookFilters(genre="Poetry", year_from=1950, year_to=1959)),
+            "by_title_unfiltered": dict(sort="-title"),
+            "first_cursor_page_by_genre": dict(sort="genre,title", cursor=""),
+        }
+        results = {}
+        for name, case in cases.items():
+            sort, filters = case.get("sort", "id"), case.get("filters", BookFilters())
+            cursor = case.get("cursor")
+            if cursor is not None and cursor.startswith("middle:"):
+                # A cursor half way through the catalog, as issued by the previous page
+                rows = book_crud.get_book_rows(db, skip=args.rows // 2, limit=1, sort=sort, filters=filters)
+                cursor = crud.encode_cursor(sort, rows[0])
+            if cursor is None:
+                run = lambda: book_crud.get_book_rows(db, skip=case.get("skip", 0), limit=100, sort=sort, filters=filters)
+            else:
+                run = lambda: book_crud.get_book_rows_page(db, cursor=cursor, limit=100, sort=sort, filters=filters)
+            results[name] = {"snapshot": measure(run, args.samples)}
+            crud.catalog_snapshot = None
+            results[name]["sql"] = measure(run, args.samples)
+            crud.catalog_snapshot = catalog_snapshot
+        for name, filters in (("facets", BookFilters()), ("facets_genre_1990s", BookFilters(genre="History", year_from=1990, year_to=1999))):
+            run = lambda: book_crud.get_facets(db, limit=20, filters=filters)
+            results[name] = {"snapshot": measure(run, args.samples)}
+            crud.catalog_snapshot = None
+            results[name]["sql"] = measure(run, args.samples)
+            crud.catalog_snapshot = catalog_snapshot
+        report["latency"] = results
+
+        # Each write lands in the table and its change log row; the next request applies it
+        rng = random.Random(args.seed + 1)
+        start_time = datetime.now()
+        samples = []
+        for index in range(args.writes):
+            db.add(Book(**book(rng, index, start_time)))
+            db.commit()
+            start = time.perf_counter()
+            book_crud.get_book_rows(db, limit=100, sort="title")
+            samples.append(time.perf_counter() - start)
+        report["first_page_by_title_after_each_write"] = percentiles(samples)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
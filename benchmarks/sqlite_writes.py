@@ -0,0 +1,125 @@
+"""Compare concurrent write throughput of the default and production SQLite profiles.
+
+Both also run with write-behind creates (WRITE_BEHIND=true: POST /books batched into
+multi-row INSERTs, one commit per batch). Each profile runs in its own worker process on
+a fresh copy of one seeded database.
+The worker drives POST /books at a fixed concurrency ("writes"), then the same writes
+while other clients read GET /books/{id} ("mixed"), in-process through an ASGI transport.
+
+    python benchmarks/sqlite_writes.py --rows 10000 --requests 2000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest import drive
+from variants import load_app
+
+PROFILES = ("default", "production", "write_behind", "production_write_behind")
+SCRIPT = str(Path(__file__).resolve())
+
+async def run_worker(args) -> List[Dict[str, object]]:
+    app, seed = load_app("sqlite", "sqlite", args.db)
+    rows = seed(args.rows)
+    results = []
+    # The lifespan starts the probe and, in the production profile, owns the writer
+    async with app.router.lifespan_context(app):
+        # Pool timeouts and "database is locked" count as errors instead of aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://asgi", timeout=120) as client:
+            writes = await drive(client, "create", rows, args.requests, args.concurrency, args.warmup)
+            writes.update(workload="writes")
+            results.append(writes)
+
+            mixed_writes, mixed_reads = await asyncio.gather(
+                drive(client, "create", rows, args.requests, args.concurrency, args.warmup),
+                drive(client, "get_by_id", rows, args.requests, args.concurrency, args.warmup),
+            )
+            mixed_writes.update(workload="mixed")
+            mixed_reads.update(workload="mixed")
+            results += [mixed_writes, mixed_reads]
+    for result in results:
+        result.update(profile=args.profile)
+        print(f"[{args.profile}] {result['workload']} {result['endpoint']}: {result['throughput_rps']} req/s, "
+              f"p99 {result['p99_ms']} ms, {result['errors']} errors", file=sys.stderr)
+    return results
+
+def run(args) -> int:
+    db_dir = Path(tempfile.mkdtemp(prefix="bookstore-writes-"))
+    seeded = db_dir / "seeded.db"
+    subprocess.run([sys.executable, SCRIPT, "seed", "--db", str(seeded), "--rows", str(args.rows)],
+                   check=True, stdout=subprocess.DEVNULL, env=dict(os.environ, SQLITE_PRODUCTION="false", WRITE_BEHIND="false"))
+    results = []
+    for profile in args.profiles:
+        # Every profile starts from a copy of the same rows (WAL sticks to a database once set)
+        db_path = db_dir / f"{profile}.db"
+        shutil.copyfile(seeded, db_path)
+        env = dict(os.environ, SQLITE_PRODUCTION="true" if profile.startswith("production") else "false",
+                   WRITE_BEHIND="true" if profile.endswith("write_behind") else "false")
+        command = [sys.executable, SCRIPT, "worker", "--profile", profile, "--db", str(db_path),
+                   "--rows", str(args.rows), "--requests", str(args.requests),
+                   "--concurrency", str(args.concurrency), "--warmup", str(args.warmup)]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True, env=env).stdout
+        results.extend(json.loads(output.strip().splitlines()[-1]))
+    shutil.rmtree(db_dir, ignore_errors=True)
+
+    report = {
+        "meta": {"rows": args.rows, "requests": args.requests, "concurrency": args.concurrency},
+        "results": results,
+    }
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(encoded + "\n")
+    else:
+        print(encoded)
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command")
+
+    def common(p):
+        p.add_argument("--rows", type=int, default=10000, help="Books to seed")
+        p.add_argument("--requests", type=int, default=1000, help="Measured requests per workload")
+        p.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per workload")
+        p.add_argument("--concurrency", type=int, default=64, help="Concurrent clients per workload")
+
+    run_parser = sub.add_parser("run", help="Benchmark every profile (default)")
+    common(run_parser)
+    run_parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    run_parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+
+    worker_parser = sub.add_parser("worker", help=argparse.SUPPRESS)
+    common(worker_parser)
+    worker_parser.add_argument("--profile", choices=PROFILES, required=True)
+    worker_parser.add_argument("--db", required=True)
+
+    seed_parser = sub.add_parser("seed", help=argparse.SUPPRESS)
+    seed_parser.add_argument("--db", required=True)
+    seed_parser.add_argument("--rows", type=int, required=True)
+
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in sub.choices:
+        argv = ["run", *argv]
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        print(json.dumps(asyncio.run(run_worker(args))))
+        return 0
+    if args.command == "seed":
+        _, seed = load_app("sqlite", "sqlite", args.db)
+        seed(args.rows)
+        return 0
+    return run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
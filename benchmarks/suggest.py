@@ -0,0 +1,140 @@
+"""Measure the typeahead prefix index behind GET /books/suggest at catalog scale.
+
+Runs against the 1.0-SQLite app on a throwaway database seeded with generated titles.
+Reports the index build time and memory, then per-keystroke latency: every prefix of
+random titles (1 to --keystrokes characters), for the index alone and for
+BookCRUD.suggest (index plus the existence check against the table), and the cost
+of picking up single writes incrementally.
+
+    python benchmarks/suggest.py --rows 1000000 --samples 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORDS = (
+    "shadow night river king queen lost city garden winter summer house road star dark light "
+    "silent secret last first stone fire water wind iron glass golden silver hidden broken "
+    "forest ocean mountain empire kingdom storm dream memory song war peace love time world"
+).split()
+AUTHORS = ("Smith", "Tolkien", "Orwell", "Austen", "Herbert", "Brontë", "Le Guin", "Dickens", "Twain", "Woolf")
+
+def title(rng: random.Random) -> str:
+    words = rng.sample(WORDS, rng.randint(1, 4))
+    if rng.random() < 0.3:
+        words.insert(0, "The")
+    return " ".join(word.capitalize() for word in words) + f" {rng.randint(1, 99999)}"
+
+def setup_app(rows: int, seed: int) -> List[str]:
+    """Point the SQLite app at a fresh database seeded with `rows` books; returns the titles"""
+    os.environ["DB_NAME"] = os.path.join(tempfile.mkdtemp(), "bench.db")
+    sys.path.insert(0, str(ROOT / "1.0-SQLite"))
+    from sqlalchemy import insert
+    from app.database import create_db_and_tables, engine
+    from app.models import Book
+
+    create_db_and_tables()
+    rng = random.Random(seed)
+    titles = [title(rng) for _ in range(rows)]
+    start = datetime.now() - timedelta(days=1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, 5000):
+            conn.execute(insert(Book), [
+                {"title": titles[i], "author": f"{rng.choice('ABCDEFGHJKLMNPRSTW')}. {rng.choice(AUTHORS)}",
+                 "created_at": start, "updated_at": start + timedelta(seconds=i)}
+                for i in range(offset, min(offset + 5000, rows))
+            ])
+    return titles
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * 1000, 3)
+    return {"mean_ms": round(sum(samples) / len(samples) * 1000, 3), "p50_ms": pick(0.5),
+            "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(samples[-1] * 1000, 3)}
+
+def keystrokes(titles: List[str], samples: int, depth: int, seed: int) -> List[str]:
+    """Prefixes typed while entering random titles, one keystroke at a time"""
+    rng = random.Random(seed)
+    prefixes = []
+    while len(prefixes) < samples:
+        typed = rng.choice(titles)
+        prefixes += [typed[:end] for end in range(1, min(depth, len(typed)) + 1)]
+    return prefixes[:samples]
+
+def measure(fn: Callable[[str], object], prefixes: List[str]) -> Dict[str, float]:
+    fn(prefixes[0])
+    samples = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        fn(prefix)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Books to seed")
+    parser.add_argument("--samples", type=int, default=2000, help="Timed keystrokes per case")
+    parser.add_argument("--keystrokes", type=int, default=8, help="Longest prefix typed per title")
+    parser.add_argument("--limit", type=int, default=10, help="Completions per request")
+    parser.add_argument("--writes", type=int, default=1000, help="Single writes applied incrementally")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    titles = setup_app(args.rows, args.seed)
+    from sqlmodel import Session
+    from app.crud import BookCRUD, book_crud
+    from app.database import engine
+    from app.models import Book
+    from app.suggest import SuggestIndex, suggest_index
+
+    report = {"rows": args.rows, "limit": args.limit}
+    with Session(engine) as db:
+        start = time.perf_counter()
+        book_crud.sync_suggest_index(db)
+        report["build_seconds"] = round(time.perf_counter() - start, 2)
+        report["index"] = suggest_index.stats()["fields"]
+        # Memory of the structure alone: rebuild a second index from fresh copies of the strings
+        # (so the values it keeps are traced), then drop the rows before reading the total
+        rows = db.exec(BookCRUD._suggest_query(None)).all()
+        tracemalloc.start()
+        copies = [(title.encode().decode(), author.encode().decode(), updated_at) for title, author, updated_at in rows]
+        index = SuggestIndex(len(rows), 0)
+        index.apply(copies)
+        del copies
+        report["index_mb"] = round(tracemalloc.get_traced_memory()[0] / 2**20, 1)
+        tracemalloc.stop()
+        del rows, index
+
+        prefixes = keystrokes(titles, args.samples, args.keystrokes, args.seed)
+        report["index_only"] = measure(lambda prefix: suggest_index.top("title", prefix, args.limit), prefixes)
+        report["suggest"] = measure(lambda prefix: book_crud.suggest(db, "title", prefix, args.limit), prefixes)
+        report["by_prefix_length"] = {
+            length: measure(lambda prefix: book_crud.suggest(db, "title", prefix, args.limit),
+                            [prefix for prefix in prefixes if len(prefix) == length] or prefixes[:1])
+            for length in (1, 2, 4, args.keystrokes)
+        }
+
+        # Each write lands in the table, then the next request picks it up through updated_at
+        rng = random.Random(args.seed + 1)
+        samples = []
+        for _ in range(args.writes):
+            db.add(Book(title=title(rng), author=rng.choice(AUTHORS)))
+            db.commit()
+            start = time.perf_counter()
+            book_crud.suggest(db, "title", "the", args.limit)
+            samples.append(time.perf_counter() - start)
+        report["suggest_after_each_write"] = percentiles(samples)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Load one of the three app variants in the current process and seed its database.
+
+Every variant has its own top-level `main`/`config` modules, so a process can
+host only one of them; loadtest.py runs each variant in a separate worker.
+"""
+import os
+import random
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, FrozenSet, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Seed vocabulary; search terms are drawn from the same words
+WORDS = (
+    "river", "stone", "shadow", "garden", "winter", "empire", "silver", "forest", "harbor", "machine",
+    "letters", "midnight", "ocean", "kingdom", "memory", "thunder", "island", "mirror", "journey", "lantern",
+)
+FIRST_NAMES = ("Ada", "Jorge", "Mary", "Haruki", "Chinua", "Toni", "Italo", "Ursula", "Naguib", "Wislawa")
+LAST_NAMES = ("Lovelace", "Borges", "Shelley", "Murakami", "Achebe", "Morrison", "Calvino", "Le Guin", "Mahfouz", "Szymborska")
+GENRES = ("Fiction", "Science Fiction", "Fantasy", "History", "Poetry", "Mystery", "Biography", "Essays")
+
+@dataclass(frozen=True)
+class Variant:
+    directory: str
+    # Endpoints the variant implements; MySQL search needs a real FULLTEXT index
+    features: FrozenSet[str]
+    native_search_only: bool = False
+
+VARIANTS = {
+    "sqlite": Variant("1.0-SQLite", frozenset({"search", "bulk"})),
+    "mysql": Variant("1.0-MySQL", frozenset({"search", "bulk"}), native_search_only=True),
+    "mysql-main": Variant("1.0-MySQL-Main", frozenset({"search"}), native_search_only=True),
+}
+
+def supported_endpoints(name: str, backend: str, endpoints: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Endpoints from `endpoints` that the variant can serve on `backend`"""
+    variant = VARIANTS[name]
+    features = set(variant.features)
+    if variant.native_search_only and backend != "native":
+        features.discard("search")
+    return tuple(e for e in endpoints if e not in ("search", "bulk") or e in features)
+
+def load_app(name: str, backend: str, db_path: str) -> Tuple[object, Callable[[int], int]]:
+    """Import the variant's FastAPI app and return it with a `seed(rows)` function.
+
+    backend "native" uses the variant's own configuration (the SQLite variant is
+    pointed at `db_path`); backend "sqlite" swaps the MySQL variants' engines for
+    a SQLite file at `db_path` so they can run without a MySQL server.
+    """
+    directory = ROOT / VARIANTS[name].directory
+    os.chdir(directory)
+    sys.path.insert(0, str(directory))
+
+    if name == "sqlite":
+        os.environ["DB_NAME"] = db_path
+        import main
+        from app.database import create_db_and_tables, engine
+        from app.models import Book
+        create_db_and_tables()
+        return main.app, _seeder(engine, Book)
+
+    import main
+    modules = [main]
+    if name == "mysql":
+        import database
+        import export
+        modules += [database, export]
+    if backend == "sqlite":
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from sqlmodel import create_engine
+        engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        for module in modules:
+            if hasattr(module, "engine"):
+                module.engine = engine
+            if getattr(module, "async_engine", None) is not None:
+                module.async_engine = async_engine
+            if hasattr(module, "db_probe"):
+                module.db_probe.engine = engine
+    engine = main.engine
+    book = main.Book
+    book.metadata.create_all(engine)
+    return main.app, _seeder(engine, book)
+
+def _seeder(engine, book) -> Callable[[int], int]:
+    def seed(rows: int, batch_size: int = 10000) -> int:
+        """Top the table up to `rows` books; returns the resulting row count"""
+        from sqlalchemy import func, insert, select
+        with engine.begin() as conn:
+            existing = conn.execute(select(func.count()).select_from(book.__table__)).scalar_one()
+        rng = random.Random(existing)
+        now = datetime.now()
+        for start in range(existing, rows, batch_size):
+            batch = [book_row(rng, i, now) for i in range(start, min(start + batch_size, rows))]
+            with engine.begin() as conn:
+                conn.execute(insert(book.__table__), batch)
+        return max(existing, rows)
+    return seed
+
+def book_row(rng: random.Random, index: int, now: datetime) -> dict:
+    return {
+        "title": f"The {rng.choice(WORDS).title()} of {rng.choice(WORDS).title()} {index}",
+        "author": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        "published_year": rng.randint(1800, 2024),
+        "genre": rng.choice(GENRES),
+        "created_at": now,
+        "updated_at": now,
+    }